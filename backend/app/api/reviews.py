@@ -2,15 +2,14 @@
 Reviews API Router - Endpoints for review ingestion and retrieval
 """
 import logging
+import os
 import uuid
 from typing import Optional
-from io import BytesIO
 
-from fastapi import APIRouter, Depends, HTTPException, Query
-from fastapi.responses import StreamingResponse
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse, FileResponse, JSONResponse
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
-import pandas as pd
 
 from app.db.session import get_db
 from app.api.schemas import (
@@ -24,7 +23,6 @@ from app.api.schemas import (
     ProductResponse,
     ProductStatsResponse,
     TaskResponse,
-    TranslationStatus,
     PinReviewRequest,
     ToggleVisibilityRequest,
     UpdateReviewRequest,
@@ -50,7 +48,7 @@ from app.api.schemas import (
     ReportTypeInfo,
     ReportTypeListResponse,
 )
-from app.services.review_service import ReviewService
+from app.services.review_service import ReviewService, decode_review_cursor
 from app.models.task import TaskType
 from app.models.user import User
 from app.services.auth_service import get_current_user
@@ -122,6 +120,11 @@ async def ingest_reviews(
         
         await db.commit()
         
+        if inserted > 0:
+            # 新评论入库：失效产品缓存并递增数据版本（ETag / 导出产物）
+            from app.core.cache import get_cache_service
+            await (await get_cache_service()).invalidate_all_for_product(request.asin)
+        
         # [NEW] 🔥 流式翻译触发：数据入库后立即触发轻量翻译任务
         # 只有当有新数据插入时才触发
         stream_flag = "流式" if request.is_stream else "批量"
@@ -358,11 +361,14 @@ async def get_queue_length():
 @router.get("/{asin}")
 async def get_reviews(
     asin: str,
+    request: Request,
+    response: Response,
     page: int = Query(1, ge=1),
     page_size: int = Query(20, ge=1, le=1000),  # ✅ 将单页最大限制从 100 提升到 1000，支持大批量展示
     rating: Optional[int] = Query(None, ge=1, le=5),
     sentiment: Optional[str] = Query(None, pattern="^(positive|neutral|negative)$"),
     status: Optional[str] = Query(None, pattern="^(pending|processing|completed|failed)$"),
+    cursor: Optional[str] = Query(None, description="游标分页：上一页返回的 next_cursor（传入后忽略 page）"),
     compact: bool = Query(False, description="🚀 精简模式：不返回 insights/theme_highlights 完整内容，只返回数量"),
     no_cache: bool = Query(False, description="跳过缓存，强制从数据库获取"),
     db: AsyncSession = Depends(get_db)
@@ -376,23 +382,42 @@ async def get_reviews(
     - rating: Filter by star rating (1-5)
     - sentiment: Filter by sentiment (positive/neutral/negative)
     - status: Filter by translation status
+    - cursor: next_cursor from the previous page (keyset pagination, ignores page)
     - compact: 🚀 精简模式（默认 false）- 设为 true 可减少约 70% 数据传输量
     - no_cache: Skip cache and fetch from database
     
     🚀 Performance: 
     - Results are cached in Redis for 5 minutes.
     - Use compact=true for list pages to reduce response size from ~50KB to ~15KB
+    - Use cursor for deep pages: an index seek instead of OFFSET, same latency at any depth
+    - total is counted once per product version and cached separately from the pages
+    - ETag is the product data version; a poll with a matching If-None-Match gets
+      304 after a single Redis lookup
     """
-    from app.core.cache import get_cache_service
+    from app.core.cache import get_cache_service, TTL_REVIEWS, data_version_etag, etag_matches, etag_headers
+    
+    if cursor:
+        try:
+            decode_review_cursor(cursor)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
     
     cache = await get_cache_service()
     
+    # 🏷️ 数据版本未变：直接 304（先读数据版本，再从 Redis 读命名空间版本拼缓存 Key，响应内容不会旧于 ETag）
+    version = await cache.get_data_version(asin)
+    if version is not None:
+        etag = data_version_etag(version)
+        if not no_cache and etag_matches(request.headers.get("if-none-match"), etag):
+            return Response(status_code=304, headers=etag_headers(etag))
+        response.headers.update(etag_headers(etag))
+    
     # 🚀 精简模式使用不同的缓存键
     cache_suffix = "_compact" if compact else ""
     
     # 尝试从缓存获取（除非指定 no_cache）
     if not no_cache:
-        cached = await cache.get_reviews(asin, page, page_size, rating, sentiment)
+        cached = await cache.get_reviews(asin, page, page_size, rating, sentiment, cursor, fresh=True)
         if cached:
             # 如果请求精简模式但缓存是完整模式，需要转换
             if compact and "reviews" in cached and len(cached["reviews"]) > 0:
@@ -428,26 +453,46 @@ async def get_reviews(
                         total=cached["total"],
                         page=cached["page"],
                         page_size=cached["page_size"],
-                        reviews=compact_reviews
+                        reviews=compact_reviews,
+                        next_cursor=cached.get("next_cursor")
                     )
             logger.debug(f"[Cache HIT] Reviews for {asin} page={page}")
             if compact:
                 return ReviewListCompactResponse(**cached)
             return ReviewListResponse(**cached)
     
-    # 缓存未命中，从数据库获取
+    # 缓存未命中，从数据库获取（不再每页执行 COUNT）
     service = ReviewService(db)
     
-    reviews, total = await service.get_product_reviews(
-        asin=asin,
-        page=page,
-        page_size=page_size,
-        rating_filter=rating,
-        sentiment_filter=sentiment,
-        status_filter=status
-    )
+    async def load_reviews():
+        return await service.get_product_reviews_page(
+            asin=asin,
+            page_size=page_size,
+            cursor=cursor,
+            page=page,
+            rating_filter=rating,
+            sentiment_filter=sentiment,
+            status_filter=status
+        )
+    
+    async def load_total() -> int:
+        """总数单独缓存（随产品版本号失效），翻页时直接复用"""
+        total_key = await cache.stats_key(asin, f"total:r{rating or 0}:st_{sentiment or ''}:ts_{status or ''}", fresh=True)
+        if no_cache:
+            total = await service.count_product_reviews(asin, rating, sentiment, status)
+            await cache.set(total_key, total, TTL_REVIEWS, local=True)
+            return total
+        return await cache.get_or_compute(
+            total_key,
+            lambda: service.count_product_reviews(asin, rating, sentiment, status),
+            ttl=TTL_REVIEWS,
+            local=True
+        )
     
     if compact:
+        reviews, next_cursor = await load_reviews()
+        total = await load_total()
+        
         # 🚀 精简模式：只返回基本信息 + 数量
         compact_reviews = []
         for r in reviews:
@@ -479,127 +524,226 @@ async def get_reviews(
             "total": total,
             "page": page,
             "page_size": page_size,
-            "reviews": [r.model_dump() for r in compact_reviews]
+            "reviews": [r.model_dump() for r in compact_reviews],
+            "next_cursor": next_cursor
         }
         logger.debug(f"[DB Query] Reviews for {asin} page={page} (compact mode)")
         return ReviewListCompactResponse(**response_data)
-    else:
-        # 完整模式：返回所有数据
-        response_data = {
+    
+    async def load_full_page() -> dict:
+        reviews, next_cursor = await load_reviews()
+        total = await load_total()
+        logger.debug(f"[DB Query] Reviews for {asin} page={page}")
+        return {
             "total": total,
             "page": page,
             "page_size": page_size,
-            "reviews": [ReviewResponse.model_validate(r).model_dump() for r in reviews]
+            "reviews": [ReviewResponse.model_validate(r).model_dump() for r in reviews],
+            "next_cursor": next_cursor
         }
-        
-        # 写入缓存（只缓存完整模式）
-        await cache.set_reviews(asin, response_data, page, page_size, rating, sentiment)
-        logger.debug(f"[Cache SET] Reviews for {asin} page={page}")
-        
-        return ReviewListResponse(**response_data)
+    
+    # 完整模式：返回所有数据（只缓存完整模式）
+    if no_cache:
+        response_data = await load_full_page()
+        await cache.set_reviews(asin, response_data, page, page_size, rating, sentiment, cursor, fresh=True)
+    else:
+        # 🛡️ 单飞：热门产品缓存过期时只有一个请求查库，其余请求等待其结果；
+        # 开启 L1 时热门页（首页，不带游标）直接从进程内存返回（无 Redis 往返、无 json.loads）
+        key = await cache.reviews_key(asin, page, page_size, rating, sentiment, cursor, fresh=True)
+        response_data = await cache.get_or_compute(
+            key, load_full_page, ttl=TTL_REVIEWS, local=cursor is None
+        )
+    
+    return ReviewListResponse(**response_data)
 
 
 @router.get("/{asin}/export")
 async def export_reviews(
     asin: str,
+    format: str = Query("xlsx", pattern="^(xlsx|csv)$", description="导出格式：xlsx / csv"),
+    version: Optional[int] = Query(None, ge=0, description="下载指定数据版本的已生成文件（202 轮询完成后使用）"),
     db: AsyncSession = Depends(get_db)
 ):
     """
-    Export all reviews for a product as Excel (XLSX).
+    Export all reviews for a product as Excel (XLSX) or CSV.
     Includes insights and theme highlights data.
-    """
-    service = ReviewService(db)
     
-    # Get all reviews (no pagination) with insights and theme highlights
-    reviews, total = await service.get_product_reviews(
-        asin=asin,
-        page=1,
-        page_size=10000  # Max export limit
+    🚀 Performance:
+    - Rendered files are stored keyed by the product data version; while the
+      version is unchanged, repeat downloads just send the stored file
+    - Products above EXPORT_INLINE_MAX_ROWS are rendered by a background job on the
+      reports queue (one render per product and format at a time). While a newer
+      version renders, the newest finished file is sent with X-Export-Stale: 1 and
+      X-Export-Latest-Version; with no finished file yet, returns 202 with the job
+      status (poll /reviews/{asin}/export/status?version=..., then download with
+      ?version=...)
+    - Otherwise rendered in the request from a server-side cursor (constant memory):
+      CSV is streamed while it is being queried, XLSX is written by a write-only
+      workbook; the result is stored for the next download
+    """
+    from starlette.background import BackgroundTask
+    from app.core.cache import get_cache_service
+    from app.core.config import settings
+    from app.services.export_service import (
+        ReviewExportService, ExportArtifactStore, XLSX_MEDIA_TYPE, CSV_MEDIA_TYPE
     )
     
-    if not reviews:
+    service = ReviewExportService()
+    product_id = await service.find_product(db, asin)
+    if not product_id:
         raise HTTPException(status_code=404, detail="No reviews found")
     
-    # Convert to DataFrame with insights and theme highlights
-    data = []
-    for r in reviews:
-        # Format insights
-        insights_text = ""
-        if r.insights and len(r.insights) > 0:
-            insight_parts = []
-            for insight in r.insights:
-                insight_str = f"[{insight.insight_type}] {insight.quote}"
-                if insight.quote_translated:
-                    insight_str += f" | 翻译: {insight.quote_translated}"
-                if insight.analysis:
-                    insight_str += f" | 分析: {insight.analysis}"
-                if insight.dimension:
-                    insight_str += f" | 维度: {insight.dimension}"
-                insight_parts.append(insight_str)
-            insights_text = " | ".join(insight_parts)
-        
-        # Format theme highlights
-        theme_parts = []
-        if r.theme_highlights and len(r.theme_highlights) > 0:
-            for theme in r.theme_highlights:
-                theme_label_map = {
-                    "who": "Who（使用者）",
-                    "where": "Where（使用场景）",
-                    "when": "When（使用时机）",
-                    "unmet_needs": "未被满足的需求",
-                    "pain_points": "Pain Points（痛点）",
-                    "benefits": "Benefits（收益/好处）",
-                    "features": "Features（功能特性）",
-                    "comparison": "Comparison（对比）"
-                }
-                theme_label = theme_label_map.get(theme.theme_type, theme.theme_type)
-                
-                # Format items
-                if theme.items and len(theme.items) > 0:
-                    item_texts = []
-                    for item in theme.items:
-                        item_str = item.get("content", "")
-                        if item.get("content_original"):
-                            item_str += f" ({item['content_original']})"
-                        if item.get("explanation"):
-                            item_str += f" - {item['explanation']}"
-                        item_texts.append(item_str)
-                    theme_str = f"{theme_label}: {', '.join(item_texts)}"
-                    theme_parts.append(theme_str)
-        
-        themes_text = " | ".join(theme_parts) if theme_parts else ""
-        
-        data.append({
-            "评分 (Rating)": r.rating,
-            "评论标题 (Title)": r.title_original,
-            "标题翻译 (Title CN)": r.title_translated,
-            "评论内容 (Body)": r.body_original,
-            "内容翻译 (Body CN)": r.body_translated,
-            "情感 (Sentiment)": r.sentiment,
-            "作者 (Author)": r.author,
-            "日期 (Date)": r.review_date,
-            "认证购买 (Verified)": "是" if r.verified_purchase else "否",
-            "有用票数 (Helpful)": r.helpful_votes,
-            "提取洞察 (Insights)": insights_text,
-            "提取主题 (Theme Highlights)": themes_text
-        })
-    
-    df = pd.DataFrame(data)
-    
-    # Generate Excel file
-    output = BytesIO()
-    with pd.ExcelWriter(output, engine='openpyxl') as writer:
-        df.to_excel(writer, index=False, sheet_name='Reviews')
-    
-    output.seek(0)
-    
-    return StreamingResponse(
-        output,
-        media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-        headers={"Content-Disposition": f"attachment; filename=reviews_{asin}.xlsx"}
+    media_type = CSV_MEDIA_TYPE if format == "csv" else XLSX_MEDIA_TYPE
+    filename = f"reviews_{asin}.{format}"
+    store = ExportArtifactStore()
+    
+    # 轮询完成后按版本下载：该版本文件还在就直接发送（期间数据版本可能已前进）
+    if version is not None:
+        path = store.find(asin, version, format)
+        if path:
+            return FileResponse(
+                path, media_type=media_type, filename=filename,
+                headers={"X-Export-Version": str(version)}
+            )
+    
+    # 拿不到数据版本（Redis 不可用）或目录不可写时退化为只渲染、不存储
+    version = None
+    if store.supports(asin):
+        cache = await get_cache_service()
+        version = await cache.get_data_version(asin)
+    
+    temp_path = None
+    if version is not None:
+        path = store.find(asin, version, format)
+        if path:
+            return FileResponse(
+                path, media_type=media_type, filename=filename,
+                headers={"X-Export-Version": str(version)}
+            )
+        if await service.count_rows(db, product_id) > settings.EXPORT_INLINE_MAX_ROWS:
+            job = await _dispatch_export_render(asin, product_id, version, format)
+            # 分析进行中数据版本随每次写入前进：先给最近一次完成的文件，新版本在后台渲染
+            latest = store.latest(asin, format)
+            if latest:
+                latest_version, path = latest
+                return FileResponse(
+                    path, media_type=media_type, filename=filename,
+                    headers={
+                        "X-Export-Version": str(latest_version),
+                        "X-Export-Latest-Version": str(version),
+                        "X-Export-Stale": "1",
+                    }
+                )
+            return JSONResponse(status_code=202, content={
+                "success": True,
+                "asin": asin,
+                "format": format,
+                **job,
+                "status_url": f"/api/v1/reviews/{asin}/export/status?format={format}&version={job['version']}",
+                "message": "评论较多，导出文件正在后台生成，完成后按 version 重新请求导出即可下载"
+            })
+        try:
+            temp_path = store.new_temp(asin, format)
+        except OSError as e:
+            logger.warning(f"导出产物目录不可写，本次不存储: {e}")
+    
+    if format == "csv":
+        chunks = service.stream_csv(product_id)
+        if temp_path:
+            chunks = store.tee_csv(chunks, temp_path, asin, version)
+        return StreamingResponse(
+            chunks,
+            media_type=media_type,
+            headers={"Content-Disposition": f"attachment; filename={filename}"}
+        )
+    
+    if not temp_path:
+        path = await service.write_xlsx(product_id)
+        return FileResponse(
+            path, media_type=media_type, filename=filename,
+            background=BackgroundTask(os.unlink, path)
+        )
+    
+    try:
+        await service.write_xlsx(product_id, temp_path)
+        path = store.publish(temp_path, asin, version, format)
+    except Exception:
+        if os.path.exists(temp_path):
+            os.unlink(temp_path)
+        raise
+    return FileResponse(
+        path, media_type=media_type, filename=filename,
+        headers={"X-Export-Version": str(version)}
     )
 
 
+async def _dispatch_export_render(asin: str, product_id, version: int, fmt: str) -> dict:
+    """大产品：派发后台渲染（同一产品同一格式同时只渲染一个版本），返回正在渲染的版本及任务状态"""
+    from app.core.redis import get_async_redis, ExportJobTracker
+    from app.worker import task_render_review_export
+    
+    tracker = ExportJobTracker(await get_async_redis())
+    rendering, dispatch = await tracker.claim(asin, version, fmt)
+    if dispatch:
+        task_render_review_export.delay(asin, str(product_id), version, fmt)
+        logger.info(f"[导出] 已派发后台渲染 {asin} v{version} {fmt}")
+    elif rendering is not None and rendering != version:
+        logger.info(f"[导出] {asin} {fmt} v{rendering} 渲染中，当前版本 v{version} 待其完成后派发")
+    
+    rendering = rendering if rendering is not None else version
+    job = await tracker.get(asin, rendering, fmt) or {"status": "queued"}
+    return {"version": rendering, **job}
+
+
+@router.get("/{asin}/export/status")
+async def get_export_status(
+    asin: str,
+    format: str = Query("xlsx", pattern="^(xlsx|csv)$", description="导出格式：xlsx / csv"),
+    version: Optional[int] = Query(None, ge=0, description="数据版本（202 响应中的 version，默认当前版本）"),
+):
+    """
+    查询评论导出文件的生成状态（大产品后台渲染时轮询）
+    
+    状态说明：
+    - none: 该数据版本尚未生成
+    - queued / processing: 后台渲染中
+    - completed: 已生成，GET /reviews/{asin}/export?version=... 直接下载
+    - failed: 生成失败（包含 error，重新请求导出会再次派发）
+    """
+    from app.core.cache import get_cache_service
+    from app.core.redis import get_async_redis, ExportJobTracker
+    from app.services.export_service import ExportArtifactStore
+    
+    store = ExportArtifactStore()
+    if not store.supports(asin):
+        raise HTTPException(status_code=400, detail="该 ASIN 不支持导出文件缓存")
+    
+    if version is None:
+        cache = await get_cache_service()
+        version = await cache.get_data_version(asin)
+        if version is None:
+            raise HTTPException(status_code=503, detail="导出状态暂不可用")
+    
+    job = await ExportJobTracker(await get_async_redis()).get(asin, version, format)
+    ready = store.find(asin, version, format) is not None
+    status = "none"
+    if ready:
+        status = "completed"
+    elif job and job["status"] != "completed":  # 已完成但文件已被清理：视为未生成
+        status = job["status"]
+    
+    return {
+        "asin": asin,
+        "format": format,
+        "version": version,
+        "ready": ready,
+        "status": status,
+        "rows": job["rows"] if job else None,
+        "size": job["size"] if job else None,
+        "error": job["error"] if status == "failed" else None,
+    }
+
+
 # ==========================================
 # System Health Check endpoints
 # ==========================================
@@ -625,6 +769,8 @@ async def check_worker_health():
         'app.worker.task_ingest_translation_only',
         'app.worker.task_extract_insights',
         'app.worker.task_extract_themes',
+        'app.worker.task_auto_analysis_tick',
+        'app.worker.task_finalize_auto_analysis',
     ]
     
     try:
@@ -670,6 +816,48 @@ async def check_worker_health():
         }
 
 
+@system_router.get("/translation-memory")
+def get_translation_memory_metrics():
+    """
+    翻译记忆库命中率指标（同步 Redis 调用，FastAPI 会放入线程池执行）
+
+    Returns:
+        - lookups / redis_hits / db_hits / misses: 查询与各层命中次数
+        - saved_calls: 因命中或合并而省下的 LLM 翻译条数
+        - singleflight_waits: 等待其他调用方翻译结果的次数
+        - hit_rate / redis_hit_rate: 总命中率 / Redis 层命中率
+    """
+    from app.services.translation_memory import translation_memory
+
+    return translation_memory.get_metrics()
+
+
+@system_router.get("/llm-transport")
+def get_llm_transport_metrics():
+    """
+    LLM 共享连接池指标（本进程 + 各 Worker 进程的 Redis 快照）
+
+    pool_wait_seconds 高而 latency_seconds 正常 → 连接池打满在排队；
+    latency_seconds 高 → LLM 服务端本身慢。
+    """
+    from app.core.llm import get_transport_metrics
+
+    return get_transport_metrics()
+
+
+@system_router.get("/cache-l1")
+def get_cache_l1_metrics():
+    """
+    进程内 L1 缓存指标（仅处理本次请求的 API 进程）
+
+    hit_rate 低而 evictions 高 → CACHE_L1_MAX_ENTRIES 偏小；
+    active=false → 失效广播监听未连上 Redis，L1 暂时停用。
+    """
+    from app.core.cache import get_local_cache_stats
+
+    return get_local_cache_stats()
+
+
 # Products endpoints
 products_router = APIRouter(prefix="/products", tags=["Products"])
 
@@ -740,6 +928,8 @@ async def get_products(
 @products_router.get("/{asin}/stats", response_model=ProductStatsResponse)
 async def get_product_stats(
     asin: str,
+    request: Request,
+    response: Response,
     no_cache: bool = Query(False, description="跳过缓存"),
     db: AsyncSession = Depends(get_db)
 ):
@@ -747,60 +937,44 @@ async def get_product_stats(
     Get detailed statistics for a product.
     
     🚀 Performance: Results are cached in Redis for 5 minutes.
+    ETag is the product data version; polls with a matching If-None-Match get 304.
     
     **[NEW] Auto-initializes 5W label learning on first visit:**
     - If product has translated reviews (>=10) but no context labels, 
       automatically triggers label learning in background (non-blocking).
     - This ensures labels are ready when user triggers theme extraction.
     """
-    from sqlalchemy import select, func, and_
-    from app.models.product import Product
-    from app.models.review import Review, TranslationStatus
+    from sqlalchemy import select, func
     from app.models.product_context_label import ProductContextLabel
-    from app.services.context_service import ContextService
-    from app.core.cache import get_cache_service
+    from app.core.cache import get_cache_service, data_version_etag, etag_matches, etag_headers
+    from app.api.schemas import ActiveTasksResponse, ActiveTaskStatus
     
-    # 🚀 尝试从缓存获取
     cache = await get_cache_service()
-    if not no_cache:
-        cached = await cache.get(f"cache:stats:{asin}:overview")
-        if cached:
-            logger.debug(f"[Cache HIT] Stats for {asin}")
-            return cached
-    
-    service = ReviewService(db)
-    stats = await service.get_product_stats(asin)
     
-    if not stats:
-        raise HTTPException(status_code=404, detail="Product not found")
-    
-    # [NEW] Auto-initialize 5W label learning on first visit (non-blocking)
-    product_result = await db.execute(
-        select(Product).where(Product.asin == asin)
-    )
-    product = product_result.scalar_one_or_none()
+    # 🏷️ 轮询时数据未变：一次 Redis 读取后直接 304，不再反序列化 / 序列化整份统计
+    version = await cache.get_data_version(asin)
+    if version is not None:
+        etag = data_version_etag(version)
+        if not no_cache and etag_matches(request.headers.get("if-none-match"), etag):
+            return Response(status_code=304, headers=etag_headers(etag))
+        response.headers.update(etag_headers(etag))
     
-    if product:
-        # Check if context labels exist
+    async def compute_stats() -> dict:
+        service = ReviewService(db)
+        stats = await service.get_product_stats(asin)
+        
+        if not stats:
+            raise HTTPException(status_code=404, detail="Product not found")
+        
+        # [NEW] Auto-initialize 5W label learning on first visit (non-blocking)
+        # 已翻译数直接取统计汇总，不再 COUNT 评论表
+        product_data = stats.get("product", {})
         label_count_result = await db.execute(
             select(func.count(ProductContextLabel.id))
-            .where(ProductContextLabel.product_id == product.id)
+            .where(ProductContextLabel.product_id == product_data["id"])
         )
         label_count = label_count_result.scalar() or 0
-        
-        # Check if there are enough translated reviews
-        translated_count_result = await db.execute(
-            select(func.count(Review.id))
-            .where(
-                and_(
-                    Review.product_id == product.id,
-                    Review.translation_status == TranslationStatus.COMPLETED.value,
-                    Review.body_translated.isnot(None),
-                    Review.is_deleted == False
-                )
-            )
-        )
-        translated_count = translated_count_result.scalar() or 0
+        translated_count = product_data.get("translated_reviews", 0)
         
         # Auto-trigger label learning if needed (non-blocking, runs in background)
         # Only trigger if: no labels exist AND has enough translated reviews
@@ -810,69 +984,71 @@ async def get_product_stats(
             # Note: Labels will be auto-generated when user triggers theme extraction
             # We don't trigger it here to avoid unnecessary processing
             # The worker.task_extract_themes will handle label generation automatically
-    
-    # [NEW] 直接用产品统计数据计算任务进度（更简单可靠）
-    from app.api.schemas import ActiveTasksResponse, ActiveTaskStatus
-    
-    active_tasks = ActiveTasksResponse()
-    
-    # stats 是字典，使用字典访问方式
-    product_data = stats.get("product", {})
-    total = product_data.get("total_reviews", 0)
-    
-    if total > 0:
-        # 🚀 优化：直接使用服务层返回的统计数据，无需额外数据库查询
-        # [FIXED] 翻译进度：已翻译 + 已跳过 + 已失败 = 已处理（避免无限轮询）
-        translated = product_data.get("translated_reviews", 0)
-        skipped_count = product_data.get("skipped_reviews", 0)  # 🚀 从服务层获取
-        failed_count = product_data.get("failed_reviews", 0)    # 🚀 从服务层获取
-        
-        # 已处理 = 已翻译 + 已跳过 + 已失败（避免 failed 评论导致前端无限轮询）
-        processed = translated + skipped_count + failed_count
-        trans_progress = int((processed / total) * 100)
-        active_tasks.translation_progress = min(100, trans_progress)
-        active_tasks.translation = ActiveTaskStatus.COMPLETED if trans_progress >= 100 else (
-            ActiveTaskStatus.PROCESSING if trans_progress > 0 else ActiveTaskStatus.IDLE
-        )
         
-        # 洞察进度
-        insights_progress = int((product_data.get("reviews_with_insights", 0) / total) * 100)
-        active_tasks.insights_progress = min(100, insights_progress)
-        active_tasks.insights = ActiveTaskStatus.COMPLETED if insights_progress >= 100 else (
-            ActiveTaskStatus.PROCESSING if insights_progress > 0 else ActiveTaskStatus.IDLE
-        )
+        # [NEW] 直接用产品统计数据计算任务进度（更简单可靠）
+        active_tasks = ActiveTasksResponse()
+        
+        total = product_data.get("total_reviews", 0)
+        
+        if total > 0:
+            # 🚀 优化：直接使用服务层返回的统计数据，无需额外数据库查询
+            # [FIXED] 翻译进度：已翻译 + 已跳过 + 已失败 = 已处理（避免无限轮询）
+            translated = product_data.get("translated_reviews", 0)
+            skipped_count = product_data.get("skipped_reviews", 0)  # 🚀 从服务层获取
+            failed_count = product_data.get("failed_reviews", 0)    # 🚀 从服务层获取
+        
+            # 已处理 = 已翻译 + 已跳过 + 已失败（避免 failed 评论导致前端无限轮询）
+            processed = translated + skipped_count + failed_count
+            trans_progress = int((processed / total) * 100)
+            active_tasks.translation_progress = min(100, trans_progress)
+            active_tasks.translation = ActiveTaskStatus.COMPLETED if trans_progress >= 100 else (
+                ActiveTaskStatus.PROCESSING if trans_progress > 0 else ActiveTaskStatus.IDLE
+            )
+        
+            # 洞察进度
+            insights_progress = int((product_data.get("reviews_with_insights", 0) / total) * 100)
+            active_tasks.insights_progress = min(100, insights_progress)
+            active_tasks.insights = ActiveTaskStatus.COMPLETED if insights_progress >= 100 else (
+                ActiveTaskStatus.PROCESSING if insights_progress > 0 else ActiveTaskStatus.IDLE
+            )
+        
+            # 主题进度
+            themes_progress = int((product_data.get("reviews_with_themes", 0) / total) * 100)
+            active_tasks.themes_progress = min(100, themes_progress)
+            active_tasks.themes = ActiveTaskStatus.COMPLETED if themes_progress >= 100 else (
+                ActiveTaskStatus.PROCESSING if themes_progress > 0 else ActiveTaskStatus.IDLE
+            )
+        
+        # 将 active_tasks 添加到返回结果
+        stats_dict = stats.model_dump() if hasattr(stats, 'model_dump') else dict(stats)
+        # 确保 active_tasks 可以被 JSON 序列化
+        stats_dict['active_tasks'] = active_tasks.model_dump() if hasattr(active_tasks, 'model_dump') else {
+            "translation": active_tasks.translation.value if hasattr(active_tasks.translation, 'value') else active_tasks.translation,
+            "insights": active_tasks.insights.value if hasattr(active_tasks.insights, 'value') else active_tasks.insights,
+            "themes": active_tasks.themes.value if hasattr(active_tasks.themes, 'value') else active_tasks.themes,
+            "translation_progress": active_tasks.translation_progress,
+            "insights_progress": active_tasks.insights_progress,
+            "themes_progress": active_tasks.themes_progress
+        }
+        
+        return stats_dict
         
-        # 主题进度
-        themes_progress = int((product_data.get("reviews_with_themes", 0) / total) * 100)
-        active_tasks.themes_progress = min(100, themes_progress)
-        active_tasks.themes = ActiveTaskStatus.COMPLETED if themes_progress >= 100 else (
-            ActiveTaskStatus.PROCESSING if themes_progress > 0 else ActiveTaskStatus.IDLE
+    def stats_ttl(stats_dict: dict) -> int:
+        """智能 TTL：任务全完成缓存 5 分钟，否则缓存 2 秒（与前端轮询频率匹配，确保实时进度更新）"""
+        tasks = stats_dict["active_tasks"]
+        all_completed = all(
+            tasks[stage] == ActiveTaskStatus.COMPLETED for stage in ("translation", "insights", "themes")
         )
+        return 300 if all_completed else 2
     
-    # 将 active_tasks 添加到返回结果
-    stats_dict = stats.model_dump() if hasattr(stats, 'model_dump') else dict(stats)
-    # 确保 active_tasks 可以被 JSON 序列化
-    stats_dict['active_tasks'] = active_tasks.model_dump() if hasattr(active_tasks, 'model_dump') else {
-        "translation": active_tasks.translation.value if hasattr(active_tasks.translation, 'value') else active_tasks.translation,
-        "insights": active_tasks.insights.value if hasattr(active_tasks.insights, 'value') else active_tasks.insights,
-        "themes": active_tasks.themes.value if hasattr(active_tasks.themes, 'value') else active_tasks.themes,
-        "translation_progress": active_tasks.translation_progress,
-        "insights_progress": active_tasks.insights_progress,
-        "themes_progress": active_tasks.themes_progress
-    }
-    
-    # 🚀 写入缓存（智能 TTL：任务完成缓存久，进行中缓存短）
-    all_completed = (
-        active_tasks.translation == ActiveTaskStatus.COMPLETED and 
-        active_tasks.insights == ActiveTaskStatus.COMPLETED and 
-        active_tasks.themes == ActiveTaskStatus.COMPLETED
-    )
-    # 任务全完成: 缓存 5 分钟，否则缓存 2 秒（与前端轮询频率匹配，确保实时进度更新）
-    cache_ttl = 300 if all_completed else 2
-    await cache.set(f"cache:stats:{asin}:overview", stats_dict, ttl=cache_ttl)
-    logger.debug(f"[Cache SET] Stats for {asin} (ttl={cache_ttl}s)")
+    if no_cache:
+        stats_dict = await compute_stats()
+        await cache.set_product_stats(asin, stats_dict, "overview", ttl=stats_ttl(stats_dict), fresh=True)
+        return stats_dict
     
-    return stats_dict
+    # 🛡️ 单飞：轮询高峰时缓存过期（进行中仅 2 秒），同一产品只有一个请求查库
+    key = await cache.stats_key(asin, "overview", fresh=True)
+    return await cache.get_or_compute(key, compute_stats, ttl=stats_ttl, local=True)
 
 
 # Tasks endpoints  
@@ -1286,6 +1462,10 @@ async def clear_and_reanalyze(
     
     await db.commit()
     
+    # 洞察 / 主题已删除：失效产品缓存并递增数据版本（ETag / 导出产物）
+    from app.core.cache import get_cache_service
+    await (await get_cache_service()).invalidate_all_for_product(asin)
+    
     # 清理 Redis 中的 label_cache（避免主题提取使用旧缓存）
     try:
         from app.core.redis import get_redis
@@ -1414,6 +1594,8 @@ async def batch_clear_and_reanalyze(
         }
     
     # 实际执行清空和重新分析
+    from app.core.cache import get_cache_service
+    cache = await get_cache_service()
     results = []
     success_count = 0
     fail_count = 0
@@ -1447,6 +1629,7 @@ async def batch_clear_and_reanalyze(
             await db.execute(delete(Task).where(Task.product_id == product_id))
             
             await db.commit()
+            await cache.invalidate_all_for_product(asin)
             
             # 3. 清理 Redis 中的 label_cache（避免主题提取使用旧缓存）
             try:
@@ -3472,6 +3655,18 @@ async def delete_report(
 
 # ============== Review Actions API ==============
 
+async def _touch_review_product(db: AsyncSession, product_id) -> None:
+    """评论被编辑 / 删除后：递增所属产品的数据版本，并失效评论列表 / 统计缓存"""
+    from app.core.cache import get_cache_service
+    from app.models.product import Product
+    
+    result = await db.execute(select(Product.asin).where(Product.id == product_id))
+    asin = result.scalar_one_or_none()
+    if asin:
+        cache = await get_cache_service()
+        await cache.touch_product_data(asin)
+
+
 @router.put("/{review_id}/pin")
 async def pin_review(
     review_id: str,
@@ -3503,6 +3698,7 @@ async def pin_review(
         .values(is_pinned=request_body.isPinned)
     )
     await db.commit()
+    await _touch_review_product(db, review.product_id)
     
     logger.info(f"Review {review_id} {'pinned' if request_body.isPinned else 'unpinned'}")
     
@@ -3547,6 +3743,7 @@ async def toggle_review_visibility(
         .values(is_hidden=request_body.isHidden)
     )
     await db.commit()
+    await _touch_review_product(db, review.product_id)
     
     logger.info(f"Review {review_id} {'hidden' if request_body.isHidden else 'shown'}")
     
@@ -3613,6 +3810,7 @@ async def update_review(
     
     # Refresh review to get updated data
     await db.refresh(review)
+    await _touch_review_product(db, review.product_id)
     
     # Convert to response format
     review_response = ReviewResponse.model_validate(review)
@@ -3660,6 +3858,7 @@ async def delete_review(
         .values(is_deleted=True)
     )
     await db.commit()
+    await _touch_review_product(db, review.product_id)
     
     logger.info(f"Review {review_id} logically deleted")
     
@@ -400,6 +400,7 @@ class ReviewListResponse(BaseModel):
     page: int
     page_size: int
     reviews: List[ReviewResponse]
+    next_cursor: Optional[str] = None  # 游标分页：下一页游标（None 表示没有更多）
 
 
 class ReviewListItemCompact(BaseModel):
@@ -449,6 +450,7 @@ class ReviewListCompactResponse(BaseModel):
     page: int
     page_size: int
     reviews: List[ReviewListItemCompact]
+    next_cursor: Optional[str] = None  # 游标分页：下一页游标（None 表示没有更多）
 
 
 # ============== Product Schemas ==============
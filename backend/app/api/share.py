@@ -8,7 +8,7 @@ import logging
 from typing import Optional, List
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request, Response
 from pydantic import BaseModel, Field
 from sqlalchemy.ext.asyncio import AsyncSession
 
@@ -318,10 +318,13 @@ class ShareReviewsResponse(BaseModel):
 @router.get("/{token}/reviews")
 async def get_share_reviews_paginated(
     token: str,
+    request: Request,
+    response: Response,
     page: int = Query(1, ge=1, description="页码（从1开始）"),
     page_size: int = Query(50, ge=10, le=100, description="每页数量（10-100）"),
     rating: Optional[int] = Query(None, ge=1, le=5, description="筛选评分（1-5）"),
     sentiment: Optional[str] = Query(None, description="筛选情感（positive/neutral/negative）"),
+    cursor: Optional[str] = Query(None, description="游标分页：上一页 pagination.next_cursor（传入后忽略 page）"),
     db: AsyncSession = Depends(get_db)
 ):
     """
@@ -333,7 +336,11 @@ async def get_share_reviews_paginated(
     性能优化：
     - 带 Redis 缓存（5分钟TTL）
     - 按需加载，减少首次加载数据量
+    - 游标分页：深页按索引定位，耗时与页码无关；总数单独缓存
+    - ETag = 产品数据版本：If-None-Match 命中时返回 304，不再读缓存 / 查库
     """
+    from app.core.cache import get_cache_service, data_version_etag, etag_matches, etag_headers
+    
     try:
         # 验证 sentiment 参数
         if sentiment and sentiment not in ["positive", "neutral", "negative"]:
@@ -343,12 +350,27 @@ async def get_share_reviews_paginated(
             )
         
         service = ShareService(db)
+        
+        # 先取数据版本（早于读取页面缓存），有效的评论分享链接才做条件请求
+        version = None
+        meta = await service.get_share_meta(token)
+        if meta and meta.get("is_valid") and meta.get("resource_type") == ShareResourceType.REVIEW_READER.value and meta.get("asin"):
+            cache = await get_cache_service()
+            version = await cache.get_data_version(meta["asin"])
+        if version is not None:
+            etag = data_version_etag(version)
+            if etag_matches(request.headers.get("if-none-match"), etag):
+                return Response(status_code=304, headers=etag_headers(etag))
+            response.headers.update(etag_headers(etag))
+        
         result = await service.get_share_reviews_paginated(
             token=token,
             page=page,
             page_size=page_size,
             rating=rating,
-            sentiment=sentiment
+            sentiment=sentiment,
+            cursor=cursor,
+            data_version=version
         )
         
         return ShareReviewsResponse(
@@ -454,8 +476,8 @@ class DataChangeCheckResponse(BaseModel):
     """数据变化检查响应"""
     success: bool
     has_changes: bool
-    current_review_count: int
-    last_summary_review_count: Optional[int] = None
+    data_version: Optional[int] = None
+    summary_data_version: Optional[int] = None
     message: str
 
 
@@ -467,13 +489,10 @@ async def check_data_changes(
     """
     检查数据是否有变化（公开）
     
-    检查评论数据是否在AI总结生成后发生了变化。
-    用于判断是否需要重新生成AI分析。
+    比较产品当前数据版本与最近一次维度总结基于的数据版本（均在 Redis），
+    不再对评论表做 COUNT。用于判断是否需要重新生成AI分析。
     """
-    from app.models import Product
-    from app.models.review import Review
-    from app.models.product_dimension_summary import ProductDimensionSummary
-    from sqlalchemy import select, func, and_
+    from app.core.cache import get_cache_service
     
     try:
         # 验证token并获取资源信息
@@ -499,7 +518,6 @@ async def check_data_changes(
                 detail="此类型的分享链接不支持数据变化检查"
             )
         
-        # 获取ASIN对应的product_id
         asin = meta.get("asin")
         if not asin:
             raise HTTPException(
@@ -507,84 +525,23 @@ async def check_data_changes(
                 detail="无法获取产品信息"
             )
         
-        result = await db.execute(
-            select(Product).where(Product.asin == asin)
-        )
-        product = result.scalar_one_or_none()
-        
-        if not product:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail=f"产品不存在: {asin}"
-            )
-        
-        # 获取当前评论数量
-        current_count_result = await db.execute(
-            select(func.count(Review.id)).where(
-                and_(
-                    Review.product_id == product.id,
-                    Review.is_deleted == False
-                )
-            )
-        )
-        current_review_count = current_count_result.scalar() or 0
-        
-        # 获取上次生成AI总结的时间
-        last_summary_result = await db.execute(
-            select(ProductDimensionSummary.created_at)
-            .where(ProductDimensionSummary.product_id == product.id)
-            .order_by(ProductDimensionSummary.created_at.desc())
-            .limit(1)
-        )
-        last_summary_time = last_summary_result.scalar_one_or_none()
-        
-        last_summary_review_count = None
-        has_changes = False
+        # 一次 Redis 往返取两个版本号
+        cache = await get_cache_service()
+        data_version, summary_data_version = await cache.get_summary_data_versions(asin)
         
-        if last_summary_time:
-            # 获取上次生成总结时的评论数量（基于created_at时间点）
-            # 这里我们使用一个简化的方法：比较当前评论数量和上次总结时的评论数量
-            # 如果存在AI总结，我们假设数据可能已经变化，需要重新生成
-            # 更精确的方法是在生成总结时记录当时的评论数量，但这里先简化处理
-            
-            # 检查是否有新增或删除的评论（通过比较时间戳）
-            # 简化：如果当前评论数量与上次不同，则认为有变化
-            # 或者检查是否有在last_summary_time之后创建或更新的评论
-            new_reviews_result = await db.execute(
-                select(func.count(Review.id)).where(
-                    and_(
-                        Review.product_id == product.id,
-                        Review.is_deleted == False,
-                        Review.created_at > last_summary_time
-                    )
-                )
-            )
-            new_reviews_count = new_reviews_result.scalar() or 0
-            
-            deleted_reviews_result = await db.execute(
-                select(func.count(Review.id)).where(
-                    and_(
-                        Review.product_id == product.id,
-                        Review.is_deleted == True,
-                        Review.updated_at > last_summary_time
-                    )
-                )
-            )
-            deleted_reviews_count = deleted_reviews_result.scalar() or 0
-            
-            has_changes = (new_reviews_count > 0) or (deleted_reviews_count > 0)
-            last_summary_review_count = current_review_count - new_reviews_count + deleted_reviews_count
-        else:
-            # 如果没有AI总结，认为需要生成（数据有变化）
+        if summary_data_version is None:
+            # 从未生成过总结（或未记录版本 / 已过期 / Redis 不可用）：允许生成
             has_changes = True
-        
-        message = "数据已发生变化，可以重新生成AI分析" if has_changes else "数据未发生变化，无需重新生成"
+            message = "未找到AI分析对应的数据版本，可以生成AI分析"
+        else:
+            has_changes = data_version != summary_data_version
+            message = "数据已发生变化，可以重新生成AI分析" if has_changes else "数据未发生变化，无需重新生成"
         
         return DataChangeCheckResponse(
             success=True,
             has_changes=has_changes,
-            current_review_count=current_review_count,
-            last_summary_review_count=last_summary_review_count,
+            data_version=data_version,
+            summary_data_version=summary_data_version,
             message=message
         )
         
@@ -16,7 +16,6 @@ from app.db.session import get_db
 from app.models.user import User
 from app.models.user_project import UserProject
 from app.models.product import Product
-from app.models.review import Review, TranslationStatus
 from app.services.auth_service import get_current_user_required, get_current_user
 
 logger = logging.getLogger(__name__)
@@ -96,37 +95,19 @@ async def get_my_projects(
             return UserProjectListResponse(**cached)
     
     # 构建查询 - 排除已逻辑删除的项目
-    # 🚀 优化：使用子查询一次性获取所有统计数据，避免 N+1 查询
-    from sqlalchemy import case
-    from sqlalchemy.orm import aliased
-    
-    # 子查询：统计每个产品的评论数和已翻译数
-    review_stats = (
-        select(
-            Review.product_id,
-            func.count(Review.id).label("total_reviews"),
-            func.count(
-                case(
-                    (Review.translation_status == TranslationStatus.COMPLETED.value, Review.id),
-                    else_=None
-                )
-            ).label("translated_reviews")
-        )
-        .where(Review.is_deleted == False)
-        .group_by(Review.product_id)
-        .subquery()
-    )
+    # 🚀 优化：评论数 / 已翻译数读 product_review_stats 汇总行，不再按产品 GROUP BY 整张评论表
+    from app.models.product_review_stats import ProductReviewStats
     
     # 主查询
     query = (
         select(
             UserProject, 
             Product,
-            func.coalesce(review_stats.c.total_reviews, 0).label("total_reviews"),
-            func.coalesce(review_stats.c.translated_reviews, 0).label("translated_reviews")
+            func.coalesce(ProductReviewStats.total_reviews, 0).label("total_reviews"),
+            func.coalesce(ProductReviewStats.translated_reviews, 0).label("translated_reviews")
         )
         .join(Product, UserProject.product_id == Product.id)
-        .outerjoin(review_stats, Product.id == review_stats.c.product_id)
+        .outerjoin(ProductReviewStats, Product.id == ProductReviewStats.product_id)
         .where(
             and_(
                 UserProject.user_id == user.id,
@@ -10,12 +10,21 @@ Redis 缓存服务层
 特性：
 - 自动序列化/反序列化
 - 可配置的 TTL
-- 缓存失效机制
+- 缓存失效机制（版本号命名空间：失效 = 一次 INCR，不再 SCAN 整个键空间）
+- 防击穿：get_or_compute 按 Key 单飞（Redis 锁），可选 stale-while-revalidate
+- 可选进程内 L1（LRU + TTL）：热点 Key 直接从内存返回，失效经 Redis Pub/Sub 广播
+- 产品数据版本：单调递增，用作 ETag 与导出产物等持久结果的版本键
 - 异步和同步两种模式
 """
+import asyncio
 import json
 import logging
-from typing import Optional, Any, List
+import os
+import socket
+import time
+import uuid
+from collections import OrderedDict
+from typing import Optional, Any, List, Callable, Awaitable, Union, Tuple
 from datetime import timedelta
 
 from redis import asyncio as aioredis
@@ -33,6 +42,72 @@ KEY_PRODUCT = f"{CACHE_PREFIX}product:"           # 产品详情
 KEY_REVIEWS = f"{CACHE_PREFIX}reviews:"           # 评论列表
 KEY_USER_PROJECTS = f"{CACHE_PREFIX}user_projects:"  # 用户项目列表
 KEY_PRODUCT_STATS = f"{CACHE_PREFIX}stats:"       # 产品统计
+KEY_VERSION = f"{CACHE_PREFIX}ver:"               # 命名空间版本号
+
+# ==========================================
+# 版本号命名空间
+# ==========================================
+# 评论列表 / 统计按产品、项目列表按用户各维护一个版本号，嵌入缓存 Key：
+#   cache:reviews:{asin}:v{n}:p1:s20
+# 失效时 INCR 版本号即可，旧版本的 Key 不再被读到，随 TTL 自然过期。
+# 版本号 Key 的过期时间远大于缓存 TTL，过期后从 0 重新计数时旧 Key 早已过期。
+NS_PRODUCT = "product"    # 按 ASIN：评论列表 + 统计
+NS_USER = "user"          # 按用户：项目列表
+NS_SHARE = "share"        # 按分享 token：分享页评论分页
+VERSION_TTL = 7 * 24 * 3600
+
+# ==========================================
+# 产品数据版本（ETag / 导出产物 / 维度总结的版本键）
+# ==========================================
+# 与上面的缓存命名空间版本不同：只增不减。
+# 自增时取 max(当前值 + 1, 当前毫秒时间戳)，不存在时初始化为当前毫秒时间戳，
+# 因此 Key 过期或 Redis 数据丢失后，新版本号也不会回退到已用过的值（前提是时钟不回拨）；
+# 过期只是让长期无变化的产品（以及随意请求的 ASIN）不常驻 Redis。
+# 入库、翻译写回、洞察 / 主题入库、评论编辑 / 删除提交后都会递增（touch_product_data）。
+KEY_DATA_VERSION = "data_version:product:"
+KEY_SUMMARY_DATA_VERSION = "data_version:summary:"  # 最近一次维度总结基于的数据版本
+DATA_VERSION_TTL = 30 * 24 * 3600
+
+GET_DATA_VERSION_LUA = """
+local value = redis.call('get', KEYS[1])
+if not value then
+    redis.call('set', KEYS[1], ARGV[1], 'EX', ARGV[2])
+    value = ARGV[1]
+end
+return value
+"""
+
+BUMP_DATA_VERSION_LUA = """
+local next_version = tonumber(redis.call('get', KEYS[1]) or '0') + 1
+local now = tonumber(ARGV[1])
+if now > next_version then
+    next_version = now
+end
+redis.call('set', KEYS[1], string.format('%d', next_version), 'EX', ARGV[2])
+return next_version
+"""
+
+# ==========================================
+# 防击穿（single-flight + stale-while-revalidate）
+# ==========================================
+KEY_LOCK = f"{CACHE_PREFIX}lock:"      # 重算锁前缀
+SWR_FRESH_FIELD = "__fresh_until__"    # 软过期包装字段（值为 Unix 时间戳）
+LOCK_POLL_SECONDS = 0.05               # 未抢到锁时轮询缓存的间隔
+
+# 只释放自己持有的锁（避免锁超时后误删他人的锁）
+RELEASE_LOCK_LUA = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('del', KEYS[1])
+end
+return 0
+"""
+
+# ==========================================
+# 进程内 L1 缓存
+# ==========================================
+# delete / bump_version 除了修改 Redis，还向该频道广播被失效的 Key，
+# 各 API 进程的监听任务收到后删除本进程 L1 中的对应条目。
+CHANNEL_INVALIDATE = f"{CACHE_PREFIX}invalidate"
 
 # ==========================================
 # 缓存 TTL (秒)
@@ -43,42 +118,180 @@ TTL_USER_PROJECTS = 60    # 用户项目 1 分钟
 TTL_PRODUCT_STATS = 600   # 统计数据 10 分钟
 
 
+def _version_key(namespace: str, ident: str) -> str:
+    return f"{KEY_VERSION}{namespace}:{ident}"
+
+
+def _versioned_key(prefix: str, ident: str, version: int, suffix: str) -> str:
+    return f"{prefix}{ident}:v{version}:{suffix}"
+
+
+def _now_ms() -> str:
+    return str(int(time.time() * 1000))
+
+
+def data_version_etag(version: int) -> str:
+    """数据版本 → 弱 ETag（同一版本的不同 JSON 序列化视为等价）"""
+    return f'W/"{version}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """If-None-Match 是否命中（弱比较；支持逗号分隔的多个值与 *）"""
+    if not if_none_match:
+        return False
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    if "*" in candidates:
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(tag.removeprefix("W/") == opaque for tag in candidates)
+
+
+def etag_headers(etag: str) -> dict:
+    """带 ETag 的响应头：no-cache 要求浏览器每次都带 If-None-Match 回源校验"""
+    return {"ETag": etag, "Cache-Control": "no-cache"}
+
+
+def _origin() -> str:
+    """当前进程标识（监听时跳过自己发出的广播；按调用时的 PID 计算，fork 后依然正确）"""
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def _invalidation_message(keys: List[str]) -> str:
+    return json.dumps({"origin": _origin(), "keys": keys})
+
+
+class LocalLRUCache:
+    """
+    进程内 L1 缓存（LRU + TTL），保存已反序列化的值，命中时无网络 I/O、无 json.loads
+
+    - 条目数超过 max_entries 时淘汰最久未访问的条目
+    - 单条驻留时间不超过 ttl，写入方可传入更短的 TTL（Redis 剩余 TTL）
+    - 只有失效广播监听在线时才启用（active）：断线期间可能漏收失效消息，
+      此时 get 一律未命中、set 不写入，重连后先清空再启用
+    - generation：每次失效 +1。读 Redis 前记录、回填时比对，
+      防止"读取期间收到失效广播"后又把旧值写回 L1
+
+    返回的是共享对象，调用方不得修改。
+    """
+
+    def __init__(self, max_entries: int, ttl: int):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.active = False
+        self.generation = 0
+        self._entries: OrderedDict = OrderedDict()  # key -> (expires_at, value)
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def get(self, key: str) -> Optional[Any]:
+        """读取条目，未命中 / 已过期 / 未启用返回 None"""
+        if not self.active:
+            return None
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        expires_at, value = entry
+        if time.monotonic() >= expires_at:
+            del self._entries[key]
+            self.expirations += 1
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None,
+            generation: Optional[int] = None) -> None:
+        """写入条目；generation 与当前不一致（期间发生过失效）时放弃写入"""
+        if not self.active or value is None:
+            return
+        if generation is not None and generation != self.generation:
+            return
+        ttl = self.ttl if ttl is None else min(ttl, self.ttl)
+        if ttl <= 0:
+            return
+        self._entries[key] = (time.monotonic() + ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def invalidate(self, keys: List[str]) -> None:
+        """删除指定条目（本进程失效或收到广播）"""
+        self.generation += 1
+        for key in keys:
+            if self._entries.pop(key, None) is not None:
+                self.invalidations += 1
+
+    def clear(self) -> None:
+        self.generation += 1
+        self._entries.clear()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "active": self.active,
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "invalidations": self.invalidations,
+        }
+
+
 class CacheService:
     """
     异步缓存服务（用于 FastAPI）
     """
     
-    def __init__(self, redis_client: aioredis.Redis):
+    def __init__(self, redis_client: aioredis.Redis, local_cache: Optional[LocalLRUCache] = None):
         self.redis = redis_client
+        self.local = local_cache  # 进程内 L1（None 表示关闭）
+        self._refresh_tasks = set()  # 后台刷新任务（持有引用，防止被 GC）
     
     # ==========================================
     # 通用方法
     # ==========================================
     
-    async def get(self, key: str) -> Optional[Any]:
-        """获取缓存值"""
+    async def get(self, key: str, local: bool = False) -> Optional[Any]:
+        """获取缓存值（local=True 时先查进程内 L1）"""
         try:
-            value = await self.redis.get(key)
-            if value:
-                return json.loads(value)
-            return None
+            return await self._read(key, local)
         except Exception as e:
             logger.warning(f"Cache get error for key {key}: {e}")
             return None
     
-    async def set(self, key: str, value: Any, ttl: int = 300) -> bool:
-        """设置缓存值"""
+    async def set(self, key: str, value: Any, ttl: int = 300, local: bool = False) -> bool:
+        """设置缓存值（local=True 时同时写入进程内 L1）"""
         try:
             await self.redis.setex(key, ttl, json.dumps(value, default=str, ensure_ascii=False))
+            if local:
+                self._fill_local(key, value, ttl)
             return True
         except Exception as e:
             logger.warning(f"Cache set error for key {key}: {e}")
             return False
     
     async def delete(self, key: str) -> bool:
-        """删除单个缓存"""
+        """删除单个缓存（同时失效本进程 L1 并广播给其他进程）"""
+        if self.local is not None:
+            self.local.invalidate([key])
         try:
-            await self.redis.delete(key)
+            if settings.CACHE_L1_ENABLED:
+                pipe = self.redis.pipeline(transaction=False)
+                pipe.delete(key)
+                pipe.publish(CHANNEL_INVALIDATE, _invalidation_message([key]))
+                await pipe.execute()
+            else:
+                await self.redis.delete(key)
             return True
         except Exception as e:
             logger.warning(f"Cache delete error for key {key}: {e}")
@@ -91,13 +304,232 @@ class CacheService:
             async for key in self.redis.scan_iter(match=pattern):
                 keys.append(key)
             if keys:
+                if self.local is not None:
+                    self.local.invalidate(keys)
                 await self.redis.delete(*keys)
+                if settings.CACHE_L1_ENABLED:
+                    await self.redis.publish(CHANNEL_INVALIDATE, _invalidation_message(keys))
                 logger.info(f"Deleted {len(keys)} cache keys matching pattern: {pattern}")
             return len(keys)
         except Exception as e:
             logger.warning(f"Cache delete_pattern error for {pattern}: {e}")
             return 0
     
+    async def _read(self, key: str, local: bool, missing: Any = None) -> Optional[Any]:
+        """
+        读取并反序列化；local=True 时先查 L1，未命中再读 Redis 并回填 L1
+        （驻留时间不超过 Redis 剩余 TTL）。missing：Key 不存在时回填 L1 的值（None 不回填）
+        """
+        if not local or self.local is None or not self.local.active:
+            raw = await self.redis.get(key)
+            return json.loads(raw) if raw else None
+        
+        value = self.local.get(key)
+        if value is not None:
+            return value
+        generation = self.local.generation
+        pipe = self.redis.pipeline(transaction=False)
+        pipe.get(key)
+        pipe.pttl(key)
+        raw, pttl = await pipe.execute()
+        if not raw:
+            self.local.set(key, missing, generation=generation)
+            return None
+        value = json.loads(raw)
+        self._fill_local(key, value, pttl / 1000 if pttl > 0 else None, generation)
+        return value
+    
+    def _fill_local(self, key: str, value: Any, ttl: Optional[float], generation: Optional[int] = None) -> None:
+        """回填 L1；软过期包装的值只驻留到 fresh_until，陈旧后回到 Redis 读取（可能已被其他进程刷新）"""
+        if self.local is None:
+            return
+        if isinstance(value, dict) and SWR_FRESH_FIELD in value:
+            fresh_for = value[SWR_FRESH_FIELD] - time.time()
+            ttl = fresh_for if ttl is None else min(ttl, fresh_for)
+        self.local.set(key, value, ttl, generation)
+    
+    # ==========================================
+    # 读穿 + 防击穿
+    # ==========================================
+    
+    async def get_or_compute(
+        self,
+        key: str,
+        compute: Callable[[], Awaitable[Any]],
+        ttl: Union[int, Callable[[Any], int]] = 300,
+        soft_ttl: Optional[int] = None,
+        lock_timeout: int = 30,
+        wait_timeout: float = 10.0,
+        local: bool = False
+    ) -> Any:
+        """
+        读穿缓存，同一 Key 同一时刻只有一个调用方执行 compute（single-flight）
+        
+        - 未命中：抢到锁的调用方计算并写入，其余调用方轮询等待结果
+          （超过 wait_timeout 仍未出现则自行计算兜底）
+        - soft_ttl 模式：值在 soft_ttl 后变"陈旧"但仍保留到 ttl；
+          读到陈旧值时立即返回，由抢到锁的一个调用方在后台刷新
+          （此时 compute 在请求结束后运行，不能依赖请求级 DB 会话）
+        
+        Args:
+            key: 缓存 Key
+            compute: 无参协程函数，返回可 JSON 序列化的值（None 不缓存）
+            ttl: 硬过期秒数，或按计算结果决定 TTL 的函数
+            soft_ttl: 软过期秒数（None 关闭 stale-while-revalidate）
+            lock_timeout: 重算锁超时（需覆盖一次 compute）
+            wait_timeout: 未抢到锁时最长等待秒数
+            local: 是否经过进程内 L1（用于访问集中的热点 Key）
+        """
+        cached = await self._get_entry(key, local)
+        if cached is not None:
+            value, fresh_until = cached
+            if fresh_until is None or time.time() < fresh_until:
+                return value
+            # 陈旧：抢到锁的请求后台刷新，所有请求都直接返回旧值
+            token = await self._acquire_lock(key, lock_timeout)
+            if token:
+                task = asyncio.create_task(
+                    self._refresh(key, compute, ttl, soft_ttl, token, background=True, local=local)
+                )
+                self._refresh_tasks.add(task)
+                task.add_done_callback(self._refresh_tasks.discard)
+            return value
+        
+        deadline = time.monotonic() + wait_timeout
+        while True:
+            token = await self._acquire_lock(key, lock_timeout)
+            if token:
+                return await self._refresh(key, compute, ttl, soft_ttl, token, local=local)
+            await asyncio.sleep(LOCK_POLL_SECONDS)
+            cached = await self._get_entry(key, local)
+            if cached is not None:
+                return cached[0]
+            if time.monotonic() >= deadline:
+                logger.warning(f"Cache single-flight wait timeout for key {key}, computing directly")
+                return await compute()
+    
+    async def _get_entry(self, key: str, local: bool = False) -> Optional[tuple]:
+        """读取缓存，返回 (value, fresh_until)；非软过期包装的值 fresh_until 为 None"""
+        try:
+            value = await self._read(key, local)
+            if value is None:
+                return None
+        except Exception as e:
+            logger.warning(f"Cache get error for key {key}: {e}")
+            return None
+        if isinstance(value, dict) and SWR_FRESH_FIELD in value:
+            return value["value"], value[SWR_FRESH_FIELD]
+        return value, None
+    
+    async def _acquire_lock(self, key: str, lock_timeout: int) -> Optional[str]:
+        """抢重算锁，成功返回 token；Redis 不可用时视为抢到（直接计算，不阻塞请求）"""
+        token = uuid.uuid4().hex
+        try:
+            if await self.redis.set(f"{KEY_LOCK}{key}", token, nx=True, ex=lock_timeout):
+                return token
+            return None
+        except Exception as e:
+            logger.warning(f"Cache lock error for key {key}: {e}")
+            return token
+    
+    async def _refresh(self, key: str, compute, ttl, soft_ttl: Optional[int], token: str,
+                       background: bool = False, local: bool = False) -> Any:
+        """执行 compute 并写入缓存，完成后释放锁"""
+        try:
+            value = await compute()
+            if value is not None:
+                hard_ttl = ttl(value) if callable(ttl) else ttl
+                if soft_ttl is not None:
+                    await self.set(key, {SWR_FRESH_FIELD: time.time() + soft_ttl, "value": value}, hard_ttl, local)
+                else:
+                    await self.set(key, value, hard_ttl, local)
+            return value
+        except Exception as e:
+            if not background:
+                raise
+            logger.warning(f"Cache background refresh failed for key {key}: {e}")
+        finally:
+            try:
+                await self.redis.eval(RELEASE_LOCK_LUA, 1, f"{KEY_LOCK}{key}", token)
+            except Exception as e:
+                logger.warning(f"Cache unlock error for key {key}: {e}")
+    
+    async def get_version(self, namespace: str, ident: str, fresh: bool = False) -> int:
+        """
+        获取命名空间当前版本号（不存在为 0；开启 L1 时从进程内存读取，失效靠广播）
+        
+        fresh=True 时绕过 L1 直接读 Redis：带 ETag 的接口先读数据版本再读命名空间版本，
+        L1 中的旧版本号（广播尚未到达）会让新 ETag 配上旧缓存内容。
+        """
+        try:
+            value = await self._read(_version_key(namespace, ident), local=not fresh, missing=0)
+            return int(value) if value else 0
+        except Exception as e:
+            logger.warning(f"Cache get_version error for {namespace}:{ident}: {e}")
+            return 0
+    
+    async def bump_version(self, namespace: str, ident: str) -> int:
+        """失效命名空间下的所有缓存：版本号 +1（O(1)），并广播让各进程丢弃 L1 中的旧版本号"""
+        key = _version_key(namespace, ident)
+        if self.local is not None:
+            self.local.invalidate([key])
+        try:
+            pipe = self.redis.pipeline()
+            pipe.incr(key)
+            pipe.expire(key, VERSION_TTL)
+            if settings.CACHE_L1_ENABLED:
+                pipe.publish(CHANNEL_INVALIDATE, _invalidation_message([key]))
+            results = await pipe.execute()
+            return results[0]
+        except Exception as e:
+            logger.warning(f"Cache bump_version error for {namespace}:{ident}: {e}")
+            return 0
+    
+    async def get_data_version(self, asin: str) -> Optional[int]:
+        """获取产品数据版本（Redis 不可用时返回 None，调用方不应据此复用持久结果）"""
+        try:
+            value = await self.redis.eval(GET_DATA_VERSION_LUA, 1, f"{KEY_DATA_VERSION}{asin}", _now_ms(), DATA_VERSION_TTL)
+            return int(value)
+        except Exception as e:
+            logger.warning(f"Cache get_data_version error for {asin}: {e}")
+            return None
+    
+    async def bump_data_version(self, asin: str) -> Optional[int]:
+        """产品数据变更：数据版本单调递增"""
+        try:
+            return int(await self.redis.eval(BUMP_DATA_VERSION_LUA, 1, f"{KEY_DATA_VERSION}{asin}", _now_ms(), DATA_VERSION_TTL))
+        except Exception as e:
+            logger.warning(f"Cache bump_data_version error for {asin}: {e}")
+            return None
+    
+    async def touch_product_data(self, asin: str) -> Optional[int]:
+        """
+        产品数据已写入（提交后调用）：失效评论列表 / 统计缓存，并递增数据版本
+        
+        先换缓存命名空间、再递增数据版本：读方先读数据版本（ETag）再从 Redis 读命名空间版本
+        （get_version(fresh=True)），读到新版本时缓存命名空间也一定是新的，不会把旧内容打上新 ETag。
+        """
+        await self.bump_version(NS_PRODUCT, asin)
+        return await self.bump_data_version(asin)
+    
+    async def get_summary_data_versions(self, asin: str) -> Tuple[Optional[int], Optional[int]]:
+        """(当前数据版本, 最近一次维度总结基于的数据版本)，一次往返；不可用 / 未记录为 None"""
+        try:
+            pipe = self.redis.pipeline(transaction=False)
+            pipe.eval(GET_DATA_VERSION_LUA, 1, f"{KEY_DATA_VERSION}{asin}", _now_ms(), DATA_VERSION_TTL)
+            pipe.get(f"{KEY_SUMMARY_DATA_VERSION}{asin}")
+            current, summary = await pipe.execute()
+            return int(current), int(summary) if summary else None
+        except Exception as e:
+            logger.warning(f"Cache get_summary_data_versions error for {asin}: {e}")
+            return None, None
+    
+    async def versioned_key(self, prefix: str, namespace: str, ident: str, suffix: str,
+                            fresh: bool = False) -> str:
+        """生成带当前版本号的缓存 Key（fresh 见 get_version）"""
+        version = await self.get_version(namespace, ident, fresh)
+        return _versioned_key(prefix, ident, version, suffix)
+    
     # ==========================================
     # 产品相关缓存
     # ==========================================
@@ -121,72 +553,73 @@ class CacheService:
     # 评论列表缓存
     # ==========================================
     
-    def _reviews_key(self, asin: str, page: int = 1, page_size: int = 20, 
-                     rating: Optional[int] = None, sentiment: Optional[str] = None) -> str:
-        """生成评论列表缓存 Key"""
-        key = f"{KEY_REVIEWS}{asin}:p{page}:s{page_size}"
+    async def reviews_key(self, asin: str, page: int = 1, page_size: int = 20, 
+                          rating: Optional[int] = None, sentiment: Optional[str] = None,
+                          cursor: Optional[str] = None, fresh: bool = False) -> str:
+        """生成评论列表缓存 Key（带产品版本号；游标分页按游标区分）"""
+        suffix = f"c{cursor}:s{page_size}" if cursor else f"p{page}:s{page_size}"
         if rating:
-            key += f":r{rating}"
+            suffix += f":r{rating}"
         if sentiment:
-            key += f":st_{sentiment}"
-        return key
+            suffix += f":st_{sentiment}"
+        return await self.versioned_key(KEY_REVIEWS, NS_PRODUCT, asin, suffix, fresh)
     
     async def get_reviews(self, asin: str, page: int = 1, page_size: int = 20,
-                          rating: Optional[int] = None, sentiment: Optional[str] = None) -> Optional[dict]:
+                          rating: Optional[int] = None, sentiment: Optional[str] = None,
+                          cursor: Optional[str] = None, fresh: bool = False) -> Optional[dict]:
         """获取评论列表缓存"""
-        key = self._reviews_key(asin, page, page_size, rating, sentiment)
+        key = await self.reviews_key(asin, page, page_size, rating, sentiment, cursor, fresh)
         return await self.get(key)
     
     async def set_reviews(self, asin: str, data: dict, page: int = 1, page_size: int = 20,
-                          rating: Optional[int] = None, sentiment: Optional[str] = None) -> bool:
+                          rating: Optional[int] = None, sentiment: Optional[str] = None,
+                          cursor: Optional[str] = None, fresh: bool = False) -> bool:
         """设置评论列表缓存"""
-        key = self._reviews_key(asin, page, page_size, rating, sentiment)
+        key = await self.reviews_key(asin, page, page_size, rating, sentiment, cursor, fresh)
         return await self.set(key, data, TTL_REVIEWS)
     
     async def invalidate_reviews(self, asin: str) -> int:
-        """失效产品的所有评论缓存"""
-        pattern = f"{KEY_REVIEWS}{asin}:*"
-        return await self.delete_pattern(pattern)
+        """失效产品的所有评论缓存（与统计缓存共用产品版本号）"""
+        return await self.bump_version(NS_PRODUCT, asin)
     
     # ==========================================
     # 用户项目列表缓存
     # ==========================================
     
-    def _user_projects_key(self, user_id: str, page: int = 1, page_size: int = 20) -> str:
-        return f"{KEY_USER_PROJECTS}{user_id}:p{page}:s{page_size}"
+    async def _user_projects_key(self, user_id: str, page: int = 1, page_size: int = 20) -> str:
+        return await self.versioned_key(KEY_USER_PROJECTS, NS_USER, user_id, f"p{page}:s{page_size}")
     
     async def get_user_projects(self, user_id: str, page: int = 1, page_size: int = 20) -> Optional[dict]:
         """获取用户项目列表缓存"""
-        return await self.get(self._user_projects_key(user_id, page, page_size))
+        return await self.get(await self._user_projects_key(user_id, page, page_size))
     
     async def set_user_projects(self, user_id: str, data: dict, page: int = 1, page_size: int = 20) -> bool:
         """设置用户项目列表缓存"""
-        return await self.set(self._user_projects_key(user_id, page, page_size), data, TTL_USER_PROJECTS)
+        return await self.set(await self._user_projects_key(user_id, page, page_size), data, TTL_USER_PROJECTS)
     
     async def invalidate_user_projects(self, user_id: str) -> int:
         """失效用户的所有项目列表缓存"""
-        pattern = f"{KEY_USER_PROJECTS}{user_id}:*"
-        return await self.delete_pattern(pattern)
+        return await self.bump_version(NS_USER, user_id)
     
     # ==========================================
     # 产品统计缓存
     # ==========================================
     
-    def _stats_key(self, asin: str, stat_type: str = "overview") -> str:
-        return f"{KEY_PRODUCT_STATS}{asin}:{stat_type}"
+    async def stats_key(self, asin: str, stat_type: str = "overview", fresh: bool = False) -> str:
+        return await self.versioned_key(KEY_PRODUCT_STATS, NS_PRODUCT, asin, stat_type, fresh)
     
     async def get_product_stats(self, asin: str, stat_type: str = "overview") -> Optional[dict]:
         """获取产品统计缓存"""
-        return await self.get(self._stats_key(asin, stat_type))
+        return await self.get(await self.stats_key(asin, stat_type))
     
-    async def set_product_stats(self, asin: str, data: dict, stat_type: str = "overview") -> bool:
+    async def set_product_stats(self, asin: str, data: dict, stat_type: str = "overview",
+                                ttl: int = TTL_PRODUCT_STATS, fresh: bool = False) -> bool:
         """设置产品统计缓存"""
-        return await self.set(self._stats_key(asin, stat_type), data, TTL_PRODUCT_STATS)
+        return await self.set(await self.stats_key(asin, stat_type, fresh), data, ttl)
     
     async def invalidate_product_stats(self, asin: str) -> int:
-        """失效产品的所有统计缓存"""
-        pattern = f"{KEY_PRODUCT_STATS}{asin}:*"
-        return await self.delete_pattern(pattern)
+        """失效产品的所有统计缓存（与评论缓存共用产品版本号）"""
+        return await self.bump_version(NS_PRODUCT, asin)
     
     # ==========================================
     # 批量失效
@@ -200,11 +633,11 @@ class CacheService:
         - 新评论入库
         - 翻译完成
         - 洞察/主题提取完成
+        - 清空 AI 分析数据
         """
         results = {
             "product": await self.invalidate_product(asin),
-            "reviews": await self.invalidate_reviews(asin),
-            "stats": await self.invalidate_product_stats(asin)
+            "data_version": await self.touch_product_data(asin)  # 评论列表 + 统计 + ETag / 导出产物
         }
         logger.info(f"Invalidated all caches for product {asin}: {results}")
         return results
@@ -239,9 +672,15 @@ class CacheServiceSync:
             return False
     
     def delete(self, key: str) -> bool:
-        """删除单个缓存"""
+        """删除单个缓存（开启 L1 时广播给各 API 进程）"""
         try:
-            self.redis.delete(key)
+            if settings.CACHE_L1_ENABLED:
+                pipe = self.redis.pipeline(transaction=False)
+                pipe.delete(key)
+                pipe.publish(CHANNEL_INVALIDATE, _invalidation_message([key]))
+                pipe.execute()
+            else:
+                self.redis.delete(key)
             return True
         except Exception as e:
             logger.warning(f"Cache delete error for key {key}: {e}")
@@ -253,21 +692,80 @@ class CacheServiceSync:
             keys = list(self.redis.scan_iter(match=pattern))
             if keys:
                 self.redis.delete(*keys)
+                if settings.CACHE_L1_ENABLED:
+                    self.redis.publish(CHANNEL_INVALIDATE, _invalidation_message(keys))
                 logger.info(f"Deleted {len(keys)} cache keys matching pattern: {pattern}")
             return len(keys)
         except Exception as e:
             logger.warning(f"Cache delete_pattern error for {pattern}: {e}")
             return 0
     
+    def get_version(self, namespace: str, ident: str) -> int:
+        """获取命名空间当前版本号（不存在为 0）"""
+        try:
+            value = self.redis.get(_version_key(namespace, ident))
+            return int(value) if value else 0
+        except Exception as e:
+            logger.warning(f"Cache get_version error for {namespace}:{ident}: {e}")
+            return 0
+    
+    def bump_version(self, namespace: str, ident: str) -> int:
+        """失效命名空间下的所有缓存：版本号 +1（O(1)），开启 L1 时广播给各 API 进程"""
+        try:
+            key = _version_key(namespace, ident)
+            pipe = self.redis.pipeline()
+            pipe.incr(key)
+            pipe.expire(key, VERSION_TTL)
+            if settings.CACHE_L1_ENABLED:
+                pipe.publish(CHANNEL_INVALIDATE, _invalidation_message([key]))
+            results = pipe.execute()
+            return results[0]
+        except Exception as e:
+            logger.warning(f"Cache bump_version error for {namespace}:{ident}: {e}")
+            return 0
+    
+    def get_data_version(self, asin: str) -> Optional[int]:
+        """获取产品数据版本（Redis 不可用时返回 None）"""
+        try:
+            return int(self.redis.eval(GET_DATA_VERSION_LUA, 1, f"{KEY_DATA_VERSION}{asin}", _now_ms(), DATA_VERSION_TTL))
+        except Exception as e:
+            logger.warning(f"Cache get_data_version error for {asin}: {e}")
+            return None
+    
+    def bump_data_version(self, asin: str) -> Optional[int]:
+        """产品数据变更：数据版本单调递增"""
+        try:
+            return int(self.redis.eval(BUMP_DATA_VERSION_LUA, 1, f"{KEY_DATA_VERSION}{asin}", _now_ms(), DATA_VERSION_TTL))
+        except Exception as e:
+            logger.warning(f"Cache bump_data_version error for {asin}: {e}")
+            return None
+    
+    def touch_product_data(self, asin: str) -> Optional[int]:
+        """产品数据已写入（提交后调用）：先失效评论列表 / 统计缓存，再递增数据版本"""
+        self.bump_version(NS_PRODUCT, asin)
+        return self.bump_data_version(asin)
+    
+    def set_summary_data_version(self, asin: str, version: int) -> bool:
+        """记录维度总结基于的数据版本（过期后视为数据已变化）"""
+        try:
+            self.redis.set(f"{KEY_SUMMARY_DATA_VERSION}{asin}", version, ex=DATA_VERSION_TTL)
+            return True
+        except Exception as e:
+            logger.warning(f"Cache set_summary_data_version error for {asin}: {e}")
+            return False
+    
     def invalidate_all_for_product(self, asin: str) -> dict:
         """失效产品相关的所有缓存"""
         results = {
             "product": self.delete(f"{KEY_PRODUCT}{asin}"),
-            "reviews": self.delete_pattern(f"{KEY_REVIEWS}{asin}:*"),
-            "stats": self.delete_pattern(f"{KEY_PRODUCT_STATS}{asin}:*")
+            "data_version": self.touch_product_data(asin)  # 评论列表 + 统计 + ETag / 导出产物
         }
         logger.info(f"Invalidated all caches for product {asin}: {results}")
         return results
+    
+    def invalidate_user_projects(self, user_id: str) -> int:
+        """失效用户的所有项目列表缓存"""
+        return self.bump_version(NS_USER, user_id)
 
 
 # ==========================================
@@ -275,6 +773,16 @@ class CacheServiceSync:
 # ==========================================
 
 _cache_service: Optional[CacheService] = None
+_local_cache: Optional[LocalLRUCache] = None
+_listener_task: Optional[asyncio.Task] = None
+
+
+def get_local_cache() -> Optional[LocalLRUCache]:
+    """获取进程内 L1 实例（CACHE_L1_ENABLED 关闭时为 None）"""
+    global _local_cache
+    if _local_cache is None and settings.CACHE_L1_ENABLED:
+        _local_cache = LocalLRUCache(settings.CACHE_L1_MAX_ENTRIES, settings.CACHE_L1_TTL)
+    return _local_cache
 
 
 async def get_cache_service() -> CacheService:
@@ -283,7 +791,7 @@ async def get_cache_service() -> CacheService:
     if _cache_service is None:
         from app.core.redis import get_async_redis
         redis_client = await get_async_redis()
-        _cache_service = CacheService(redis_client)
+        _cache_service = CacheService(redis_client, get_local_cache())
     return _cache_service
 
 
@@ -292,3 +800,79 @@ def get_cache_service_sync() -> CacheServiceSync:
     from app.core.redis import get_sync_redis
     redis_client = get_sync_redis()
     return CacheServiceSync(redis_client)
+
+
+# ==========================================
+# L1 失效广播监听（每个 API 进程一个）
+# ==========================================
+
+async def _listen_invalidations(local_cache: LocalLRUCache) -> None:
+    """
+    订阅失效广播，删除本进程 L1 中的对应条目
+    
+    断线期间可能漏收消息：先停用 L1，重新订阅成功后清空并启用。
+    """
+    from app.core.redis import get_async_redis
+    origin = _origin()
+    while True:
+        pubsub = None
+        try:
+            redis_client = await get_async_redis()
+            pubsub = redis_client.pubsub(ignore_subscribe_messages=True)
+            await pubsub.subscribe(CHANNEL_INVALIDATE)
+            local_cache.clear()
+            local_cache.active = True
+            logger.info(f"L1 cache invalidation listener subscribed to {CHANNEL_INVALIDATE}")
+            while True:
+                # 超时需低于 Redis socket_timeout=5s
+                message = await pubsub.get_message(timeout=1.0)
+                if message is None:
+                    continue
+                try:
+                    payload = json.loads(message["data"])
+                except (TypeError, ValueError):
+                    logger.warning(f"Malformed cache invalidation message: {message['data']!r}")
+                    continue
+                if payload.get("origin") != origin:
+                    local_cache.invalidate(payload.get("keys") or [])
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.warning(f"L1 cache invalidation listener error, reconnecting: {e}")
+        finally:
+            local_cache.active = False
+            if pubsub is not None:
+                try:
+                    await pubsub.reset()
+                except Exception:
+                    pass
+        await asyncio.sleep(1)
+
+
+def start_local_cache_listener() -> None:
+    """启动 L1 失效广播监听（FastAPI 启动时调用；未开启 L1 时不做任何事）"""
+    global _listener_task
+    local_cache = get_local_cache()
+    if local_cache is None or _listener_task is not None:
+        return
+    _listener_task = asyncio.create_task(_listen_invalidations(local_cache))
+
+
+async def stop_local_cache_listener() -> None:
+    """停止 L1 失效广播监听"""
+    global _listener_task
+    if _listener_task is not None:
+        _listener_task.cancel()
+        try:
+            await _listener_task
+        except asyncio.CancelledError:
+            pass
+        _listener_task = None
+
+
+def get_local_cache_stats() -> dict:
+    """本进程 L1 指标（多 Worker 部署时每个进程各自统计）"""
+    local_cache = get_local_cache()
+    if local_cache is None:
+        return {"enabled": False}
+    return {"enabled": True, "pid": os.getpid(), **local_cache.stats()}
@@ -0,0 +1,439 @@
+"""
+LLM 传输层 (LLM Transport)
+
+所有 Qwen (OpenAI 兼容) 调用共享的 HTTP 连接池，提供同步和异步两种客户端：
+1. 同步客户端：Celery Worker 的 gevent 协程（TranslationService、PivotInsightService 等）
+2. 异步客户端：FastAPI 协程（analysis_service 对比分析）
+
+连接池策略：
+- 显式的 httpx.Limits（总连接数、keep-alive 连接数、空闲回收时间），
+  默认按 THEME_PARALLEL_SIZE=150 个协程并发留出余量，避免默认 100 连接上限造成排队
+- 安装了 h2 时启用 HTTP/2（单连接多路复用，减少握手）
+- 分阶段超时：connect / read / write / pool（等待空闲连接）
+
+限流：
+每次请求前向全局令牌桶（app/core/rate_limiter.py）按当前车道预约许可，
+预估 token = 输入估算 + max_tokens，响应后按 usage 结算差额。
+
+可观测性：
+每次请求分别记录"等待限流许可""等待连接池""等待 LLM 响应头"三段耗时，
+限流排队、连接池打满不再和 LLM 慢混为一谈。
+Worker 进程定期把指标快照写入 Redis，API 进程可汇总查看。
+"""
+import json
+import logging
+import os
+import socket
+import threading
+import time
+from collections import deque
+from typing import Optional
+
+import httpx
+from openai import OpenAI, AsyncOpenAI
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# ==========================================
+# Key 前缀常量
+# ==========================================
+KEY_PREFIX_LLM_TRANSPORT = "llm:transport:"  # 进程级指标快照前缀
+
+try:
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+
+# ==========================================
+# 指标
+# ==========================================
+
+class LLMTransportMetrics:
+    """
+    进程内 LLM 传输指标（滑动窗口分位数 + 累计计数）
+
+    - rate_limit_wait: 等待全局限流许可的时间
+    - pool_wait: 请求发出 → 拿到连接（连接池排队时间）
+    - connect: 新建 TCP/TLS 连接耗时（复用连接时为 0）
+    - latency: 发送请求头 → 收到响应头（LLM 服务端耗时）
+    """
+
+    WINDOW = 1000               # 分位数统计窗口（最近 N 次请求）
+    PUBLISH_INTERVAL = 15       # 快照写入 Redis 的最小间隔（秒）
+    SLOW_LOG_INTERVAL = 10      # 连接池排队告警的最小间隔（秒）
+
+    def __init__(self, face: str):
+        self.face = face
+        self._lock = threading.Lock()
+        self._rate_limit_wait = deque(maxlen=self.WINDOW)
+        self._pool_wait = deque(maxlen=self.WINDOW)
+        self._connect = deque(maxlen=self.WINDOW)
+        self._latency = deque(maxlen=self.WINDOW)
+        self.requests = 0
+        self.errors = 0
+        self.pool_timeouts = 0
+        self.slow_pool_waits = 0
+        self.new_connections = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._last_publish = 0.0
+        self._last_slow_log = 0.0
+
+    def started(self):
+        with self._lock:
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+
+    def finished(self, timings: dict, error: Optional[BaseException] = None):
+        now = time.monotonic()
+        start = timings["start"]
+        acquired = timings.get("acquired")
+        pool_wait = (acquired if acquired is not None else now) - start
+        connect = timings["connected"] - timings["connect_started"] \
+            if timings.get("connected") and timings.get("connect_started") else None
+        latency = timings["headers_received"] - timings["headers_sent"] \
+            if timings.get("headers_received") and timings.get("headers_sent") else None
+
+        slow = pool_wait >= settings.LLM_SLOW_POOL_WAIT_SECONDS
+        with self._lock:
+            self.in_flight -= 1
+            self.requests += 1
+            self._pool_wait.append(pool_wait)
+            self._rate_limit_wait.append(timings.get("rate_limit_wait", 0.0))
+            if connect is not None:
+                self.new_connections += 1
+                self._connect.append(connect)
+            if latency is not None:
+                self._latency.append(latency)
+            if error is not None:
+                self.errors += 1
+                if isinstance(error, httpx.PoolTimeout):
+                    self.pool_timeouts += 1
+            if slow:
+                self.slow_pool_waits += 1
+            log_slow = slow and now - self._last_slow_log >= self.SLOW_LOG_INTERVAL
+            if log_slow:
+                self._last_slow_log = now
+            in_flight = self.in_flight
+
+        if log_slow:
+            logger.warning(
+                f"[LLM 连接池] {self.face} 等待连接 {pool_wait:.2f}s（连接池排队，不是 LLM 慢），"
+                f"进行中 {in_flight} / 上限 {settings.LLM_MAX_CONNECTIONS}"
+            )
+
+    @staticmethod
+    def _percentiles(values) -> dict:
+        if not values:
+            return {"p50": 0.0, "p95": 0.0, "max": 0.0}
+        ordered = sorted(values)
+        pick = lambda q: ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+        return {"p50": round(pick(0.5), 4), "p95": round(pick(0.95), 4), "max": round(ordered[-1], 4)}
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "face": self.face,
+                "http2": HTTP2_AVAILABLE and settings.LLM_HTTP2,
+                "max_connections": settings.LLM_MAX_CONNECTIONS,
+                "requests": self.requests,
+                "errors": self.errors,
+                "pool_timeouts": self.pool_timeouts,
+                "slow_pool_waits": self.slow_pool_waits,
+                "new_connections": self.new_connections,
+                "in_flight": self.in_flight,
+                "max_in_flight": self.max_in_flight,
+                "rate_limit_wait_seconds": self._percentiles(self._rate_limit_wait),
+                "pool_wait_seconds": self._percentiles(self._pool_wait),
+                "connect_seconds": self._percentiles(self._connect),
+                "latency_seconds": self._percentiles(self._latency),
+            }
+
+    def maybe_publish(self):
+        """定期把快照写入 Redis（只在同步面调用，避免阻塞事件循环）"""
+        now = time.monotonic()
+        if now - self._last_publish < self.PUBLISH_INTERVAL:
+            return
+        self._last_publish = now
+        try:
+            from app.core.redis import get_sync_redis
+            key = f"{KEY_PREFIX_LLM_TRANSPORT}{socket.gethostname()}:{os.getpid()}:{self.face}"
+            get_sync_redis().set(key, json.dumps(self.snapshot()), ex=self.PUBLISH_INTERVAL * 20)
+        except Exception as e:
+            logger.debug(f"[LLM 连接池] 指标快照写入失败: {e}")
+
+
+sync_metrics = LLMTransportMetrics("sync")
+async_metrics = LLMTransportMetrics("async")
+
+
+# ==========================================
+# 带计时的 httpx Transport
+# ==========================================
+
+def _record_trace(timings: dict, event_name: str):
+    """httpcore trace 事件 → 时间点（第一个事件即表示已从连接池拿到连接）"""
+    now = time.monotonic()
+    timings.setdefault("acquired", now)
+    if event_name == "connection.connect_tcp.started":
+        timings["connect_started"] = now
+    elif event_name in ("connection.start_tls.complete", "connection.connect_tcp.complete"):
+        timings["connected"] = now
+    elif event_name.endswith("send_request_headers.started"):
+        timings.setdefault("headers_sent", now)
+    elif event_name.endswith("receive_response_headers.complete"):
+        timings["headers_received"] = now
+
+
+# 请求体没有 max_tokens 时的输出 token 预估
+DEFAULT_OUTPUT_TOKENS = 1000
+
+# 请求未发出的异常：退还预约的 token（读超时等已发出的请求不退还，服务端可能已计费）
+NOT_SENT_ERRORS = (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout)
+
+
+def estimate_request_tokens(request: httpx.Request) -> int:
+    """按请求体估算本次调用最多消耗的 token（输入估算 + max_tokens）"""
+    from app.services.batch_packer import estimate_tokens
+
+    try:
+        body = json.loads(request.content or b"{}")
+    except (ValueError, UnicodeDecodeError):
+        return 0
+    if not isinstance(body, dict):
+        return 0
+    text = "".join(
+        str(message.get("content") or "")
+        for message in body.get("messages") or []
+        if isinstance(message, dict)
+    )
+    return estimate_tokens(text) + int(body.get("max_tokens") or DEFAULT_OUTPUT_TOKENS)
+
+
+def _settle_delta(response: httpx.Response, estimated: int) -> int:
+    """
+    计算结算差额：成功响应按 usage.total_tokens 结算，失败响应全额退还
+    （响应体已读入内存）
+    """
+    if response.status_code >= 400:
+        return -estimated
+    try:
+        usage = json.loads(response.content).get("usage") or {}
+        return int(usage["total_tokens"]) - estimated
+    except (ValueError, KeyError, TypeError, AttributeError):
+        return 0
+
+
+def _is_event_stream(response: httpx.Response) -> bool:
+    return "text/event-stream" in response.headers.get("content-type", "")
+
+
+class _MeteredTransport(httpx.BaseTransport):
+    """同步 Transport 包装：获取限流许可，记录限流等待、连接池等待与服务端耗时"""
+
+    def __init__(self, transport: httpx.BaseTransport, metrics: LLMTransportMetrics):
+        self._transport = transport
+        self._metrics = metrics
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        from app.core.rate_limiter import llm_rate_limiter
+
+        estimated = estimate_request_tokens(request)
+        rate_limit_wait = llm_rate_limiter.acquire(tokens=estimated)
+
+        timings = {"start": time.monotonic(), "rate_limit_wait": rate_limit_wait}
+        request.extensions["trace"] = lambda event_name, info: _record_trace(timings, event_name)
+        self._metrics.started()
+        error = None
+        try:
+            response = self._transport.handle_request(request)
+        except BaseException as e:
+            error = e
+            if isinstance(e, NOT_SENT_ERRORS):
+                llm_rate_limiter.settle(-estimated)
+            raise
+        finally:
+            self._metrics.finished(timings, error)
+            self._metrics.maybe_publish()
+
+        if estimated and not _is_event_stream(response):
+            response.read()
+            llm_rate_limiter.settle(_settle_delta(response, estimated))
+        return response
+
+    def close(self):
+        self._transport.close()
+
+
+class _AsyncMeteredTransport(httpx.AsyncBaseTransport):
+    """异步 Transport 包装：获取限流许可，记录限流等待、连接池等待与服务端耗时"""
+
+    def __init__(self, transport: httpx.AsyncBaseTransport, metrics: LLMTransportMetrics):
+        self._transport = transport
+        self._metrics = metrics
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        from app.core.rate_limiter import async_llm_rate_limiter
+
+        estimated = estimate_request_tokens(request)
+        rate_limit_wait = await async_llm_rate_limiter.acquire(tokens=estimated)
+
+        timings = {"start": time.monotonic(), "rate_limit_wait": rate_limit_wait}
+
+        async def trace(event_name, info):
+            _record_trace(timings, event_name)
+
+        request.extensions["trace"] = trace
+        self._metrics.started()
+        error = None
+        try:
+            response = await self._transport.handle_async_request(request)
+        except BaseException as e:
+            error = e
+            if isinstance(e, NOT_SENT_ERRORS):
+                await async_llm_rate_limiter.settle(-estimated)
+            raise
+        finally:
+            self._metrics.finished(timings, error)
+
+        if estimated and not _is_event_stream(response):
+            await response.aread()
+            await async_llm_rate_limiter.settle(_settle_delta(response, estimated))
+        return response
+
+    async def aclose(self):
+        await self._transport.aclose()
+
+
+# ==========================================
+# 连接池配置
+# ==========================================
+
+def build_limits() -> httpx.Limits:
+    return httpx.Limits(
+        max_connections=settings.LLM_MAX_CONNECTIONS,
+        max_keepalive_connections=settings.LLM_MAX_KEEPALIVE_CONNECTIONS,
+        keepalive_expiry=settings.LLM_KEEPALIVE_EXPIRY,
+    )
+
+
+def build_timeout() -> httpx.Timeout:
+    """
+    默认分阶段超时；调用方仍可在 chat.completions.create(timeout=...) 中按调用覆盖
+    """
+    return httpx.Timeout(
+        connect=settings.LLM_CONNECT_TIMEOUT,
+        read=settings.LLM_READ_TIMEOUT,
+        write=settings.LLM_WRITE_TIMEOUT,
+        pool=settings.LLM_POOL_TIMEOUT,
+    )
+
+
+# ==========================================
+# 同步客户端（用于 Celery Worker / gevent 协程）
+# ==========================================
+_sync_llm_client: Optional[OpenAI] = None
+
+
+def get_sync_llm_client() -> Optional[OpenAI]:
+    """
+    获取同步 LLM 客户端（单例，进程内共享连接池）
+
+    Returns:
+        未配置 QWEN_API_KEY 时返回 None
+    """
+    global _sync_llm_client
+    if _sync_llm_client is None:
+        if not settings.QWEN_API_KEY:
+            return None
+        http2 = HTTP2_AVAILABLE and settings.LLM_HTTP2
+        transport = _MeteredTransport(
+            httpx.HTTPTransport(http2=http2, limits=build_limits()),
+            sync_metrics
+        )
+        _sync_llm_client = OpenAI(
+            api_key=settings.QWEN_API_KEY,
+            base_url=settings.QWEN_API_BASE,
+            timeout=build_timeout(),
+            max_retries=settings.LLM_MAX_RETRIES,
+            http_client=httpx.Client(transport=transport, timeout=build_timeout()),
+        )
+        logger.info(
+            f"[LLM 连接池] 同步客户端已创建: max_connections={settings.LLM_MAX_CONNECTIONS}, "
+            f"keepalive={settings.LLM_MAX_KEEPALIVE_CONNECTIONS}, http2={http2}"
+        )
+    return _sync_llm_client
+
+
+# ==========================================
+# 异步客户端（用于 FastAPI）
+# ==========================================
+_async_llm_client: Optional[AsyncOpenAI] = None
+
+
+def get_async_llm_client() -> Optional[AsyncOpenAI]:
+    """
+    获取异步 LLM 客户端（单例，进程内共享连接池）
+
+    Returns:
+        未配置 QWEN_API_KEY 时返回 None
+    """
+    global _async_llm_client
+    if _async_llm_client is None:
+        if not settings.QWEN_API_KEY:
+            return None
+        http2 = HTTP2_AVAILABLE and settings.LLM_HTTP2
+        transport = _AsyncMeteredTransport(
+            httpx.AsyncHTTPTransport(http2=http2, limits=build_limits()),
+            async_metrics
+        )
+        _async_llm_client = AsyncOpenAI(
+            api_key=settings.QWEN_API_KEY,
+            base_url=settings.QWEN_API_BASE,
+            timeout=build_timeout(),
+            max_retries=settings.LLM_MAX_RETRIES,
+            http_client=httpx.AsyncClient(transport=transport, timeout=build_timeout()),
+        )
+        logger.info(
+            f"[LLM 连接池] 异步客户端已创建: max_connections={settings.LLM_MAX_CONNECTIONS}, "
+            f"keepalive={settings.LLM_MAX_KEEPALIVE_CONNECTIONS}, http2={http2}"
+        )
+    return _async_llm_client
+
+
+async def close_async_llm_client():
+    """关闭异步 LLM 客户端连接池"""
+    global _async_llm_client
+    if _async_llm_client is not None:
+        await _async_llm_client.close()
+        _async_llm_client = None
+
+
+# ==========================================
+# 指标汇总
+# ==========================================
+
+def get_transport_metrics() -> dict:
+    """
+    汇总本进程与各 Worker 进程（Redis 快照）的传输指标
+    """
+    from app.core.redis import get_sync_redis
+
+    workers = []
+    try:
+        redis_client = get_sync_redis()
+        keys = list(redis_client.scan_iter(match=f"{KEY_PREFIX_LLM_TRANSPORT}*", count=200))
+        for key, raw in zip(keys, redis_client.mget(keys) if keys else []):
+            if raw:
+                workers.append({"process": key[len(KEY_PREFIX_LLM_TRANSPORT):], **json.loads(raw)})
+    except Exception as e:
+        logger.warning(f"[LLM 连接池] 读取 Worker 指标失败: {e}")
+
+    return {
+        "local": [sync_metrics.snapshot(), async_metrics.snapshot()],
+        "workers": workers,
+    }
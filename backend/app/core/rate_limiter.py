@@ -0,0 +1,339 @@
+"""
+LLM 全局限流器（Redis Lua 令牌桶）
+
+替代 worker.py 中基于 ZSET 滑动窗口的 APIRateLimiter：
+- 旧实现每次获取许可要 4 次 Redis 往返（ZREMRANGEBYSCORE / ZCARD / ZADD / EXPIRE），
+  且"检查-写入"不是原子的，并发协程会冲过 MAX_API_RPS
+- 旧实现只限请求数，而服务商同时限制每分钟 token 数（TPM）
+
+新实现：
+1. 单个 Lua 脚本（1 次 EVALSHA 往返）原子地完成补充、判断、扣减
+2. 双桶：请求桶（RPS）+ token 桶（TPM），任一不足都需要等待
+3. 优先级车道：低优先级车道必须给桶留出一定比例的余量，
+   桶被批量翻译压低时，learning 车道仍能立即从保留余量中拿到许可
+4. 非阻塞预约：reserve() 立即返回"需要等待多久"，调用方精确睡到自己的时间片，
+   不再随机退避反复轮询
+5. 事后结算：调用完成后按实际 usage 退还/补扣 token
+
+车道通过 contextvar 传递（llm_lane 上下文管理器），默认 analysis。
+Redis 不可用时放行（fail-open），限流故障不应让整个 AI 流水线停摆。
+"""
+import asyncio
+import logging
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Optional
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# ==========================================
+# Key 前缀常量
+# ==========================================
+KEY_PREFIX_RATE_LIMIT = "ratelimit:"  # 令牌桶状态 Hash 前缀
+
+# ==========================================
+# 优先级车道（数值 = 该车道必须保留给更高优先级的桶容量比例）
+# ==========================================
+LANE_LEARNING = "learning"        # 建模：最高优先级，可用尽整个桶
+LANE_ANALYSIS = "analysis"        # 洞察 / 5W 提取 / 总结
+LANE_TRANSLATION = "translation"  # 批量翻译：最低优先级
+
+LANE_RESERVE = {
+    LANE_LEARNING: 0.0,
+    LANE_ANALYSIS: 0.2,
+    LANE_TRANSLATION: 0.4,
+}
+
+# 结算（退还/补扣）总是立即生效
+SETTLE_MAX_WAIT = 1e9
+
+_current_lane: ContextVar[str] = ContextVar("llm_lane", default=LANE_ANALYSIS)
+
+
+@contextmanager
+def llm_lane(lane: str):
+    """
+    在当前协程内指定 LLM 调用的优先级车道
+
+    用法：
+        with llm_lane(LANE_LEARNING):
+            translation_service.learn_dimensions(...)
+
+    注意：gevent Pool 新开的协程不会继承 contextvar，需在协程函数内部再次设置。
+    """
+    token = _current_lane.set(lane if lane in LANE_RESERVE else LANE_ANALYSIS)
+    try:
+        yield
+    finally:
+        _current_lane.reset(token)
+
+
+def current_lane() -> str:
+    return _current_lane.get()
+
+
+def set_current_lane(lane: str):
+    """直接设置当前协程的车道（用于 Celery task_prerun 信号，每个任务运行在独立协程中）"""
+    return _current_lane.set(lane if lane in LANE_RESERVE else LANE_ANALYSIS)
+
+
+# ==========================================
+# Lua 令牌桶脚本
+# ==========================================
+# KEYS[1]: 桶状态 Hash（r=请求令牌, t=token 令牌, ts=上次更新时间）
+# ARGV: 请求速率/容量, token 速率/容量, 本次请求数, 本次 token 数, 车道保留比例, 最长预约等待, 过期秒数
+# 返回: {是否授予(0/1), 需要等待的秒数, 未授予时的重试间隔}（秒数为字符串，避免 Lua 数字被截断为整数）
+#
+# 预约规则（对每个桶分别计算）：
+#   floor = 保留比例 × 容量，车道只能使用 floor 以上的令牌
+#   允许预支（桶降到 floor 以下）的量：
+#     learning 车道：max_wait × 速率
+#     其他车道：不超过自己的保留量，保证低优先级车道的预支永远不会把桶压到 0 以下，
+#              learning 到来时总能在 1 个令牌的时间内拿到许可
+TOKEN_BUCKET_LUA = """
+local now_parts = redis.call('TIME')
+local now = tonumber(now_parts[1]) + tonumber(now_parts[2]) / 1000000
+
+local rate_r = tonumber(ARGV[1])
+local cap_r = tonumber(ARGV[2])
+local rate_t = tonumber(ARGV[3])
+local cap_t = tonumber(ARGV[4])
+local need_r = tonumber(ARGV[5])
+local need_t = tonumber(ARGV[6])
+local reserve = tonumber(ARGV[7])
+local max_wait = tonumber(ARGV[8])
+
+local state = redis.call('HMGET', KEYS[1], 'r', 't', 'ts')
+local r = tonumber(state[1]) or cap_r
+local t = tonumber(state[2]) or cap_t
+local ts = tonumber(state[3]) or now
+
+local elapsed = math.max(0, now - ts)
+r = math.min(cap_r, r + elapsed * rate_r)
+t = math.min(cap_t, t + elapsed * rate_t)
+
+local wait = 0
+local retry_after = 0
+local function check(level, need, rate, cap)
+    if need <= 0 then
+        return
+    end
+    local floor = reserve * cap
+    local debt = max_wait * rate
+    if reserve > 0 then
+        debt = math.min(debt, floor)
+    end
+    local shortfall = need - (level - floor)
+    wait = math.max(wait, shortfall / rate)
+    retry_after = math.max(retry_after, (shortfall - debt) / rate)
+end
+check(r, need_r, rate_r, cap_r)
+check(t, need_t, rate_t, cap_t)
+
+local granted = 0
+if retry_after <= 0 then
+    granted = 1
+    r = math.min(cap_r, r - need_r)
+    t = math.min(cap_t, t - need_t)
+end
+
+redis.call('HSET', KEYS[1], 'r', tostring(r), 't', tostring(t), 'ts', tostring(now))
+redis.call('EXPIRE', KEYS[1], tonumber(ARGV[9]))
+return {granted, tostring(wait), tostring(retry_after)}
+"""
+
+
+class RateLimitExceeded(Exception):
+    """在超时时间内没能拿到 LLM 调用许可"""
+    pass
+
+
+@dataclass
+class Reservation:
+    """一次预约的结果"""
+    granted: bool              # True: 已扣减配额，调用方睡 wait 秒后即可调用
+    wait: float                # 授予时需要等待的秒数
+    retry_after: float = 0.0   # 未授予时，多久之后重新预约即可授予
+
+
+class _TokenBucketBase:
+    """同步/异步限流器共用的参数计算"""
+
+    REQUEST_BURST_SECONDS = 1.0    # 请求桶容量 = 1 秒的量（与旧 1 秒滑动窗口一致）
+    TOKEN_BURST_SECONDS = 10.0     # token 桶容量 = 10 秒的量（避免一分钟配额瞬间打光）
+    DEFAULT_MAX_WAIT = 5.0         # 单次预约最多预支未来多少秒的配额（低优先级车道另受保留量限制）
+    KEY_TTL = 120
+
+    def __init__(
+        self,
+        api_name: str = "qwen",
+        max_rps: Optional[int] = None,
+        max_tpm: Optional[int] = None
+    ):
+        self.key = f"{KEY_PREFIX_RATE_LIMIT}{api_name}"
+        self.max_rps = max_rps or settings.MAX_API_RPS
+        self.max_tpm = max_tpm or settings.MAX_API_TPM
+
+    def _args(self, requests: int, tokens: int, lane: str, max_wait: float) -> list:
+        rate_r = float(self.max_rps)
+        rate_t = self.max_tpm / 60.0
+        cap_r = rate_r * self.REQUEST_BURST_SECONDS
+        cap_t = rate_t * self.TOKEN_BURST_SECONDS
+        reserve = LANE_RESERVE.get(lane, LANE_RESERVE[LANE_ANALYSIS])
+        # 单次需求不能超过车道可用容量，否则永远无法授予
+        tokens = min(tokens, int(cap_t * (1 - reserve)))
+        return [rate_r, cap_r, rate_t, cap_t, requests, tokens, reserve, max_wait, self.KEY_TTL]
+
+
+class TokenBucketRateLimiter(_TokenBucketBase):
+    """同步版本（用于 Celery Worker / gevent 协程）"""
+
+    def __init__(self, redis_client=None, **kwargs):
+        super().__init__(**kwargs)
+        self._redis_client = redis_client
+        self._script = None
+
+    def _get_script(self):
+        if self._script is None:
+            if self._redis_client is None:
+                from app.core.redis import get_sync_redis
+                self._redis_client = get_sync_redis()
+            self._script = self._redis_client.register_script(TOKEN_BUCKET_LUA)
+        return self._script
+
+    def reserve(
+        self,
+        tokens: int = 0,
+        lane: Optional[str] = None,
+        requests: int = 1,
+        max_wait: Optional[float] = None
+    ) -> Reservation:
+        """
+        非阻塞预约（1 次 Redis 往返）
+
+        Args:
+            tokens: 预计消耗的 token 数（输入 + 输出上限）
+            lane: 优先级车道，缺省取当前 contextvar
+            requests: 占用的请求数（结算时为 0）
+            max_wait: 最多预支多少秒后的配额
+
+        Returns:
+            Reservation
+        """
+        lane = lane or current_lane()
+        max_wait = self.DEFAULT_MAX_WAIT if max_wait is None else max_wait
+        try:
+            granted, wait, retry_after = self._get_script()(
+                keys=[self.key], args=self._args(requests, tokens, lane, max_wait)
+            )
+            return Reservation(
+                granted=bool(int(granted)),
+                wait=max(0.0, float(wait)),
+                retry_after=max(0.01, float(retry_after))
+            )
+        except Exception as e:
+            logger.warning(f"[限流] Redis 限流不可用，放行: {e}")
+            return Reservation(granted=True, wait=0.0)
+
+    def acquire(
+        self,
+        tokens: int = 0,
+        lane: Optional[str] = None,
+        timeout: float = 60.0
+    ) -> float:
+        """
+        阻塞获取许可：预约成功后精确睡到自己的时间片
+
+        Returns:
+            实际等待的秒数
+
+        Raises:
+            RateLimitExceeded: 超时仍未拿到许可
+        """
+        start = time.monotonic()
+        deadline = start + timeout
+        while True:
+            reservation = self.reserve(tokens=tokens, lane=lane)
+            if reservation.granted:
+                if reservation.wait > 0:
+                    time.sleep(reservation.wait)
+                return time.monotonic() - start
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise RateLimitExceeded(f"[限流] {timeout:.0f}s 内无法获取 API 许可")
+            time.sleep(min(reservation.retry_after, remaining))
+
+    def settle(self, token_delta: int, lane: Optional[str] = None):
+        """
+        调用完成后按实际用量结算（正数补扣，负数退还）
+        """
+        if token_delta:
+            self.reserve(tokens=token_delta, lane=lane or LANE_LEARNING, requests=0, max_wait=SETTLE_MAX_WAIT)
+
+
+class AsyncTokenBucketRateLimiter(_TokenBucketBase):
+    """异步版本（用于 FastAPI），与同步版本共享同一个 Redis 桶"""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self._script = None
+
+    async def _get_script(self):
+        if self._script is None:
+            from app.core.redis import get_async_redis
+            redis_client = await get_async_redis()
+            self._script = redis_client.register_script(TOKEN_BUCKET_LUA)
+        return self._script
+
+    async def reserve(
+        self,
+        tokens: int = 0,
+        lane: Optional[str] = None,
+        requests: int = 1,
+        max_wait: Optional[float] = None
+    ) -> Reservation:
+        lane = lane or current_lane()
+        max_wait = self.DEFAULT_MAX_WAIT if max_wait is None else max_wait
+        try:
+            script = await self._get_script()
+            granted, wait, retry_after = await script(keys=[self.key], args=self._args(requests, tokens, lane, max_wait))
+            return Reservation(
+                granted=bool(int(granted)),
+                wait=max(0.0, float(wait)),
+                retry_after=max(0.01, float(retry_after))
+            )
+        except Exception as e:
+            logger.warning(f"[限流] Redis 限流不可用，放行: {e}")
+            return Reservation(granted=True, wait=0.0)
+
+    async def acquire(
+        self,
+        tokens: int = 0,
+        lane: Optional[str] = None,
+        timeout: float = 60.0
+    ) -> float:
+        start = time.monotonic()
+        deadline = start + timeout
+        while True:
+            reservation = await self.reserve(tokens=tokens, lane=lane)
+            if reservation.granted:
+                if reservation.wait > 0:
+                    await asyncio.sleep(reservation.wait)
+                return time.monotonic() - start
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise RateLimitExceeded(f"[限流] {timeout:.0f}s 内无法获取 API 许可")
+            await asyncio.sleep(min(reservation.retry_after, remaining))
+
+    async def settle(self, token_delta: int, lane: Optional[str] = None):
+        if token_delta:
+            await self.reserve(tokens=token_delta, lane=lane or LANE_LEARNING, requests=0, max_wait=SETTLE_MAX_WAIT)
+
+
+# Singleton instances（同一个 Redis 桶，分布式共享）
+llm_rate_limiter = TokenBucketRateLimiter()
+async_llm_rate_limiter = AsyncTokenBucketRateLimiter()
@@ -8,7 +8,8 @@ Redis Client 封装
 4. 分布式锁（可选）
 """
 import logging
-from typing import Optional, List, Any
+import time
+from typing import Optional, List, Any, Tuple
 import json
 
 import redis
@@ -21,8 +22,9 @@ logger = logging.getLogger(__name__)
 # ==========================================
 # 队列名称常量
 # ==========================================
-QUEUE_REVIEW_INGESTION = "review_ingestion_queue"  # 评论入库队列
+QUEUE_REVIEW_INGESTION = "review_ingestion_queue"  # 评论入库队列（旧 List，仅迁移残留数据）
 KEY_PREFIX_SEEN_REVIEWS = "reviews:seen:"          # 已见评论 Set 前缀
+KEY_PREFIX_SEEN_BLOOM = "reviews:bloom:"           # 已见评论 Bloom 过滤器前缀（位图 + 元数据 Hash）
 KEY_PREFIX_BATCH_STATUS = "batch:"                 # 批次状态前缀
 
 # ==========================================
@@ -80,19 +82,46 @@ async def close_async_redis():
 # ==========================================
 # 队列操作封装
 # ==========================================
+# 入库队列使用 Redis Stream + 消费组（替代旧的 List + Beat 轮询 RPOP）：
+# - 生产者 XADD，消费者 XREADGROUP 阻塞批量读取，无需 5 秒 tick
+# - 入库提交后才 XACK + XDEL，Worker 崩溃时消息留在 PEL（待确认列表）中不丢失
+# - 空闲超过阈值的待确认消息由其他消费者 XAUTOCLAIM 接管重投
+# - 多次投递仍失败的消息转入死信 Stream，避免毒消息无限重试
+# 旧 List 队列（QUEUE_REVIEW_INGESTION）中残留的数据由消费者启动时迁移到 Stream
+# ==========================================
+STREAM_REVIEW_INGESTION = "review_ingestion_stream"             # 评论入库 Stream
+STREAM_REVIEW_INGESTION_DEAD = "review_ingestion_stream:dead"   # 死信 Stream
+GROUP_REVIEW_INGESTION = "ingestion"                            # 入库消费组
+STREAM_PAYLOAD_FIELD = "payload"                                # Stream 消息字段名
+
+# 旧 List → Stream 迁移：RPOP 与 XADD 在同一脚本内原子执行，多个消费者并发迁移也不会丢失或重复
+# LPUSH 入队、RPOP 出队：列表尾部是最早的数据，逐条 RPOP 追加即保持顺序
+MIGRATE_LEGACY_LUA = """
+local moved = 0
+for i = 1, tonumber(ARGV[2]) do
+    local item = redis.call('rpop', KEYS[1])
+    if not item then
+        break
+    end
+    redis.call('xadd', KEYS[2], '*', ARGV[1], item)
+    moved = moved + 1
+end
+return moved
+"""
+
 
 class ReviewIngestionQueue:
     """
-    评论入库队列操作封装
+    评论入库队列操作封装（API 侧，异步）
     
-    使用 Redis List 作为消息队列：
-    - LPUSH: 生产者推入数据
-    - RPOP/BRPOP: 消费者取出数据
+    使用 Redis Stream 作为消息队列：
+    - XADD: 生产者推入数据
+    - 消费由 Worker 侧 ReviewIngestionQueueSync 通过消费组完成
     """
     
     def __init__(self, redis_client):
         self.redis = redis_client
-        self.queue_name = QUEUE_REVIEW_INGESTION
+        self.queue_name = STREAM_REVIEW_INGESTION
     
     async def push(self, payload: dict) -> bool:
         """
@@ -106,8 +135,8 @@ class ReviewIngestionQueue:
         """
         try:
             logger.info(f"[Redis Queue] 推入队列: queue_name={self.queue_name}, payload_keys={list(payload.keys())}")
-            result = await self.redis.lpush(self.queue_name, json.dumps(payload))
-            logger.info(f"[Redis Queue] ✅ 推入成功，队列长度: {result}")
+            message_id = await self.redis.xadd(self.queue_name, {STREAM_PAYLOAD_FIELD: json.dumps(payload)})
+            logger.info(f"[Redis Queue] ✅ 推入成功，消息 ID: {message_id}")
             return True
         except Exception as e:
             logger.error(f"[Redis Queue] ❌ Failed to push to ingestion queue: {e}", exc_info=True)
@@ -123,41 +152,26 @@ class ReviewIngestionQueue:
         try:
             pipe = self.redis.pipeline()
             for payload in payloads:
-                pipe.lpush(self.queue_name, json.dumps(payload))
+                pipe.xadd(self.queue_name, {STREAM_PAYLOAD_FIELD: json.dumps(payload)})
             await pipe.execute()
             return len(payloads)
         except Exception as e:
             logger.error(f"Failed to push batch to ingestion queue: {e}")
             return 0
     
-    def pop_batch_sync(self, count: int = 100) -> List[dict]:
+    async def length(self) -> int:
         """
-        同步批量取出数据（用于 Worker）
+        获取队列长度
         
-        Args:
-            count: 最多取出的数量
-            
-        Returns:
-            数据列表
+        已确认的消息会被 XDEL，因此 XLEN = 未读取 + 已读取未确认（处理中）；
+        另加旧 List 队列中尚未迁移的数据
         """
-        items = []
-        try:
-            for _ in range(count):
-                item = self.redis.rpop(self.queue_name)
-                if item is None:
-                    break
-                try:
-                    items.append(json.loads(item))
-                except json.JSONDecodeError:
-                    logger.warning(f"Invalid JSON in queue: {item[:100]}")
-        except Exception as e:
-            logger.error(f"Failed to pop from ingestion queue: {e}")
-        return items
-    
-    async def length(self) -> int:
-        """获取队列长度"""
         try:
-            length = await self.redis.llen(self.queue_name)
+            pipe = self.redis.pipeline()
+            pipe.xlen(self.queue_name)
+            pipe.llen(QUEUE_REVIEW_INGESTION)
+            stream_len, legacy_len = await pipe.execute()
+            length = stream_len + legacy_len
             logger.debug(f"[Redis Queue] 队列长度查询: queue_name={self.queue_name}, length={length}")
             return length
         except Exception as e:
@@ -166,43 +180,178 @@ class ReviewIngestionQueue:
 
 
 class ReviewIngestionQueueSync:
-    """同步版本的队列操作（用于 Worker）"""
+    """同步版本的队列操作（用于 Worker，消费组读取 / 确认 / 接管）"""
     
     def __init__(self, redis_client: redis.Redis):
         self.redis = redis_client
-        self.queue_name = QUEUE_REVIEW_INGESTION
+        self.queue_name = STREAM_REVIEW_INGESTION
+        self.group = GROUP_REVIEW_INGESTION
     
     def push(self, payload: dict) -> bool:
         """推入一条数据"""
         try:
-            self.redis.lpush(self.queue_name, json.dumps(payload))
+            self.redis.xadd(self.queue_name, {STREAM_PAYLOAD_FIELD: json.dumps(payload)})
             return True
         except Exception as e:
             logger.error(f"Failed to push to ingestion queue: {e}")
             return False
     
-    def pop_batch(self, count: int = 100) -> List[dict]:
-        """批量取出数据"""
-        items = []
+    def ensure_group(self):
+        """创建消费组（幂等，Stream 不存在时一并创建）"""
         try:
-            for _ in range(count):
-                item = self.redis.rpop(self.queue_name)
-                if item is None:
-                    break
-                try:
-                    items.append(json.loads(item))
-                except json.JSONDecodeError:
-                    logger.warning(f"Invalid JSON in queue: {item[:100]}")
-        except Exception as e:
-            logger.error(f"Failed to pop from ingestion queue: {e}")
-        return items
+            self.redis.xgroup_create(self.queue_name, self.group, id="0", mkstream=True)
+            logger.info(f"[Redis Stream] 已创建消费组 {self.group} ({self.queue_name})")
+        except redis.ResponseError as e:
+            if "BUSYGROUP" not in str(e):
+                raise
+    
+    def _decode(self, messages) -> List[tuple]:
+        """[(message_id, fields)] → [(message_id, payload)]，无法解析的 payload 为 None"""
+        entries = []
+        for message_id, fields in messages or []:
+            raw = (fields or {}).get(STREAM_PAYLOAD_FIELD)
+            try:
+                entries.append((message_id, json.loads(raw)))
+            except (TypeError, json.JSONDecodeError):
+                logger.warning(f"Invalid JSON in stream {message_id}: {str(raw)[:100]}")
+                entries.append((message_id, None))
+        return entries
+    
+    def read_batch(self, consumer: str, count: int = 100, block_ms: Optional[int] = None) -> List[tuple]:
+        """
+        以消费者身份读取新消息（XREADGROUP >）
+        
+        Args:
+            consumer: 消费者名称（每个消费者进程唯一）
+            count: 最多读取条数
+            block_ms: 阻塞等待毫秒数（None 不阻塞；需低于客户端 socket_timeout）
+            
+        Returns:
+            [(message_id, payload)]
+        """
+        try:
+            response = self.redis.xreadgroup(
+                self.group, consumer, {self.queue_name: ">"}, count=count, block=block_ms
+            )
+        except redis.ResponseError as e:
+            if "NOGROUP" not in str(e):
+                raise
+            # Stream 被删除（如 FLUSHDB）后重建消费组
+            self.ensure_group()
+            return []
+        if not response:
+            return []
+        _, messages = response[0]
+        return self._decode(messages)
+    
+    def ack(self, message_ids: List[str]) -> int:
+        """确认并删除消息（入库事务提交后调用）"""
+        if not message_ids:
+            return 0
+        pipe = self.redis.pipeline()
+        pipe.xack(self.queue_name, self.group, *message_ids)
+        pipe.xdel(self.queue_name, *message_ids)
+        acked, _ = pipe.execute()
+        return acked
+    
+    def claim_stale(self, consumer: str, min_idle_ms: int, count: int = 100, max_deliveries: int = 5) -> List[tuple]:
+        """
+        接管空闲超时的待确认消息（消费者崩溃或处理失败未确认）
+        
+        投递次数已达 max_deliveries 的消息转入死信 Stream 并确认，不再返回。
+        
+        Returns:
+            [(message_id, payload)]
+        """
+        _, messages, *_ = self.redis.xautoclaim(
+            self.queue_name, self.group, consumer, min_idle_ms, start_id="0-0", count=count
+        )
+        messages = [m for m in messages if m and m[1] is not None]
+        if not messages:
+            return []
+        
+        # XAUTOCLAIM 已将投递次数 +1，超过上限的视为毒消息
+        pending = self.redis.xpending_range(
+            self.queue_name, self.group, min=messages[0][0], max=messages[-1][0],
+            count=len(messages), consumername=consumer
+        )
+        deliveries = {p["message_id"]: p["times_delivered"] for p in pending}
+        poisoned = [m for m in messages if deliveries.get(m[0], 0) > max_deliveries]
+        if poisoned:
+            pipe = self.redis.pipeline()
+            for message_id, fields in poisoned:
+                pipe.xadd(STREAM_REVIEW_INGESTION_DEAD, {**fields, "source_id": message_id})
+            pipe.execute()
+            self.ack([m[0] for m in poisoned])
+            logger.error(f"[Redis Stream] {len(poisoned)} 条消息投递超过 {max_deliveries} 次，已转入死信 {STREAM_REVIEW_INGESTION_DEAD}")
+        
+        poisoned_ids = {m[0] for m in poisoned}
+        return self._decode([m for m in messages if m[0] not in poisoned_ids])
+    
+    def remove_consumer(self, consumer: str) -> int:
+        """从消费组移除消费者（退出时调用，返回其剩余待确认数，非 0 时不移除）"""
+        try:
+            pending = self.redis.xpending_range(
+                self.queue_name, self.group, min="-", max="+", count=1, consumername=consumer
+            )
+            if pending:
+                return len(pending)
+            self.redis.xgroup_delconsumer(self.queue_name, self.group, consumer)
+        except redis.ResponseError:
+            pass
+        return 0
+    
+    def purge_idle_consumers(self, min_idle_ms: int) -> int:
+        """移除空闲超时且没有待确认消息的消费者（已退出的 Worker 进程）"""
+        removed = 0
+        try:
+            for c in self.redis.xinfo_consumers(self.queue_name, self.group):
+                if c.get("pending", 0) == 0 and c.get("idle", 0) >= min_idle_ms:
+                    self.redis.xgroup_delconsumer(self.queue_name, self.group, c["name"])
+                    removed += 1
+        except redis.ResponseError:
+            pass
+        return removed
+    
+    def migrate_legacy(self, count: int = 1000) -> int:
+        """
+        将旧 List 队列的残留数据迁移到 Stream（部署切换时的兼容）
+        
+        每批 RPOP + XADD 在 Lua 脚本中原子执行（MIGRATE_LEGACY_LUA），
+        多个消费者启动时同时迁移也不会读到同一批数据或丢失数据
+        """
+        moved = 0
+        while True:
+            batch = int(self.redis.eval(
+                MIGRATE_LEGACY_LUA, 2, QUEUE_REVIEW_INGESTION, self.queue_name, STREAM_PAYLOAD_FIELD, count
+            ))
+            if not batch:
+                return moved
+            moved += batch
+            logger.info(f"[Redis Stream] 已迁移旧队列数据 {batch} 条")
     
     def length(self) -> int:
-        """获取队列长度"""
+        """获取队列长度（Stream 未确认 + 旧 List 残留）"""
         try:
-            return self.redis.llen(self.queue_name)
+            return self.redis.xlen(self.queue_name) + self.redis.llen(QUEUE_REVIEW_INGESTION)
         except Exception:
             return 0
+    
+    def stats(self) -> dict:
+        """消费组状态（积压 / 待确认 / 消费者数 / 死信数）"""
+        try:
+            groups = {g["name"]: g for g in self.redis.xinfo_groups(self.queue_name)}
+            group = groups.get(self.group, {})
+            return {
+                "length": self.redis.xlen(self.queue_name),
+                "pending": group.get("pending", 0),
+                "consumers": group.get("consumers", 0),
+                "lag": group.get("lag"),
+                "dead": self.redis.xlen(STREAM_REVIEW_INGESTION_DEAD),
+                "legacy": self.redis.llen(QUEUE_REVIEW_INGESTION),
+            }
+        except redis.ResponseError:
+            return {"length": 0, "pending": 0, "consumers": 0, "lag": None, "dead": 0, "legacy": 0}
 
 
 # ==========================================
@@ -290,6 +439,128 @@ class BatchStatusTrackerSync:
             logger.error(f"Failed to update batch status: {e}")
 
 
+# ==========================================
+# 评论导出任务状态 (Export Job)
+# ==========================================
+
+KEY_PREFIX_EXPORT_JOB = "export:job:"
+KEY_PREFIX_EXPORT_RENDER = "export:render:"  # 每个产品每种格式正在渲染的版本（同时只渲染一个）
+
+# 占位空闲时登记本版本并返回 {版本, 1}；已有版本在渲染时返回 {该版本, 0}
+CLAIM_EXPORT_RENDER_LUA = """
+local current = redis.call('get', KEYS[1])
+if current then
+    return {current, 0}
+end
+redis.call('set', KEYS[1], ARGV[1], 'EX', ARGV[2])
+return {ARGV[1], 1}
+"""
+
+# 只释放自己版本的渲染占位（占位已被更新版本接管时不删除）
+RELEASE_EXPORT_RENDER_LUA = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('del', KEYS[1])
+end
+return 0
+"""
+
+
+def _export_job_key(asin: str, version: int, fmt: str) -> str:
+    return f"{KEY_PREFIX_EXPORT_JOB}{asin}:v{version}:{fmt}"
+
+
+def _export_render_key(asin: str, fmt: str) -> str:
+    return f"{KEY_PREFIX_EXPORT_RENDER}{asin}:{fmt}"
+
+
+class ExportJobTracker:
+    """
+    评论导出任务状态
+    
+    按 (ASIN, 数据版本, 格式) 记录一次后台渲染，同一产品同一格式同时只渲染一个版本，供前端轮询
+    状态：queued / processing / completed / failed
+    """
+    
+    def __init__(self, redis_client):
+        self.redis = redis_client
+        self.expire_seconds = 24 * 3600  # 1 天过期
+        self.stale_seconds = 3600        # 排队 / 处理中超过该时长未更新，视为 Worker 已丢失任务
+    
+    async def claim(self, asin: str, version: int, fmt: str) -> Tuple[Optional[int], bool]:
+        """
+        登记后台渲染，返回 (需要等待的版本, 是否需要派发)
+        
+        同一产品同一格式同时只渲染一个版本（KEY_PREFIX_EXPORT_RENDER 占位）：分析进行中数据版本
+        随每次写入前进，若每个新版本都派发，等待中的版本总被取代，文件迟迟生成不出来。
+        已有版本在渲染时返回该版本，调用方等它完成；占位超过 stale_seconds 视为 Worker 已丢失任务。
+        Redis 不可用时返回 (None, False)。
+        """
+        try:
+            rendering, claimed = await self.redis.eval(
+                CLAIM_EXPORT_RENDER_LUA, 1, _export_render_key(asin, fmt),
+                str(version), str(self.stale_seconds)
+            )
+            if not claimed:
+                return int(rendering), False
+            await self.redis.hset(_export_job_key(asin, version, fmt), mapping={
+                "status": "queued",
+                "rows": "0",
+                "error": "",
+                "updated_at": str(int(time.time()))
+            })
+            await self.redis.expire(_export_job_key(asin, version, fmt), self.expire_seconds)
+            return version, True
+        except Exception as e:
+            logger.error(f"Failed to claim export job: {e}")
+            return None, False
+    
+    async def get(self, asin: str, version: int, fmt: str) -> Optional[dict]:
+        """获取任务状态"""
+        try:
+            result = await self.redis.hgetall(_export_job_key(asin, version, fmt))
+            if not result:
+                return None
+            return {
+                "status": result.get("status", "unknown"),
+                "rows": int(result.get("rows", 0)),
+                "size": int(result.get("size", 0)),
+                "error": result.get("error") or None,
+                "updated_at": int(result.get("updated_at", 0))
+            }
+        except Exception as e:
+            logger.error(f"Failed to get export job: {e}")
+            return None
+
+
+class ExportJobTrackerSync:
+    """同步版本（用于 Worker）"""
+    
+    def __init__(self, redis_client: redis.Redis):
+        self.redis = redis_client
+        self.expire_seconds = 24 * 3600
+    
+    def update(self, asin: str, version: int, fmt: str, status: str,
+               rows: int = 0, size: int = 0, error: str = ""):
+        """更新任务状态"""
+        try:
+            key = _export_job_key(asin, version, fmt)
+            pipe = self.redis.pipeline()
+            pipe.hset(key, mapping={
+                "status": status,
+                "rows": str(rows),
+                "size": str(size),
+                "error": error,
+                "updated_at": str(int(time.time()))
+            })
+            pipe.expire(key, self.expire_seconds)
+            if status in ("completed", "failed"):
+                # 渲染结束：释放产品级占位，下一次导出请求可以派发更新的版本
+                pipe.eval(RELEASE_EXPORT_RENDER_LUA, 1, _export_render_key(asin, fmt), str(version))
+            pipe.execute()
+        except Exception as e:
+            logger.error(f"Failed to update export job: {e}")
+
+
 # ==========================================
 # 分析任务进度追踪 (Analysis Progress)
 # ==========================================
@@ -0,0 +1,79 @@
+"""
+gevent 协作式 psycopg2（Celery Worker 专用）
+
+Celery Worker 以 --pool=gevent 运行，socket 已被 monkey patch，但 psycopg2 是 C 扩展，
+默认在 libpq 内部阻塞等待服务器响应，一次 db.execute 会卡住整个 gevent hub，
+"并行"的协程全部排在数据库往返后面。
+
+psycopg2 提供 wait callback 钩子：注册后所有连接以异步模式工作，
+等待可读/可写时回调到这里，由 gevent 的 wait_read / wait_write 让出协程（即 psycogreen 的做法）。
+
+限制（psycopg2 green 模式本身的限制）：
+- COPY 与大对象（lobject）不可用
+- 每个连接同一时刻只能有一个协程在用（SQLAlchemy Session 本来就不跨协程共享）
+"""
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+def gevent_wait_callback(conn, timeout=None):
+    """psycopg2 wait callback：轮询连接状态，等待 I/O 时让出 gevent 协程"""
+    import psycopg2
+    from psycopg2 import extensions
+    from gevent.socket import wait_read, wait_write
+
+    while True:
+        state = conn.poll()
+        if state == extensions.POLL_OK:
+            break
+        elif state == extensions.POLL_READ:
+            wait_read(conn.fileno(), timeout=timeout)
+        elif state == extensions.POLL_WRITE:
+            wait_write(conn.fileno(), timeout=timeout)
+        else:
+            raise psycopg2.OperationalError(f"Bad result from poll: {state!r}")
+
+
+def is_gevent_patched() -> bool:
+    """当前进程是否已由 gevent monkey patch（Celery gevent 池在导入任务模块前完成）"""
+    try:
+        from gevent import monkey
+    except ImportError:
+        return False
+    return monkey.is_module_patched("socket")
+
+
+def is_green_psycopg2() -> bool:
+    """psycopg2 是否已注册 gevent wait callback"""
+    from psycopg2 import extensions
+    return extensions.get_wait_callback() is gevent_wait_callback
+
+
+def make_psycopg2_green(force: bool = False) -> bool:
+    """
+    为 psycopg2 注册 gevent wait callback（幂等）
+
+    只在 gevent 已 monkey patch 时生效（prefork / solo 池与 FastAPI 进程不受影响）。
+    必须在创建任何连接之前调用，已建立的连接不会切换为协作模式。
+
+    Args:
+        force: 不检查 monkey patch 状态（压测脚本用）
+
+    Returns:
+        是否处于协作模式
+    """
+    from psycopg2 import extensions
+
+    if not force and not is_gevent_patched():
+        return False
+    if extensions.get_wait_callback() is not gevent_wait_callback:
+        extensions.set_wait_callback(gevent_wait_callback)
+        logger.info("[数据库] psycopg2 已切换为 gevent 协作模式（wait callback）")
+    return True
+
+
+def make_psycopg2_blocking():
+    """取消 wait callback，恢复阻塞模式（压测对照组用）"""
+    from psycopg2 import extensions
+    extensions.set_wait_callback(None)
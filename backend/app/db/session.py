@@ -6,13 +6,18 @@ This module provides:
 - Dependency injection for FastAPI routes
 - Database initialization
 """
+import logging
+from pathlib import Path
 from typing import AsyncGenerator
 
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncSession, create_async_engine, async_sessionmaker
 from sqlalchemy.orm import DeclarativeBase
 
 from app.core.config import settings
 
+logger = logging.getLogger(__name__)
+
 
 # ============================================================================
 # 🔧 异步数据库引擎（FastAPI 专用）
@@ -80,3 +85,37 @@ async def init_db():
     
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
+        await install_review_stats_triggers(conn)
+
+
+# ============================================================================
+# 📊 产品评论统计汇总触发器（product_review_stats）
+# ============================================================================
+# create_all 只建表不建触发器：新库（或未执行 db/migrate_product_review_stats.sql 的库）
+# 汇总行永远为空，统计 / 产品列表 / 我的项目都显示 0。启动时检测并补装触发器 + 回填。
+# ============================================================================
+REVIEW_STATS_TRIGGERS_SQL = Path(__file__).with_name("product_review_stats.sql")
+REVIEW_STATS_LOCK_ID = 7320514  # pg_advisory_xact_lock：多进程同时启动时只有一个执行安装
+REVIEW_STATS_TRIGGER_CHECK = text(
+    "SELECT 1 FROM pg_trigger WHERE tgname = 'trigger_product_review_stats_reviews_insert'"
+)
+
+
+async def install_review_stats_triggers(conn: AsyncConnection) -> bool:
+    """
+    库中缺少汇总触发器时安装并回填（在调用方事务中执行；已安装时只有一次查询）
+
+    Returns:
+        本次是否执行了安装
+    """
+    if (await conn.execute(REVIEW_STATS_TRIGGER_CHECK)).scalar():
+        return False
+    await conn.execute(text("SELECT pg_advisory_xact_lock(:lock_id)"), {"lock_id": REVIEW_STATS_LOCK_ID})
+    if (await conn.execute(REVIEW_STATS_TRIGGER_CHECK)).scalar():
+        return False
+
+    # 脚本含 plpgsql 函数体，需整段按简单查询协议执行（asyncpg 无参数 execute 支持多语句）
+    raw = await conn.get_raw_connection()
+    await raw.driver_connection.execute(REVIEW_STATS_TRIGGERS_SQL.read_text(encoding="utf-8"))
+    logger.info("[DB Init] 已安装 product_review_stats 触发器并回填汇总行")
+    return True
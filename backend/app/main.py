@@ -42,9 +42,14 @@ async def lifespan(app: FastAPI):
     logger.info("Starting VOC-Master backend...")
     await init_db()
     logger.info("Database initialized successfully")
+    from app.core.cache import start_local_cache_listener, stop_local_cache_listener
+    start_local_cache_listener()  # 进程内 L1 缓存失效广播（CACHE_L1_ENABLED 关闭时不启动）
     yield
     # Shutdown: Cleanup if needed
     logger.info("Shutting down VOC-Master backend...")
+    await stop_local_cache_listener()
+    from app.core.llm import close_async_llm_client
+    await close_async_llm_client()
 
 
 # Create FastAPI application
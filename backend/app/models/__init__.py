@@ -45,6 +45,12 @@ from app.models.share_link import ShareLink, ShareResourceType
 from app.models.product_dimension_summary import ProductDimensionSummary, SummaryType as DimensionSummaryType
 # Product Pivot Insight Model (数据透视AI洞察)
 from app.models.product_pivot_insight import ProductPivotInsight
+# Translation Memory Model (翻译记忆库)
+from app.models.translation_memory import TranslationMemoryEntry
+# Analysis Lease Model (分析阶段认领租约)
+from app.models.analysis_lease import ReviewAnalysisLease
+# Product Review Stats Model (产品评论统计汇总)
+from app.models.product_review_stats import ProductReviewStats
 
 __all__ = [
     "Product", 
@@ -103,5 +109,11 @@ __all__ = [
     "DimensionSummaryType",
     # Product Pivot Insight Model
     "ProductPivotInsight",
+    # Translation Memory Model
+    "TranslationMemoryEntry",
+    # Analysis Lease Model
+    "ReviewAnalysisLease",
+    # Product Review Stats Model
+    "ProductReviewStats",
 ]
 
@@ -0,0 +1,74 @@
+"""
+Analysis Lease Model - 分析阶段的评论认领租约
+
+洞察 / 主题提取按块认领评论（INSERT ... ON CONFLICT 抢占），租约到期前其他 Worker 不会重复处理；
+Worker 崩溃后租约自然过期，评论可被重新认领。多个 Worker 因此可以协作处理同一个大产品。
+"""
+import uuid
+from datetime import datetime
+
+from sqlalchemy import String, Integer, DateTime, ForeignKey, func
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db.session import Base
+
+
+class ReviewAnalysisLease(Base):
+    """
+    评论分析租约
+
+    主键 (review_id, stage)：同一条评论在洞察和主题阶段各有一份租约。
+    结果入库后（或 Worker 结束时）删除；过期租约可被任意 Worker 重新认领。
+    """
+    __tablename__ = "review_analysis_leases"
+
+    review_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True),
+        ForeignKey("reviews.id", ondelete="CASCADE"),
+        primary_key=True
+    )
+
+    stage: Mapped[str] = mapped_column(
+        String(20),
+        primary_key=True,
+        comment="分析阶段：insights / themes"
+    )
+
+    product_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True),
+        nullable=False,
+        index=True,
+        comment="冗余产品 ID，便于按产品统计在途租约"
+    )
+
+    owner: Mapped[str] = mapped_column(
+        String(100),
+        nullable=False,
+        index=True,
+        comment="持有者（Celery 任务 ID）"
+    )
+
+    lease_until: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        nullable=False,
+        index=True,
+        comment="租约到期时间，过期后可被重新认领"
+    )
+
+    attempts: Mapped[int] = mapped_column(
+        Integer,
+        default=1,
+        server_default="1",
+        nullable=False,
+        comment="累计认领次数（过期重认领时递增）"
+    )
+
+    claimed_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        server_default=func.now(),
+        nullable=False
+    )
+
+    def __repr__(self) -> str:
+        return f"<ReviewAnalysisLease {self.review_id} {self.stage} owner={self.owner}>"
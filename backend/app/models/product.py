@@ -5,7 +5,7 @@ import uuid
 from datetime import datetime
 from typing import TYPE_CHECKING, List
 
-from sqlalchemy import String, DateTime, func, Text, Numeric
+from sqlalchemy import String, DateTime, func, Text, Numeric, Boolean
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
@@ -69,6 +69,12 @@ class Product(Base):
         nullable=True,
         comment="Product category breadcrumb as JSON array"
     )
+    # Fused insight + 5W analysis switch (NULL = follow settings.FUSED_ANALYSIS_ENABLED)
+    fused_analysis: Mapped[bool | None] = mapped_column(
+        Boolean,
+        nullable=True,
+        comment="Use fused insight+theme extraction (NULL = global default)"
+    )
     
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True),
@@ -0,0 +1,86 @@
+"""
+Product Review Stats Model - 产品评论统计汇总（物化）
+
+每个产品一行：总数、各翻译状态数、星级 / 情感分布、有洞察 / 主题的评论数。
+由数据库语句级触发器增量维护（reviews / review_insights / review_theme_highlights 的写入在同一事务内更新），
+定时对账任务修正漂移。统计接口、产品列表、"我的项目" 只读这一行，不再聚合全部评论。
+
+只统计未逻辑删除（is_deleted = false）的评论。
+触发器与回填见 db/migrate_product_review_stats.sql（新库由 init_db 按 app/db/product_review_stats.sql 自动安装）。
+"""
+import uuid
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import Integer, BigInteger, DateTime, ForeignKey, func
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db.session import Base
+
+
+class ProductReviewStats(Base):
+    """
+    产品评论统计汇总
+
+    计数列只做加减（触发器按语句汇总增量），平均分 = rating_sum / total_reviews。
+    产品删除时级联删除。
+    """
+    __tablename__ = "product_review_stats"
+
+    product_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True),
+        ForeignKey("products.id", ondelete="CASCADE"),
+        primary_key=True
+    )
+
+    total_reviews: Mapped[int] = mapped_column(Integer, default=0, server_default="0", nullable=False)
+
+    # 翻译状态分布
+    pending_reviews: Mapped[int] = mapped_column(Integer, default=0, server_default="0", nullable=False)
+    processing_reviews: Mapped[int] = mapped_column(Integer, default=0, server_default="0", nullable=False)
+    translated_reviews: Mapped[int] = mapped_column(
+        Integer, default=0, server_default="0", nullable=False, comment="translation_status = completed"
+    )
+    failed_reviews: Mapped[int] = mapped_column(Integer, default=0, server_default="0", nullable=False)
+    skipped_reviews: Mapped[int] = mapped_column(Integer, default=0, server_default="0", nullable=False)
+
+    # 星级分布
+    star_1: Mapped[int] = mapped_column(Integer, default=0, server_default="0", nullable=False)
+    star_2: Mapped[int] = mapped_column(Integer, default=0, server_default="0", nullable=False)
+    star_3: Mapped[int] = mapped_column(Integer, default=0, server_default="0", nullable=False)
+    star_4: Mapped[int] = mapped_column(Integer, default=0, server_default="0", nullable=False)
+    star_5: Mapped[int] = mapped_column(Integer, default=0, server_default="0", nullable=False)
+    rating_sum: Mapped[int] = mapped_column(
+        BigInteger, default=0, server_default="0", nullable=False, comment="星级之和（平均分 = rating_sum / total_reviews）"
+    )
+
+    # 情感分布
+    sentiment_positive: Mapped[int] = mapped_column(Integer, default=0, server_default="0", nullable=False)
+    sentiment_neutral: Mapped[int] = mapped_column(Integer, default=0, server_default="0", nullable=False)
+    sentiment_negative: Mapped[int] = mapped_column(Integer, default=0, server_default="0", nullable=False)
+
+    # 分析覆盖
+    reviews_with_insights: Mapped[int] = mapped_column(Integer, default=0, server_default="0", nullable=False)
+    reviews_with_themes: Mapped[int] = mapped_column(Integer, default=0, server_default="0", nullable=False)
+
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        server_default=func.now(),
+        nullable=False,
+        comment="最近一次增量更新时间"
+    )
+
+    reconciled_at: Mapped[Optional[datetime]] = mapped_column(
+        DateTime(timezone=True),
+        nullable=True,
+        comment="最近一次全量对账时间"
+    )
+
+    @property
+    def calculated_avg_rating(self) -> float:
+        """按评论计算的平均星级（无评论为 0）"""
+        return self.rating_sum / self.total_reviews if self.total_reviews else 0.0
+
+    def __repr__(self) -> str:
+        return f"<ProductReviewStats {self.product_id} total={self.total_reviews}>"
@@ -6,7 +6,7 @@ from datetime import datetime, date
 from enum import Enum
 from typing import TYPE_CHECKING, List
 
-from sqlalchemy import String, Integer, Boolean, Date, DateTime, Text, ForeignKey, func, UniqueConstraint
+from sqlalchemy import String, Integer, Boolean, Date, DateTime, Text, ForeignKey, func, UniqueConstraint, Index, text
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
@@ -164,6 +164,15 @@ class Review(Base):
     # Unique constraint: one review_id per product
     __table_args__ = (
         UniqueConstraint('product_id', 'review_id', name='unique_review_per_product'),
+        # 评论列表游标分页（db/migrate_review_keyset_index.sql）
+        Index(
+            'ix_reviews_product_keyset',
+            'product_id',
+            text("(COALESCE(review_date, '-infinity'::date)) DESC"),
+            text('created_at DESC'),
+            text('id DESC'),
+            postgresql_where=text('is_deleted = false'),
+        ),
     )
     
     def __repr__(self) -> str:
@@ -0,0 +1,76 @@
+"""
+Translation Memory Model - 翻译记忆库（跨产品复用的内容寻址译文缓存）
+
+Redis 作为热层（LRU + TTL 淘汰），本表作为持久层：
+Redis 被淘汰或重启后，译文仍可从 Postgres 取回并回填 Redis。
+"""
+from datetime import datetime
+
+from sqlalchemy import String, DateTime, Integer, Text, func
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db.session import Base
+
+
+class TranslationMemoryEntry(Base):
+    """
+    翻译记忆条目
+
+    主键为 sha256(模型 | 提示词版本 | 命名空间 | 归一化原文)，
+    同一段原文在不同 ASIN 之间共享同一条译文。
+    """
+    __tablename__ = "translation_memory"
+
+    source_hash: Mapped[str] = mapped_column(
+        String(64),
+        primary_key=True,
+        comment="sha256(模型|提示词版本|命名空间|归一化原文)"
+    )
+
+    source_text: Mapped[str] = mapped_column(
+        Text,
+        nullable=False,
+        comment="归一化后的英文原文（便于排查）"
+    )
+
+    translated_text: Mapped[str] = mapped_column(
+        Text,
+        nullable=False,
+        comment="中文译文"
+    )
+
+    model: Mapped[str] = mapped_column(
+        String(100),
+        nullable=False,
+        comment="生成译文的模型"
+    )
+
+    prompt_version: Mapped[str] = mapped_column(
+        String(50),
+        nullable=False,
+        comment="翻译提示词版本"
+    )
+
+    hit_count: Mapped[int] = mapped_column(
+        Integer,
+        default=0,
+        server_default="0",
+        nullable=False,
+        comment="从 Postgres 层命中的次数"
+    )
+
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        server_default=func.now(),
+        nullable=False
+    )
+
+    last_used_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        server_default=func.now(),
+        nullable=False,
+        index=True
+    )
+
+    def __repr__(self) -> str:
+        return f"<TranslationMemoryEntry {self.source_hash[:12]} hits={self.hit_count}>"
@@ -38,21 +38,21 @@ from app.models.project_learning import (
 )
 from app.services.summary_service import SummaryService
 from app.core.config import settings
+from app.core.llm import get_async_llm_client
 
 logger = logging.getLogger(__name__)
 
-# 初始化异步 OpenAI 客户端
+# 异步 OpenAI 客户端（共享 LLM 连接池的异步面）
 _async_client: Optional[AsyncOpenAI] = None
 
 def get_async_client() -> AsyncOpenAI:
-    """获取或创建异步 OpenAI 客户端"""
+    """获取异步 OpenAI 客户端（复用 app.core.llm 的连接池，仅覆盖超时与重试）"""
     global _async_client
     if _async_client is None:
-        if not settings.QWEN_API_KEY:
+        client = get_async_llm_client()
+        if client is None:
             raise ValueError("QWEN_API_KEY 未配置")
-        _async_client = AsyncOpenAI(
-            api_key=settings.QWEN_API_KEY,
-            base_url=settings.QWEN_API_BASE,
+        _async_client = client.with_options(
             timeout=60.0,  # 单个请求超时
             max_retries=3   # 内置重试
         )
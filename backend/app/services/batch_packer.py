@@ -0,0 +1,259 @@
+"""
+Token 感知的批量打包器 (Token-Aware Batch Packer)
+
+按 token 预算把评论装箱成 LLM 批量请求，替代按字数分类的固定批量大小。
+
+设计理念：
+1. 离线估算：不依赖远程 tokenizer，用字词规则近似估算输入/输出 token 数
+2. 装箱：First-Fit Decreasing，每个请求尽量填满输入、输出 token 预算
+3. 长评论分片：超长评论按句子边界切成多个分片分别翻译，再按顺序拼接（不再截断）
+
+分片约定：
+- 未分片的评论 id 保持不变
+- 分片 id 为 "{原id}#{序号}"，标题只随第 0 个分片发送
+- 每个条目都带 parent_id / chunk_index / chunk_count，便于调用方合并
+"""
+import logging
+import re
+from collections import Counter
+from typing import Dict, List, Optional
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+# ==========================================
+# Token 估算（近似 Qwen / GPT 系 BPE 分词）
+# ==========================================
+CJK_PATTERN = re.compile(r"[\u3040-\u30ff\u3400-\u9fff\uac00-\ud7af\uff00-\uffef]")
+PIECE_PATTERN = re.compile(r"[A-Za-z]+|\d+|[^\sA-Za-z\d]")
+SENTENCE_SPLIT_PATTERN = re.compile(r"(?<=[.!?])\s+")
+
+CHUNK_SEPARATOR = "#"
+
+
+def estimate_tokens(text: Optional[str]) -> int:
+    """
+    离线估算文本 token 数
+
+    规则（偏保守）：
+    - 中日韩字符：每字 1 token
+    - 英文单词：短词 1 token，长词每 6 个字母多 1 token
+    - 数字：每 3 位 1 token
+    - 标点符号：每个 1 token
+    """
+    if not text:
+        return 0
+
+    tokens = len(CJK_PATTERN.findall(text))
+    for piece in PIECE_PATTERN.findall(CJK_PATTERN.sub(" ", text)):
+        if piece.isdigit():
+            tokens += (len(piece) + 2) // 3
+        elif piece.isalpha():
+            tokens += 1 + (len(piece) - 1) // 6
+        else:
+            tokens += 1
+    return tokens
+
+
+class TokenBatchPacker:
+    """
+    按 token 预算装箱的批量打包器
+
+    预算默认取自配置（LLM_BATCH_*），也可在构造时覆盖。
+    """
+
+    # 每条评论的 JSON 结构开销（键名、引号、id、情感标签等）
+    INPUT_OVERHEAD_PER_ITEM = 15
+    OUTPUT_OVERHEAD_PER_ITEM = 25
+
+    # 英文 → 中文译文的 token 比例（中文更紧凑，取 1.0 留出余量）
+    OUTPUT_RATIO = 1.0
+
+    def __init__(
+        self,
+        input_budget: Optional[int] = None,
+        output_budget: Optional[int] = None,
+        max_items: Optional[int] = None,
+        chunk_tokens: Optional[int] = None
+    ):
+        self.input_budget = input_budget or settings.LLM_BATCH_INPUT_TOKENS
+        self.output_budget = output_budget or settings.LLM_BATCH_OUTPUT_TOKENS
+        self.max_items = max_items or settings.LLM_BATCH_MAX_ITEMS
+        self.chunk_tokens = chunk_tokens or settings.LLM_CHUNK_TOKENS
+
+    # ==========================================
+    # 估算
+    # ==========================================
+
+    def estimate_item(self, item: dict) -> tuple:
+        """估算单个条目的 (输入 token, 输出 token)"""
+        source_tokens = estimate_tokens(item.get("text")) + estimate_tokens(item.get("title"))
+        input_tokens = source_tokens + self.INPUT_OVERHEAD_PER_ITEM
+        output_tokens = int(source_tokens * self.OUTPUT_RATIO) + self.OUTPUT_OVERHEAD_PER_ITEM
+        return input_tokens, output_tokens
+
+    # ==========================================
+    # 长评论分片
+    # ==========================================
+
+    def _split_text(self, text: str) -> List[str]:
+        """按句子边界切分文本，单句超限时再按单词切分"""
+        chunks: List[str] = []
+        current: List[str] = []
+        current_tokens = 0
+
+        def flush():
+            nonlocal current, current_tokens
+            if current:
+                chunks.append(" ".join(current))
+            current, current_tokens = [], 0
+
+        for sentence in SENTENCE_SPLIT_PATTERN.split(text):
+            sentence_tokens = estimate_tokens(sentence)
+            if sentence_tokens > self.chunk_tokens:
+                flush()
+                for word in sentence.split():
+                    word_tokens = estimate_tokens(word)
+                    if current and current_tokens + word_tokens > self.chunk_tokens:
+                        flush()
+                    current.append(word)
+                    current_tokens += word_tokens
+                flush()
+                continue
+
+            if current and current_tokens + sentence_tokens > self.chunk_tokens:
+                flush()
+            current.append(sentence)
+            current_tokens += sentence_tokens
+
+        flush()
+        return chunks or [text]
+
+    def split(self, item: dict) -> List[dict]:
+        """
+        将单条评论切成一个或多个分片条目
+
+        Args:
+            item: {"id": "xxx", "text": "正文", "title": "标题（可选）", ...}
+
+        Returns:
+            分片条目列表（保留原条目的其他字段）
+        """
+        parent_id = str(item.get("id", ""))
+        text = " ".join((item.get("text") or "").split())
+
+        if estimate_tokens(text) <= self.chunk_tokens:
+            return [{**item, "id": parent_id, "text": text,
+                     "parent_id": parent_id, "chunk_index": 0, "chunk_count": 1}]
+
+        pieces = self._split_text(text)
+        return [
+            {
+                **item,
+                "id": f"{parent_id}{CHUNK_SEPARATOR}{index}",
+                "text": piece,
+                "title": item.get("title") if index == 0 else None,
+                "parent_id": parent_id,
+                "chunk_index": index,
+                "chunk_count": len(pieces),
+            }
+            for index, piece in enumerate(pieces)
+        ]
+
+    # ==========================================
+    # 装箱
+    # ==========================================
+
+    def pack(self, items: List[dict]) -> List[List[dict]]:
+        """
+        将评论装箱为批量请求（First-Fit Decreasing）
+
+        Args:
+            items: [{"id": "xxx", "text": "正文", "title": "标题（可选）"}, ...]
+
+        Returns:
+            批次列表，每个批次是分片条目列表；同一评论的分片按序号出现
+        """
+        chunks = [chunk for item in items if (item.get("text") or "").strip() for chunk in self.split(item)]
+        if not chunks:
+            return []
+
+        sized = [(chunk, *self.estimate_item(chunk)) for chunk in chunks]
+        sized.sort(key=lambda entry: entry[2], reverse=True)
+
+        bins: List[dict] = []
+        for chunk, input_tokens, output_tokens in sized:
+            for bin_ in bins:
+                if (
+                    len(bin_["items"]) < self.max_items
+                    and bin_["input"] + input_tokens <= self.input_budget
+                    and bin_["output"] + output_tokens <= self.output_budget
+                ):
+                    break
+            else:
+                bin_ = {"items": [], "input": 0, "output": 0}
+                bins.append(bin_)
+            bin_["items"].append(chunk)
+            bin_["input"] += input_tokens
+            bin_["output"] += output_tokens
+
+        batches = [
+            sorted(bin_["items"], key=lambda c: (c["parent_id"], c["chunk_index"]))
+            for bin_ in bins
+        ]
+
+        logger.debug(
+            f"[批量打包] {len(items)} 条评论 → {len(chunks)} 个分片 → {len(batches)} 个请求"
+        )
+        return batches
+
+    # ==========================================
+    # 分片结果合并
+    # ==========================================
+
+    @staticmethod
+    def merge_results(chunk_items: List[dict], results: dict) -> Dict[str, object]:
+        """
+        将分片结果合并回原评论
+
+        只有全部分片都成功的评论才会出现在返回结果中。
+
+        Args:
+            chunk_items: pack/split 产出的分片条目
+            results: {分片id: 译文字符串} 或 {分片id: {"title", "body", "sentiment"}}
+
+        Returns:
+            {原评论id: 合并后的结果}（与 results 值类型一致）
+        """
+        grouped: Dict[str, List[dict]] = {}
+        for chunk in chunk_items:
+            grouped.setdefault(chunk["parent_id"], []).append(chunk)
+
+        merged = {}
+        for parent_id, chunks in grouped.items():
+            chunks = sorted(chunks, key=lambda c: c["chunk_index"])
+            if len(chunks) != chunks[0]["chunk_count"]:
+                continue
+            parts = [results.get(chunk["id"]) for chunk in chunks]
+            if any(part is None for part in parts):
+                continue
+
+            if len(parts) == 1:
+                merged[parent_id] = parts[0]
+            elif isinstance(parts[0], dict):
+                sentiments = [part.get("sentiment") for part in parts if part.get("sentiment") is not None]
+                merged[parent_id] = {
+                    **parts[0],
+                    "body": "".join(part["body"] for part in parts),
+                    "sentiment": Counter(sentiments).most_common(1)[0][0] if sentiments else None,
+                }
+            else:
+                merged[parent_id] = "".join(parts)
+
+        return merged
+
+
+# Singleton instance
+review_batch_packer = TokenBatchPacker()
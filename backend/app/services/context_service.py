@@ -9,6 +9,7 @@ Context Service - 5W 上下文标签发现与管理服务
 - Why: 购买动机
 - What: 待办任务 (Jobs to be Done)
 """
+import asyncio
 import logging
 from typing import List, Optional, Dict
 from uuid import UUID
@@ -121,7 +122,8 @@ class ContextService:
         logger.info(f"开始为产品 {product.asin} 学习 5W 标签，样本数量: {len(sample_texts)}")
         
         # 4. [UPDATED] 调用 AI 学习 5W 标签（结合产品官方信息）
-        learned_labels = translation_service.learn_context_labels(
+        learned_labels = await asyncio.to_thread(
+            translation_service.learn_context_labels,
             reviews_text=sample_texts,
             product_title=product_title,      # [NEW] 产品标题
             bullet_points=bullet_points       # [NEW] 五点卖点
@@ -12,31 +12,312 @@
 - 每个 review_id 约 20 字节
 - 1 个产品 10,000 条评论 ≈ 200KB
 - 10,000 个产品 ≈ 2GB Redis 内存
+
+可选紧凑模式（REVIEW_DEDUP_BACKEND=bloom）：
+- 每个 ASIN 一个可扩展 Bloom 过滤器，存放在普通 Redis 位图中（BITFIELD 批量读写，无需 RedisBloom 模块）
+- 1% 误判率下约 9.6 bit / 条 ≈ 1.2MB / 百万条（Set 约 60MB+ / 百万条）
+- Bloom 只有误判没有漏判：判为"新"的一定没见过，直接入库（ON CONFLICT 兜底）；
+  判为"已见"的可能误判，由调用方传入 verify_existing 回查 DB 确认（只查命中部分），
+  误判的评论照常入库，不会丢数据
 """
+import hashlib
 import logging
+import math
 from typing import List, Tuple, Optional, Set
 import redis
 
-from app.core.redis import KEY_PREFIX_SEEN_REVIEWS
+from app.core.config import settings
+from app.core.redis import KEY_PREFIX_SEEN_REVIEWS, KEY_PREFIX_SEEN_BLOOM
 
 logger = logging.getLogger(__name__)
 
 
+# ==========================================
+# 可扩展 Bloom 过滤器（Redis 位图）
+# ==========================================
+# 键结构（每个 ASIN）：
+# - {prefix}{asin}:meta  Hash：layers 层数；m{i} 位数、k{i} 哈希数、c{i} 容量、n{i} 已写入条数
+# - {prefix}{asin}:{i}   第 i 层位图（BITFIELD 按需扩展，未写入的位读为 0）
+# 最后一层写满后追加一层：容量翻倍、误判率减半，总误判率 ≤ error_rate
+# 并发写入同一 ASIN 时层数判断可能短暂超额（最多多写一批），只影响误判率，不影响正确性
+# ==========================================
+BLOOM_GROWTH = 2          # 每层容量倍数
+BLOOM_TIGHTENING = 0.5    # 每层误判率倍数
+
+
+def bloom_layer_params(capacity: int, error_rate: float) -> Tuple[int, int]:
+    """按容量和误判率计算 (位数 m, 哈希数 k)"""
+    bits = max(64, math.ceil(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+    hashes = max(1, round(bits / capacity * math.log(2)))
+    return bits, hashes
+
+
+def bloom_digests(review_ids: List[str]) -> List[Tuple[int, int]]:
+    """每个 review_id 一次 blake2b，拆成两个 64 位整数供双重哈希使用"""
+    digests = []
+    for rid in review_ids:
+        d = hashlib.blake2b(rid.encode(), digest_size=16).digest()
+        digests.append((int.from_bytes(d[:8], "little"), int.from_bytes(d[8:], "little") | 1))
+    return digests
+
+
+def bloom_positions(digest: Tuple[int, int], bits: int, hashes: int) -> List[int]:
+    """双重哈希：pos_i = (h1 + i * h2) mod m"""
+    h1, h2 = digest
+    return [(h1 + i * h2) % bits for i in range(hashes)]
+
+
+def _parse_bloom_meta(meta: dict) -> List[dict]:
+    """Hash 元数据 → [{"m", "k", "c", "n"}]"""
+    layers = []
+    for i in range(int(meta.get("layers", 0))):
+        layers.append({
+            "m": int(meta[f"m{i}"]),
+            "k": int(meta[f"k{i}"]),
+            "c": int(meta[f"c{i}"]),
+            "n": int(meta.get(f"n{i}", 0)),
+        })
+    return layers
+
+
+def _bloom_read_args(digests: List[Tuple[int, int]], layer: dict) -> list:
+    """BITFIELD 批量读取参数：每个 id 的 k 个位"""
+    args = []
+    for digest in digests:
+        for pos in bloom_positions(digest, layer["m"], layer["k"]):
+            args += ["GET", "u1", pos]
+    return args
+
+
+def _bloom_write_args(digests: List[Tuple[int, int]], layer: dict) -> list:
+    """BITFIELD 批量写入参数"""
+    args = []
+    for digest in digests:
+        for pos in bloom_positions(digest, layer["m"], layer["k"]):
+            args += ["SET", "u1", pos, 1]
+    return args
+
+
+def _bloom_hits(digests: List[Tuple[int, int]], layers: List[dict], replies: list) -> List[bool]:
+    """汇总各层 BITFIELD 结果：任意一层 k 位全为 1 即视为已见"""
+    hits = [False] * len(digests)
+    for layer, bits in zip(layers, replies):
+        k = layer["k"]
+        for idx in range(len(digests)):
+            if not hits[idx] and all(bits[idx * k:(idx + 1) * k]):
+                hits[idx] = True
+    return hits
+
+
+class ScalableBloomFilterSync:
+    """按 ASIN 划分的可扩展 Bloom 过滤器（同步版本）"""
+    
+    def __init__(
+        self,
+        redis_client: redis.Redis,
+        prefix: str = KEY_PREFIX_SEEN_BLOOM,
+        error_rate: float = None,
+        initial_capacity: int = None,
+        expire_seconds: int = 90 * 24 * 3600
+    ):
+        self.redis = redis_client
+        self.prefix = prefix
+        self.error_rate = error_rate or settings.REVIEW_DEDUP_BLOOM_ERROR_RATE
+        self.initial_capacity = initial_capacity or settings.REVIEW_DEDUP_BLOOM_INITIAL_CAPACITY
+        self.expire_seconds = expire_seconds
+    
+    def _meta_key(self, asin: str) -> str:
+        return f"{self.prefix}{asin}:meta"
+    
+    def _layer_key(self, asin: str, index: int) -> str:
+        return f"{self.prefix}{asin}:{index}"
+    
+    def _layers(self, asin: str) -> List[dict]:
+        return _parse_bloom_meta(self.redis.hgetall(self._meta_key(asin)))
+    
+    def _next_layer(self, asin: str, layers: List[dict], min_capacity: int = 0) -> dict:
+        """追加一层（容量翻倍、误判率收紧）"""
+        index = len(layers)
+        capacity = max(
+            self.initial_capacity * BLOOM_GROWTH ** index,
+            min_capacity
+        )
+        error_rate = self.error_rate * (1 - BLOOM_TIGHTENING) * BLOOM_TIGHTENING ** index
+        bits, hashes = bloom_layer_params(capacity, error_rate)
+        self.redis.hset(self._meta_key(asin), mapping={
+            "layers": index + 1, f"m{index}": bits, f"k{index}": hashes, f"c{index}": capacity, f"n{index}": 0
+        })
+        return {"m": bits, "k": hashes, "c": capacity, "n": 0}
+    
+    def contains_many(self, asin: str, review_ids: List[str]) -> List[bool]:
+        """批量判断是否（可能）已见，与 SMISMEMBER 返回格式一致"""
+        if not review_ids:
+            return []
+        layers = self._layers(asin)
+        if not layers:
+            return [False] * len(review_ids)
+        
+        digests = bloom_digests(review_ids)
+        pipe = self.redis.pipeline(transaction=False)
+        for i, layer in enumerate(layers):
+            pipe.execute_command("BITFIELD", self._layer_key(asin, i), *_bloom_read_args(digests, layer))
+        return _bloom_hits(digests, layers, pipe.execute())
+    
+    def add_many(self, asin: str, review_ids: List[str]):
+        """写入最后一层（写满则先追加新层）"""
+        if not review_ids:
+            return
+        layers = self._layers(asin)
+        if not layers or layers[-1]["n"] >= layers[-1]["c"]:
+            layers.append(self._next_layer(asin, layers))
+        index = len(layers) - 1
+        
+        pipe = self.redis.pipeline(transaction=False)
+        pipe.execute_command(
+            "BITFIELD", self._layer_key(asin, index), *_bloom_write_args(bloom_digests(review_ids), layers[index])
+        )
+        pipe.hincrby(self._meta_key(asin), f"n{index}", len(review_ids))
+        pipe.expire(self._meta_key(asin), self.expire_seconds)
+        for i in range(len(layers)):
+            pipe.expire(self._layer_key(asin, i), self.expire_seconds)
+        pipe.execute()
+    
+    def rebuild(self, asin: str, review_ids: List[str]):
+        """按 DB 全量重建（单层，容量按现有条数预留一倍余量）"""
+        layers = self._layers(asin)
+        self.redis.delete(self._meta_key(asin), *[self._layer_key(asin, i) for i in range(len(layers))])
+        if review_ids:
+            self._next_layer(asin, [], min_capacity=len(review_ids) * BLOOM_GROWTH)
+            self.add_many(asin, review_ids)
+    
+    def count(self, asin: str) -> int:
+        """已写入条数（近似，重复写入会重复计数）"""
+        return sum(layer["n"] for layer in self._layers(asin))
+    
+    def memory_bytes(self, asin: str) -> int:
+        """过滤器占用的位图字节数"""
+        return sum(-(-layer["m"] // 8) for layer in self._layers(asin))
+
+
+class ScalableBloomFilter:
+    """按 ASIN 划分的可扩展 Bloom 过滤器（异步版本）"""
+    
+    def __init__(
+        self,
+        redis_client,
+        prefix: str = KEY_PREFIX_SEEN_BLOOM,
+        error_rate: float = None,
+        initial_capacity: int = None,
+        expire_seconds: int = 90 * 24 * 3600
+    ):
+        self.redis = redis_client
+        self.prefix = prefix
+        self.error_rate = error_rate or settings.REVIEW_DEDUP_BLOOM_ERROR_RATE
+        self.initial_capacity = initial_capacity or settings.REVIEW_DEDUP_BLOOM_INITIAL_CAPACITY
+        self.expire_seconds = expire_seconds
+    
+    def _meta_key(self, asin: str) -> str:
+        return f"{self.prefix}{asin}:meta"
+    
+    def _layer_key(self, asin: str, index: int) -> str:
+        return f"{self.prefix}{asin}:{index}"
+    
+    async def _layers(self, asin: str) -> List[dict]:
+        return _parse_bloom_meta(await self.redis.hgetall(self._meta_key(asin)))
+    
+    async def _next_layer(self, asin: str, layers: List[dict], min_capacity: int = 0) -> dict:
+        index = len(layers)
+        capacity = max(
+            self.initial_capacity * BLOOM_GROWTH ** index,
+            min_capacity
+        )
+        error_rate = self.error_rate * (1 - BLOOM_TIGHTENING) * BLOOM_TIGHTENING ** index
+        bits, hashes = bloom_layer_params(capacity, error_rate)
+        await self.redis.hset(self._meta_key(asin), mapping={
+            "layers": index + 1, f"m{index}": bits, f"k{index}": hashes, f"c{index}": capacity, f"n{index}": 0
+        })
+        return {"m": bits, "k": hashes, "c": capacity, "n": 0}
+    
+    async def contains_many(self, asin: str, review_ids: List[str]) -> List[bool]:
+        if not review_ids:
+            return []
+        layers = await self._layers(asin)
+        if not layers:
+            return [False] * len(review_ids)
+        
+        digests = bloom_digests(review_ids)
+        pipe = self.redis.pipeline(transaction=False)
+        for i, layer in enumerate(layers):
+            pipe.execute_command("BITFIELD", self._layer_key(asin, i), *_bloom_read_args(digests, layer))
+        return _bloom_hits(digests, layers, await pipe.execute())
+    
+    async def add_many(self, asin: str, review_ids: List[str]):
+        if not review_ids:
+            return
+        layers = await self._layers(asin)
+        if not layers or layers[-1]["n"] >= layers[-1]["c"]:
+            layers.append(await self._next_layer(asin, layers))
+        index = len(layers) - 1
+        
+        pipe = self.redis.pipeline(transaction=False)
+        pipe.execute_command(
+            "BITFIELD", self._layer_key(asin, index), *_bloom_write_args(bloom_digests(review_ids), layers[index])
+        )
+        pipe.hincrby(self._meta_key(asin), f"n{index}", len(review_ids))
+        pipe.expire(self._meta_key(asin), self.expire_seconds)
+        for i in range(len(layers)):
+            pipe.expire(self._layer_key(asin, i), self.expire_seconds)
+        await pipe.execute()
+    
+    async def rebuild(self, asin: str, review_ids: List[str]):
+        layers = await self._layers(asin)
+        await self.redis.delete(self._meta_key(asin), *[self._layer_key(asin, i) for i in range(len(layers))])
+        if review_ids:
+            await self._next_layer(asin, [], min_capacity=len(review_ids) * BLOOM_GROWTH)
+            await self.add_many(asin, review_ids)
+    
+    async def count(self, asin: str) -> int:
+        return sum(layer["n"] for layer in await self._layers(asin))
+
+
 class ReviewDeduplicator:
     """
     基于 Redis Set 的评论去重器（异步版本）
+    
+    backend="bloom" 时改用 ScalableBloomFilter，接口不变
     """
     
     KEY_PREFIX = KEY_PREFIX_SEEN_REVIEWS
     EXPIRE_DAYS = 90  # 90 天后自动清理冷数据
     
-    def __init__(self, redis_client):
+    def __init__(self, redis_client, backend: str = None):
         self.redis = redis_client
+        self.backend = backend or settings.REVIEW_DEDUP_BACKEND
+        self.bloom = ScalableBloomFilter(
+            redis_client, expire_seconds=self.EXPIRE_DAYS * 24 * 3600
+        ) if self.backend == "bloom" else None
+    
+    async def exists_many(self, asin: str, review_ids: List[str]) -> List[bool]:
+        """批量判断是否已见（与 SMISMEMBER 返回格式一致；bloom 模式下"已见"可能是误判）"""
+        if self.bloom:
+            return await self.bloom.contains_many(asin, review_ids)
+        
+        key = f"{self.KEY_PREFIX}{asin}"
+        try:
+            # SMISMEMBER 需要 Redis 6.6.0+
+            return await self.redis.smismember(key, review_ids)
+        except Exception:
+            # 兼容旧版本 Redis，使用 pipeline
+            pipe = self.redis.pipeline()
+            for rid in review_ids:
+                pipe.sismember(key, rid)
+            return await pipe.execute()
     
     async def filter_new_reviews(
         self, 
         asin: str, 
-        reviews: List[dict]
+        reviews: List[dict],
+        verify_existing=None
     ) -> Tuple[List[dict], int, List[str]]:
         """
         过滤出新评论（Redis 中没见过的）
@@ -44,6 +325,8 @@ class ReviewDeduplicator:
         Args:
             asin: 产品 ASIN
             reviews: 评论列表
+            verify_existing: 可选，async (review_ids) -> 已存在于 DB 的 review_id 集合；
+                bloom 模式下用于回查命中部分，排除误判
             
         Returns:
             (new_reviews, skipped_count, new_ids)
@@ -54,8 +337,6 @@ class ReviewDeduplicator:
         if not reviews:
             return [], 0, []
         
-        key = f"{self.KEY_PREFIX}{asin}"
-        
         # 提取所有 review_id
         review_id_map = {}  # review_id -> review
         for r in reviews:
@@ -69,15 +350,11 @@ class ReviewDeduplicator:
         review_ids = list(review_id_map.keys())
         
         # 批量检查哪些已存在
-        try:
-            # SMISMEMBER 需要 Redis 6.6.0+
-            exists_flags = await self.redis.smismember(key, review_ids)
-        except Exception:
-            # 兼容旧版本 Redis，使用 pipeline
-            pipe = self.redis.pipeline()
-            for rid in review_ids:
-                pipe.sismember(key, rid)
-            exists_flags = await pipe.execute()
+        exists_flags = await self.exists_many(asin, review_ids)
+        if self.bloom and verify_existing:
+            hits = [rid for rid, exists in zip(review_ids, exists_flags) if exists]
+            confirmed = set(await verify_existing(hits)) if hits else set()
+            exists_flags = [rid in confirmed for rid in review_ids]
         
         # 过滤出新的
         new_reviews = []
@@ -108,6 +385,9 @@ class ReviewDeduplicator:
         
         key = f"{self.KEY_PREFIX}{asin}"
         try:
+            if self.bloom:
+                await self.bloom.add_many(asin, review_ids)
+                return
             await self.redis.sadd(key, *review_ids)
             await self.redis.expire(key, self.EXPIRE_DAYS * 24 * 3600)
         except Exception as e:
@@ -127,6 +407,10 @@ class ReviewDeduplicator:
         
         key = f"{self.KEY_PREFIX}{asin}"
         try:
+            if self.bloom:
+                await self.bloom.rebuild(asin, review_ids)
+                logger.info(f"[{asin}] 重建 Bloom 过滤器: {len(review_ids)} 条 review_id")
+                return
             # 批量添加
             await self.redis.sadd(key, *review_ids)
             await self.redis.expire(key, self.EXPIRE_DAYS * 24 * 3600)
@@ -138,6 +422,8 @@ class ReviewDeduplicator:
         """获取已见评论数量"""
         key = f"{self.KEY_PREFIX}{asin}"
         try:
+            if self.bloom:
+                return await self.bloom.count(asin)
             return await self.redis.scard(key)
         except Exception:
             return 0
@@ -151,25 +437,47 @@ class ReviewDeduplicatorSync:
     KEY_PREFIX = KEY_PREFIX_SEEN_REVIEWS
     EXPIRE_DAYS = 90
     
-    def __init__(self, redis_client: redis.Redis):
+    def __init__(self, redis_client: redis.Redis, backend: str = None):
         self.redis = redis_client
+        self.backend = backend or settings.REVIEW_DEDUP_BACKEND
+        self.bloom = ScalableBloomFilterSync(
+            redis_client, expire_seconds=self.EXPIRE_DAYS * 24 * 3600
+        ) if self.backend == "bloom" else None
+    
+    def exists_many(self, asin: str, review_ids: List[str]) -> List[bool]:
+        """批量判断是否已见（同步版本）"""
+        if self.bloom:
+            return self.bloom.contains_many(asin, review_ids)
+        
+        key = f"{self.KEY_PREFIX}{asin}"
+        try:
+            # 尝试使用 SMISMEMBER（Redis 6.6+）
+            return self.redis.smismember(key, review_ids)
+        except Exception:
+            # 兼容旧版本
+            pipe = self.redis.pipeline()
+            for rid in review_ids:
+                pipe.sismember(key, rid)
+            return pipe.execute()
     
     def filter_new_reviews(
         self, 
         asin: str, 
-        reviews: List[dict]
+        reviews: List[dict],
+        verify_existing=None
     ) -> Tuple[List[dict], int, List[str]]:
         """
         过滤出新评论（同步版本）
         
+        Args:
+            verify_existing: 可选，(review_ids) -> 已存在于 DB 的 review_id 集合（bloom 模式回查误判）
+        
         Returns:
             (new_reviews, skipped_count, new_ids)
         """
         if not reviews:
             return [], 0, []
         
-        key = f"{self.KEY_PREFIX}{asin}"
-        
         # 提取所有 review_id
         review_id_map = {}
         for r in reviews:
@@ -183,15 +491,11 @@ class ReviewDeduplicatorSync:
         review_ids = list(review_id_map.keys())
         
         # 批量检查
-        try:
-            # 尝试使用 SMISMEMBER（Redis 6.6+）
-            exists_flags = self.redis.smismember(key, review_ids)
-        except Exception:
-            # 兼容旧版本
-            pipe = self.redis.pipeline()
-            for rid in review_ids:
-                pipe.sismember(key, rid)
-            exists_flags = pipe.execute()
+        exists_flags = self.exists_many(asin, review_ids)
+        if self.bloom and verify_existing:
+            hits = [rid for rid, exists in zip(review_ids, exists_flags) if exists]
+            confirmed = set(verify_existing(hits)) if hits else set()
+            exists_flags = [rid in confirmed for rid in review_ids]
         
         # 过滤
         new_reviews = []
@@ -216,6 +520,9 @@ class ReviewDeduplicatorSync:
         
         key = f"{self.KEY_PREFIX}{asin}"
         try:
+            if self.bloom:
+                self.bloom.add_many(asin, review_ids)
+                return
             self.redis.sadd(key, *review_ids)
             self.redis.expire(key, self.EXPIRE_DAYS * 24 * 3600)
         except Exception as e:
@@ -228,6 +535,10 @@ class ReviewDeduplicatorSync:
         
         key = f"{self.KEY_PREFIX}{asin}"
         try:
+            if self.bloom:
+                self.bloom.rebuild(asin, review_ids)
+                logger.info(f"[{asin}] 重建 Bloom 过滤器: {len(review_ids)} 条 review_id")
+                return
             self.redis.sadd(key, *review_ids)
             self.redis.expire(key, self.EXPIRE_DAYS * 24 * 3600)
             logger.info(f"[{asin}] 同步 {len(review_ids)} 条 review_id 到 Redis")
@@ -2,6 +2,7 @@
 Dimension Service - 维度发现与管理服务
 用于实现 "AI 学习建模 -> 标准化执行" 模式
 """
+import asyncio
 import json
 import logging
 from typing import List, Optional
@@ -115,7 +116,8 @@ class DimensionService:
             logger.info(f"产品卖点: {len(bullet_points_text)} 字符")
         
         # 5. 调用 AI 学习维度（传入产品上下文）
-        learned_dims = translation_service.learn_dimensions(
+        learned_dims = await asyncio.to_thread(
+            translation_service.learn_dimensions,
             reviews_text=sample_texts,
             product_title=product_title,
             bullet_points=bullet_points_text
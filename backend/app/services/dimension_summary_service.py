@@ -8,6 +8,7 @@
 - 消费者原型
 - 整体数据总结
 """
+import asyncio
 import json
 import logging
 from typing import Dict, List, Any, Optional
@@ -22,9 +23,8 @@ from app.models import (
     ProductDimension, ProductContextLabel,
     ProductDimensionSummary, DimensionSummaryType
 )
-from app.services.translation import translation_service
 from app.core.config import settings
-from openai import OpenAI
+from app.core.llm import get_sync_llm_client
 
 logger = logging.getLogger(__name__)
 
@@ -34,19 +34,12 @@ class DimensionSummaryService:
     
     def __init__(self, db: AsyncSession):
         self.db = db
-        # 使用translation_service的client，如果没有则创建新的
-        if translation_service.client:
-            self.client = translation_service.client
-        else:
-            self.client = OpenAI(
-                api_key=settings.QWEN_API_KEY,
-                base_url=settings.QWEN_API_BASE,
-                timeout=120.0,
-            )
+        # 共享 LLM 连接池（与 translation_service 是同一个客户端）
+        self.client = get_sync_llm_client()
         self.model = settings.QWEN_MODEL
     
     def _generate_text(self, prompt: str, max_tokens: int = 500) -> str:
-        """调用AI生成文本（同步方法）"""
+        """调用AI生成文本（同步方法；异步方法中经 asyncio.to_thread 调用，限流等待不阻塞事件循环）"""
         if not self.client:
             raise RuntimeError("AI服务未配置")
         
@@ -75,6 +68,12 @@ class DimensionSummaryService:
         if not product:
             raise ValueError(f"产品不存在: {product_id}")
         
+        # 收集数据之前记下数据版本：生成期间的新写入会让版本前进，check-data-changes 仍报告有变化
+        # （在 Celery 任务的临时事件循环中运行，用同步 Redis 客户端）
+        from app.core.cache import get_cache_service_sync
+        cache = get_cache_service_sync()
+        data_version = cache.get_data_version(product.asin)
+        
         # 收集所有需要的数据
         data = await self._collect_data(product_id)
         
@@ -133,6 +132,9 @@ class DimensionSummaryService:
         overall = await self._generate_overall_summary(product_id, data, product)
         results["overall_summary"] = overall
         
+        if data_version is not None:
+            cache.set_summary_data_version(product.asin, data_version)
+        
         logger.info(f"维度总结生成完成: {product_id}")
         return results
     
@@ -259,7 +261,7 @@ class DimensionSummaryService:
 只输出JSON，不要其他内容。"""
 
         try:
-            response = self._generate_text(prompt, max_tokens=400)
+            response = await asyncio.to_thread(self._generate_text, prompt, max_tokens=400)
             
             # 解析JSON
             structured_data = None
@@ -351,7 +353,7 @@ class DimensionSummaryService:
 只输出JSON，不要其他内容。"""
 
         try:
-            response = self._generate_text(prompt, max_tokens=400)
+            response = await asyncio.to_thread(self._generate_text, prompt, max_tokens=400)
             
             # 解析JSON
             structured_data = None
@@ -439,7 +441,7 @@ class DimensionSummaryService:
 请用1-2句话总结用户在这个情感维度上的核心感受。直接输出总结。"""
 
         try:
-            response = self._generate_text(prompt, max_tokens=200)
+            response = await asyncio.to_thread(self._generate_text, prompt, max_tokens=200)
             
             summary = ProductDimensionSummary(
                 product_id=product_id,
@@ -489,7 +491,7 @@ class DimensionSummaryService:
 请用1-2句话总结用户在这个场景下的使用情况和反馈。直接输出总结。"""
 
         try:
-            response = self._generate_text(prompt, max_tokens=200)
+            response = await asyncio.to_thread(self._generate_text, prompt, max_tokens=200)
             
             summary = ProductDimensionSummary(
                 product_id=product_id,
@@ -561,7 +563,7 @@ class DimensionSummaryService:
 只输出JSON，不要其他内容。"""
 
         try:
-            response = self._generate_text(prompt, max_tokens=800)
+            response = await asyncio.to_thread(self._generate_text, prompt, max_tokens=800)
             
             # 解析JSON
             try:
@@ -649,7 +651,7 @@ class DimensionSummaryService:
 只输出JSON，不要其他内容。"""
 
         try:
-            response = self._generate_text(prompt, max_tokens=500)
+            response = await asyncio.to_thread(self._generate_text, prompt, max_tokens=500)
             
             # 解析JSON
             structured_data = None
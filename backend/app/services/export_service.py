@@ -0,0 +1,449 @@
+"""
+评论导出 (Review Export)
+
+GET /reviews/{asin}/export 的导出引擎。以前的实现一次性加载全部 ORM 对象
+（selectinload 洞察 / 主题）、拼 pandas DataFrame、把整个 XLSX 写进 BytesIO，
+内存随评论数线性增长，且固定截断在 10000 条。
+
+设计理念：
+1. 服务端游标：AsyncSession.stream + yield_per 分批拉取，任意时刻只持有一批行
+2. SQL 聚合：洞察在 SQL 里 string_agg 成文本，主题 json_agg 成一列，
+   不再为每条评论加载关联对象
+3. 增量写出：
+   - CSV：生成器逐批 yield，边查边发送
+   - XLSX：openpyxl write-only 工作簿（行直接写入临时文件），保存到磁盘后按块发送
+4. 不设行数上限；峰值内存与评论数无关（scripts/bench_review_export.py）
+5. 产物复用：渲染结果按产品数据版本（cache.get_data_version）存入 EXPORT_STORAGE_DIR，
+   版本不变时直接发送文件；大产品由 reports 队列的 task_render_review_export 后台渲染
+
+导出在响应阶段才开始读库，此时请求级会话已关闭，因此使用独立会话。
+"""
+import asyncio
+import csv
+import io
+import logging
+import os
+import re
+import tempfile
+import time
+from typing import AsyncIterator, Iterator, List, Optional, Tuple
+from uuid import UUID
+
+from sqlalchemy import select, func, and_, literal, literal_column, JSON
+from sqlalchemy.dialects.postgresql import aggregate_order_by
+
+from app.core.config import settings
+from app.db.session import async_session_maker
+from app.models.insight import ReviewInsight
+from app.models.product import Product
+from app.models.review import Review
+from app.models.theme_highlight import ReviewThemeHighlight
+from app.services.review_service import REVIEW_KEYSET_ORDER
+
+logger = logging.getLogger(__name__)
+
+# ==========================================
+# 导出配置
+# ==========================================
+EXPORT_BATCH_SIZE = 1000  # 服务端游标每批行数
+
+EXPORT_COLUMNS = [
+    "评分 (Rating)",
+    "评论标题 (Title)",
+    "标题翻译 (Title CN)",
+    "评论内容 (Body)",
+    "内容翻译 (Body CN)",
+    "情感 (Sentiment)",
+    "作者 (Author)",
+    "日期 (Date)",
+    "认证购买 (Verified)",
+    "有用票数 (Helpful)",
+    "提取洞察 (Insights)",
+    "提取主题 (Theme Highlights)",
+]
+
+THEME_LABELS = {
+    "who": "Who（使用者）",
+    "where": "Where（使用场景）",
+    "when": "When（使用时机）",
+    "unmet_needs": "未被满足的需求",
+    "pain_points": "Pain Points（痛点）",
+    "benefits": "Benefits（收益/好处）",
+    "features": "Features（功能特性）",
+    "comparison": "Comparison（对比）",
+}
+
+XLSX_MEDIA_TYPE = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+CSV_MEDIA_TYPE = "text/csv; charset=utf-8"
+
+# ==========================================
+# 导出产物存储
+# ==========================================
+ARTIFACT_SAFE_ASIN_RE = re.compile(r"^[A-Za-z0-9_-]{1,64}$")  # ASIN 作为目录名，拒绝路径字符
+ARTIFACT_TEMP_PREFIX = ".rendering_"                          # 渲染中的临时文件（与产物同目录，保证 os.replace 原子）
+ARTIFACT_STALE_TEMP_SECONDS = 24 * 3600                       # 超过该时长的临时文件视为进程崩溃残留
+
+
+def _optional_part(prefix: str, column):
+    """prefix || column，列为空时整段为空字符串"""
+    return func.coalesce(literal(prefix) + func.nullif(column, ""), "")
+
+
+def _format_themes(themes: Optional[list]) -> str:
+    """主题聚合列 → "标签: 内容 (原文) - 解释, ... | ..." """
+    parts = []
+    for theme in themes or []:
+        if theme.get("label_name"):
+            # 一条记录 = 一个标签
+            items = [{
+                "content": theme["label_name"],
+                "content_original": theme.get("quote"),
+                "explanation": theme.get("explanation"),
+            }]
+        else:
+            items = theme.get("items") if isinstance(theme.get("items"), list) else []
+        if not items:
+            continue
+        item_texts = []
+        for item in items:
+            item_str = item.get("content", "")
+            if item.get("content_original"):
+                item_str += f" ({item['content_original']})"
+            if item.get("explanation"):
+                item_str += f" - {item['explanation']}"
+            item_texts.append(item_str)
+        label = THEME_LABELS.get(theme.get("theme_type"), theme.get("theme_type"))
+        parts.append(f"{label}: {', '.join(item_texts)}")
+    return " | ".join(parts)
+
+
+def _export_query(product_id: UUID, batch_size: int):
+    """评论 + SQL 聚合的洞察文本 / 主题列表，顺序与评论列表一致"""
+    insight_text = (
+        literal("[") + ReviewInsight.insight_type + "] " + func.coalesce(ReviewInsight.quote, "")
+        + _optional_part(" | 翻译: ", ReviewInsight.quote_translated)
+        + _optional_part(" | 分析: ", ReviewInsight.analysis)
+        + _optional_part(" | 维度: ", ReviewInsight.dimension)
+    )
+    insights = (
+        select(func.string_agg(
+            insight_text,
+            aggregate_order_by(literal_column("' | '"), ReviewInsight.created_at, ReviewInsight.id)
+        ))
+        .where(ReviewInsight.review_id == Review.id)
+        .correlate(Review)
+        .scalar_subquery()
+    )
+    theme = func.json_build_object(
+        "theme_type", ReviewThemeHighlight.theme_type,
+        "label_name", ReviewThemeHighlight.label_name,
+        "quote", ReviewThemeHighlight.quote,
+        "explanation", ReviewThemeHighlight.explanation,
+        "items", ReviewThemeHighlight.items,
+    )
+    themes = (
+        select(func.json_agg(
+            aggregate_order_by(theme, ReviewThemeHighlight.created_at, ReviewThemeHighlight.id),
+            type_=JSON
+        ))
+        .where(ReviewThemeHighlight.review_id == Review.id)
+        .correlate(Review)
+        .scalar_subquery()
+    )
+    return (
+        select(
+            Review.rating,
+            Review.title_original,
+            Review.title_translated,
+            Review.body_original,
+            Review.body_translated,
+            Review.sentiment,
+            Review.author,
+            Review.review_date,
+            Review.verified_purchase,
+            Review.helpful_votes,
+            insights.label("insights_text"),
+            themes.label("themes"),
+        )
+        .where(and_(Review.product_id == product_id, Review.is_deleted == False))
+        .order_by(*REVIEW_KEYSET_ORDER)
+        .execution_options(yield_per=batch_size)
+    )
+
+
+def _export_rows(partition) -> List[list]:
+    """查询结果 → 导出行"""
+    return [
+        [
+            r.rating,
+            r.title_original,
+            r.title_translated,
+            r.body_original,
+            r.body_translated,
+            r.sentiment,
+            r.author,
+            r.review_date,
+            "是" if r.verified_purchase else "否",
+            r.helpful_votes,
+            r.insights_text or "",
+            _format_themes(r.themes),
+        ]
+        for r in partition
+    ]
+
+
+def _csv_header() -> bytes:
+    """CSV 表头（UTF-8 BOM，Excel 直接打开不乱码）"""
+    buffer = io.StringIO()
+    csv.writer(buffer).writerow(EXPORT_COLUMNS)
+    return ("\ufeff" + buffer.getvalue()).encode("utf-8")
+
+
+def _append_xlsx_rows(worksheet, rows: List[list]) -> None:
+    """写入一批行（去掉 XLSX 不允许的控制字符）"""
+    from openpyxl.cell.cell import ILLEGAL_CHARACTERS_RE
+
+    for row in rows:
+        worksheet.append([
+            ILLEGAL_CHARACTERS_RE.sub("", value) if isinstance(value, str) else value
+            for value in row
+        ])
+
+
+class ReviewExportService:
+    """
+    评论导出服务（流式、常量内存）
+    """
+
+    def __init__(self, batch_size: int = EXPORT_BATCH_SIZE):
+        self.batch_size = batch_size
+
+    # ==========================================
+    # 查询
+    # ==========================================
+
+    async def find_product(self, db, asin: str) -> Optional[UUID]:
+        """有可导出评论时返回产品 ID，否则返回 None（用于在开始流式响应前返回 404）"""
+        result = await db.execute(
+            select(Product.id)
+            .join(Review, Review.product_id == Product.id)
+            .where(and_(Product.asin == asin, Review.is_deleted == False))
+            .limit(1)
+        )
+        return result.scalar_one_or_none()
+
+    async def count_rows(self, db, product_id: UUID) -> int:
+        """可导出评论数（决定当场渲染还是交给后台任务）"""
+        result = await db.execute(
+            select(func.count(Review.id))
+            .where(and_(Review.product_id == product_id, Review.is_deleted == False))
+        )
+        return result.scalar() or 0
+
+    async def iter_rows(self, product_id: UUID) -> AsyncIterator[List[list]]:
+        """按批产出导出行（服务端游标，独立会话）"""
+        exported = 0
+        async with async_session_maker() as session:
+            result = await session.stream(_export_query(product_id, self.batch_size))
+            async for partition in result.partitions():
+                rows = _export_rows(partition)
+                exported += len(rows)
+                yield rows
+        logger.info(f"导出评论完成: product={product_id}, rows={exported}")
+
+    # ==========================================
+    # 写出
+    # ==========================================
+
+    async def stream_csv(self, product_id: UUID) -> AsyncIterator[bytes]:
+        """逐批生成 CSV（UTF-8 BOM，Excel 直接打开不乱码）"""
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        yield _csv_header()
+        async for rows in self.iter_rows(product_id):
+            buffer.seek(0)
+            buffer.truncate()
+            writer.writerows(rows)
+            yield buffer.getvalue().encode("utf-8")
+
+    async def write_xlsx(self, product_id: UUID, path: Optional[str] = None) -> str:
+        """
+        写出 XLSX 并返回路径（未指定 path 时写到临时文件，调用方负责删除）
+
+        write-only 工作簿把行直接写进临时 XML，保存时再打包成 zip，内存不随行数增长；
+        openpyxl 是同步 CPU 操作，放到线程里执行，不阻塞事件循环。
+        """
+        from openpyxl import Workbook
+
+        workbook = Workbook(write_only=True)
+        worksheet = workbook.create_sheet("Reviews")
+        worksheet.append(EXPORT_COLUMNS)
+        async for rows in self.iter_rows(product_id):
+            await asyncio.to_thread(_append_xlsx_rows, worksheet, rows)
+
+        if path is None:
+            fd, path = tempfile.mkstemp(prefix="reviews_export_", suffix=".xlsx")
+            os.close(fd)
+        try:
+            await asyncio.to_thread(workbook.save, path)
+        except Exception:
+            os.unlink(path)
+            raise
+        return path
+
+
+class ReviewExportServiceSync:
+    """
+    评论导出服务（同步版本，用于 reports Worker 预渲染导出产物）
+    """
+
+    def __init__(self, db, batch_size: int = EXPORT_BATCH_SIZE):
+        self.db = db
+        self.batch_size = batch_size
+
+    def iter_rows(self, product_id: UUID) -> Iterator[List[list]]:
+        """按批产出导出行（yield_per 走服务端游标）"""
+        result = self.db.execute(_export_query(product_id, self.batch_size))
+        for partition in result.partitions():
+            yield _export_rows(partition)
+
+    def write_csv(self, product_id: UUID, path: str) -> int:
+        """写出 CSV 到 path，返回行数"""
+        exported = 0
+        with open(path, "wb") as f:
+            f.write(_csv_header())
+            buffer = io.StringIO()
+            writer = csv.writer(buffer)
+            for rows in self.iter_rows(product_id):
+                buffer.seek(0)
+                buffer.truncate()
+                writer.writerows(rows)
+                f.write(buffer.getvalue().encode("utf-8"))
+                exported += len(rows)
+        return exported
+
+    def write_xlsx(self, product_id: UUID, path: str) -> int:
+        """写出 XLSX 到 path（write-only 工作簿），返回行数"""
+        from openpyxl import Workbook
+
+        exported = 0
+        workbook = Workbook(write_only=True)
+        worksheet = workbook.create_sheet("Reviews")
+        worksheet.append(EXPORT_COLUMNS)
+        for rows in self.iter_rows(product_id):
+            _append_xlsx_rows(worksheet, rows)
+            exported += len(rows)
+        workbook.save(path)
+        return exported
+
+
+def _remove_quietly(path: str) -> None:
+    try:
+        os.unlink(path)
+    except OSError:
+        pass
+
+
+class ExportArtifactStore:
+    """
+    导出产物存储（EXPORT_STORAGE_DIR，API 与 reports Worker 共享）
+
+    路径：{root}/{asin}/reviews_{asin}_v{数据版本}.{xlsx|csv}
+    - 先写同目录临时文件，完成后 os.replace 原子发布，读方不会看到写了一半的文件
+    - 数据版本只增不减，文件名即可判断是否过期；每个产品每种格式只保留最近几个版本
+      （刚被替换的旧版本可能还在被下载，不立即删除）
+    """
+
+    def __init__(self, root: Optional[str] = None, keep_versions: Optional[int] = None):
+        self.root = root or settings.EXPORT_STORAGE_DIR
+        self.keep_versions = keep_versions or settings.EXPORT_KEEP_VERSIONS
+
+    def supports(self, asin: str) -> bool:
+        """ASIN 能否安全地用作目录名"""
+        return bool(ARTIFACT_SAFE_ASIN_RE.match(asin))
+
+    def _dir(self, asin: str) -> str:
+        return os.path.join(self.root, asin)
+
+    def path(self, asin: str, version: int, fmt: str) -> str:
+        return os.path.join(self._dir(asin), f"reviews_{asin}_v{version}.{fmt}")
+
+    def _pattern(self, asin: str, fmt: str) -> "re.Pattern":
+        return re.compile(rf"^reviews_{re.escape(asin)}_v(\d+)\.{fmt}$")
+
+    def find(self, asin: str, version: int, fmt: str) -> Optional[str]:
+        """已渲染的产物路径（不存在返回 None）"""
+        if not self.supports(asin):
+            return None
+        path = self.path(asin, version, fmt)
+        return path if os.path.isfile(path) else None
+
+    def latest(self, asin: str, fmt: str) -> Optional[Tuple[int, str]]:
+        """最近一次发布的产物 (数据版本, 路径)，没有返回 None"""
+        if not self.supports(asin):
+            return None
+        try:
+            names = os.listdir(self._dir(asin))
+        except OSError:
+            return None
+        pattern = self._pattern(asin, fmt)
+        versions = [int(m.group(1)) for m in map(pattern.match, names) if m]
+        if not versions:
+            return None
+        version = max(versions)
+        return version, self.path(asin, version, fmt)
+
+    def new_temp(self, asin: str, fmt: str) -> str:
+        """在产品目录下创建渲染用临时文件"""
+        directory = self._dir(asin)
+        os.makedirs(directory, exist_ok=True)
+        fd, path = tempfile.mkstemp(prefix=ARTIFACT_TEMP_PREFIX, suffix=f".{fmt}", dir=directory)
+        os.close(fd)
+        return path
+
+    def publish(self, temp_path: str, asin: str, version: int, fmt: str) -> str:
+        """临时文件原子替换为正式产物，并清理旧版本"""
+        path = self.path(asin, version, fmt)
+        os.replace(temp_path, path)
+        self._prune(asin, fmt)
+        logger.info(f"导出产物已发布: {path} ({os.path.getsize(path)} bytes)")
+        return path
+
+    def _prune(self, asin: str, fmt: str) -> None:
+        """只保留最近 keep_versions 个版本；顺带清理崩溃残留的临时文件"""
+        pattern = self._pattern(asin, fmt)
+        directory = self._dir(asin)
+        versions = []
+        now = time.time()
+        for name in os.listdir(directory):
+            path = os.path.join(directory, name)
+            match = pattern.match(name)
+            if match:
+                versions.append((int(match.group(1)), path))
+            elif name.startswith(ARTIFACT_TEMP_PREFIX):
+                try:
+                    if now - os.path.getmtime(path) > ARTIFACT_STALE_TEMP_SECONDS:
+                        _remove_quietly(path)
+                except OSError:
+                    pass
+        versions.sort(reverse=True)
+        for _, path in versions[self.keep_versions:]:
+            _remove_quietly(path)
+
+    async def tee_csv(self, chunks: AsyncIterator[bytes], temp_path: str,
+                      asin: str, version: int) -> AsyncIterator[bytes]:
+        """边发送边写入临时文件；完整发送后发布为产物，客户端中途断开则丢弃"""
+        published = False
+        try:
+            with open(temp_path, "wb") as f:
+                async for chunk in chunks:
+                    f.write(chunk)
+                    yield chunk
+            try:
+                self.publish(temp_path, asin, version, "csv")
+                published = True
+            except OSError as e:
+                logger.warning(f"导出产物发布失败: {asin} v{version} csv: {e}")
+        finally:
+            if not published:
+                _remove_quietly(temp_path)
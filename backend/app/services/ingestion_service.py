@@ -12,19 +12,72 @@ import logging
 from collections import defaultdict
 from typing import List, Dict, Tuple
 from datetime import datetime
+import io
 import json
+import uuid
 
 from sqlalchemy import select, and_, func
-from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.orm import Session
 
 from app.models.product import Product
 from app.models.review import Review, TranslationStatus
 from app.services.deduplicator import ReviewDeduplicatorSync, deduplicate_in_memory
 from app.core.redis import BatchStatusTrackerSync, get_sync_redis
+from app.db.green import is_green_psycopg2
 
 logger = logging.getLogger(__name__)
 
+# ==========================================
+# 评论批量入库（COPY 临时表）
+# ==========================================
+REVIEW_STAGE_TABLE = "review_ingest_stage"
+REVIEW_STAGE_PAGE_SIZE = 1000  # 协作模式退化为 VALUES 写入时每条语句的行数
+REVIEW_STAGE_COLUMNS = (
+    "id", "product_id", "review_id", "author", "rating",
+    "title_original", "body_original", "review_date",
+    "verified_purchase", "helpful_votes", "has_video", "has_images",
+    "image_urls", "video_url", "review_url", "variant",
+    "sentiment", "translation_status", "is_pinned", "is_hidden", "is_deleted",
+)
+REVIEW_STAGE_COLUMNS_SQL = ", ".join(REVIEW_STAGE_COLUMNS)
+
+REVIEW_STAGE_CREATE_SQL = f"""
+CREATE TEMP TABLE IF NOT EXISTS {REVIEW_STAGE_TABLE}
+(LIKE reviews INCLUDING DEFAULTS) ON COMMIT DROP
+"""
+
+REVIEW_STAGE_INSERT_SQL = f"""
+INSERT INTO reviews ({REVIEW_STAGE_COLUMNS_SQL})
+SELECT {REVIEW_STAGE_COLUMNS_SQL} FROM {REVIEW_STAGE_TABLE}
+ON CONFLICT (product_id, review_id) DO NOTHING
+RETURNING review_id
+"""
+
+
+def _copy_text(value) -> str:
+    """转为 COPY text 格式字段（\\N 表示 NULL，转义反斜杠 / 制表符 / 换行）"""
+    if value is None:
+        return "\\N"
+    if isinstance(value, bool):
+        return "t" if value else "f"
+    return (
+        str(value)
+        .replace("\\", "\\\\")
+        .replace("\t", "\\t")
+        .replace("\n", "\\n")
+        .replace("\r", "\\r")
+    )
+
+
+def _to_copy_buffer(records: List[dict]) -> io.StringIO:
+    """评论记录 → COPY FROM STDIN 的 text 格式缓冲区"""
+    buffer = io.StringIO()
+    for r in records:
+        buffer.write("\t".join(_copy_text(r[c]) for c in REVIEW_STAGE_COLUMNS))
+        buffer.write("\n")
+    buffer.seek(0)
+    return buffer
+
 
 class IngestionService:
     """
@@ -121,7 +174,7 @@ class IngestionService:
         # 清除相关用户的项目列表缓存
         for user_id in set(user_id_map.values()):
             if user_id:
-                cache.delete_pattern(f"cache:user_projects:{user_id}:*")
+                cache.invalidate_user_projects(user_id)
                 logger.info(f"[Cache] Invalidated user projects cache for user {user_id}")
         
         return results
@@ -150,7 +203,8 @@ class IngestionService:
         
         # Step 1: Redis 预过滤
         filtered_reviews, skipped_redis, new_ids = self.deduplicator.filter_new_reviews(
-            asin, all_reviews
+            asin, all_reviews,
+            verify_existing=lambda review_ids: self._existing_review_ids(asin, review_ids)
         )
         
         if not filtered_reviews:
@@ -173,12 +227,11 @@ class IngestionService:
         product = self._get_or_create_product(asin, product_info)
         
         # Step 4: 批量入库
-        inserted, skipped_db = self._bulk_insert_reviews(product.id, unique_reviews)
+        inserted_ids, skipped_db = self._bulk_insert_reviews(product.id, unique_reviews)
+        inserted = len(inserted_ids)
         
-        # Step 5: 更新 Redis Set（只标记真正入库的）
-        if inserted > 0:
-            # 获取实际入库的 review_id
-            inserted_ids = [r.get("review_id") for r in unique_reviews[:inserted] if r.get("review_id")]
+        # Step 5: 更新 Redis Set（只标记真正入库的，来自 RETURNING）
+        if inserted_ids:
             self.deduplicator.mark_as_seen(asin, inserted_ids)
         
         # [FIXED] Step 6: 创建用户项目关联
@@ -197,6 +250,14 @@ class IngestionService:
         
         return inserted, total_skipped
     
+    def _existing_review_ids(self, asin: str, review_ids: List[str]) -> List[str]:
+        """DB 中已存在的 review_id（Bloom 预过滤命中时回查，排除误判）"""
+        return self.db.execute(
+            select(Review.review_id)
+            .join(Product, Product.id == Review.product_id)
+            .where(and_(Product.asin == asin, Review.review_id.in_(review_ids)))
+        ).scalars().all()
+    
     def _get_or_create_product(self, asin: str, info: dict) -> Product:
         """获取或创建产品"""
         result = self.db.execute(
@@ -331,15 +392,18 @@ class IngestionService:
         self,
         product_id,
         reviews: List[dict]
-    ) -> Tuple[int, int]:
+    ) -> Tuple[List[str], int]:
         """
-        批量插入评论
+        批量插入评论（COPY 到临时表 → INSERT ... SELECT ... ON CONFLICT DO NOTHING RETURNING）
+        
+        RETURNING 给出真正入库的 review_id，无需预先 SELECT 猜测重复，
+        并发消费者同时写入同一产品时计数也是准确的。
         
         Returns:
-            (inserted_count, skipped_count)
+            (inserted_review_ids, skipped_count)
         """
         if not reviews:
-            return 0, 0
+            return [], 0
         
         # 准备记录
         records = []
@@ -393,10 +457,9 @@ class IngestionService:
             if variant and len(variant) > 500:
                 variant = variant[:500]
             
-            import uuid
             records.append({
-                "id": uuid.uuid4(),
-                "product_id": product_id,
+                "id": str(uuid.uuid4()),
+                "product_id": str(product_id),
                 "review_id": review_id,
                 "author": author,
                 "rating": r.get("rating", 0),
@@ -412,37 +475,41 @@ class IngestionService:
                 "review_url": review_url,
                 "variant": variant,  # [NEW] 产品变体信息
                 "sentiment": "neutral",
-                "translation_status": TranslationStatus.PENDING.value
+                "translation_status": TranslationStatus.PENDING.value,
+                "is_pinned": False,
+                "is_hidden": False,
+                "is_deleted": False
             })
         
         if not records:
-            return 0, skipped_invalid
-        
-        # 检查已存在的 review_id
-        review_ids = [r["review_id"] for r in records]
-        existing_result = self.db.execute(
-            select(Review.review_id).where(
-                and_(
-                    Review.product_id == product_id,
-                    Review.review_id.in_(review_ids)
-                )
-            )
-        )
-        existing_ids = set(existing_result.scalars().all())
-        skipped_existing = len(existing_ids)
+            return [], skipped_invalid
         
-        # 使用 ON CONFLICT DO NOTHING
-        stmt = insert(Review).values(records)
-        stmt = stmt.on_conflict_do_nothing(
-            index_elements=['product_id', 'review_id']
-        )
+        cursor = self.db.connection().connection.cursor()
+        try:
+            cursor.execute(REVIEW_STAGE_CREATE_SQL)
+            if is_green_psycopg2():
+                # gevent 协作模式下 psycopg2 不支持 COPY，退化为多行 VALUES 写入临时表
+                from psycopg2.extras import execute_values
+                execute_values(
+                    cursor,
+                    f"INSERT INTO {REVIEW_STAGE_TABLE} ({REVIEW_STAGE_COLUMNS_SQL}) VALUES %s",
+                    [tuple(r[c] for c in REVIEW_STAGE_COLUMNS) for r in records],
+                    page_size=REVIEW_STAGE_PAGE_SIZE
+                )
+            else:
+                cursor.copy_expert(
+                    f"COPY {REVIEW_STAGE_TABLE} ({REVIEW_STAGE_COLUMNS_SQL}) FROM STDIN",
+                    _to_copy_buffer(records)
+                )
+            cursor.execute(REVIEW_STAGE_INSERT_SQL)
+            inserted_ids = [row[0] for row in cursor.fetchall()]
+        finally:
+            cursor.close()
         
-        self.db.execute(stmt)
+        # 提交时临时表随事务删除（ON COMMIT DROP）
         self.db.commit()
         
-        inserted = len(records) - skipped_existing
-        
-        return inserted, skipped_invalid + skipped_existing
+        return inserted_ids, skipped_invalid + len(records) - len(inserted_ids)
     
     def _create_or_update_user_project(self, user_id: str, product_id, reviews_count: int):
         """
@@ -7,14 +7,13 @@ from typing import Dict, Any, List, Optional
 from uuid import UUID
 from sqlalchemy.orm import Session
 from sqlalchemy import and_
-from openai import OpenAI
 
 from app.models.product import Product
 from app.models.product_pivot_insight import ProductPivotInsight
 from app.models.review import Review
-from app.services.translation import translation_service
 from app.services.pivot_insight_prompts import generate_pivot_insight_prompt
 from app.core.config import settings
+from app.core.llm import get_sync_llm_client
 
 logger = logging.getLogger(__name__)
 
@@ -24,15 +23,8 @@ class PivotInsightService:
     
     def __init__(self, db: Session):
         self.db = db
-        # 使用 translation_service 的 client，如果没有则创建新的
-        if translation_service.client:
-            self.client = translation_service.client
-        else:
-            self.client = OpenAI(
-                api_key=settings.QWEN_API_KEY,
-                base_url=settings.QWEN_API_BASE,
-                timeout=120.0,
-            )
+        # 共享 LLM 连接池（与 translation_service 是同一个客户端）
+        self.client = get_sync_llm_client()
         self.model = settings.QWEN_MODEL
     
     def generate_all_insights(self, product_id: UUID) -> Dict[str, Any]:
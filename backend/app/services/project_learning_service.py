@@ -9,6 +9,7 @@ Project Learning Service - 项目级维度/标签学习与映射服务
 
 参考产品层面的科学学习方法，只是数据量做了增加。
 """
+import asyncio
 import json
 import logging
 import random
@@ -102,7 +103,8 @@ class ProjectLearningService:
         
         # 3. 学习项目级维度（复用现有方法）
         logger.info(f"🔍 开始学习项目级维度...")
-        project_dimensions = translation_service.learn_dimensions_from_raw(
+        project_dimensions = await asyncio.to_thread(
+            translation_service.learn_dimensions_from_raw,
             raw_reviews=sampled_reviews[:80],  # 限制数量
             product_title=combined_title[:200],
             bullet_points="\n".join(combined_bullets[:10])
@@ -121,7 +123,8 @@ class ProjectLearningService:
         
         # 4. 学习项目级标签（复用现有方法）
         logger.info(f"🏷️ 开始学习项目级5W标签...")
-        project_labels = translation_service.learn_context_labels_from_raw(
+        project_labels = await asyncio.to_thread(
+            translation_service.learn_context_labels_from_raw,
             raw_reviews=sampled_reviews[:80],  # 限制数量
             product_title=combined_title[:200],
             bullet_points=combined_bullets[:10]
@@ -625,7 +628,7 @@ class ProjectLearningService:
         
         输入数据量很小：只有维度名称列表
         """
-        from openai import OpenAI
+        from app.core.llm import get_sync_llm_client
         
         # 构建简洁的 Prompt
         prompt = f"""请建立项目级维度与产品级维度的映射关系。
@@ -654,20 +657,20 @@ class ProjectLearningService:
 请直接输出 JSON，不要有其他文字。确保所有字符串都用双引号包裹，JSON 格式完整。"""
 
         try:
-            client = OpenAI(
-                api_key=settings.QWEN_API_KEY,
-                base_url=settings.QWEN_API_BASE,
-                timeout=60.0
-            )
+            client = get_sync_llm_client()
+            if client is None:
+                raise RuntimeError("QWEN_API_KEY 未配置")
             
-            response = client.chat.completions.create(
+            response = await asyncio.to_thread(
+                client.chat.completions.create,
                 model=settings.QWEN_MODEL,  # 使用普通模型即可
                 messages=[
                     {"role": "system", "content": "你是一个专业的数据映射专家。请严格按照 JSON 格式输出，确保：1) 所有字符串都用双引号包裹；2) 字符串中的特殊字符（如换行符、引号）要正确转义；3) JSON 格式完整且有效；4) 不要输出任何其他文字，只输出 JSON。"},
                     {"role": "user", "content": prompt}
                 ],
                 temperature=0.1,
-                max_tokens=4000  # 增加 token 限制，避免截断
+                max_tokens=4000,  # 增加 token 限制，避免截断
+                timeout=60.0,
             )
             
             result_text = response.choices[0].message.content.strip()
@@ -722,7 +725,7 @@ class ProjectLearningService:
         
         输入数据量很小：只有标签名称列表
         """
-        from openai import OpenAI
+        from app.core.llm import get_sync_llm_client
         
         # 构建简洁的 Prompt
         prompt = f"""请建立项目级5W标签与产品级5W标签的映射关系。
@@ -751,20 +754,20 @@ class ProjectLearningService:
 请直接输出 JSON，不要有其他文字。确保所有字符串都用双引号包裹，JSON 格式完整。"""
 
         try:
-            client = OpenAI(
-                api_key=settings.QWEN_API_KEY,
-                base_url=settings.QWEN_API_BASE,
-                timeout=60.0
-            )
+            client = get_sync_llm_client()
+            if client is None:
+                raise RuntimeError("QWEN_API_KEY 未配置")
             
-            response = client.chat.completions.create(
+            response = await asyncio.to_thread(
+                client.chat.completions.create,
                 model=settings.QWEN_MODEL,  # 使用普通模型即可
                 messages=[
                     {"role": "system", "content": "你是一个专业的数据映射专家。请严格按照 JSON 格式输出，确保：1) 所有字符串都用双引号包裹；2) 字符串中的特殊字符（如换行符、引号）要正确转义；3) JSON 格式完整且有效；4) 不要输出任何其他文字，只输出 JSON。"},
                     {"role": "user", "content": prompt}
                 ],
                 temperature=0.1,
-                max_tokens=4000  # 增加 token 限制，避免截断
+                max_tokens=4000,  # 增加 token 限制，避免截断
+                timeout=60.0,
             )
             
             result_text = response.choices[0].message.content.strip()
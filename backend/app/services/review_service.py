@@ -1,13 +1,15 @@
 """
 Review Service - Database operations for reviews
 """
+import base64
+import json
 import logging
 import uuid
-from datetime import datetime
+from datetime import datetime, date
 from typing import Optional, List, Tuple
 from uuid import UUID
 
-from sqlalchemy import select, func, and_, update, exists
+from sqlalchemy import select, func, and_, update, exists, tuple_, literal, literal_column
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.orm import selectinload
@@ -19,6 +21,99 @@ from app.models.insight import ReviewInsight
 
 logger = logging.getLogger(__name__)
 
+# ==========================================
+# 游标分页（keyset）
+# ==========================================
+# 排序键 (COALESCE(review_date, -infinity) DESC, created_at DESC, id DESC)：
+# 与原来的 "review_date DESC NULLS LAST, created_at DESC" 顺序一致（id 保证唯一），
+# 且可以写成行比较，命中 ix_reviews_product_keyset 直接定位到游标位置，
+# 深页不再像 OFFSET 那样扫描并丢弃前面的所有行。
+REVIEW_SORT_DATE = func.coalesce(Review.review_date, literal_column("'-infinity'::date"))
+REVIEW_KEYSET_ORDER = (REVIEW_SORT_DATE.desc(), Review.created_at.desc(), Review.id.desc())
+
+
+def encode_review_cursor(review: Review) -> str:
+    """把一页最后一条评论的排序键编码为不透明游标"""
+    payload = [
+        review.review_date.isoformat() if review.review_date else None,
+        review.created_at.isoformat() if review.created_at else None,
+        str(review.id),
+    ]
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_review_cursor(cursor: str) -> Tuple[Optional[date], datetime, UUID]:
+    """解析游标，格式非法时抛出 ValueError"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        review_date, created_at, review_id = json.loads(raw)
+        return (
+            date.fromisoformat(review_date) if review_date else None,
+            datetime.fromisoformat(created_at),
+            UUID(review_id),
+        )
+    except (ValueError, TypeError) as e:
+        raise ValueError("无效的分页游标") from e
+
+
+def review_cursor_condition(cursor: str):
+    """排在游标之后的评论（按 REVIEW_KEYSET_ORDER）"""
+    review_date, created_at, review_id = decode_review_cursor(cursor)
+    cursor_date = func.coalesce(literal(review_date, Review.review_date.type), literal_column("'-infinity'::date"))
+    return tuple_(REVIEW_SORT_DATE, Review.created_at, Review.id) < tuple_(
+        cursor_date,
+        literal(created_at, Review.created_at.type),
+        literal(review_id, Review.id.type),
+    )
+
+
+
+# ==========================================
+# 评论统计汇总（product_review_stats）
+# ==========================================
+# 汇总行由数据库语句级触发器在写入事务内增量维护（db/migrate_product_review_stats.sql），
+# 统计 / 产品列表 / 我的项目只读这一行。下面的全量聚合与迁移回填口径一致，只用于对账和基准测试。
+REVIEW_ROLLUP_COLUMNS = (
+    "total_reviews",
+    "pending_reviews", "processing_reviews", "translated_reviews", "failed_reviews", "skipped_reviews",
+    "star_1", "star_2", "star_3", "star_4", "star_5", "rating_sum",
+    "sentiment_positive", "sentiment_neutral", "sentiment_negative",
+    "reviews_with_insights", "reviews_with_themes",
+)
+
+
+def review_rollup_query(product_id: UUID):
+    """按评论表全量计算一个产品的汇总值（列名同 REVIEW_ROLLUP_COLUMNS，只统计未逻辑删除的评论）"""
+    from app.models.theme_highlight import ReviewThemeHighlight
+    
+    count = func.count(Review.id)
+    return select(
+        count.label("total_reviews"),
+        count.filter(Review.translation_status == TranslationStatus.PENDING.value).label("pending_reviews"),
+        count.filter(Review.translation_status == TranslationStatus.PROCESSING.value).label("processing_reviews"),
+        count.filter(Review.translation_status == TranslationStatus.COMPLETED.value).label("translated_reviews"),
+        count.filter(Review.translation_status == TranslationStatus.FAILED.value).label("failed_reviews"),
+        count.filter(Review.translation_status == TranslationStatus.SKIPPED.value).label("skipped_reviews"),
+        *[count.filter(Review.rating == star).label(f"star_{star}") for star in range(1, 6)],
+        func.coalesce(func.sum(Review.rating), 0).label("rating_sum"),
+        count.filter(Review.sentiment == "positive").label("sentiment_positive"),
+        count.filter(Review.sentiment == "neutral").label("sentiment_neutral"),
+        count.filter(Review.sentiment == "negative").label("sentiment_negative"),
+        count.filter(exists().where(ReviewInsight.review_id == Review.id)).label("reviews_with_insights"),
+        count.filter(exists().where(ReviewThemeHighlight.review_id == Review.id)).label("reviews_with_themes"),
+    ).where(Review.product_id == product_id, Review.is_deleted == False)
+
+
+def rollup_translation_status(total_reviews: int, translated_reviews: int) -> TranslationStatus:
+    """产品整体翻译状态"""
+    if total_reviews == 0:
+        return TranslationStatus.PENDING
+    if translated_reviews == total_reviews:
+        return TranslationStatus.COMPLETED
+    if translated_reviews > 0:
+        return TranslationStatus.PROCESSING
+    return TranslationStatus.PENDING
 
 class ReviewService:
     """Service for managing reviews in the database."""
@@ -447,6 +542,90 @@ class ReviewService:
         )
         await self.db.flush()
     
+    def _review_list_conditions(
+        self,
+        product_id: UUID,
+        rating_filter: Optional[int] = None,
+        sentiment_filter: Optional[str] = None,
+        status_filter: Optional[str] = None
+    ) -> list:
+        """评论列表的过滤条件（排除逻辑删除，与 ix_reviews_product_keyset 的部分索引条件一致）"""
+        conditions = [
+            Review.product_id == product_id,
+            Review.is_deleted == False  # Only show non-deleted reviews
+        ]
+        if rating_filter:
+            conditions.append(Review.rating == rating_filter)
+        if sentiment_filter:
+            conditions.append(Review.sentiment == sentiment_filter)
+        if status_filter:
+            conditions.append(Review.translation_status == status_filter)
+        return conditions
+    
+    async def _get_product_id(self, asin: str) -> Optional[UUID]:
+        result = await self.db.execute(select(Product.id).where(Product.asin == asin))
+        return result.scalar_one_or_none()
+    
+    async def count_product_reviews(
+        self,
+        asin: str,
+        rating_filter: Optional[int] = None,
+        sentiment_filter: Optional[str] = None,
+        status_filter: Optional[str] = None
+    ) -> int:
+        """
+        Count non-deleted reviews for a product with optional filters.
+        
+        列表接口不再每页都执行：由调用方按产品版本号缓存。
+        """
+        product_id = await self._get_product_id(asin)
+        if not product_id:
+            return 0
+        conditions = self._review_list_conditions(product_id, rating_filter, sentiment_filter, status_filter)
+        result = await self.db.execute(select(func.count(Review.id)).where(and_(*conditions)))
+        return result.scalar() or 0
+    
+    async def get_product_reviews_page(
+        self,
+        asin: str,
+        page_size: int = 20,
+        cursor: Optional[str] = None,
+        page: int = 1,
+        rating_filter: Optional[int] = None,
+        sentiment_filter: Optional[str] = None,
+        status_filter: Optional[str] = None
+    ) -> Tuple[List[Review], Optional[str]]:
+        """
+        Get one page of reviews without counting the total.
+        
+        传入 cursor 时按游标定位（索引 seek，任意深度耗时相同），否则按 page 走 OFFSET。
+        多取一条判断是否还有下一页。
+        
+        Returns:
+            Tuple of (reviews list, next cursor or None when this is the last page)
+        """
+        product_id = await self._get_product_id(asin)
+        if not product_id:
+            return [], None
+        
+        conditions = self._review_list_conditions(product_id, rating_filter, sentiment_filter, status_filter)
+        if cursor:
+            conditions.append(review_cursor_condition(cursor))
+        
+        query = select(Review).where(and_(*conditions)).options(
+            selectinload(Review.insights),          # Eager load insights
+            selectinload(Review.theme_highlights)   # Eager load theme highlights
+        ).order_by(*REVIEW_KEYSET_ORDER).limit(page_size + 1)
+        if not cursor:
+            query = query.offset((page - 1) * page_size)
+        
+        result = await self.db.execute(query)
+        reviews = list(result.scalars().all())
+        if len(reviews) <= page_size:
+            return reviews, None
+        reviews = reviews[:page_size]
+        return reviews, encode_review_cursor(reviews[-1])
+    
     async def get_product_reviews(
         self,
         asin: str,
@@ -470,54 +649,24 @@ class ReviewService:
         Returns:
             Tuple of (reviews list, total count)
         """
-        # Get product
-        product_result = await self.db.execute(
-            select(Product).where(Product.asin == asin)
-        )
-        product = product_result.scalar_one_or_none()
-        
-        if not product:
+        product_id = await self._get_product_id(asin)
+        if not product_id:
             return [], 0
         
-        # Build query with eager loading for insights and theme_highlights
         # Filter out deleted reviews (logical delete)
-        query = select(Review).where(
-            and_(
-                Review.product_id == product.id,
-                Review.is_deleted == False  # Only show non-deleted reviews
-            )
-        ).options(
-            selectinload(Review.insights),          # Eager load insights
-            selectinload(Review.theme_highlights)   # Eager load theme highlights
-        )
-        count_query = select(func.count(Review.id)).where(
-            and_(
-                Review.product_id == product.id,
-                Review.is_deleted == False  # Only count non-deleted reviews
-            )
-        )
-        
-        # Apply filters
-        if rating_filter:
-            query = query.where(Review.rating == rating_filter)
-            count_query = count_query.where(Review.rating == rating_filter)
-        
-        if sentiment_filter:
-            query = query.where(Review.sentiment == sentiment_filter)
-            count_query = count_query.where(Review.sentiment == sentiment_filter)
-        
-        if status_filter:
-            query = query.where(Review.translation_status == status_filter)
-            count_query = count_query.where(Review.translation_status == status_filter)
+        conditions = self._review_list_conditions(product_id, rating_filter, sentiment_filter, status_filter)
         
         # Get total count
-        total_result = await self.db.execute(count_query)
+        total_result = await self.db.execute(select(func.count(Review.id)).where(and_(*conditions)))
         total = total_result.scalar()
         
-        # Apply pagination
-        offset = (page - 1) * page_size
+        # Build query with eager loading for insights and theme_highlights
         # 默认按评论日期降序排序（与前端显示顺序一致）
-        query = query.order_by(Review.review_date.desc().nullslast(), Review.created_at.desc()).offset(offset).limit(page_size)
+        offset = (page - 1) * page_size
+        query = select(Review).where(and_(*conditions)).options(
+            selectinload(Review.insights),          # Eager load insights
+            selectinload(Review.theme_highlights)   # Eager load theme highlights
+        ).order_by(*REVIEW_KEYSET_ORDER).offset(offset).limit(page_size)
         
         result = await self.db.execute(query)
         reviews = list(result.scalars().all())
@@ -528,125 +677,20 @@ class ReviewService:
         """
         Get all products with their review statistics.
         
-        [OPTIMIZED] 使用 LEFT JOIN + 条件聚合，一次查询获取所有数据
-        原来: N+1 查询 (1 + N*3 次 SQL)
-        现在: 2 次 SQL 查询（主查询 + 洞察/主题统计）
+        [OPTIMIZED] 统计读 product_review_stats 汇总行：一次 LEFT JOIN，不再聚合评论表
+        原来: 1 次 LEFT JOIN reviews + GROUP BY + 2 次洞察/主题 COUNT(DISTINCT)
+        现在: 1 次 SQL，与评论数量无关
         
         Returns:
             List of product dicts with statistics
         """
-        from sqlalchemy import case, literal, distinct
-        from sqlalchemy.orm import aliased
-        from app.models.insight import ReviewInsight
-        from app.models.theme_highlight import ReviewThemeHighlight
-        
-        # 使用 LEFT JOIN + 条件聚合，一次查询获取所有产品及其统计
-        query = (
-            select(
-                Product,
-                func.count(Review.id).label('total_reviews'),
-                func.count(
-                    case(
-                        (Review.translation_status == TranslationStatus.COMPLETED.value, Review.id),
-                        else_=literal(None)
-                    )
-                ).label('translated_reviews'),
-                func.coalesce(
-                    func.avg(
-                        case(
-                            (Review.id.isnot(None), Review.rating),
-                            else_=literal(None)
-                        )
-                    ),
-                    literal(0.0)
-                ).label('calculated_avg_rating')
-            )
-            .outerjoin(Review, Review.product_id == Product.id)
-            .group_by(Product.id)
-            .order_by(Product.updated_at.desc())
-        )
-        
-        result_rows = await self.db.execute(query)
-        rows = result_rows.all()
-        
-        # 获取所有产品的洞察和主题统计
-        product_ids = [row[0].id for row in rows]
-        
-        # 查询每个产品有洞察的评论数
-        insights_query = (
-            select(
-                Review.product_id,
-                func.count(distinct(ReviewInsight.review_id)).label('reviews_with_insights')
-            )
-            .join(ReviewInsight, ReviewInsight.review_id == Review.id)
-            .where(Review.product_id.in_(product_ids))
-            .group_by(Review.product_id)
-        )
-        insights_result = await self.db.execute(insights_query)
-        insights_map = {row[0]: row[1] for row in insights_result.all()}
-        
-        # 查询每个产品有主题的评论数
-        themes_query = (
-            select(
-                Review.product_id,
-                func.count(distinct(ReviewThemeHighlight.review_id)).label('reviews_with_themes')
-            )
-            .join(ReviewThemeHighlight, ReviewThemeHighlight.review_id == Review.id)
-            .where(Review.product_id.in_(product_ids))
-            .group_by(Review.product_id)
-        )
-        themes_result = await self.db.execute(themes_query)
-        themes_map = {row[0]: row[1] for row in themes_result.all()}
-        
-        result = []
-        for row in rows:
-            product = row[0]
-            total_reviews = row[1] or 0
-            translated_reviews = row[2] or 0
-            calculated_avg = float(row[3]) if row[3] else 0.0
-            
-            # 获取洞察和主题统计
-            reviews_with_insights = insights_map.get(product.id, 0)
-            reviews_with_themes = themes_map.get(product.id, 0)
-            
-            # Use real average rating from product page, fallback to calculated
-            avg_rating = float(product.average_rating) if product.average_rating else calculated_avg
-            
-            # Determine overall status
-            if total_reviews == 0:
-                status = TranslationStatus.PENDING
-            elif translated_reviews == total_reviews:
-                status = TranslationStatus.COMPLETED
-            elif translated_reviews > 0:
-                status = TranslationStatus.PROCESSING
-            else:
-                status = TranslationStatus.PENDING
-            
-            result.append({
-                "id": product.id,
-                "asin": product.asin,
-                "title": product.title,
-                "image_url": product.image_url,
-                "marketplace": product.marketplace,
-                "total_reviews": total_reviews,
-                "translated_reviews": translated_reviews,
-                "reviews_with_insights": reviews_with_insights,
-                "reviews_with_themes": reviews_with_themes,
-                "average_rating": round(avg_rating, 2),
-                "translation_status": status,
-                "created_at": product.created_at,
-                "updated_at": product.updated_at
-            })
-        
-        return result
+        return await self._list_products_with_stats()
     
     async def get_products_by_ids(self, product_ids: List) -> List[dict]:
         """
         Get products by their IDs with review statistics.
         
-        [OPTIMIZED] 使用 LEFT JOIN + 条件聚合，一次查询获取所有数据
-        原来: N+1 查询 (1 + N*3 次 SQL)
-        现在: 3 次 SQL 查询（主查询 + 洞察统计 + 主题统计）
+        [OPTIMIZED] 同 get_all_products，统计来自 product_review_stats 汇总行
         
         Args:
             product_ids: List of product UUIDs
@@ -656,91 +700,31 @@ class ReviewService:
         """
         if not product_ids:
             return []
+        return await self._list_products_with_stats(product_ids)
+    
+    async def _list_products_with_stats(self, product_ids: Optional[List] = None) -> List[dict]:
+        """产品 LEFT JOIN 统计汇总（没有汇总行的产品即没有评论）"""
+        from app.models.product_review_stats import ProductReviewStats
         
-        from sqlalchemy import case, literal, distinct
-        from app.models.insight import ReviewInsight
-        from app.models.theme_highlight import ReviewThemeHighlight
-        
-        # 使用 LEFT JOIN + 条件聚合，一次查询获取所有产品及其统计
         query = (
-            select(
-                Product,
-                func.count(Review.id).label('total_reviews'),
-                func.count(
-                    case(
-                        (Review.translation_status == TranslationStatus.COMPLETED.value, Review.id),
-                        else_=literal(None)
-                    )
-                ).label('translated_reviews'),
-                func.coalesce(
-                    func.avg(
-                        case(
-                            (Review.id.isnot(None), Review.rating),
-                            else_=literal(None)
-                        )
-                    ),
-                    literal(0.0)
-                ).label('calculated_avg_rating')
-            )
-            .where(Product.id.in_(product_ids))
-            .outerjoin(Review, Review.product_id == Product.id)
-            .group_by(Product.id)
+            select(Product, ProductReviewStats)
+            .outerjoin(ProductReviewStats, ProductReviewStats.product_id == Product.id)
             .order_by(Product.updated_at.desc())
         )
+        if product_ids is not None:
+            query = query.where(Product.id.in_(product_ids))
         
-        result_rows = await self.db.execute(query)
-        rows = result_rows.all()
-        
-        # 查询每个产品有洞察的评论数
-        insights_query = (
-            select(
-                Review.product_id,
-                func.count(distinct(ReviewInsight.review_id)).label('reviews_with_insights')
-            )
-            .join(ReviewInsight, ReviewInsight.review_id == Review.id)
-            .where(Review.product_id.in_(product_ids))
-            .group_by(Review.product_id)
-        )
-        insights_result = await self.db.execute(insights_query)
-        insights_map = {row[0]: row[1] for row in insights_result.all()}
-        
-        # 查询每个产品有主题的评论数
-        themes_query = (
-            select(
-                Review.product_id,
-                func.count(distinct(ReviewThemeHighlight.review_id)).label('reviews_with_themes')
-            )
-            .join(ReviewThemeHighlight, ReviewThemeHighlight.review_id == Review.id)
-            .where(Review.product_id.in_(product_ids))
-            .group_by(Review.product_id)
-        )
-        themes_result = await self.db.execute(themes_query)
-        themes_map = {row[0]: row[1] for row in themes_result.all()}
+        rows = (await self.db.execute(query)).all()
         
         result = []
-        for row in rows:
-            product = row[0]
-            total_reviews = row[1] or 0
-            translated_reviews = row[2] or 0
-            calculated_avg = float(row[3]) if row[3] else 0.0
-            
-            # 获取洞察和主题统计
-            reviews_with_insights = insights_map.get(product.id, 0)
-            reviews_with_themes = themes_map.get(product.id, 0)
+        for product, stats in rows:
+            total_reviews = stats.total_reviews if stats else 0
+            translated_reviews = stats.translated_reviews if stats else 0
+            calculated_avg = stats.calculated_avg_rating if stats else 0.0
             
             # Use real average rating from product page, fallback to calculated
             avg_rating = float(product.average_rating) if product.average_rating else calculated_avg
             
-            # Determine overall status
-            if total_reviews == 0:
-                status = TranslationStatus.PENDING
-            elif translated_reviews == total_reviews:
-                status = TranslationStatus.COMPLETED
-            elif translated_reviews > 0:
-                status = TranslationStatus.PROCESSING
-            else:
-                status = TranslationStatus.PENDING
-            
             result.append({
                 "id": product.id,
                 "asin": product.asin,
@@ -749,10 +733,10 @@ class ReviewService:
                 "marketplace": product.marketplace,
                 "total_reviews": total_reviews,
                 "translated_reviews": translated_reviews,
-                "reviews_with_insights": reviews_with_insights,
-                "reviews_with_themes": reviews_with_themes,
+                "reviews_with_insights": stats.reviews_with_insights if stats else 0,
+                "reviews_with_themes": stats.reviews_with_themes if stats else 0,
                 "average_rating": round(avg_rating, 2),
-                "translation_status": status,
+                "translation_status": rollup_translation_status(total_reviews, translated_reviews),
                 "created_at": product.created_at,
                 "updated_at": product.updated_at
             })
@@ -763,9 +747,9 @@ class ReviewService:
         """
         Get detailed statistics for a product.
         
-        [OPTIMIZED] 使用条件聚合，将 14+ 次查询合并为 2 次查询
-        原来: 1(product) + 5(星级) + 3(情感) + 4(统计) + 2(子查询) = 15 次 SQL
-        现在: 1(product) + 1(聚合统计) + 1(子查询统计) = 3 次 SQL
+        [OPTIMIZED] 产品与 product_review_stats 汇总行一次 LEFT JOIN 读出
+        原来: 1(product) + 1(条件聚合) + 1(EXISTS 子查询) = 3 次 SQL，随评论数线性变慢
+        现在: 1 次主键查询，与评论数量无关
         
         Args:
             asin: Product ASIN
@@ -773,115 +757,36 @@ class ReviewService:
         Returns:
             Dict with product info and statistics
         """
-        from sqlalchemy import case, literal
-        from app.models.theme_highlight import ReviewThemeHighlight
+        from app.models.product_review_stats import ProductReviewStats
         
-        # 查询 1: 获取产品
-        product_result = await self.db.execute(
-            select(Product).where(Product.asin == asin)
+        result = await self.db.execute(
+            select(Product, ProductReviewStats)
+            .outerjoin(ProductReviewStats, ProductReviewStats.product_id == Product.id)
+            .where(Product.asin == asin)
         )
-        product = product_result.scalar_one_or_none()
+        row = result.one_or_none()
         
-        if not product:
+        if not row:
             return None
+        product, stats = row
+        # 没有汇总行 = 还没有评论
+        stats = stats or ProductReviewStats(**{column: 0 for column in REVIEW_ROLLUP_COLUMNS})
         
-        # 查询 2: 使用条件聚合一次获取所有基础统计
-        # 包括：星级分布(5个)、情感分布(3个)、总数、翻译数、平均分
-        # 🚀 优化：添加 skipped 和 failed 统计，避免API层额外查询
-        stats_query = select(
-            # Total reviews (exclude deleted)
-            func.count(case((Review.is_deleted == False, Review.id), else_=literal(None))).label('total_reviews'),
-            # Translated reviews
-            func.count(case(
-                (and_(Review.is_deleted == False, Review.translation_status == TranslationStatus.COMPLETED.value), Review.id),
-                else_=literal(None)
-            )).label('translated_reviews'),
-            # 🚀 Skipped reviews (不需要翻译的评论)
-            func.count(case(
-                (and_(Review.is_deleted == False, Review.translation_status == TranslationStatus.SKIPPED.value), Review.id),
-                else_=literal(None)
-            )).label('skipped_reviews'),
-            # 🚀 Failed reviews (翻译失败的评论)
-            func.count(case(
-                (and_(Review.is_deleted == False, Review.translation_status == TranslationStatus.FAILED.value), Review.id),
-                else_=literal(None)
-            )).label('failed_reviews'),
-            # Star ratings distribution
-            func.count(case((and_(Review.is_deleted == False, Review.rating == 1), Review.id), else_=literal(None))).label('star_1'),
-            func.count(case((and_(Review.is_deleted == False, Review.rating == 2), Review.id), else_=literal(None))).label('star_2'),
-            func.count(case((and_(Review.is_deleted == False, Review.rating == 3), Review.id), else_=literal(None))).label('star_3'),
-            func.count(case((and_(Review.is_deleted == False, Review.rating == 4), Review.id), else_=literal(None))).label('star_4'),
-            func.count(case((and_(Review.is_deleted == False, Review.rating == 5), Review.id), else_=literal(None))).label('star_5'),
-            # Sentiment distribution
-            func.count(case((and_(Review.is_deleted == False, Review.sentiment == 'positive'), Review.id), else_=literal(None))).label('positive'),
-            func.count(case((and_(Review.is_deleted == False, Review.sentiment == 'neutral'), Review.id), else_=literal(None))).label('neutral'),
-            func.count(case((and_(Review.is_deleted == False, Review.sentiment == 'negative'), Review.id), else_=literal(None))).label('negative'),
-            # Calculated average rating
-            func.avg(case((Review.is_deleted == False, Review.rating), else_=literal(None))).label('calculated_avg')
-        ).where(Review.product_id == product.id)
-        
-        stats_result = await self.db.execute(stats_query)
-        stats_row = stats_result.one()
-        
-        total_reviews = stats_row.total_reviews or 0
-        translated_reviews = stats_row.translated_reviews or 0
-        # 🚀 新增：skipped 和 failed 统计
-        skipped_reviews = stats_row.skipped_reviews or 0
-        failed_reviews = stats_row.failed_reviews or 0
-        
-        rating_dist = {
-            "star_1": stats_row.star_1 or 0,
-            "star_2": stats_row.star_2 or 0,
-            "star_3": stats_row.star_3 or 0,
-            "star_4": stats_row.star_4 or 0,
-            "star_5": stats_row.star_5 or 0,
-        }
+        total_reviews = stats.total_reviews
+        translated_reviews = stats.translated_reviews
+        
+        rating_dist = {f"star_{star}": getattr(stats, f"star_{star}") for star in range(1, 6)}
         
         sentiment_dist = {
-            "positive": stats_row.positive or 0,
-            "neutral": stats_row.neutral or 0,
-            "negative": stats_row.negative or 0,
+            "positive": stats.sentiment_positive,
+            "neutral": stats.sentiment_neutral,
+            "negative": stats.sentiment_negative,
         }
         
-        calculated_avg = float(stats_row.calculated_avg) if stats_row.calculated_avg else 0.0
-        
-        # 查询 3: 使用子查询统计 insights 和 themes（这两个需要 exists 子查询）
-        # 合并为一次查询
-        subquery_stats = select(
-            func.count(case(
-                (and_(
-                    Review.is_deleted == False,
-                    exists(select(1).where(ReviewInsight.review_id == Review.id))
-                ), Review.id),
-                else_=literal(None)
-            )).label('reviews_with_insights'),
-            func.count(case(
-                (and_(
-                    Review.is_deleted == False,
-                    exists(select(1).where(ReviewThemeHighlight.review_id == Review.id))
-                ), Review.id),
-                else_=literal(None)
-            )).label('reviews_with_themes')
-        ).where(Review.product_id == product.id)
-        
-        subquery_result = await self.db.execute(subquery_stats)
-        subquery_row = subquery_result.one()
-        
-        reviews_with_insights = subquery_row.reviews_with_insights or 0
-        reviews_with_themes = subquery_row.reviews_with_themes or 0
-        
         # Use real average rating from product page, fallback to calculated
-        avg_rating = float(product.average_rating) if product.average_rating else calculated_avg
-        
-        # Determine overall status
-        if total_reviews == 0:
-            status = TranslationStatus.PENDING
-        elif translated_reviews == total_reviews:
-            status = TranslationStatus.COMPLETED
-        elif translated_reviews > 0:
-            status = TranslationStatus.PROCESSING
-        else:
-            status = TranslationStatus.PENDING
+        avg_rating = float(product.average_rating) if product.average_rating else stats.calculated_avg_rating
+        
+        status = rollup_translation_status(total_reviews, translated_reviews)
         
         # Parse bullet_points - handle PostgreSQL text[] array, JSON string, and PostgreSQL array format
         import json
@@ -941,10 +846,10 @@ class ReviewService:
                 "total_reviews": total_reviews,
                 "translated_reviews": translated_reviews,
                 # 🚀 新增：skipped 和 failed 统计，避免API层额外查询
-                "skipped_reviews": skipped_reviews,
-                "failed_reviews": failed_reviews,
-                "reviews_with_insights": reviews_with_insights,
-                "reviews_with_themes": reviews_with_themes,
+                "skipped_reviews": stats.skipped_reviews,
+                "failed_reviews": stats.failed_reviews,
+                "reviews_with_insights": stats.reviews_with_insights,
+                "reviews_with_themes": stats.reviews_with_themes,
                 "average_rating": round(float(avg_rating), 2),
                 "translation_status": status,
                 "created_at": product.created_at,
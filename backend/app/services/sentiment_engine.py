@@ -0,0 +1,262 @@
+"""
+本地情感分类引擎 (Local Sentiment Engine)
+
+在进程内批量判断评论情感，不产生网络 I/O，替代逐条调用 LLM 的 analyze_sentiment。
+
+打分模型：
+1. 星级先验：1★ → -1.0 ... 5★ → +1.0
+2. 词典打分：电商评论情感词典 + 否定词翻转 + 程度副词加权 + "but" 转折加权
+3. NumPy 向量化聚合：整批评论的 token 分数一次 bincount 汇总
+
+只有低置信度的评论（分数落在阈值附近、星级与文本矛盾、3 星评论）才交给 LLM 复核。
+"""
+import logging
+import re
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+# ==========================================
+# 情感词典（英文原文，权重范围 [-3, 3]）
+# ==========================================
+POSITIVE_WORDS = {
+    "love": 3.0, "loved": 3.0, "loves": 3.0, "excellent": 3.0, "amazing": 3.0,
+    "awesome": 3.0, "perfect": 3.0, "perfectly": 2.5, "fantastic": 3.0, "outstanding": 3.0,
+    "best": 2.5, "wonderful": 3.0, "great": 2.5, "superb": 3.0, "flawless": 3.0,
+    "good": 1.5, "nice": 1.5, "happy": 2.0, "pleased": 2.0, "satisfied": 2.0,
+    "recommend": 2.0, "recommended": 2.0, "sturdy": 1.5, "durable": 1.5, "comfortable": 1.5,
+    "easy": 1.2, "beautiful": 2.0, "cute": 1.5, "works": 1.0, "worked": 0.8,
+    "worth": 1.5, "quality": 0.8, "reliable": 1.5, "solid": 1.2, "impressed": 2.0,
+    "glad": 1.5, "convenient": 1.2, "useful": 1.2, "helpful": 1.2, "fast": 0.8,
+    "quick": 0.8, "bright": 0.8, "clear": 0.8, "loud": 0.5, "accurate": 1.2,
+    "favorite": 2.0, "exactly": 1.0, "thanks": 1.2, "thank": 1.2, "bargain": 1.5,
+    "value": 1.0, "fun": 1.5, "enjoy": 2.0, "enjoyed": 2.0, "gorgeous": 2.5,
+    "incredible": 2.5, "lifesaver": 3.0, "exceeded": 2.0, "fine": 0.8, "well": 0.8,
+}
+
+NEGATIVE_WORDS = {
+    "terrible": -3.0, "horrible": -3.0, "awful": -3.0, "worst": -3.0, "garbage": -3.0,
+    "junk": -3.0, "trash": -3.0, "useless": -3.0, "defective": -2.5, "broken": -2.5,
+    "broke": -2.5, "bad": -2.0, "poor": -2.0, "poorly": -2.0, "cheap": -1.2,
+    "cheaply": -1.5, "flimsy": -2.0, "disappointed": -2.5, "disappointing": -2.5, "disappointment": -2.5,
+    "return": -1.5, "returned": -2.0, "returning": -2.0, "refund": -2.0, "waste": -2.5,
+    "wasted": -2.5, "stopped": -1.5, "fails": -2.0, "failed": -2.0, "fail": -2.0,
+    "problem": -1.5, "problems": -1.5, "issue": -1.2, "issues": -1.2, "hate": -3.0,
+    "hated": -3.0, "unhappy": -2.0, "scam": -3.0, "fake": -2.5, "leak": -1.5,
+    "leaks": -1.5, "leaking": -1.5, "noisy": -1.2, "hard": -0.8, "difficult": -1.2,
+    "annoying": -1.8, "uncomfortable": -1.8, "wrong": -1.5, "missing": -1.5, "damaged": -2.5,
+    "dead": -2.0, "doa": -3.0, "lemon": -2.5, "overpriced": -2.0, "ripped": -2.0,
+    "cracked": -2.0, "smell": -1.0, "smells": -1.2, "worse": -2.0,
+    "unfortunately": -1.5, "meh": -1.0, "mediocre": -1.5, "regret": -2.5, "avoid": -2.5,
+}
+
+LEXICON = {**POSITIVE_WORDS, **NEGATIVE_WORDS}
+
+NEGATORS = {
+    "not", "no", "never", "dont", "don't", "doesnt", "doesn't", "didnt", "didn't",
+    "isnt", "isn't", "wasnt", "wasn't", "wont", "won't", "cant", "can't", "cannot",
+    "couldnt", "couldn't", "wouldnt", "wouldn't", "shouldnt", "shouldn't", "arent",
+    "aren't", "werent", "weren't", "nothing", "hardly", "barely", "without", "nor",
+}
+
+INTENSIFIERS = {
+    "very": 1.4, "really": 1.4, "extremely": 1.6, "so": 1.3, "super": 1.5,
+    "absolutely": 1.6, "totally": 1.5, "highly": 1.5, "completely": 1.5, "incredibly": 1.6,
+}
+
+# 星级先验
+RATING_PRIOR = {1: -1.0, 2: -0.6, 3: 0.0, 4: 0.6, 5: 1.0}
+
+TOKEN_PATTERN = re.compile(r"[a-z]+(?:'[a-z]+)?|[.!?;]")
+
+
+@dataclass
+class SentimentPrediction:
+    """单条评论的本地情感判断结果"""
+    label: str          # positive / neutral / negative
+    score: float        # 综合得分，范围约 [-1, 1]
+    confidence: float   # 距最近判定阈值的距离，越大越确定
+    needs_llm: bool     # 是否需要交给 LLM 复核
+
+
+class LocalSentimentEngine:
+    """
+    本地情感分类器（星级先验 + 词典 + 否定处理，NumPy 向量化打分）
+
+    阈值与权重均为类属性，可按业务数据调优。
+    """
+
+    # 综合得分权重（星级 vs 文本）
+    RATING_WEIGHT = 0.6
+    TEXT_WEIGHT = 0.4
+
+    # 标签阈值
+    POSITIVE_THRESHOLD = 0.3
+    NEGATIVE_THRESHOLD = -0.3
+
+    # 低置信度判定
+    MIN_CONFIDENCE = 0.12            # 距阈值小于该值 → 交给 LLM
+    CONFLICT_TEXT_SCORE = 0.5        # 星级与文本方向相反且文本分数超过该值 → 交给 LLM
+    AMBIGUOUS_RATINGS = {3}          # 中间星级一律复核
+
+    # 词典分数归一化参数（VADER 风格 x / sqrt(x^2 + alpha)）
+    NORMALIZE_ALPHA = 15.0
+    NEGATION_SCOPE = 3               # 否定词影响后续 N 个 token
+    NEGATION_FACTOR = -0.75
+    BUT_BEFORE_FACTOR = 0.5          # "but" 之前的分数减弱
+    BUT_AFTER_FACTOR = 1.5           # "but" 之后的分数加强
+
+    def _tokenize_scores(self, text: str) -> List[float]:
+        """将单条文本转换为逐 token 的情感分数（已应用否定/程度/转折规则）"""
+        tokens = TOKEN_PATTERN.findall((text or "").lower())
+        scores: List[float] = []
+        negation_left = 0
+        boost = 1.0
+        but_index = None
+
+        for token in tokens:
+            if token in ".!?;":
+                negation_left = 0
+                boost = 1.0
+                continue
+            if token == "but":
+                but_index = len(scores)
+                negation_left = 0
+                continue
+            if token in NEGATORS:
+                negation_left = self.NEGATION_SCOPE
+                continue
+            if token in INTENSIFIERS:
+                boost = INTENSIFIERS[token]
+                continue
+
+            weight = LEXICON.get(token)
+            if weight is not None:
+                value = weight * boost
+                if negation_left > 0:
+                    value *= self.NEGATION_FACTOR
+                scores.append(value)
+                boost = 1.0
+            if negation_left > 0:
+                negation_left -= 1
+
+        if but_index is not None:
+            for i in range(len(scores)):
+                scores[i] *= self.BUT_BEFORE_FACTOR if i < but_index else self.BUT_AFTER_FACTOR
+
+        return scores
+
+    def classify_batch(self, items: List[dict]) -> List[SentimentPrediction]:
+        """
+        批量判断情感
+
+        Args:
+            items: [{"text": "英文原文", "rating": 5}, ...]（rating 可缺省）
+
+        Returns:
+            与输入顺序一致的 SentimentPrediction 列表
+        """
+        n = len(items)
+        if n == 0:
+            return []
+
+        # 1. 逐条分词打分，展开成扁平数组（唯一的 Python 循环）
+        review_index: List[int] = []
+        token_scores: List[float] = []
+        for i, item in enumerate(items):
+            scores = self._tokenize_scores(item.get("text") or "")
+            review_index.extend([i] * len(scores))
+            token_scores.extend(scores)
+
+        # 2. 向量化聚合 + 归一化
+        raw = np.bincount(
+            np.asarray(review_index, dtype=np.int64),
+            weights=np.asarray(token_scores, dtype=np.float64),
+            minlength=n
+        ) if token_scores else np.zeros(n)
+        text_score = raw / np.sqrt(raw * raw + self.NORMALIZE_ALPHA)
+
+        ratings = np.array(
+            [RATING_PRIOR.get(item.get("rating"), np.nan) for item in items],
+            dtype=np.float64
+        )
+        has_rating = ~np.isnan(ratings)
+        combined = np.where(
+            has_rating,
+            self.RATING_WEIGHT * np.nan_to_num(ratings) + self.TEXT_WEIGHT * text_score,
+            text_score
+        )
+
+        # 3. 标签与置信度
+        labels = np.where(
+            combined >= self.POSITIVE_THRESHOLD, "positive",
+            np.where(combined <= self.NEGATIVE_THRESHOLD, "negative", "neutral")
+        )
+        confidence = np.minimum(
+            np.abs(combined - self.POSITIVE_THRESHOLD),
+            np.abs(combined - self.NEGATIVE_THRESHOLD)
+        )
+        conflict = has_rating & (
+            ((ratings > 0) & (text_score <= -self.CONFLICT_TEXT_SCORE)) |
+            ((ratings < 0) & (text_score >= self.CONFLICT_TEXT_SCORE))
+        )
+        ambiguous_rating = np.array(
+            [item.get("rating") in self.AMBIGUOUS_RATINGS for item in items],
+            dtype=bool
+        )
+        needs_llm = (confidence < self.MIN_CONFIDENCE) | conflict | ambiguous_rating
+
+        return [
+            SentimentPrediction(
+                label=str(labels[i]),
+                score=float(combined[i]),
+                confidence=float(confidence[i]),
+                needs_llm=bool(needs_llm[i])
+            )
+            for i in range(n)
+        ]
+
+    def classify(self, text: str, rating: Optional[int] = None) -> SentimentPrediction:
+        """判断单条评论情感"""
+        return self.classify_batch([{"text": text, "rating": rating}])[0]
+
+    def resolve_batch(
+        self,
+        items: List[dict],
+        llm_fallback: Optional[Callable[[str], str]] = None
+    ) -> Dict[str, str]:
+        """
+        批量判断情感，低置信度条目交给 LLM 复核
+
+        Args:
+            items: [{"id": "xxx", "text": "英文原文", "rating": 5}, ...]
+            llm_fallback: 单条 LLM 判定函数，输入原文返回标签字符串；为 None 时直接使用本地标签
+
+        Returns:
+            {id: "positive|neutral|negative"}
+        """
+        predictions = self.classify_batch(items)
+        result = {}
+        llm_calls = 0
+
+        for item, prediction in zip(items, predictions):
+            label = prediction.label
+            if prediction.needs_llm and llm_fallback and (item.get("text") or "").strip():
+                try:
+                    label = llm_fallback(item["text"])
+                    llm_calls += 1
+                except Exception as e:
+                    logger.warning(f"[本地情感] LLM 复核失败，使用本地结果: {e}")
+            result[str(item.get("id"))] = label
+
+        if items:
+            logger.debug(f"[本地情感] 批量判断 {len(items)} 条，LLM 复核 {llm_calls} 条")
+        return result
+
+
+# Singleton instance
+sentiment_engine = LocalSentimentEngine()
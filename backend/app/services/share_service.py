@@ -8,6 +8,7 @@
 性能优化：
 - Redis 缓存：分享数据缓存 5 分钟
 - 分页加载：评论列表延迟加载，支持分页
+- 元信息缓存：各分享页接口共用，开启 L1 时热门链接直接从进程内存返回
 """
 import json
 import logging
@@ -19,6 +20,7 @@ from sqlalchemy import select, update, and_, func
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
+from app.db.session import async_session_maker
 from app.models.share_link import ShareLink, ShareResourceType
 
 # ==========================================
@@ -26,7 +28,9 @@ from app.models.share_link import ShareLink, ShareResourceType
 # ==========================================
 CACHE_PREFIX_SHARE = "cache:share:"
 CACHE_TTL_SHARE_DATA = 300  # 分享数据缓存 5 分钟
+CACHE_STALE_SHARE_DATA = 600  # 过期后继续返回旧数据的时间（后台刷新期间）
 CACHE_TTL_SHARE_REVIEWS = 300  # 分页评论缓存 5 分钟
+CACHE_TTL_SHARE_META = 60  # 分享元信息缓存 1 分钟（view_count 允许滞后；撤销/删除时主动失效）
 from app.models.product import Product
 from app.models.report import ProductReport
 from app.models.analysis import AnalysisProject
@@ -36,6 +40,12 @@ from app.models.keyword_collection import KeywordCollection
 from app.models.collection_product import CollectionProduct
 from app.models.insight import ReviewInsight
 from app.models.theme_highlight import ReviewThemeHighlight
+from app.services.review_service import (
+    REVIEW_KEYSET_ORDER,
+    encode_review_cursor,
+    decode_review_cursor,
+    review_cursor_condition,
+)
 from app.models.product_dimension import ProductDimension
 from app.models.product_context_label import ProductContextLabel
 
@@ -299,60 +309,44 @@ class ShareService:
             share_link.view_count += 1
             await self.db.commit()
         
-        # 尝试从缓存获取数据
-        cache_key = f"{CACHE_PREFIX_SHARE}data:{token}"
-        cached_data = await self._get_from_cache(cache_key)
-        if cached_data:
-            logger.debug(f"分享数据命中缓存: {token}")
-            # 更新 view_count（缓存中的可能过时）
-            cached_data["view_count"] = share_link.view_count
-            return cached_data
-        
         # 根据资源类型获取数据
         resource_type = ShareResourceType(share_link.resource_type)
-        data = await self._get_resource_data(resource_type, share_link.resource_id, share_link.asin)
-        
+        resource_id, asin = share_link.resource_id, share_link.asin
         result = {
             "resource_type": resource_type.value,
             "title": share_link.title,
             "created_at": share_link.created_at.isoformat() if share_link.created_at else None,
-            "view_count": share_link.view_count,
-            "data": data
         }
         
-        # 写入缓存
-        await self._set_to_cache(cache_key, result, CACHE_TTL_SHARE_DATA)
-        logger.info(f"分享数据写入缓存: {token}")
+        async def load_resource_data() -> Dict[str, Any]:
+            # 可能在请求结束后作为后台刷新运行，使用独立会话
+            async with async_session_maker() as session:
+                data = await ShareService(session)._get_resource_data(resource_type, resource_id, asin)
+            logger.info(f"分享数据写入缓存: {token}")
+            return {**result, "data": data}
+        
+        # 🛡️ 单飞 + stale-while-revalidate：热门分享链接过期时只有一个请求重算，
+        # 其余请求（含过期后的请求）直接拿到旧数据
+        from app.core.cache import get_cache_service
+        cache = await get_cache_service()
+        cached_data = await cache.get_or_compute(
+            f"{CACHE_PREFIX_SHARE}data:{token}",
+            load_resource_data,
+            ttl=CACHE_TTL_SHARE_DATA + CACHE_STALE_SHARE_DATA,
+            soft_ttl=CACHE_TTL_SHARE_DATA
+        )
         
-        return result
-    
-    async def _get_from_cache(self, key: str) -> Optional[Dict[str, Any]]:
-        """从 Redis 获取缓存数据"""
-        try:
-            from app.core.cache import get_cache_service
-            cache = await get_cache_service()
-            return await cache.get(key)
-        except Exception as e:
-            logger.warning(f"获取缓存失败 {key}: {e}")
-            return None
-    
-    async def _set_to_cache(self, key: str, value: Dict[str, Any], ttl: int) -> bool:
-        """写入 Redis 缓存"""
-        try:
-            from app.core.cache import get_cache_service
-            cache = await get_cache_service()
-            return await cache.set(key, value, ttl)
-        except Exception as e:
-            logger.warning(f"写入缓存失败 {key}: {e}")
-            return False
+        # 更新 view_count（缓存中的可能过时）
+        return {**cached_data, "view_count": share_link.view_count}
     
     async def invalidate_share_cache(self, token: str) -> bool:
         """使分享数据缓存失效"""
         try:
-            from app.core.cache import get_cache_service
+            from app.core.cache import get_cache_service, NS_SHARE
             cache = await get_cache_service()
             await cache.delete(f"{CACHE_PREFIX_SHARE}data:{token}")
-            await cache.delete_pattern(f"{CACHE_PREFIX_SHARE}reviews:{token}:*")
+            await cache.delete(f"{CACHE_PREFIX_SHARE}meta:{token}")
+            await cache.bump_version(NS_SHARE, token)  # 分页评论缓存整体失效
             logger.info(f"已清除分享缓存: {token}")
             return True
         except Exception as e:
@@ -381,7 +375,6 @@ class ShareService:
     
     async def _get_review_reader_data(self, asin: str) -> Dict[str, Any]:
         """获取评论详情页数据（包含完整洞察和主题信息）"""
-        import json
         from collections import defaultdict
         
         # 获取产品信息
@@ -1046,6 +1039,7 @@ class ShareService:
         
         share_link.is_active = False
         await self.db.commit()
+        await self.invalidate_share_cache(token)
         
         logger.info(f"撤销分享链接: token={token}, user={user_id}")
         return True
@@ -1071,6 +1065,7 @@ class ShareService:
         
         await self.db.delete(share_link)
         await self.db.commit()
+        await self.invalidate_share_cache(token)
         
         logger.info(f"删除分享链接: token={token}, user={user_id}")
         return True
@@ -1089,23 +1084,40 @@ class ShareService:
         Returns:
             分享链接的基本信息
         """
-        share_link = await self.get_share_link_by_token(token)
+        async def load_meta() -> Optional[Dict[str, Any]]:
+            share_link = await self.get_share_link_by_token(token)
+            if not share_link:
+                return None
+            return {
+                "token": share_link.token,
+                "resource_type": share_link.resource_type,
+                "resource_id": str(share_link.resource_id) if share_link.resource_id else None,
+                "asin": share_link.asin,
+                "title": share_link.title,
+                "is_active": share_link.is_active,
+                "expires_at": share_link.expires_at.isoformat() if share_link.expires_at else None,
+                "view_count": share_link.view_count,
+                "created_at": share_link.created_at.isoformat() if share_link.created_at else None,
+            }
         
-        if not share_link:
+        # 每个分享页接口都先取元信息：热门链接从进程内 L1 / Redis 返回，不再每次查库
+        from app.core.cache import get_cache_service
+        cache = await get_cache_service()
+        cached = await cache.get_or_compute(
+            f"{CACHE_PREFIX_SHARE}meta:{token}",
+            load_meta,
+            ttl=CACHE_TTL_SHARE_META,
+            local=True
+        )
+        if not cached:
             return None
         
-        return {
-            "token": share_link.token,
-            "resource_type": share_link.resource_type,
-            "resource_id": str(share_link.resource_id) if share_link.resource_id else None,
-            "asin": share_link.asin,
-            "title": share_link.title,
-            "is_valid": share_link.is_valid,
-            "is_expired": share_link.is_expired,
-            "expires_at": share_link.expires_at.isoformat() if share_link.expires_at else None,
-            "view_count": share_link.view_count,
-            "created_at": share_link.created_at.isoformat() if share_link.created_at else None,
-        }
+        # 过期状态按读取时刻计算（缓存期间可能跨过 expires_at）
+        meta = dict(cached)
+        is_active = meta.pop("is_active")
+        expires_at = datetime.fromisoformat(meta["expires_at"]) if meta["expires_at"] else None
+        is_expired = expires_at is not None and datetime.now(timezone.utc) > expires_at
+        return {**meta, "is_valid": is_active and not is_expired, "is_expired": is_expired}
     
     # ==========================================
     # 分页获取评论（性能优化）
@@ -1118,22 +1130,24 @@ class ShareService:
         page_size: int = 50,
         rating: Optional[int] = None,
         sentiment: Optional[str] = None,
+        cursor: Optional[str] = None,
+        data_version: Optional[int] = None,
     ) -> Dict[str, Any]:
         """
         分页获取分享链接的评论列表（带缓存）
         
         Args:
             token: 分享令牌
-            page: 页码（从1开始）
+            page: 页码（从1开始；传入 cursor 时忽略）
             page_size: 每页数量（默认50，最大100）
             rating: 筛选评分（1-5）
             sentiment: 筛选情感（positive/neutral/negative）
+            cursor: 上一页返回的 next_cursor（游标分页，深页不再 OFFSET 扫描）
+            data_version: 调用方已读取的产品数据版本（与响应 ETag 一致；不传则在此读取）
             
         Returns:
             分页的评论列表
         """
-        from collections import defaultdict
-        
         # 验证分享链接
         share_link = await self.get_share_link_by_token(token)
         if not share_link:
@@ -1153,50 +1167,111 @@ class ShareService:
         
         # 限制 page_size
         page_size = min(max(page_size, 10), 100)
-        
-        # 尝试从缓存获取
-        cache_key = f"{CACHE_PREFIX_SHARE}reviews:{token}:p{page}:s{page_size}"
+        if cursor:
+            decode_review_cursor(cursor)  # 非法游标抛 ValueError
+        
+        # 尝试从缓存获取（Key 带分享版本号与产品数据版本号，失效时无需扫描）
+        from app.core.cache import get_cache_service, NS_SHARE
+        cache = await get_cache_service()
+        if data_version is None:
+            data_version = await cache.get_data_version(asin)
+        filters = ""
         if rating:
-            cache_key += f":r{rating}"
+            filters += f":r{rating}"
         if sentiment:
-            cache_key += f":st_{sentiment}"
-        
-        cached_data = await self._get_from_cache(cache_key)
-        if cached_data:
-            logger.debug(f"分页评论命中缓存: {cache_key}")
-            return cached_data
+            filters += f":st_{sentiment}"
+        position = f"c{cursor}" if cursor else f"p{page}"
+        page_key = await cache.versioned_key(
+            f"{CACHE_PREFIX_SHARE}page:", NS_SHARE, token, f"{position}:s{page_size}:d{data_version or 0}{filters}"
+        )
+        total_key = await cache.versioned_key(f"{CACHE_PREFIX_SHARE}total:", NS_SHARE, token, f"d{data_version or 0}{filters}")
         
-        # 获取产品
-        result = await self.db.execute(
-            select(Product).where(Product.asin == asin)
+        # 🛡️ 单飞：热门分享页缓存过期时同一页只有一个请求查库
+        page_data = await cache.get_or_compute(
+            page_key,
+            lambda: self._load_share_reviews_page(asin, page, page_size, rating, sentiment, cursor),
+            ttl=CACHE_TTL_SHARE_REVIEWS
+        )
+        # 总数单独缓存：翻页时不再每页 COUNT(*)
+        total = await cache.get_or_compute(
+            total_key,
+            lambda: self._count_share_reviews(asin, rating, sentiment),
+            ttl=CACHE_TTL_SHARE_REVIEWS
         )
-        product = result.scalar_one_or_none()
-        if not product:
-            raise ValueError(f"产品不存在: {asin}")
         
-        # 构建查询条件
-        conditions = [Review.product_id == product.id]
+        return {
+            "reviews": page_data["reviews"],
+            "pagination": {
+                "page": page,
+                "page_size": page_size,
+                "total": total,
+                "total_pages": (total + page_size - 1) // page_size,
+                "has_next": page_data["next_cursor"] is not None,
+                "has_prev": bool(cursor) or page > 1,
+                "next_cursor": page_data["next_cursor"],
+            },
+            "filters": {
+                "rating": rating,
+                "sentiment": sentiment,
+            }
+        }
+    
+    def _share_review_conditions(self, product_id: UUID, rating: Optional[int], sentiment: Optional[str]) -> list:
+        """分享页评论过滤条件（排除逻辑删除，与 ix_reviews_product_keyset 的部分索引条件一致）"""
+        conditions = [Review.product_id == product_id, Review.is_deleted == False]
         if rating:
             conditions.append(Review.rating == rating)
         if sentiment:
             conditions.append(Review.sentiment == sentiment)
-        
-        # 获取总数
-        count_result = await self.db.execute(
-            select(func.count(Review.id)).where(and_(*conditions))
+        return conditions
+    
+    async def _get_share_product_id(self, asin: str) -> UUID:
+        result = await self.db.execute(select(Product.id).where(Product.asin == asin))
+        product_id = result.scalar_one_or_none()
+        if not product_id:
+            raise ValueError(f"产品不存在: {asin}")
+        return product_id
+    
+    async def _count_share_reviews(self, asin: str, rating: Optional[int], sentiment: Optional[str]) -> int:
+        """分享页评论总数"""
+        product_id = await self._get_share_product_id(asin)
+        result = await self.db.execute(
+            select(func.count(Review.id)).where(and_(*self._share_review_conditions(product_id, rating, sentiment)))
         )
-        total = count_result.scalar() or 0
+        return result.scalar() or 0
+    
+    async def _load_share_reviews_page(
+        self,
+        asin: str,
+        page: int,
+        page_size: int,
+        rating: Optional[int],
+        sentiment: Optional[str],
+        cursor: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """查询分享页的一页评论（含洞察 / 主题），返回 {reviews, next_cursor}"""
+        from collections import defaultdict
         
-        # 分页查询
-        offset = (page - 1) * page_size
-        review_result = await self.db.execute(
+        product_id = await self._get_share_product_id(asin)
+        conditions = self._share_review_conditions(product_id, rating, sentiment)
+        if cursor:
+            conditions.append(review_cursor_condition(cursor))
+        
+        # 游标分页走索引定位；多取一条判断是否还有下一页
+        query = (
             select(Review)
             .where(and_(*conditions))
-            .order_by(Review.review_date.desc().nullslast())
-            .offset(offset)
-            .limit(page_size)
+            .order_by(*REVIEW_KEYSET_ORDER)
+            .limit(page_size + 1)
         )
+        if not cursor:
+            query = query.offset((page - 1) * page_size)
+        review_result = await self.db.execute(query)
         reviews = list(review_result.scalars().all())
+        next_cursor = None
+        if len(reviews) > page_size:
+            reviews = reviews[:page_size]
+            next_cursor = encode_review_cursor(reviews[-1])
         review_ids = [r.id for r in reviews]
         
         # 获取 insights
@@ -1260,23 +1335,4 @@ class ShareService:
             for r in reviews
         ]
         
-        result_data = {
-            "reviews": reviews_data,
-            "pagination": {
-                "page": page,
-                "page_size": page_size,
-                "total": total,
-                "total_pages": (total + page_size - 1) // page_size,
-                "has_next": offset + len(reviews) < total,
-                "has_prev": page > 1,
-            },
-            "filters": {
-                "rating": rating,
-                "sentiment": sentiment,
-            }
-        }
-        
-        # 写入缓存
-        await self._set_to_cache(cache_key, result_data, CACHE_TTL_SHARE_REVIEWS)
-        
-        return result_data
+        return {"reviews": reviews_data, "next_cursor": next_cursor}
@@ -20,6 +20,7 @@ Summary Service - 智能报告生成模块 (Report Generation Module)
 - ProductReport 模型 (报告存储)
 - TranslationService (LLM 调用)
 """
+import asyncio
 import logging
 import json
 from collections import defaultdict, Counter
@@ -1206,7 +1207,9 @@ class SummaryService:
 
 请直接输出 JSON（只包含 {', '.join(module['fields'])} 字段）:"""
 
-                response = translation_service.client.chat.completions.create(
+                # 同步客户端（含限流等待）放到线程中执行，避免阻塞 FastAPI 事件循环
+                response = await asyncio.to_thread(
+                    translation_service.client.chat.completions.create,
                     model="qwen-plus",  # 使用 qwen-plus，速度更快
                     messages=[
                         {"role": "system", "content": "You are a data analyst. Output JSON only. Always respond in Chinese."},
@@ -13,10 +13,10 @@ from typing import Optional, Tuple, List
 from enum import Enum
 from concurrent.futures import ThreadPoolExecutor
 
-from openai import OpenAI
 from tenacity import retry, stop_after_attempt, wait_exponential, retry_if_exception_type
 
 from app.core.config import settings
+from app.core.llm import get_sync_llm_client
 
 logger = logging.getLogger(__name__)
 
@@ -904,6 +904,73 @@ Output: {{
 Output JSON only, no other text."""
 
 
+# [NEW] 多评论批量分析 Prompt（共享一份维度/标签 Schema，K 条评论一次调用）
+# 用法：单条 Prompt 的 {original_text} 填入 BATCH_INPUT_PLACEHOLDER，再在末尾追加批量模式说明
+BATCH_INPUT_PLACEHOLDER = "(BATCH MODE - the English reviews are provided in the REVIEWS section at the end of this prompt)"
+
+INSIGHT_BATCH_MODE_PROMPT = """
+
+# ⚠️ BATCH MODE (OVERRIDES THE SINGLE-REVIEW OUTPUT FORMAT)
+You are analyzing {count} reviews at once. Apply ALL rules above to EACH review independently.
+Never mix quotes or insights between reviews.
+
+# REVIEWS (JSON object: review id → English review text)
+{reviews_json}
+
+# Batch Output Format (JSON Object)
+Return ONE JSON object. Keys are exactly the review ids above; each value is that review's insight array
+in the single-review format described above (at least 1 insight per review).
+{{
+  "<review_id_1>": [{{"type": "...", "dimension": "...", "quote": "...", "quote_translated": "...", "analysis": "...", "sentiment": "...", "confidence": "..."}}],
+  "<review_id_2>": [...]
+}}
+Every review id MUST appear. Output JSON only, no other text."""
+
+THEME_BATCH_MODE_PROMPT = """
+
+# ⚠️ BATCH MODE (OVERRIDES THE SINGLE-REVIEW OUTPUT FORMAT)
+You are analyzing {count} reviews at once. Apply ALL rules above (including the evidence standards) to EACH review independently.
+Never mix quotes or evidence between reviews.
+
+# REVIEWS (JSON object: review id → English review text)
+{reviews_json}
+
+# Batch Output Format (JSON Object)
+Return ONE JSON object. Keys are exactly the review ids above; each value is that review's 5W object
+in the single-review format described above (empty arrays are valid).
+{{
+  "<review_id_1>": {{"buyer": [], "user": [], "where": [], "when": [], "why": [], "what": []}},
+  "<review_id_2>": {{...}}
+}}
+Every review id MUST appear. Output JSON only, no other text."""
+
+
+# [NEW] 洞察 + 5W 融合批量 Prompt（同一批评论一次调用同时返回两类结果）
+FUSED_ANALYSIS_BATCH_PROMPT = """You will perform TWO analyses on the same batch of English reviews and return both in ONE response.
+
+==================== PART A: INSIGHT EXTRACTION ====================
+{insight_prompt}
+
+==================== PART B: 5W THEME EXTRACTION ====================
+{theme_prompt}
+
+==================== ⚠️ BATCH MODE (OVERRIDES BOTH OUTPUT FORMATS ABOVE) ====================
+You are analyzing {count} reviews at once. Apply ALL PART A rules and ALL PART B rules to EACH review independently.
+Never mix quotes or evidence between reviews.
+
+# REVIEWS (JSON object: review id → English review text)
+{reviews_json}
+
+# Combined Output Format (JSON Object)
+{{
+  "<review_id>": {{
+    "insights": [ ...PART A insight array, at least 1 item... ],
+    "themes": {{ ...PART B 5W object, empty arrays are valid... }}
+  }}
+}}
+Every review id MUST appear. Output JSON only, no other text."""
+
+
 # [NEW] Helper function for robust JSON parsing
 def parse_json_safely(text: str):
     """
@@ -958,15 +1025,10 @@ class TranslationService:
     
     def __init__(self):
         """Initialize the translation service with Qwen API client."""
-        if not settings.QWEN_API_KEY:
+        # 共享 LLM 连接池（同进程内所有服务复用同一个客户端）
+        self.client = get_sync_llm_client()
+        if self.client is None:
             logger.warning("QWEN_API_KEY not configured, translation will fail")
-            self.client = None
-        else:
-            self.client = OpenAI(
-                api_key=settings.QWEN_API_KEY,
-                base_url=settings.QWEN_API_BASE,
-                timeout=120.0,  # 2分钟超时，适合复杂任务
-            )
         self.model = settings.QWEN_MODEL
     
     def _check_client(self) -> bool:
@@ -976,15 +1038,11 @@ class TranslationService:
             return False
         return True
     
-    @retry(
-        stop=stop_after_attempt(3),
-        wait=wait_exponential(multiplier=1, min=2, max=10),
-        retry=retry_if_exception_type((Exception,)),
-        reraise=True
-    )
     def translate_text(self, text: str) -> str:
         """
         Translate English text to Chinese with e-commerce context.
+        
+        先查翻译记忆库（跨产品复用），未命中时 single-flight 调用 LLM 并写回记忆。
         """
         if not self._check_client():
             raise RuntimeError("Translation service not configured")
@@ -995,6 +1053,18 @@ class TranslationService:
         # Clean text: remove extra whitespace and normalize
         text = " ".join(text.split())
         
+        from app.services.translation_memory import translation_memory
+        return translation_memory.get_or_translate(text, self._translate_text_llm)
+    
+    @retry(
+        stop=stop_after_attempt(3),
+        wait=wait_exponential(multiplier=1, min=2, max=10),
+        retry=retry_if_exception_type((Exception,)),
+        reraise=True
+    )
+    def _translate_text_llm(self, text: str) -> str:
+        """单条翻译的 LLM 调用（不经过翻译记忆库）"""
+        
         try:
             response = self.client.chat.completions.create(
                 model=self.model,
@@ -1061,22 +1131,18 @@ class TranslationService:
 输入: {"r1": "Total lemon. Don't waste your money.", "r2": "Game changer for my morning routine."}
 输出: {"r1": "简直是个次品！别浪费钱了。", "r2": "彻底改变了我每天早上的习惯，真香！"}"""
 
-    @retry(
-        stop=stop_after_attempt(3),
-        wait=wait_exponential(multiplier=1, min=2, max=15),
-        retry=retry_if_exception_type((Exception,)),
-        reraise=True
-    )
     def translate_batch(self, reviews: List[dict]) -> dict:
         """
-        批量翻译多条评论（10 条一批）
+        批量翻译多条评论（一个 token 预算箱一次调用）
         
-        🔥 核心优化：一次 API 调用翻译 10 条评论
-        - QPS 消耗降低 10 倍
-        - 总体效率提升 8-10 倍
+        🔥 核心优化：一次 API 调用翻译一整箱评论
+        - QPS 消耗按箱计算，而不是按条
+        - 超长评论不再截断，由 TokenBatchPacker 预先分片
+        - 翻译记忆库命中的原文不再发送，批内相同原文只发送一次
         
         Args:
             reviews: 评论列表，每项包含 {"id": "xxx", "text": "original text"}
+                     （应为 TokenBatchPacker.pack 产出的一个批次）
             
         Returns:
             翻译结果字典，格式: {"id1": "translated1", "id2": "translated2", ...}
@@ -1100,15 +1166,31 @@ class TranslationService:
             review_id = str(review.get("id", ""))
             text = review.get("text", "")
             if review_id and text and text.strip():
-                # 截断超长文本（防止超出 token 限制）
-                text = " ".join(text.split())  # 清理空白
-                if len(text) > 2000:
-                    text = text[:2000] + "..."
-                input_dict[review_id] = text
+                # 超长文本由 TokenBatchPacker 预先分片，这里不再截断
+                input_dict[review_id] = " ".join(text.split())  # 清理空白
         
         if not input_dict:
             return {}
         
+        from app.services.translation_memory import translation_memory
+        return translation_memory.translate_many(input_dict, self._translate_batch_llm)
+    
+    @retry(
+        stop=stop_after_attempt(3),
+        wait=wait_exponential(multiplier=1, min=2, max=15),
+        retry=retry_if_exception_type((Exception,)),
+        reraise=True
+    )
+    def _translate_batch_llm(self, input_dict: dict) -> dict:
+        """
+        批量翻译的 LLM 调用（不经过翻译记忆库）
+        
+        Args:
+            input_dict: {"id1": "清理后的原文", ...}
+            
+        Returns:
+            {"id1": "译文", ...}
+        """
         input_json = json.dumps(input_dict, ensure_ascii=False)
         
         logger.info(f"[批量翻译] 开始翻译 {len(input_dict)} 条评论")
@@ -1201,6 +1283,7 @@ class TranslationService:
         """
         批量翻译，带单条回退机制
         
+        先按 token 预算装箱（超长评论自动分片），每箱一次批量调用；
         如果批量翻译失败或部分失败，自动降级为单条翻译
         
         Args:
@@ -1209,31 +1292,387 @@ class TranslationService:
         Returns:
             翻译结果字典，格式: {"id1": "translated1", "id2": "translated2", ...}
         """
-        result = {}
+        from app.services.batch_packer import review_batch_packer
         
-        # 1. 尝试批量翻译
-        try:
-            batch_result = self.translate_batch(reviews)
-            result.update(batch_result)
-        except Exception as e:
-            logger.warning(f"[批量翻译] 批量模式失败，降级为单条: {e}")
+        batches = review_batch_packer.pack(reviews)
+        chunk_result = {}
         
-        # 2. 检查是否有未翻译的评论，单条回退
-        for review in reviews:
-            review_id = str(review.get("id", ""))
-            text = review.get("text", "")
+        for batch in batches:
+            # 1. 尝试批量翻译
+            try:
+                chunk_result.update(self.translate_batch(batch))
+            except Exception as e:
+                logger.warning(f"[批量翻译] 批量模式失败，降级为单条: {e}")
             
-            if review_id and text and review_id not in result:
+            # 2. 检查是否有未翻译的分片，单条回退
+            for chunk in batch:
+                if chunk["id"] in chunk_result:
+                    continue
                 try:
-                    translated = self.translate_text(text)
+                    translated = self.translate_text(chunk["text"])
                     if translated:
-                        result[review_id] = translated
-                        logger.debug(f"[批量翻译] 单条回退成功: {review_id}")
+                        chunk_result[chunk["id"]] = translated
+                        logger.debug(f"[批量翻译] 单条回退成功: {chunk['id']}")
                 except Exception as e:
-                    logger.warning(f"[批量翻译] 单条回退失败 {review_id}: {e}")
+                    logger.warning(f"[批量翻译] 单条回退失败 {chunk['id']}: {e}")
         
+        # 3. 分片译文按序拼接回原评论
+        return review_batch_packer.merge_results(
+            [chunk for batch in batches for chunk in batch],
+            chunk_result
+        )
+
+    # ==========================================================================
+    # 🔥 融合批量翻译（正文 + 标题 + 情感，一次调用完成）
+    # ==========================================================================
+
+    # 融合批量翻译系统提示
+    BATCH_REVIEW_SYSTEM_PROMPT = """你是一位精通中美文化差异的资深亚马逊跨境电商翻译专家，同时负责评论情感判断。
+
+## 任务
+对多条亚马逊英文评论，一次性完成：
+1. 正文翻译（body）
+2. 标题翻译（title，输入中没有标题时输出 null）
+3. 情感判断（sentiment，只能是 positive / neutral / negative 之一）
+
+## 翻译原则
+1. **拒绝翻译腔**: 使用自然流畅的中文表达
+2. **情感对齐**: 保持原文的语气和情绪
+3. **电商风格**: 使用符合中国电商的文案风格
+
+## 情感判断标准
+- positive: 满意、推荐、喜欢
+- neutral: 客观描述、一般评价
+- negative: 不满、批评、退货
+
+## 输入/输出格式
+- 输入: JSON 字典，键为评论 ID，值为 {"title": 英文标题或 null, "body": 英文正文}
+- 输出: JSON 字典，键与输入一致，值为 {"title": 中文标题或 null, "body": 中文正文, "sentiment": "positive|neutral|negative"}
+- **严格要求**: 只返回 JSON，不要添加任何解释、Markdown 标记或其他文字
+
+## 示例
+输入: {"r1": {"title": "Total lemon", "body": "Stopped working after 2 days. Don't waste your money."}, "r2": {"title": null, "body": "Game changer for my morning routine."}}
+输出: {"r1": {"title": "简直是个次品", "body": "用了两天就坏了，千万别浪费钱！", "sentiment": "negative"}, "r2": {"title": null, "body": "彻底改变了我每天早上的习惯，真香！", "sentiment": "positive"}}"""
+
+    @retry(
+        stop=stop_after_attempt(3),
+        wait=wait_exponential(multiplier=1, min=2, max=15),
+        retry=retry_if_exception_type((Exception,)),
+        reraise=True
+    )
+    def translate_reviews_batch(self, reviews: List[dict]) -> dict:
+        """
+        融合批量翻译：一次 API 调用返回每条评论的正文译文、标题译文和情感标签
+
+        替代 translate_batch + 逐条 translate_text(标题) + 逐条 analyze_sentiment
+        的 2N+1 次调用模式。
+
+        Args:
+            reviews: 评论列表，每项包含 {"id": "xxx", "text": "正文", "title": "标题（可选）"}
+
+        Returns:
+            结果字典（只包含通过校验的条目），格式:
+            {"id1": {"title": "标题译文或 None", "body": "正文译文", "sentiment": Sentiment}, ...}
+        """
+        if not self._check_client():
+            raise RuntimeError("Translation service not configured")
+
+        if not reviews:
+            return {}
+
+        input_dict = {}
+        for review in reviews:
+            review_id = str(review.get("id", ""))
+            text = review.get("text", "")
+            if not review_id or not text or not text.strip():
+                continue
+            text = " ".join(text.split())  # 超长正文由 TokenBatchPacker 预先分片
+            title = review.get("title")
+            title = " ".join(title.split()) if title and title.strip() else None
+            input_dict[review_id] = {"title": title, "body": text}
+
+        if not input_dict:
+            return {}
+
+        logger.info(f"[融合翻译] 开始处理 {len(input_dict)} 条评论（正文+标题+情感）")
+
+        try:
+            response = self.client.chat.completions.create(
+                model=self.model,
+                messages=[
+                    {"role": "system", "content": self.BATCH_REVIEW_SYSTEM_PROMPT},
+                    {"role": "user", "content": json.dumps(input_dict, ensure_ascii=False)}
+                ],
+                temperature=0.3,
+                max_tokens=8000,
+                timeout=120.0,
+            )
+
+            result_text = response.choices[0].message.content.strip()
+            result_dict = self._parse_batch_review_result(result_text, input_dict)
+
+            logger.info(f"[融合翻译] 完成: 输入 {len(input_dict)} 条, 校验通过 {len(result_dict)} 条")
+
+            return result_dict
+
+        except Exception as e:
+            logger.error(f"[融合翻译] API 调用失败: {e}")
+            raise
+
+    def _parse_batch_review_result(self, result_text: str, input_dict: dict) -> dict:
+        """
+        解析并校验融合批量翻译结果
+
+        单条校验规则：
+        - body 必须是非空字符串
+        - 输入有标题时，title 必须是非空字符串
+        - sentiment 必须是 positive / neutral / negative 之一
+
+        任何一项不满足，该 ID 不会出现在返回结果中，由调用方单条回退。
+        """
+        parsed = parse_json_safely(result_text)
+        if not isinstance(parsed, dict):
+            logger.error(f"[融合翻译] 无法解析结果，原始输出: {result_text[:500]}")
+            return {}
+
+        valid_sentiments = {s.value for s in Sentiment}
+        valid_result = {}
+
+        for review_id, source in input_dict.items():
+            item = parsed.get(review_id)
+            if not isinstance(item, dict):
+                continue
+
+            body = item.get("body")
+            if not isinstance(body, str) or not body.strip():
+                continue
+
+            title = item.get("title")
+            if source["title"]:
+                if not isinstance(title, str) or not title.strip():
+                    continue
+                title = title.strip()
+            else:
+                title = None
+
+            sentiment = str(item.get("sentiment") or "").strip().lower()
+            if sentiment not in valid_sentiments:
+                continue
+
+            valid_result[review_id] = {
+                "title": title,
+                "body": body.strip(),
+                "sentiment": Sentiment(sentiment)
+            }
+
+        return valid_result
+
+    def translate_reviews_batch_with_fallback(self, reviews: List[dict]) -> dict:
+        """
+        融合批量翻译，带单条回退机制
+
+        批量结果中未通过校验的 ID，才回退为单条调用：
+        translate_text(正文)、translate_text(标题)、analyze_sentiment(原文)。
+
+        Args:
+            reviews: 评论列表，每项包含 {"id": "xxx", "text": "正文", "title": "标题（可选）"}
+
+        Returns:
+            结果字典，格式: {"id1": {"title": ..., "body": ..., "sentiment": Sentiment}, ...}
+        """
+        from app.services.translation_memory import translation_memory
+
+        # 0. 翻译记忆库：正文与标题都命中的评论不再调用 LLM，情感交给本地引擎；
+        #    未命中的原文先抢占翻译权，被其他调用方占位的评论暂缓（single-flight）
+        result, owned, deferred = self._translate_reviews_from_memory(reviews)
+        deferred_ids = {str(review["id"]) for review in deferred}
+        pending = [
+            review for review in reviews
+            if str(review.get("id", "")) not in result and str(review.get("id", "")) not in deferred_ids
+        ]
+
+        try:
+            # 1. 尝试融合批量调用
+            try:
+                batch_result = self.translate_reviews_batch(pending) if pending else {}
+                result.update(batch_result)
+            except Exception as e:
+                batch_result = {}
+                logger.warning(f"[融合翻译] 批量模式失败，降级为单条: {e}")
+
+            # 融合调用产出的正文/标题译文写回记忆库（单条回退走 translate_text，已自动写回）
+            entries = {}
+            for review in pending:
+                item = batch_result.get(str(review.get("id", "")))
+                if not item:
+                    continue
+                for source, translated in ((review.get("text"), item["body"]), (review.get("title"), item["title"])):
+                    if translated and translation_memory.cacheable(source):
+                        entries[translation_memory.key_for(source)] = (source, translated)
+            translation_memory.put_many(entries)
+        finally:
+            # 写回后再释放占位锁，等待方随即读到译文（单条回退的 translate_text 也需要重新抢占）
+            translation_memory.release(owned)
+
+        # 1.1 暂缓的评论：自己的批次完成后再等待其他调用方的结果，仍未拿到的走单条回退
+        if deferred:
+            result.update(self._wait_reviews_from_memory(deferred))
+
+        # 2. 只对未通过校验的 ID 单条回退
+        fallback_count = 0
+        for review in reviews:
+            review_id = str(review.get("id", ""))
+            text = review.get("text", "")
+            if not review_id or not text or not text.strip() or review_id in result:
+                continue
+
+            fallback_count += 1
+            try:
+                body = self.translate_text(text)
+            except Exception as e:
+                logger.warning(f"[融合翻译] 单条回退失败 {review_id}: {e}")
+                continue
+            if not body:
+                continue
+
+            title = None
+            if review.get("title") and review["title"].strip():
+                try:
+                    title = self.translate_text(review["title"]) or None
+                except Exception:
+                    title = None
+
+            result[review_id] = {
+                "title": title,
+                "body": body,
+                "sentiment": self.classify_sentiment(text, review.get("rating"))
+            }
+
+        if fallback_count:
+            logger.info(f"[融合翻译] 单条回退 {fallback_count} 条")
+
         return result
-    
+
+    def _memory_candidates(self, reviews: List[dict]) -> list:
+        """
+        筛选可走翻译记忆库的评论（正文及存在的标题都可缓存）
+
+        Returns:
+            [(review, review_id, 正文 hash, 标题 hash 或 None)]
+        """
+        from app.services.translation_memory import translation_memory
+
+        candidates = []
+        for review in reviews:
+            review_id = str(review.get("id", ""))
+            text = review.get("text") or ""
+            title = review.get("title") if review.get("title") and review["title"].strip() else None
+            if not review_id or not translation_memory.cacheable(text):
+                continue
+            if title and not translation_memory.cacheable(title):
+                continue
+            candidates.append((
+                review, review_id,
+                translation_memory.key_for(text),
+                translation_memory.key_for(title) if title else None
+            ))
+        return candidates
+
+    def _assemble_reviews_from_memory(self, candidates: list, found: dict, total: int) -> dict:
+        """
+        用已查到的译文组装融合翻译结果（正文与标题都命中才返回），情感由本地引擎批量判断
+
+        Returns:
+            {"id1": {"title": ..., "body": ..., "sentiment": Sentiment}, ...}
+        """
+        hits = {}
+        for review, review_id, body_hash, title_hash in candidates:
+            body = found.get(body_hash)
+            title_translated = found.get(title_hash) if title_hash else None
+            if body and (not title_hash or title_translated):
+                hits[review_id] = {"title": title_translated, "body": body, "rating": review.get("rating"), "text": review["text"]}
+
+        if not hits:
+            return {}
+
+        sentiments = self.classify_sentiments([
+            {"id": review_id, "text": item["text"], "rating": item["rating"]}
+            for review_id, item in hits.items()
+        ])
+        logger.info(f"[融合翻译] 翻译记忆命中 {len(hits)}/{total} 条，跳过 LLM 调用")
+        return {
+            review_id: {"title": item["title"], "body": item["body"], "sentiment": sentiments[review_id]}
+            for review_id, item in hits.items()
+        }
+
+    def _translate_reviews_from_memory(self, reviews: List[dict]) -> tuple:
+        """
+        从翻译记忆库组装融合翻译结果，并为未命中的原文抢占翻译权（single-flight）
+
+        - 抢到的 hash 由本调用方翻译，调用方写回记忆库后必须 release
+        - 含有被其他调用方占位原文的评论暂缓，调用方完成自己的批次后再 _wait_reviews_from_memory
+          （先翻译、后等待，两个批次互相占位时不会互等到超时）
+
+        Returns:
+            (命中结果 {id: {...}}, 本调用方占位的 hash 列表, 暂缓的评论列表)
+        """
+        from app.services.translation_memory import translation_memory
+
+        candidates = self._memory_candidates(reviews)
+        if not candidates:
+            return {}, [], []
+
+        hashes = list(dict.fromkeys(
+            h for _, _, body_hash, title_hash in candidates for h in (body_hash, title_hash) if h
+        ))
+        found = translation_memory.get_many(hashes)
+
+        owned, foreign = [], set()
+        for h in hashes:
+            if h not in found:
+                if translation_memory.claim(h):
+                    owned.append(h)
+                else:
+                    foreign.add(h)
+
+        deferred = [
+            review for review, _, body_hash, title_hash in candidates
+            if body_hash in foreign or title_hash in foreign
+        ]
+        return self._assemble_reviews_from_memory(candidates, found, len(reviews)), owned, deferred
+
+    def _wait_reviews_from_memory(self, reviews: List[dict]) -> dict:
+        """等待其他调用方翻译暂缓评论的原文，再从记忆库组装结果（超时未拿到的不返回）"""
+        from app.services.translation_memory import translation_memory
+
+        candidates = self._memory_candidates(reviews)
+        found = translation_memory.wait_for([
+            h for _, _, body_hash, title_hash in candidates for h in (body_hash, title_hash) if h
+        ])
+        return self._assemble_reviews_from_memory(candidates, found, len(reviews))
+
+    def classify_sentiments(self, items: List[dict]) -> dict:
+        """
+        批量情感判断：本地引擎优先，仅低置信度条目调用 LLM（analyze_sentiment）
+
+        Args:
+            items: [{"id": "xxx", "text": "英文原文", "rating": 5}, ...]
+
+        Returns:
+            {id: Sentiment}
+        """
+        from app.services.sentiment_engine import sentiment_engine
+
+        labels = sentiment_engine.resolve_batch(
+            items,
+            llm_fallback=lambda text: self.analyze_sentiment(text).value
+        )
+        return {review_id: Sentiment(label) for review_id, label in labels.items()}
+
+    def classify_sentiment(self, text: str, rating: Optional[int] = None) -> Sentiment:
+        """单条情感判断（本地引擎优先，低置信度时调用 LLM）"""
+        return self.classify_sentiments([{"id": "0", "text": text, "rating": rating}])["0"]
+
     @retry(
         stop=stop_after_attempt(3),
         wait=wait_exponential(multiplier=1, min=2, max=10),
@@ -1758,6 +2197,111 @@ class TranslationService:
             logger.error(f"5W 标签学习失败: {e}")
             return {}
 
+    def _build_insight_prompt(self, original_text: str, dimension_schema=None) -> str:
+        """
+        构建洞察提取 Prompt（维度 Schema 格式检测 + 3类维度字符串拼接）
+        
+        单条模式传入评论原文；批量模式传入 BATCH_INPUT_PLACEHOLDER，
+        再在末尾追加 INSIGHT_BATCH_MODE_PROMPT。
+        """
+        # [UPDATED 2026-01-16] 检测维度格式并构建对应的 prompt
+        if dimension_schema:
+            # 检测是新格式（dict with product/scenario/emotion）还是旧格式（list）
+            is_new_format = (
+                isinstance(dimension_schema, dict) and 
+                any(k in dimension_schema for k in ["product", "scenario", "emotion"])
+            )
+
+            if is_new_format:
+                # 新格式：3类维度体系
+                product_dims = dimension_schema.get("product", [])
+                scenario_dims = dimension_schema.get("scenario", [])
+                emotion_dims = dimension_schema.get("emotion", [])
+
+                # 构建3类维度的 schema 字符串
+                product_schema_str = "\n".join([
+                    f"- {d['name']}: {d.get('description', '无具体定义')}" 
+                    for d in product_dims
+                ]) if product_dims else "- 整体满意度: 通用产品维度"
+
+                scenario_schema_str = "\n".join([
+                    f"- {d['name']}: {d.get('description', '无具体定义')}" 
+                    for d in scenario_dims
+                ]) if scenario_dims else "- 日常使用: 通用场景维度"
+
+                emotion_schema_str = "\n".join([
+                    f"- {d['name']}: {d.get('description', '无具体定义')}" 
+                    for d in emotion_dims
+                ]) if emotion_dims else "- 正面情绪: 积极情感\n- 负面情绪: 消极情感"
+
+                prompt = INSIGHT_EXTRACTION_PROMPT_DYNAMIC.format(
+                    original_text=original_text,
+                    product_schema_str=product_schema_str,
+                    scenario_schema_str=scenario_schema_str,
+                    emotion_schema_str=emotion_schema_str
+                )
+                logger.debug(f"[跨语言洞察] 使用3类维度 Prompt "
+                           f"(产品:{len(product_dims)}, 场景:{len(scenario_dims)}, 情绪:{len(emotion_dims)})")
+            else:
+                # 旧格式：单一维度列表，向后兼容
+                # 将旧格式转换为新格式（全部作为产品维度，使用默认场景和情绪维度）
+                if isinstance(dimension_schema, list) and len(dimension_schema) > 0:
+                    product_schema_str = "\n".join([
+                        f"- {d['name']}: {d.get('description', '无具体定义')}" 
+                        for d in dimension_schema
+                    ])
+                    scenario_schema_str = "- 日常使用: 通用场景维度\n- 工作办公: 办公场景\n- 户外出行: 户外场景"
+                    emotion_schema_str = "- 惊喜好评: 超出预期的正面情绪\n- 失望不满: 期望落空的负面情绪\n- 感激推荐: 感谢并推荐"
+
+                    prompt = INSIGHT_EXTRACTION_PROMPT_DYNAMIC.format(
+                        original_text=original_text,
+                        product_schema_str=product_schema_str,
+                        scenario_schema_str=scenario_schema_str,
+                        emotion_schema_str=emotion_schema_str
+                    )
+                    logger.debug(f"[跨语言洞察] 旧格式维度已转换，共 {len(dimension_schema)} 个产品维度")
+                else:
+                    # 维度列表为空，使用无维度 Prompt
+                    prompt = INSIGHT_EXTRACTION_PROMPT.format(
+                        original_text=original_text
+                    )
+        else:
+            # 使用无维度 Prompt - 自动检测维度
+            prompt = INSIGHT_EXTRACTION_PROMPT.format(
+                original_text=original_text
+            )
+        return prompt
+    
+    def _validate_insights(self, insights: list) -> List[dict]:
+        """
+        校验单条评论的洞察列表（type 必须在 valid_types 中，quote/analysis 必填）
+        """
+        valid_insights = []
+        valid_types = {"strength", "weakness", "suggestion", "scenario", "emotion"}
+
+        for insight in insights:
+            if not isinstance(insight, dict):
+                continue
+            if insight.get("type") not in valid_types:
+                continue
+            if not insight.get("quote") or not insight.get("analysis"):
+                continue
+
+            # [UPDATED 2026-01-15] 添加 confidence 字段支持
+            confidence = insight.get("confidence", "high")
+            if confidence not in ("high", "medium", "low"):
+                confidence = "high"
+
+            valid_insights.append({
+                "type": insight["type"],
+                "quote": insight["quote"],
+                "quote_translated": insight.get("quote_translated"),
+                "analysis": insight["analysis"],
+                "dimension": insight.get("dimension"),
+                "confidence": confidence  # [NEW] 置信度
+            })
+        return valid_insights
+    
     @retry(
         stop=stop_after_attempt(2),
         wait=wait_exponential(multiplier=1, min=2, max=10),
@@ -1804,72 +2348,7 @@ class TranslationService:
             return []
         
         try:
-            # [UPDATED 2026-01-16] 检测维度格式并构建对应的 prompt
-            if dimension_schema:
-                # 检测是新格式（dict with product/scenario/emotion）还是旧格式（list）
-                is_new_format = (
-                    isinstance(dimension_schema, dict) and 
-                    any(k in dimension_schema for k in ["product", "scenario", "emotion"])
-                )
-                
-                if is_new_format:
-                    # 新格式：3类维度体系
-                    product_dims = dimension_schema.get("product", [])
-                    scenario_dims = dimension_schema.get("scenario", [])
-                    emotion_dims = dimension_schema.get("emotion", [])
-                    
-                    # 构建3类维度的 schema 字符串
-                    product_schema_str = "\n".join([
-                        f"- {d['name']}: {d.get('description', '无具体定义')}" 
-                        for d in product_dims
-                    ]) if product_dims else "- 整体满意度: 通用产品维度"
-                    
-                    scenario_schema_str = "\n".join([
-                        f"- {d['name']}: {d.get('description', '无具体定义')}" 
-                        for d in scenario_dims
-                    ]) if scenario_dims else "- 日常使用: 通用场景维度"
-                    
-                    emotion_schema_str = "\n".join([
-                        f"- {d['name']}: {d.get('description', '无具体定义')}" 
-                        for d in emotion_dims
-                    ]) if emotion_dims else "- 正面情绪: 积极情感\n- 负面情绪: 消极情感"
-                    
-                    prompt = INSIGHT_EXTRACTION_PROMPT_DYNAMIC.format(
-                        original_text=original_text,
-                        product_schema_str=product_schema_str,
-                        scenario_schema_str=scenario_schema_str,
-                        emotion_schema_str=emotion_schema_str
-                    )
-                    logger.debug(f"[跨语言洞察] 使用3类维度 Prompt "
-                               f"(产品:{len(product_dims)}, 场景:{len(scenario_dims)}, 情绪:{len(emotion_dims)})")
-                else:
-                    # 旧格式：单一维度列表，向后兼容
-                    # 将旧格式转换为新格式（全部作为产品维度，使用默认场景和情绪维度）
-                    if isinstance(dimension_schema, list) and len(dimension_schema) > 0:
-                        product_schema_str = "\n".join([
-                            f"- {d['name']}: {d.get('description', '无具体定义')}" 
-                            for d in dimension_schema
-                        ])
-                        scenario_schema_str = "- 日常使用: 通用场景维度\n- 工作办公: 办公场景\n- 户外出行: 户外场景"
-                        emotion_schema_str = "- 惊喜好评: 超出预期的正面情绪\n- 失望不满: 期望落空的负面情绪\n- 感激推荐: 感谢并推荐"
-                        
-                        prompt = INSIGHT_EXTRACTION_PROMPT_DYNAMIC.format(
-                            original_text=original_text,
-                            product_schema_str=product_schema_str,
-                            scenario_schema_str=scenario_schema_str,
-                            emotion_schema_str=emotion_schema_str
-                        )
-                        logger.debug(f"[跨语言洞察] 旧格式维度已转换，共 {len(dimension_schema)} 个产品维度")
-                    else:
-                        # 维度列表为空，使用无维度 Prompt
-                        prompt = INSIGHT_EXTRACTION_PROMPT.format(
-                            original_text=original_text
-                        )
-            else:
-                # 使用无维度 Prompt - 自动检测维度
-                prompt = INSIGHT_EXTRACTION_PROMPT.format(
-                    original_text=original_text
-                )
+            prompt = self._build_insight_prompt(original_text, dimension_schema)
             
             response = self.client.chat.completions.create(
                 model=self.model,
@@ -1890,31 +2369,7 @@ class TranslationService:
                 logger.warning(f"Parsed insights is not a list: {type(insights)}")
                 return []
             
-            # Validate insights
-            valid_insights = []
-            valid_types = {"strength", "weakness", "suggestion", "scenario", "emotion"}
-            
-            for insight in insights:
-                if not isinstance(insight, dict):
-                    continue
-                if insight.get("type") not in valid_types:
-                    continue
-                if not insight.get("quote") or not insight.get("analysis"):
-                    continue
-                
-                # [UPDATED 2026-01-15] 添加 confidence 字段支持
-                confidence = insight.get("confidence", "high")
-                if confidence not in ("high", "medium", "low"):
-                    confidence = "high"
-                
-                valid_insights.append({
-                    "type": insight["type"],
-                    "quote": insight["quote"],
-                    "quote_translated": insight.get("quote_translated"),
-                    "analysis": insight["analysis"],
-                    "dimension": insight.get("dimension"),
-                    "confidence": confidence  # [NEW] 置信度
-                })
+            valid_insights = self._validate_insights(insights)
             
             logger.debug(f"Extracted {len(valid_insights)} insights from review")
             return valid_insights
@@ -1927,10 +2382,14 @@ class TranslationService:
         self,
         title: Optional[str],
         body: str,
-        extract_insights: bool = True
+        extract_insights: bool = True,
+        rating: Optional[int] = None
     ) -> Tuple[Optional[str], str, Sentiment, List[dict]]:
         """
         Translate a complete review (title and body), analyze sentiment, and extract insights.
+        
+        Sentiment comes from the local engine (star rating + lexicon); only
+        low-confidence reviews fall through to the LLM.
         """
         # Translate title if present
         translated_title = None
@@ -1949,7 +2408,7 @@ class TranslationService:
             translated_body = ""
         
         # Analyze sentiment from original text (more accurate)
-        sentiment = self.analyze_sentiment(body)
+        sentiment = self.classify_sentiment(body, rating)
         
         # Extract insights
         insights = []
@@ -2192,6 +2651,146 @@ class TranslationService:
             logger.error(f"Product title translation failed: {e}")
             raise
 
+    # Valid theme types for 5W model (2026-01-14: 添加 buyer/user 拆分)
+    VALID_THEME_TYPES = {"buyer", "user", "who", "where", "when", "why", "what"}
+    
+    def _has_theme_schema(self, context_schema: Optional[dict]) -> bool:
+        """是否使用强制归类模式（标签库中至少有一类非空）"""
+        return bool(context_schema) and any(context_schema.get(t) for t in self.VALID_THEME_TYPES)
+    
+    def _build_theme_prompt(self, original_text: str, context_schema: dict = None) -> str:
+        """
+        构建5W主题提取 Prompt（有标签库 → 强制归类模式，否则开放提取模式）
+        
+        单条模式传入评论原文；批量模式传入 BATCH_INPUT_PLACEHOLDER，
+        再在末尾追加 THEME_BATCH_MODE_PROMPT。
+        """
+        valid_themes = self.VALID_THEME_TYPES
+        # 根据是否有标签库选择不同的 Prompt
+        # [UPDATED] 跨语言模式：只传入英文原文，AI 输出中文分析
+        if self._has_theme_schema(context_schema):
+            # 强制归类模式 - 使用标签库
+            schema_lines = []
+            for theme_type in valid_themes:
+                labels = context_schema.get(theme_type, [])
+                if labels:
+                    label_names = [l["name"] for l in labels if isinstance(l, dict) and l.get("name")]
+                    if label_names:
+                        schema_lines.append(f"- **{theme_type}**: {', '.join(label_names)}")
+
+            schema_str = "\n".join(schema_lines) if schema_lines else "（无标签库）"
+
+            prompt = THEME_EXTRACTION_PROMPT_WITH_SCHEMA.format(
+                original_text=original_text or "",
+                schema_str=schema_str
+            )
+            logger.debug(f"[跨语言5W] 使用强制归类模式，标签库包含 {len(schema_lines)} 个类型")
+        else:
+            # 开放提取模式 - 自由提取
+            prompt = THEME_EXTRACTION_PROMPT.format(
+                original_text=original_text or ""
+            )
+            logger.debug("[跨语言5W] 使用开放提取模式")
+        return prompt
+    
+    def _validate_themes(self, themes: dict, context_schema: dict = None) -> dict:
+        """
+        校验单条评论的5W主题结果（归类模式下 tag 必须在 allowed_labels 中）
+        """
+        valid_themes = self.VALID_THEME_TYPES
+        # 根据模式处理返回结果
+        valid_result = {}
+
+        if self._has_theme_schema(context_schema):
+            # [UPDATED] 强制归类模式 - 支持带证据的可解释归类
+            # 新格式: {"tag": "老年人", "quote": "...", "explanation": "..."}
+            for theme_type in valid_themes:
+                items = themes.get(theme_type, [])
+                if not isinstance(items, list):
+                    continue
+
+                # 获取该类型允许的标签
+                allowed_labels = {
+                    l["name"] for l in context_schema.get(theme_type, []) 
+                    if isinstance(l, dict) and l.get("name")
+                }
+
+                valid_items = []
+                for item in items:
+                    if isinstance(item, dict):
+                        # 新格式: 带 tag/quote/quote_translated/confidence/explanation 的对象
+                        tag = item.get("tag") or item.get("content")
+                        if tag and tag.strip() in allowed_labels:
+                            # [UPDATED 2026-01-15] 添加 confidence 字段支持
+                            confidence = item.get("confidence", "high")
+                            # 验证 confidence 值
+                            if confidence not in ("high", "medium", "low"):
+                                confidence = "high"
+                            valid_items.append({
+                                "content": tag.strip(),  # 标准标签名
+                                "content_original": item.get("quote") or item.get("content_original"),  # 原文证据
+                                "quote_translated": item.get("quote_translated"),  # [NEW] 中文翻译证据
+                                "content_translated": item.get("content_translated"),  # 翻译（可选，向后兼容）
+                                "explanation": item.get("explanation"),  # 归类理由
+                                "confidence": confidence  # [NEW] 置信度
+                            })
+                    elif isinstance(item, str):
+                        # 兼容旧格式: 纯字符串
+                        if item.strip() in allowed_labels:
+                            valid_items.append({
+                                "content": item.strip(),
+                                "content_original": None,
+                                "content_translated": None,
+                                "explanation": f"命中标签库: {item.strip()}",
+                                "confidence": "high"  # 旧格式默认高置信度
+                            })
+
+                if valid_items:
+                    valid_result[theme_type] = valid_items
+                    logger.debug(f"  {theme_type}: {len(valid_items)} 个标签 (带证据)")
+        else:
+            # 开放提取模式 - 返回的是完整内容项
+            for theme_type, items in themes.items():
+                if theme_type not in valid_themes:
+                    continue
+                if not isinstance(items, list):
+                    continue
+
+                # Validate each item
+                valid_items = []
+                for item in items:
+                    if isinstance(item, dict) and "content" in item:
+                        # Ensure content is a non-empty string
+                        content = item.get("content", "").strip()
+                        if content:
+                            # [UPDATED 2026-01-15] 添加 confidence 字段支持
+                            confidence = item.get("confidence", "high")
+                            if confidence not in ("high", "medium", "low"):
+                                confidence = "high"
+                            # Build valid item
+                            valid_item = {
+                                "content": content,
+                                "content_original": item.get("content_original") or None,
+                                "content_translated": item.get("content_translated") or None,
+                                "explanation": item.get("explanation") or None,
+                                "confidence": confidence  # [NEW] 置信度
+                            }
+                            valid_items.append(valid_item)
+                    elif isinstance(item, str):
+                        # Backward compatibility: if item is a string, convert to new format
+                        if item.strip():
+                            valid_items.append({
+                                "content": item.strip(),
+                                "content_original": None,
+                                "content_translated": None,
+                                "explanation": None,
+                                "confidence": "high"  # 旧格式默认高置信度
+                            })
+
+                if valid_items:
+                    valid_result[theme_type] = valid_items
+        return valid_result
+    
     @retry(
         stop=stop_after_attempt(2),
         wait=wait_exponential(multiplier=1, min=2, max=10),
@@ -2236,35 +2835,8 @@ class TranslationService:
         if not original_text or len(original_text.strip()) < 10:
             return {}
         
-        # [UPDATED] Valid theme types for 5W model (2026-01-14: 添加 buyer/user 拆分)
-        valid_themes = {"buyer", "user", "who", "where", "when", "why", "what"}
-        
         try:
-            # 根据是否有标签库选择不同的 Prompt
-            # [UPDATED] 跨语言模式：只传入英文原文，AI 输出中文分析
-            if context_schema and any(context_schema.get(t) for t in valid_themes):
-                # 强制归类模式 - 使用标签库
-                schema_lines = []
-                for theme_type in valid_themes:
-                    labels = context_schema.get(theme_type, [])
-                    if labels:
-                        label_names = [l["name"] for l in labels if isinstance(l, dict) and l.get("name")]
-                        if label_names:
-                            schema_lines.append(f"- **{theme_type}**: {', '.join(label_names)}")
-                
-                schema_str = "\n".join(schema_lines) if schema_lines else "（无标签库）"
-                
-                prompt = THEME_EXTRACTION_PROMPT_WITH_SCHEMA.format(
-                    original_text=original_text or "",
-                    schema_str=schema_str
-                )
-                logger.debug(f"[跨语言5W] 使用强制归类模式，标签库包含 {len(schema_lines)} 个类型")
-            else:
-                # 开放提取模式 - 自由提取
-                prompt = THEME_EXTRACTION_PROMPT.format(
-                    original_text=original_text or ""
-                )
-                logger.debug("[跨语言5W] 使用开放提取模式")
+            prompt = self._build_theme_prompt(original_text, context_schema)
             
             response = self.client.chat.completions.create(
                 model=self.model,
@@ -2285,97 +2857,7 @@ class TranslationService:
                 logger.warning(f"Parsed themes is not a dict: {type(themes)}")
                 return {}
             
-            # 根据模式处理返回结果
-            valid_result = {}
-            
-            if context_schema and any(context_schema.get(t) for t in valid_themes):
-                # [UPDATED] 强制归类模式 - 支持带证据的可解释归类
-                # 新格式: {"tag": "老年人", "quote": "...", "explanation": "..."}
-                for theme_type in valid_themes:
-                    items = themes.get(theme_type, [])
-                    if not isinstance(items, list):
-                        continue
-                    
-                    # 获取该类型允许的标签
-                    allowed_labels = {
-                        l["name"] for l in context_schema.get(theme_type, []) 
-                        if isinstance(l, dict) and l.get("name")
-                    }
-                    
-                    valid_items = []
-                    for item in items:
-                        if isinstance(item, dict):
-                            # 新格式: 带 tag/quote/quote_translated/confidence/explanation 的对象
-                            tag = item.get("tag") or item.get("content")
-                            if tag and tag.strip() in allowed_labels:
-                                # [UPDATED 2026-01-15] 添加 confidence 字段支持
-                                confidence = item.get("confidence", "high")
-                                # 验证 confidence 值
-                                if confidence not in ("high", "medium", "low"):
-                                    confidence = "high"
-                                valid_items.append({
-                                    "content": tag.strip(),  # 标准标签名
-                                    "content_original": item.get("quote") or item.get("content_original"),  # 原文证据
-                                    "quote_translated": item.get("quote_translated"),  # [NEW] 中文翻译证据
-                                    "content_translated": item.get("content_translated"),  # 翻译（可选，向后兼容）
-                                    "explanation": item.get("explanation"),  # 归类理由
-                                    "confidence": confidence  # [NEW] 置信度
-                                })
-                        elif isinstance(item, str):
-                            # 兼容旧格式: 纯字符串
-                            if item.strip() in allowed_labels:
-                                valid_items.append({
-                                    "content": item.strip(),
-                                    "content_original": None,
-                                    "content_translated": None,
-                                    "explanation": f"命中标签库: {item.strip()}",
-                                    "confidence": "high"  # 旧格式默认高置信度
-                                })
-                    
-                    if valid_items:
-                        valid_result[theme_type] = valid_items
-                        logger.debug(f"  {theme_type}: {len(valid_items)} 个标签 (带证据)")
-            else:
-                # 开放提取模式 - 返回的是完整内容项
-                for theme_type, items in themes.items():
-                    if theme_type not in valid_themes:
-                        continue
-                    if not isinstance(items, list):
-                        continue
-                    
-                    # Validate each item
-                    valid_items = []
-                    for item in items:
-                        if isinstance(item, dict) and "content" in item:
-                            # Ensure content is a non-empty string
-                            content = item.get("content", "").strip()
-                            if content:
-                                # [UPDATED 2026-01-15] 添加 confidence 字段支持
-                                confidence = item.get("confidence", "high")
-                                if confidence not in ("high", "medium", "low"):
-                                    confidence = "high"
-                                # Build valid item
-                                valid_item = {
-                                    "content": content,
-                                    "content_original": item.get("content_original") or None,
-                                    "content_translated": item.get("content_translated") or None,
-                                    "explanation": item.get("explanation") or None,
-                                    "confidence": confidence  # [NEW] 置信度
-                                }
-                                valid_items.append(valid_item)
-                        elif isinstance(item, str):
-                            # Backward compatibility: if item is a string, convert to new format
-                            if item.strip():
-                                valid_items.append({
-                                    "content": item.strip(),
-                                    "content_original": None,
-                                    "content_translated": None,
-                                    "explanation": None,
-                                    "confidence": "high"  # 旧格式默认高置信度
-                                })
-                    
-                    if valid_items:
-                        valid_result[theme_type] = valid_items
+            valid_result = self._validate_themes(themes, context_schema)
             
             logger.debug(f"Extracted themes: {list(valid_result.keys())}")
             return valid_result
@@ -2383,6 +2865,309 @@ class TranslationService:
         except Exception as e:
             logger.warning(f"Theme extraction failed: {e}")
             return {}
+
+    # ==========================================================================
+    # 🔥 多评论批量分析（洞察 / 5W 主题）
+    # ==========================================================================
+    
+    def _prepare_analysis_batch(self, reviews: List[dict], min_length: int = 1) -> dict:
+        """将 [{"id", "text"}] 整理为 {id: 清理空白后的原文}，跳过过短的评论"""
+        input_dict = {}
+        for review in reviews:
+            review_id = str(review.get("id", ""))
+            text = " ".join((review.get("text") or "").split())
+            if review_id and len(text) >= min_length:
+                input_dict[review_id] = text
+        return input_dict
+    
+    def extract_insights_batch(self, reviews: List[dict], dimension_schema=None) -> dict:
+        """
+        批量洞察提取：K 条评论共享一份维度 Schema，一次 API 调用
+        
+        Args:
+            reviews: [{"id": "xxx", "text": "英文原文"}, ...]
+            dimension_schema: 同 extract_insights
+        
+        Returns:
+            {id: [洞察, ...]}，只包含解析成功且至少有 1 条有效洞察的评论
+        """
+        if not self._check_client():
+            return {}
+        
+        input_dict = self._prepare_analysis_batch(reviews)
+        if not input_dict:
+            return {}
+        
+        prompt = self._build_insight_prompt(BATCH_INPUT_PLACEHOLDER, dimension_schema) + INSIGHT_BATCH_MODE_PROMPT.format(
+            count=len(input_dict),
+            reviews_json=json.dumps(input_dict, ensure_ascii=False)
+        )
+        
+        response = self.client.chat.completions.create(
+            model=self.model,
+            messages=[
+                {"role": "user", "content": prompt}
+            ],
+            temperature=0.2,
+            max_tokens=8000,
+            timeout=120.0,
+        )
+        
+        result_text = response.choices[0].message.content.strip()
+        parsed = parse_json_safely(result_text)
+        if not isinstance(parsed, dict):
+            logger.warning(f"[批量洞察] 无法解析结果: {result_text[:300]}")
+            return {}
+        
+        results = {}
+        for review_id in input_dict:
+            insights = parsed.get(review_id)
+            if not isinstance(insights, list):
+                continue
+            valid_insights = self._validate_insights(insights)
+            if valid_insights:
+                results[review_id] = valid_insights
+        
+        logger.debug(f"[批量洞察] 输入 {len(input_dict)} 条, 校验通过 {len(results)} 条")
+        return results
+    
+    def extract_insights_batch_with_fallback(self, reviews: List[dict], dimension_schema=None) -> dict:
+        """
+        批量洞察提取，缺失的 ID 单条回退（extract_insights）
+        
+        Returns:
+            {id: [洞察, ...]}，每条有原文的评论都会出现（单条回退失败时为空列表）
+        """
+        results = {}
+        try:
+            results.update(self.extract_insights_batch(reviews, dimension_schema))
+        except Exception as e:
+            logger.warning(f"[批量洞察] 批量模式失败，降级为单条: {e}")
+        
+        fallback_count = 0
+        for review in reviews:
+            review_id = str(review.get("id", ""))
+            text = review.get("text") or ""
+            if not review_id or review_id in results or not text.strip():
+                continue
+            fallback_count += 1
+            results[review_id] = self.extract_insights(text, dimension_schema=dimension_schema)
+        
+        if fallback_count:
+            logger.info(f"[批量洞察] 单条回退 {fallback_count}/{len(reviews)} 条")
+        return results
+    
+    def extract_themes_batch(self, reviews: List[dict], context_schema: dict = None) -> dict:
+        """
+        批量5W主题提取：K 条评论共享一份标签库 Schema，一次 API 调用
+        
+        Args:
+            reviews: [{"id": "xxx", "text": "英文原文"}, ...]
+            context_schema: 同 extract_themes
+        
+        Returns:
+            {id: 主题字典}，只包含解析成功的评论（空字典表示 AI 判定无主题，也是有效结果）
+        """
+        if not self._check_client():
+            return {}
+        
+        # 与单条模式一致：过短评论直接判定为无主题，不占用 LLM 调用
+        results = {
+            str(review.get("id")): {}
+            for review in reviews
+            if review.get("id") and len((review.get("text") or "").strip()) < 10
+        }
+        input_dict = self._prepare_analysis_batch(reviews, min_length=10)
+        if not input_dict:
+            return results
+        
+        prompt = self._build_theme_prompt(BATCH_INPUT_PLACEHOLDER, context_schema) + THEME_BATCH_MODE_PROMPT.format(
+            count=len(input_dict),
+            reviews_json=json.dumps(input_dict, ensure_ascii=False)
+        )
+        
+        response = self.client.chat.completions.create(
+            model=self.model,
+            messages=[
+                {"role": "user", "content": prompt}
+            ],
+            temperature=0.2,
+            max_tokens=8000,
+            timeout=120.0,
+        )
+        
+        result_text = response.choices[0].message.content.strip()
+        parsed = parse_json_safely(result_text)
+        if not isinstance(parsed, dict):
+            logger.warning(f"[批量5W] 无法解析结果: {result_text[:300]}")
+            return results
+        
+        for review_id in input_dict:
+            themes = parsed.get(review_id)
+            if isinstance(themes, dict):
+                results[review_id] = self._validate_themes(themes, context_schema)
+        
+        logger.debug(f"[批量5W] 输入 {len(input_dict)} 条, 解析成功 {len(results)} 条")
+        return results
+    
+    def extract_themes_batch_with_fallback(self, reviews: List[dict], context_schema: dict = None) -> dict:
+        """
+        批量5W主题提取，缺失的 ID 单条回退（extract_themes）
+        
+        Returns:
+            {id: 主题字典}，每条评论都会出现（单条回退失败时为空字典）
+        """
+        results = {}
+        try:
+            results.update(self.extract_themes_batch(reviews, context_schema))
+        except Exception as e:
+            logger.warning(f"[批量5W] 批量模式失败，降级为单条: {e}")
+        
+        fallback_count = 0
+        for review in reviews:
+            review_id = str(review.get("id", ""))
+            if not review_id or review_id in results:
+                continue
+            fallback_count += 1
+            results[review_id] = self.extract_themes(review.get("text") or "", context_schema=context_schema)
+        
+        if fallback_count:
+            logger.info(f"[批量5W] 单条回退 {fallback_count}/{len(reviews)} 条")
+        return results
+    
+    def extract_insights_and_themes_batch(
+        self,
+        reviews: List[dict],
+        dimension_schema=None,
+        context_schema: dict = None
+    ) -> dict:
+        """
+        融合批量分析：一次调用同时返回洞察（ReviewInsight）和5W主题（ReviewThemeHighlight）
+        
+        两部分分别用 _validate_insights / _validate_themes 校验，规则与单独提取完全一致。
+        
+        Args:
+            reviews: [{"id": "xxx", "text": "英文原文"}, ...]
+        
+        Returns:
+            {id: {"insights": [...] 或 None, "themes": {...} 或 None}}
+            None 表示该部分缺失或未通过校验，由调用方回退
+        """
+        if not self._check_client():
+            return {}
+        
+        input_dict = self._prepare_analysis_batch(reviews)
+        if not input_dict:
+            return {}
+        
+        prompt = FUSED_ANALYSIS_BATCH_PROMPT.format(
+            insight_prompt=self._build_insight_prompt(BATCH_INPUT_PLACEHOLDER, dimension_schema),
+            theme_prompt=self._build_theme_prompt(BATCH_INPUT_PLACEHOLDER, context_schema),
+            count=len(input_dict),
+            reviews_json=json.dumps(input_dict, ensure_ascii=False)
+        )
+        
+        response = self.client.chat.completions.create(
+            model=self.model,
+            messages=[
+                {"role": "user", "content": prompt}
+            ],
+            temperature=0.2,
+            max_tokens=8000,
+            timeout=180.0,
+        )
+        
+        result_text = response.choices[0].message.content.strip()
+        parsed = parse_json_safely(result_text)
+        if not isinstance(parsed, dict):
+            logger.warning(f"[融合分析] 无法解析结果: {result_text[:300]}")
+            return {}
+        
+        results = {}
+        for review_id, text in input_dict.items():
+            item = parsed.get(review_id)
+            if not isinstance(item, dict):
+                continue
+            
+            insights = None
+            if isinstance(item.get("insights"), list):
+                insights = self._validate_insights(item["insights"]) or None
+            
+            themes = None
+            if len(text) < 10:
+                themes = {}  # 与单条模式一致：过短评论判定为无主题
+            elif isinstance(item.get("themes"), dict):
+                themes = self._validate_themes(item["themes"], context_schema)
+            
+            results[review_id] = {"insights": insights, "themes": themes}
+        
+        logger.debug(f"[融合分析] 输入 {len(input_dict)} 条, 解析成功 {len(results)} 条")
+        return results
+    
+    def extract_insights_and_themes_batch_with_fallback(
+        self,
+        reviews: List[dict],
+        dimension_schema=None,
+        context_schema: dict = None
+    ) -> dict:
+        """
+        融合批量分析，兼容已由独立任务完成的部分
+        
+        Args:
+            reviews: [{"id": "xxx", "text": "英文原文", "insights": True, "themes": True}, ...]
+                     insights / themes 表示该评论还需要哪一部分（缺省为 True）
+        
+        Returns:
+            {id: {"insights": [...] 或 None, "themes": {...} 或 None}}
+            None 表示该部分不需要（已存在）
+        
+        策略：
+        1. 两部分都缺的评论 → 融合调用
+        2. 只缺一部分、或融合结果中该部分无效 → 走对应的批量提取（带单条回退）
+        """
+        results = {
+            str(review["id"]): {"insights": None, "themes": None}
+            for review in reviews if review.get("id")
+        }
+        
+        # 1. 两部分都缺 → 融合调用
+        fused_input = [r for r in reviews if r.get("insights", True) and r.get("themes", True)]
+        if fused_input:
+            try:
+                for review_id, item in self.extract_insights_and_themes_batch(
+                    fused_input, dimension_schema, context_schema
+                ).items():
+                    results[review_id].update(item)
+            except Exception as e:
+                logger.warning(f"[融合分析] 融合模式失败，降级为分别提取: {e}")
+        
+        # 2. 缺失部分分别补齐
+        need_insights = [
+            r for r in reviews
+            if r.get("insights", True) and results[str(r["id"])]["insights"] is None
+        ]
+        need_themes = [
+            r for r in reviews
+            if r.get("themes", True) and results[str(r["id"])]["themes"] is None
+        ]
+        
+        if need_insights:
+            for review_id, insights in self.extract_insights_batch_with_fallback(
+                need_insights, dimension_schema
+            ).items():
+                results[review_id]["insights"] = insights
+        
+        if need_themes:
+            for review_id, themes in self.extract_themes_batch_with_fallback(
+                need_themes, context_schema
+            ).items():
+                results[review_id]["themes"] = themes
+        
+        if need_insights or need_themes:
+            logger.info(
+                f"[融合分析] {len(reviews)} 条中分别补齐: 洞察 {len(need_insights)} 条, 主题 {len(need_themes)} 条"
+            )
+        return results
     
     @retry(
         stop=stop_after_attempt(2),
@@ -0,0 +1,432 @@
+"""
+翻译记忆库 (Translation Memory)
+
+亚马逊评论中存在大量相同或近似的短正文（"Great product!"、"Works as described"），
+以前每个 ASIN 都会重新翻译一遍。本模块在 translate_text / translate_batch 前加一层
+内容寻址的译文缓存，跨产品复用。
+
+设计理念：
+1. 内容寻址：key = sha256(模型 | 提示词版本 | 命名空间 | 归一化原文)，
+   换模型或改提示词后自动失效，无需手工清理
+2. 两级存储：Redis 热层（滑动 TTL + 实例级 allkeys-lru 淘汰）→ Postgres 持久层（回填 Redis）
+3. Single-flight：同一原文的并发请求只发起一次 LLM 调用。
+   占位锁用 Redis SET NX，同时覆盖同进程的 gevent 协程和跨 Worker 进程；
+   拿不到锁的调用方轮询等待结果，超时后才自行翻译
+4. 指标：查询数 / Redis 命中 / Postgres 命中 / 未命中 / 节省的调用 / 合并等待，存 Redis Hash
+
+任何一层出错都只降级为"未命中"，不影响翻译主流程。
+"""
+import hashlib
+import logging
+import time
+from typing import Callable, Dict, List, Optional
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+# ==========================================
+# Key 前缀常量
+# ==========================================
+KEY_PREFIX_TRANSLATION_MEMORY = "tm:"          # 译文缓存
+KEY_PREFIX_TRANSLATION_LOCK = "tm:lock:"       # single-flight 占位锁
+KEY_TRANSLATION_MEMORY_METRICS = "tm:metrics"  # 命中率指标 Hash
+
+METRIC_FIELDS = ("lookups", "redis_hits", "db_hits", "misses", "saved_calls", "singleflight_waits", "stores")
+
+
+def normalize_source(text: Optional[str]) -> str:
+    """归一化原文：合并空白、去首尾空白（保留大小写：专有名词、缩写、强调语气的大写会影响译文）"""
+    return " ".join((text or "").split())
+
+
+class TranslationMemory:
+    """
+    翻译记忆库（Redis + Postgres 两级，带 single-flight）
+
+    namespace 用于区分同一模型下的不同翻译任务（如评论正文 vs 商品标题），
+    避免不同提示词产出的译文互相覆盖。
+    """
+
+    # single-flight 等待轮询间隔（秒）
+    WAIT_POLL_INTERVAL = 0.2
+
+    def __init__(self, model: Optional[str] = None, prompt_version: str = "v1"):
+        self.model = model or settings.QWEN_MODEL
+        self.prompt_version = prompt_version
+        self.enabled = settings.TRANSLATION_MEMORY_ENABLED
+        self.ttl_seconds = settings.TRANSLATION_MEMORY_TTL_DAYS * 86400
+        self.lock_ms = settings.TRANSLATION_MEMORY_LOCK_SECONDS * 1000
+        self.max_chars = settings.TRANSLATION_MEMORY_MAX_CHARS
+
+    # ==========================================
+    # 基础设施
+    # ==========================================
+
+    def _redis(self):
+        from app.core.redis import get_sync_redis
+        return get_sync_redis()
+
+    def _db(self):
+        """
+        同步 Session（复用 worker 模块的 sync_engine 连接池，计入 get_db_pool_stats）
+
+        API 进程启动时已导入 app.worker（派发 Celery 任务），这里不再单独建连接池。
+        """
+        from app.worker import get_sync_db
+        return get_sync_db()
+
+    def _incr(self, **counts):
+        """累加指标（失败静默）"""
+        counts = {k: v for k, v in counts.items() if v}
+        if not counts:
+            return
+        try:
+            pipe = self._redis().pipeline(transaction=False)
+            for field, value in counts.items():
+                pipe.hincrby(KEY_TRANSLATION_MEMORY_METRICS, field, value)
+            pipe.execute()
+        except Exception as e:
+            logger.debug(f"[翻译记忆] 指标写入失败: {e}")
+
+    def cacheable(self, text: Optional[str]) -> bool:
+        """是否适合进入翻译记忆（空文本、超长文本不缓存）"""
+        return self.enabled and bool(text and text.strip()) and len(text) <= self.max_chars
+
+    def key_for(self, text: str, namespace: str = "review") -> str:
+        """计算内容寻址 hash（不含 Redis 前缀）"""
+        raw = f"{self.model}|{self.prompt_version}|{namespace}|{normalize_source(text)}"
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    # ==========================================
+    # 读写
+    # ==========================================
+
+    def get_many(self, hashes: List[str]) -> Dict[str, str]:
+        """
+        批量读取译文：先 Redis（命中即续期），未命中再查 Postgres 并回填 Redis
+
+        Returns:
+            {hash: 译文}（只包含命中项）
+        """
+        hashes = list(dict.fromkeys(hashes))
+        if not self.enabled or not hashes:
+            return {}
+
+        found: Dict[str, str] = {}
+
+        # 1. Redis 热层（GETEX 读取并滑动续期）
+        try:
+            pipe = self._redis().pipeline(transaction=False)
+            for h in hashes:
+                pipe.getex(f"{KEY_PREFIX_TRANSLATION_MEMORY}{h}", ex=self.ttl_seconds)
+            for h, value in zip(hashes, pipe.execute()):
+                if value:
+                    found[h] = value
+        except Exception as e:
+            logger.warning(f"[翻译记忆] Redis 读取失败，降级查询 Postgres: {e}")
+        redis_hits = len(found)
+
+        # 2. Postgres 持久层
+        missing = [h for h in hashes if h not in found]
+        if missing:
+            found.update(self._db_get_many(missing))
+
+        self._incr(
+            lookups=len(hashes),
+            redis_hits=redis_hits,
+            db_hits=len(found) - redis_hits,
+            misses=len(hashes) - len(found),
+        )
+        return found
+
+    def _db_get_many(self, hashes: List[str]) -> Dict[str, str]:
+        """从 Postgres 读取并回填 Redis，同时更新命中计数"""
+        from sqlalchemy import select, update, func
+        from app.models.translation_memory import TranslationMemoryEntry
+
+        try:
+            db = self._db()
+            try:
+                rows = db.execute(
+                    select(TranslationMemoryEntry.source_hash, TranslationMemoryEntry.translated_text)
+                    .where(TranslationMemoryEntry.source_hash.in_(hashes))
+                ).all()
+                found = {row.source_hash: row.translated_text for row in rows}
+                if found:
+                    db.execute(
+                        update(TranslationMemoryEntry)
+                        .where(TranslationMemoryEntry.source_hash.in_(list(found.keys())))
+                        .values(
+                            hit_count=TranslationMemoryEntry.hit_count + 1,
+                            last_used_at=func.now()
+                        )
+                    )
+                    db.commit()
+            finally:
+                db.close()
+        except Exception as e:
+            logger.warning(f"[翻译记忆] Postgres 读取失败: {e}")
+            return {}
+
+        if found:
+            self._redis_put_many(found)
+        return found
+
+    def _redis_put_many(self, entries: Dict[str, str]):
+        try:
+            pipe = self._redis().pipeline(transaction=False)
+            for h, translated in entries.items():
+                pipe.set(f"{KEY_PREFIX_TRANSLATION_MEMORY}{h}", translated, ex=self.ttl_seconds)
+            pipe.execute()
+        except Exception as e:
+            logger.warning(f"[翻译记忆] Redis 写入失败: {e}")
+
+    def put_many(self, entries: Dict[str, tuple]):
+        """
+        批量写入译文（Redis + Postgres upsert）
+
+        Args:
+            entries: {hash: (原文, 译文)}
+        """
+        entries = {h: pair for h, pair in entries.items() if pair[1] and pair[1].strip()}
+        if not self.enabled or not entries:
+            return
+
+        self._redis_put_many({h: translated for h, (_, translated) in entries.items()})
+
+        from sqlalchemy import func
+        from sqlalchemy.dialects.postgresql import insert
+        from app.models.translation_memory import TranslationMemoryEntry
+
+        try:
+            db = self._db()
+            try:
+                stmt = insert(TranslationMemoryEntry).values([
+                    {
+                        "source_hash": h,
+                        "source_text": normalize_source(source),
+                        "translated_text": translated,
+                        "model": self.model,
+                        "prompt_version": self.prompt_version,
+                    }
+                    for h, (source, translated) in entries.items()
+                ])
+                stmt = stmt.on_conflict_do_update(
+                    index_elements=[TranslationMemoryEntry.source_hash],
+                    set_={"translated_text": stmt.excluded.translated_text, "last_used_at": func.now()}
+                )
+                db.execute(stmt)
+                db.commit()
+            finally:
+                db.close()
+        except Exception as e:
+            logger.warning(f"[翻译记忆] Postgres 写入失败: {e}")
+
+        self._incr(stores=len(entries))
+
+    # ==========================================
+    # Single-flight
+    # ==========================================
+
+    def claim(self, h: str) -> bool:
+        """抢占某条原文的翻译权；Redis 不可用时视为抢占成功（退化为无合并）"""
+        try:
+            return bool(self._redis().set(
+                f"{KEY_PREFIX_TRANSLATION_LOCK}{h}", "1", nx=True, px=self.lock_ms
+            ))
+        except Exception:
+            return True
+
+    def release(self, hashes: List[str]):
+        if not hashes:
+            return
+        try:
+            self._redis().delete(*[f"{KEY_PREFIX_TRANSLATION_LOCK}{h}" for h in hashes])
+        except Exception as e:
+            logger.debug(f"[翻译记忆] 释放占位锁失败: {e}")
+
+    def wait_for(self, hashes: List[str], timeout: Optional[float] = None) -> Dict[str, str]:
+        """
+        等待其他调用方完成翻译（轮询 Redis；gevent 下 time.sleep 会让出协程）
+
+        占位锁消失（对方完成或失败）或超时后返回已得到的译文。
+        """
+        if not hashes:
+            return {}
+        timeout = self.lock_ms / 1000 if timeout is None else timeout
+        deadline = time.monotonic() + timeout
+        pending = list(dict.fromkeys(hashes))
+        found: Dict[str, str] = {}
+
+        try:
+            redis_client = self._redis()
+            while pending and time.monotonic() < deadline:
+                pipe = redis_client.pipeline(transaction=False)
+                for h in pending:
+                    pipe.get(f"{KEY_PREFIX_TRANSLATION_MEMORY}{h}")
+                    pipe.exists(f"{KEY_PREFIX_TRANSLATION_LOCK}{h}")
+                values = pipe.execute()
+
+                still_pending = []
+                for i, h in enumerate(pending):
+                    value, locked = values[2 * i], values[2 * i + 1]
+                    if value:
+                        found[h] = value
+                    elif locked:
+                        still_pending.append(h)
+                pending = still_pending
+                if pending:
+                    time.sleep(self.WAIT_POLL_INTERVAL)
+        except Exception as e:
+            logger.warning(f"[翻译记忆] 等待合并结果失败: {e}")
+
+        self._incr(singleflight_waits=len(hashes))
+        return found
+
+    # ==========================================
+    # 调用入口
+    # ==========================================
+
+    def get_or_translate(
+        self,
+        text: str,
+        translate_fn: Callable[[str], str],
+        namespace: str = "review"
+    ) -> str:
+        """
+        单条：命中直接返回，否则 single-flight 调用 translate_fn 并写入记忆
+        """
+        if not self.cacheable(text):
+            return translate_fn(text)
+
+        h = self.key_for(text, namespace)
+        cached = self.get_many([h]).get(h)
+        if cached:
+            self._incr(saved_calls=1)
+            return cached
+
+        if not self.claim(h):
+            waited = self.wait_for([h]).get(h)
+            if waited:
+                self._incr(saved_calls=1)
+                return waited
+            logger.debug(f"[翻译记忆] 等待超时，自行翻译: {text[:50]}")
+
+        try:
+            translated = translate_fn(text)
+            if translated:
+                self.put_many({h: (text, translated)})
+            return translated
+        finally:
+            self.release([h])
+
+    def translate_many(
+        self,
+        texts: Dict[str, str],
+        batch_fn: Callable[[Dict[str, str]], Dict[str, str]],
+        namespace: str = "review"
+    ) -> Dict[str, str]:
+        """
+        批量：只把未命中、且本调用方抢到翻译权的原文交给 batch_fn
+
+        同一批内相同原文只发送一次；被其他调用方占位的原文等待其结果。
+        等待超时仍未拿到的条目不会出现在返回值中，由调用方的单条回退处理。
+
+        Args:
+            texts: {id: 原文}
+            batch_fn: 接收 {id: 原文}、返回 {id: 译文} 的批量翻译函数
+
+        Returns:
+            {id: 译文}
+        """
+        if not self.enabled:
+            return batch_fn(texts) if texts else {}
+
+        hash_ids: Dict[str, List[str]] = {}
+        uncacheable: Dict[str, str] = {}
+        for item_id, text in texts.items():
+            if self.cacheable(text):
+                hash_ids.setdefault(self.key_for(text, namespace), []).append(item_id)
+            else:
+                uncacheable[item_id] = text
+
+        # 1. 查询记忆
+        found = self.get_many(list(hash_ids.keys()))
+
+        # 2. 未命中的原文：抢占翻译权（批内去重）
+        owned, foreign = [], []
+        for h in hash_ids:
+            if h not in found:
+                (owned if self.claim(h) else foreign).append(h)
+
+        # 3. 一次 LLM 调用翻译自己负责的原文（+ 不可缓存的长文本）
+        request = {hash_ids[h][0]: texts[hash_ids[h][0]] for h in owned}
+        request.update(uncacheable)
+        translated: Dict[str, str] = {}
+        try:
+            if request:
+                translated = batch_fn(request)
+            fresh = {
+                h: (texts[hash_ids[h][0]], translated[hash_ids[h][0]])
+                for h in owned if translated.get(hash_ids[h][0])
+            }
+            self.put_many(fresh)
+            found.update({h: pair[1] for h, pair in fresh.items()})
+        finally:
+            self.release(owned)
+
+        # 4. 等待其他调用方正在翻译的原文
+        if foreign:
+            found.update(self.wait_for(foreign))
+
+        # 5. 展开到每个 id
+        result = {item_id: translated[item_id] for item_id in uncacheable if translated.get(item_id)}
+        saved = 0
+        for h, ids in hash_ids.items():
+            if h in found:
+                for item_id in ids:
+                    result[item_id] = found[h]
+                saved += len(ids) - (1 if h in owned else 0)
+        self._incr(saved_calls=saved)
+
+        if texts:
+            logger.debug(
+                f"[翻译记忆] 批量 {len(texts)} 条：命中/合并 {saved} 条，实际发送 {len(request)} 条"
+            )
+        return result
+
+    # ==========================================
+    # 指标
+    # ==========================================
+
+    def get_metrics(self) -> dict:
+        """读取命中率指标"""
+        try:
+            raw = self._redis().hgetall(KEY_TRANSLATION_MEMORY_METRICS) or {}
+        except Exception as e:
+            logger.warning(f"[翻译记忆] 指标读取失败: {e}")
+            raw = {}
+        metrics = {field: int(raw.get(field, 0)) for field in METRIC_FIELDS}
+        lookups = metrics["lookups"]
+        metrics["hit_rate"] = round((metrics["redis_hits"] + metrics["db_hits"]) / lookups, 4) if lookups else 0.0
+        metrics["redis_hit_rate"] = round(metrics["redis_hits"] / lookups, 4) if lookups else 0.0
+        metrics["enabled"] = self.enabled
+        metrics["model"] = self.model
+        metrics["prompt_version"] = self.prompt_version
+        return metrics
+
+    def reset_metrics(self):
+        try:
+            self._redis().delete(KEY_TRANSLATION_MEMORY_METRICS)
+        except Exception as e:
+            logger.warning(f"[翻译记忆] 指标重置失败: {e}")
+
+
+# 翻译提示词版本：修改 TRANSLATION_SYSTEM_PROMPT / BATCH_TRANSLATION_SYSTEM_PROMPT 或归一化规则时递增，旧译文自动失效
+# v2：归一化不再大小写折叠
+TRANSLATION_MEMORY_VERSION = "v2"
+
+# Singleton instance
+translation_memory = TranslationMemory(prompt_version=TRANSLATION_MEMORY_VERSION)
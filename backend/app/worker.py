@@ -7,8 +7,11 @@ This module handles asynchronous processing of reviews:
 3. Database updates
 """
 import logging
+import os
 import time
 import random
+import uuid
+from collections import namedtuple
 from typing import Optional
 from functools import wraps
 from uuid import UUID
@@ -29,22 +32,15 @@ logger = logging.getLogger(__name__)
 
 class ReviewClassifier:
     """
-    评论分类器：根据评论长度和质量分类，采用差异化翻译策略
+    评论分类器：根据评论长度和质量分类（用于翻译统计）
     
     分类标准：
     - VIP 评论：长评论（> 200字）或极端星级的详细评论（1/5星 且 > 100字）
-      → 单独翻译，保证质量
-    
     - 标准评论：中等长度（50-200字）
-      → 5条一批翻译，平衡质量和效率
-    
     - 短评论：简短表达（≤ 50字）
-      → 20条一批翻译，最大化效率
     
-    优势：
-    - 质量保证：重要评论单独翻译，不降低质量
-    - 效率最大化：短评论大批量处理，QPS 消耗降低 20 倍
-    - 灵活平衡：中等评论适度批量，兼顾质量和效率
+    批量大小不再按分类固定（VIP=1/标准=5/短评=20），
+    改由 TokenBatchPacker 按 token 预算装箱，长评论自动分片。
     """
     
     # 可配置的分类阈值
@@ -57,11 +53,6 @@ class ReviewClassifier:
     
     SHORT_MAX_LENGTH = 50             # 短评论最高字数
     
-    # 批量大小配置
-    BATCH_SIZE_VIP = 1       # VIP 评论：单独翻译
-    BATCH_SIZE_STANDARD = 5  # 标准评论：5 条一批
-    BATCH_SIZE_SHORT = 20    # 短评论：20 条一批
-    
     @classmethod
     def classify(cls, review) -> str:
         """
@@ -93,16 +84,6 @@ class ReviewClassifier:
         # 标准评论（默认）
         return 'standard'
     
-    @classmethod
-    def get_batch_size(cls, category: str) -> int:
-        """获取批量大小"""
-        batch_sizes = {
-            'vip': cls.BATCH_SIZE_VIP,
-            'standard': cls.BATCH_SIZE_STANDARD,
-            'short': cls.BATCH_SIZE_SHORT
-        }
-        return batch_sizes.get(category, cls.BATCH_SIZE_STANDARD)
-    
     @classmethod
     def group_reviews(cls, reviews: list) -> dict:
         """
@@ -131,92 +112,50 @@ class ReviewClassifier:
 # ============================================================================
 # 🚦 全局 API 限流器（防止 QPS 冲高导致账号被封）
 # ============================================================================
+#
+# Redis Lua 令牌桶（app/core/rate_limiter.py）：
+# - 单次 EVALSHA 原子完成判断与扣减，并发协程不会冲过 MAX_API_RPS
+# - 同时限制请求数（MAX_API_RPS）与 token 数（MAX_API_TPM）
+# - 优先级车道：learning > analysis > translation
+# - LLM 传输层（app/core/llm.py）在每次请求前自动获取许可，业务代码无需手动调用
+#
+from app.core.rate_limiter import (
+    llm_rate_limiter,
+    llm_lane,
+    set_current_lane,
+    LANE_LEARNING,
+    LANE_ANALYSIS,
+    LANE_TRANSLATION,
+)
 
-class APIRateLimiter:
-    """
-    全局 API 限流器，防止瞬间 RPS 冲高
-    
-    策略：
-    - 使用 Redis 滑动窗口计数
-    - qwen-plus-latest: 40,000 RPM = 666 RPS
-    - 安全上限: 666 * 0.75 = 500 RPS（留 25% 余量）
-    - 支持分布式部署（多服务器共享 Redis 限流）
-    - 超过限制时，随机退避 0.05-0.2 秒
-    """
-    def __init__(self, redis_client, max_qps=200, window_seconds=1):
-        self.redis_client = redis_client
-        self.max_qps = max_qps
-        self.window_seconds = window_seconds
-        self.key_prefix = "api_rate_limit"
-    
-    def acquire(self, api_name="qwen"):
-        """
-        获取 API 调用许可
-        
-        Returns:
-            bool: True if allowed, False if rate limited
-        """
-        key = f"{self.key_prefix}:{api_name}"
-        current_time = time.time()
-        window_start = current_time - self.window_seconds
-        
-        # 清理过期计数
-        self.redis_client.zremrangebyscore(key, 0, window_start)
-        
-        # 检查当前窗口内的请求数
-        current_count = self.redis_client.zcard(key)
-        
-        if current_count >= self.max_qps:
-            # 超过限制，随机退避
-            backoff = random.uniform(0.1, 0.5)
-            logger.warning(f"[限流] API QPS 达到 {current_count}/{self.max_qps}，退避 {backoff:.2f}s")
-            time.sleep(backoff)
-            return False
-        
-        # 记录本次请求
-        self.redis_client.zadd(key, {str(current_time): current_time})
-        self.redis_client.expire(key, self.window_seconds * 2)  # 2 倍窗口时间过期
-        
-        return True
-    
-    def wait_and_acquire(self, api_name="qwen", max_retries=10):
-        """
-        等待直到获取到 API 调用许可
-        
-        Args:
-            api_name: API 名称
-            max_retries: 最大重试次数
-        """
-        for i in range(max_retries):
-            if self.acquire(api_name):
-                return True
-            time.sleep(random.uniform(0.05, 0.2))  # 短暂随机退避
-        
-        raise Exception(f"[限流] 无法获取 API 许可，已重试 {max_retries} 次")
-
-# Redis 客户端（用于分布式锁和限流）
+# Redis 客户端（用于分布式锁和缓存）
 redis_client = redis.from_url(settings.REDIS_URL, decode_responses=True)
 
 # 全局限流器实例
 # qwen-plus-latest: 40,000 RPM = 666 RPS，安全上限 500 RPS（留 25% 余量）
-import os
-MAX_API_RPS = int(os.environ.get('MAX_API_RPS', '500'))
-api_limiter = APIRateLimiter(redis_client, max_qps=MAX_API_RPS)
+MAX_API_RPS = settings.MAX_API_RPS
+api_limiter = llm_rate_limiter
+
+# 队列 → 优先级车道（任务开始时写入 contextvar，传输层据此选择车道）
+QUEUE_LLM_LANES = {
+    "learning": LANE_LEARNING,
+    "translation": LANE_TRANSLATION,
+}
 
-def rate_limited_api(api_name="qwen"):
+def rate_limited_api(api_name="qwen", lane=None, tokens=0):
     """
-    API 限流装饰器
+    API 限流装饰器（用于不经过共享 LLM 传输层的外部 API）
     
     用法：
-        @rate_limited_api("qwen")
+        @rate_limited_api("qwen", lane=LANE_LEARNING)
         def call_qwen_api():
             ...
     """
     def decorator(func):
         @wraps(func)
         def wrapper(*args, **kwargs):
-            # 等待获取 API 许可
-            api_limiter.wait_and_acquire(api_name)
+            # 等待获取 API 许可（精确睡到预约的时间片）
+            api_limiter.acquire(tokens=tokens, lane=lane)
             
             # 调用原函数
             return func(*args, **kwargs)
@@ -362,6 +301,9 @@ celery_app.conf.update(
         # ============== 1. 快车道：入库 (worker-base) ==============
         # 🏎️ 纯 CPU + 磁盘，保证 API 秒级响应
         "app.worker.task_process_ingestion_queue": {"queue": "ingestion"},
+        # 常驻消费者长期占用进程，独立队列 + 专属 worker-ingestion，不挤占 worker-base 的入库 / 报告槽位
+        "app.worker.task_consume_ingestion_stream": {"queue": "ingestion_stream"},
+        "app.worker.task_ensure_ingestion_consumers": {"queue": "ingestion"},
         "app.worker.task_check_pending_translations": {"queue": "ingestion"},
         
         # ============== 2. VIP 快车道：学习建模 (worker-vip) ==============
@@ -383,6 +325,10 @@ celery_app.conf.update(
         # 🏷️ 主攻主题提取，闲时支援建模
         "app.worker.task_extract_themes": {"queue": "theme_extraction"},
         
+        # ============== 5.1. 融合：洞察 + 主题一次提取 (worker-insight) ==============
+        # 🔗 可选阶段（FUSED_ANALYSIS_ENABLED / Product.fused_analysis）
+        "app.worker.task_extract_analysis_fused": {"queue": "insight_extraction"},
+        
         # ============== 5.5. 维度总结生成 (worker-insight/vip) ==============
         # 📊 AI 总结生成，需要大量 AI 调用
         "app.worker.task_generate_dimension_summaries": {"queue": "learning"},
@@ -390,13 +336,20 @@ celery_app.conf.update(
         # ============== 6. 组装：报告生成 (worker-base) ==============
         # 📊 最后的整合，生成分析报告
         "app.worker.task_generate_report": {"queue": "reports"},
+        "app.worker.task_finalize_auto_analysis": {"queue": "reports"},
+        "app.worker.task_render_review_export": {"queue": "reports"},
+        "app.worker.task_reconcile_review_stats": {"queue": "reports"},
+        
+        # ============== 7. 流水线兜底 tick (worker-base) ==============
+        # ⏱️ 轻量检查，countdown 自我调度，不占用分析 Worker
+        "app.worker.task_auto_analysis_tick": {"queue": "ingestion"},
     },
     # Celery Beat 定时任务配置
     beat_schedule={
-        # 每 5 秒消费一次入库队列
-        "process-ingestion-queue": {
-            "task": "app.worker.task_process_ingestion_queue",
-            "schedule": 5.0,
+        # 每 30 秒检查入库消费者槽位（常驻消费者阻塞读取 Stream，不再按 tick 轮询）
+        "ensure-ingestion-consumers": {
+            "task": "app.worker.task_ensure_ingestion_consumers",
+            "schedule": 30.0,
         },
         # 🔥 每 15 秒检查并触发待翻译任务（确保翻译持续进行）
         "check-pending-translations": {
@@ -408,6 +361,11 @@ celery_app.conf.update(
             "task": "app.worker.task_analysis_completion_patrol",
             "schedule": 300.0,  # 5 分钟
         },
+        # 🧮 每 6 小时对账评论统计汇总（触发器增量维护，对账修正漂移）
+        "reconcile-review-stats": {
+            "task": "app.worker.task_reconcile_review_stats",
+            "schedule": 21600.0,  # 6 小时
+        },
     },
 )
 
@@ -417,28 +375,61 @@ celery_app.conf.update(
 # Celery 使用 Gevent 协程，需要特殊的连接池配置
 # 
 # 策略说明：
-# - 使用 NullPool：每次操作创建新连接，适合高并发协程场景
-# - 避免连接池瓶颈：Gevent 150 协程 vs 默认 pool_size=5 会严重阻塞
-# - PostgreSQL max_connections=500 足以支撑
+# - psycopg2 注册 gevent wait callback（app/db/green.py）：等待数据库响应时让出协程，
+#   DB 往返与 LLM 调用交错执行，不再阻塞整个 hub
+# - 连接只在事务期间占用：LLM 协程不访问数据库（只有任务主协程和认领会话），
+#   每个任务峰值 ≤ 2 个连接，且提交后立即归还
+# - 池大小按实测峰值推导（scripts/stress_gevent_db.py 输出 checked-out 峰值），
+#   默认 20 + 30 溢出 = 每进程 50；5 个 Worker 容器 + API 150 仍低于 max_connections=500
+#   （旧配置 100 + 400 = 每进程 500，多个容器叠加可能耗尽 PostgreSQL 连接）
 # ============================================================================
+from sqlalchemy import event
 from sqlalchemy.pool import NullPool, QueuePool
+from app.db.green import make_psycopg2_green
 
 SYNC_DATABASE_URL = settings.DATABASE_URL.replace("+asyncpg", "")
 
-# 🔥 高并发连接池配置（支持 400+ 并发 Worker）
+# 必须在创建任何连接之前注册（gevent 池已在导入本模块前完成 monkey patch）
+DB_GREEN = make_psycopg2_green()
+
 sync_engine = create_engine(
     SYNC_DATABASE_URL,
     echo=settings.DEBUG,
-    # 使用 QueuePool 配合大容量，比 NullPool 更高效
     poolclass=QueuePool,
-    pool_size=100,        # 基础连接数
-    max_overflow=400,     # 溢出连接数（总共支持 500 连接）
+    pool_size=settings.WORKER_DB_POOL_SIZE,        # 基础连接数
+    max_overflow=settings.WORKER_DB_MAX_OVERFLOW,  # 溢出连接数
     pool_timeout=30,      # 等待连接超时
     pool_pre_ping=True,   # 检测断开的连接
     pool_recycle=1800,    # 30 分钟回收连接，防止数据库超时
 )
 SyncSession = sessionmaker(bind=sync_engine)
 
+# 连接池占用统计（峰值用于校准 WORKER_DB_POOL_SIZE）
+_db_pool_stats = {"checked_out": 0, "peak_checked_out": 0, "checkouts": 0}
+
+
+@event.listens_for(sync_engine, "checkout")
+def _on_pool_checkout(dbapi_connection, connection_record, connection_proxy):
+    _db_pool_stats["checkouts"] += 1
+    _db_pool_stats["checked_out"] += 1
+    if _db_pool_stats["checked_out"] > _db_pool_stats["peak_checked_out"]:
+        _db_pool_stats["peak_checked_out"] = _db_pool_stats["checked_out"]
+
+
+@event.listens_for(sync_engine, "checkin")
+def _on_pool_checkin(dbapi_connection, connection_record):
+    _db_pool_stats["checked_out"] -= 1
+
+
+def get_db_pool_stats() -> dict:
+    """当前进程的连接池占用（checked_out 当前占用，peak_checked_out 启动以来峰值）"""
+    return {
+        **_db_pool_stats,
+        "pool_size": settings.WORKER_DB_POOL_SIZE,
+        "max_overflow": settings.WORKER_DB_MAX_OVERFLOW,
+        "green": DB_GREEN,
+    }
+
 
 def get_sync_db():
     """Get synchronous database session for worker."""
@@ -457,15 +448,18 @@ def cleanup_stuck_reviews():
     
     db = get_sync_db()
     try:
-        result = db.execute(
+        product_ids = db.execute(
             update(Review)
             .where(Review.translation_status == "processing")
             .values(translation_status="pending")
-        )
+            .returning(Review.product_id)
+        ).scalars().all()
         db.commit()
         
-        if result.rowcount > 0:
-            logger.warning(f"[启动清理] 已将 {result.rowcount} 条卡住的评论重置为 pending 状态")
+        if product_ids:
+            logger.warning(f"[启动清理] 已将 {len(product_ids)} 条卡住的评论重置为 pending 状态")
+            for product_id in set(product_ids):
+                touch_product_data(get_product_asin(db, product_id))
         else:
             logger.info("[启动清理] 没有发现卡住的评论")
     except Exception as e:
@@ -630,203 +624,982 @@ def complete_task(db, task_id: str, success: bool = True, error_message: str = N
         db.rollback()
 
 
-# 使用 Celery 信号在 Worker 启动时执行清理
-from celery.signals import worker_ready
+# ============== 翻译结果批量写回 ==============
 
-@worker_ready.connect
-def on_worker_ready(**kwargs):
-    """Worker 启动完成后执行清理"""
-    logger.info("Worker 已就绪，开始检查卡住的任务...")
-    cleanup_stuck_reviews()
-    cleanup_stuck_tasks()  # [NEW] 清理心跳超时的任务
+BULK_WRITE_PAGE_SIZE = 1000  # 每条 UPDATE ... FROM (VALUES ...) 携带的行数
 
+REVIEW_TRANSLATION_UPDATE_SQL = """
+    UPDATE reviews AS r SET
+        title_translated = v.title_translated,
+        body_translated = v.body_translated,
+        sentiment = v.sentiment,
+        translation_status = v.translation_status,
+        updated_at = NOW()
+    FROM (VALUES %s) AS v(id, title_translated, body_translated, sentiment, translation_status)
+    WHERE r.id = v.id
+"""
+REVIEW_TRANSLATION_UPDATE_TEMPLATE = "(%s::uuid, %s::text, %s::text, %s::varchar, %s::varchar)"
 
-# ============== 任务1: 五点翻译 ==============
 
-@celery_app.task(bind=True, max_retries=3, default_retry_delay=30)
-def task_translate_bullet_points(self, product_id: str):
+class DBWriteStats:
+    """统计一次任务的数据库往返与提交次数（写入任务返回值，便于观察批量化效果）"""
+    
+    __slots__ = ("round_trips", "commits", "rows_written")
+    
+    def __init__(self):
+        self.round_trips = 0
+        self.commits = 0
+        self.rows_written = 0
+    
+    def execute(self, db, statement):
+        """执行一条语句并计数"""
+        self.round_trips += 1
+        return db.execute(statement)
+    
+    def commit(self, db):
+        db.commit()
+        self.round_trips += 1
+        self.commits += 1
+    
+    def as_dict(self) -> dict:
+        return {
+            "db_round_trips": self.round_trips,
+            "db_commits": self.commits,
+            "rows_written": self.rows_written
+        }
+
+
+def bulk_write_review_translations(db, rows: list, stats: DBWriteStats = None) -> int:
     """
-    Translate product bullet points and title.
-    This task should run FIRST, before review translation.
+    批量写回翻译结果：UPDATE reviews ... FROM (VALUES ...)，每 BULK_WRITE_PAGE_SIZE 行一次往返（不提交）
     
     Args:
-        product_id: UUID of the product
-    """
-    from app.models.product import Product
-    from app.services.translation import translation_service
-    import json
+        db: 同步数据库会话（与调用方同一事务）
+        rows: [{"id", "title_translated", "body_translated", "sentiment", "translation_status"}]
+        stats: 可选，累计往返次数
     
-    logger.info(f"Starting bullet points translation for product {product_id}")
+    Returns:
+        写回的行数
+    """
+    from psycopg2.extras import execute_values
     
-    db = get_sync_db()
+    if not rows:
+        return 0
     
+    cursor = db.connection().connection.cursor()
     try:
-        # Get product
-        result = db.execute(
-            select(Product).where(Product.id == product_id)
+        execute_values(
+            cursor,
+            REVIEW_TRANSLATION_UPDATE_SQL,
+            [
+                (
+                    str(row["id"]),
+                    row.get("title_translated"),
+                    row.get("body_translated"),
+                    row.get("sentiment"),
+                    row["translation_status"]
+                )
+                for row in rows
+            ],
+            template=REVIEW_TRANSLATION_UPDATE_TEMPLATE,
+            page_size=BULK_WRITE_PAGE_SIZE
         )
-        product = result.scalar_one_or_none()
-        
-        if not product:
-            logger.error(f"Product {product_id} not found")
-            return {"success": False, "error": "Product not found"}
-        
-        translated_title = None
-        translated_bullets = None
-        
-        # 1. Translate product title if not already translated
-        if product.title and not product.title_translated:
-            try:
-                translated_title = translation_service.translate_product_title(product.title)
-                product.title_translated = translated_title
-                logger.info(f"Translated product title: {translated_title[:50]}...")
-            except Exception as e:
-                logger.error(f"Failed to translate product title: {e}")
-        
-        # 2. Translate bullet points if not already translated
-        if product.bullet_points and not product.bullet_points_translated:
-            try:
-                # Parse bullet points from JSON, PostgreSQL array, or Python list
-                bullet_points = []
-                if isinstance(product.bullet_points, list):
-                    bullet_points = product.bullet_points
-                elif isinstance(product.bullet_points, str):
-                    bp_str = product.bullet_points.strip()
-                    # 尝试 JSON 格式 [...]
-                    if bp_str.startswith('['):
-                        bullet_points = json.loads(bp_str)
-                    # 处理 PostgreSQL 数组格式 {...}
-                    elif bp_str.startswith('{') and bp_str.endswith('}'):
-                        # 移除首尾的 {} 并按逗号分割（考虑引号内的逗号）
-                        import re
-                        # 匹配引号内的内容或非逗号字符
-                        content = bp_str[1:-1]  # 移除 { }
-                        # 使用正则匹配带引号的字符串
-                        matches = re.findall(r'"([^"]*)"', content)
-                        if matches:
-                            bullet_points = matches
-                        else:
-                            # 简单分割（不带引号的情况）
-                            bullet_points = [s.strip() for s in content.split(',') if s.strip()]
-                    else:
-                        # 尝试直接 JSON 解析
-                        try:
-                            bullet_points = json.loads(bp_str)
-                        except:
-                            bullet_points = [bp_str] if bp_str else []
-                
-                if bullet_points and len(bullet_points) > 0:
-                    translated_bullets = translation_service.translate_bullet_points(bullet_points)
-                    # 统一保存为 JSON 字符串格式
-                    product.bullet_points_translated = json.dumps(translated_bullets, ensure_ascii=False)
-                    logger.info(f"Translated {len(translated_bullets)} bullet points")
-            except Exception as e:
-                logger.error(f"Failed to translate bullet points: {e}")
-        
-        db.commit()
-        
-        return {
-            "success": True,
-            "product_id": product_id,
-            "title_translated": translated_title is not None,
-            "bullet_points_translated": translated_bullets is not None
-        }
-        
-    except Exception as e:
-        logger.error(f"Bullet points translation failed for product {product_id}: {e}")
-        db.rollback()
-        raise self.retry(exc=e)
-        
     finally:
-        db.close()
+        cursor.close()
+    
+    if stats:
+        stats.round_trips += -(-len(rows) // BULK_WRITE_PAGE_SIZE)
+        stats.rows_written += len(rows)
+    return len(rows)
 
 
-# ============== 任务2: 评论翻译 ==============
+def touch_product_data(asin: Optional[str]) -> None:
+    """
+    评论数据写入已提交：递增产品数据版本，并失效评论列表 / 统计缓存
+    
+    前端轮询的 ETag、导出产物都以数据版本为键，每次提交写回后调用，
+    保证版本不变时返回 304 的内容确实没有变化（Redis 异常只记日志）。
+    """
+    if not asin:
+        return
+    from app.core.cache import get_cache_service_sync
+    get_cache_service_sync().touch_product_data(asin)
 
-@celery_app.task(bind=True, max_retries=3, default_retry_delay=60)
-def task_process_reviews(self, product_id: str, task_id: str):
+
+def get_product_asin(db, product_id) -> Optional[str]:
+    """产品 ID → ASIN（数据版本、缓存都按 ASIN 维护）"""
+    from app.models.product import Product
+    return db.execute(select(Product.asin).where(Product.id == product_id)).scalar_one_or_none()
+
+
+def reconcile_product_review_stats(db, product_id) -> bool:
     """
-    Async task to process and translate reviews.
+    全量重算产品的评论统计汇总，与汇总行不一致时覆盖（返回是否发现漂移）
     
-    Workflow:
-    1. Get pending reviews from database
-    2. For each review:
-       a. Call Qwen API for translation
-       b. Analyze sentiment
-       c. Extract insights (深度解读)
-       d. Update database
-       e. Update task progress
-    3. Mark task as completed
+    先无锁比较：常见情况没有漂移，不阻塞写入。不一致时锁住汇总行再重算并覆盖——
+    加锁之后的新快照包含所有已提交的写入；尚未提交的写入，其触发器会等这把锁，
+    在覆盖之后再叠加增量，因此不会丢失。
+    """
+    from sqlalchemy.dialects.postgresql import insert as pg_insert
+    from app.models.product_review_stats import ProductReviewStats
+    from app.services.review_service import review_rollup_query, REVIEW_ROLLUP_COLUMNS
     
-    Args:
-        product_id: UUID of the product
-        task_id: UUID of the task to track progress
+    def stored(lock: bool = False) -> tuple:
+        query = select(*[getattr(ProductReviewStats, column) for column in REVIEW_ROLLUP_COLUMNS]).where(
+            ProductReviewStats.product_id == product_id
+        )
+        row = db.execute(query.with_for_update() if lock else query).one_or_none()
+        return tuple(row) if row else (0,) * len(REVIEW_ROLLUP_COLUMNS)
+    
+    def actual() -> tuple:
+        return tuple(db.execute(review_rollup_query(product_id)).one())
+    
+    drifted = stored() != actual()
+    if drifted:
+        db.execute(pg_insert(ProductReviewStats).values(product_id=product_id).on_conflict_do_nothing())
+        before = stored(lock=True)
+        values = actual()
+        drifted = before != values
+        if drifted:
+            diff = {column: (old, new) for column, old, new in zip(REVIEW_ROLLUP_COLUMNS, before, values) if old != new}
+            logger.warning(f"[统计对账] 产品 {product_id} 汇总漂移（汇总值, 实际值）: {diff}")
+            db.execute(
+                update(ProductReviewStats)
+                .where(ProductReviewStats.product_id == product_id)
+                .values(**dict(zip(REVIEW_ROLLUP_COLUMNS, values)), updated_at=func.now())
+            )
+    db.execute(
+        update(ProductReviewStats)
+        .where(ProductReviewStats.product_id == product_id)
+        .values(reconciled_at=func.now())
+    )
+    db.commit()
+    return drifted
+
+
+def load_dimension_schema(db, product_id: str):
     """
-    from app.models.review import Review
-    from app.models.task import Task
+    加载产品的维度 Schema（洞察提取用）
+    
+    [UPDATED 2026-01-16] 支持3类维度体系
+    
+    Returns:
+        {"product": [...], "scenario": [...], "emotion": [...]}，产品暂无维度时返回 None
+    """
+    from app.models.product_dimension import ProductDimension
+    
+    dimension_result = db.execute(
+        select(ProductDimension)
+        .where(ProductDimension.product_id == product_id)
+        .order_by(ProductDimension.created_at)
+    )
+    dimensions = dimension_result.scalars().all()
+
+    # [UPDATED 2026-01-16] 按维度类型分组
+    dimension_schema = None
+    if dimensions and len(dimensions) > 0:
+        # 检查是否有 dimension_type 字段（新版本数据）
+        has_type_field = hasattr(dimensions[0], 'dimension_type') and dimensions[0].dimension_type
+
+        if has_type_field:
+            # 新格式：按类型分组
+            dimension_schema = {
+                "product": [],
+                "scenario": [],
+                "emotion": []
+            }
+            for dim in dimensions:
+                dim_type = getattr(dim, 'dimension_type', 'product') or 'product'
+                if dim_type in dimension_schema:
+                    dimension_schema[dim_type].append({
+                        "name": dim.name, 
+                        "description": dim.description or ""
+                    })
+                else:
+                    # 未知类型默认归入产品维度
+                    dimension_schema["product"].append({
+                        "name": dim.name, 
+                        "description": dim.description or ""
+                    })
+
+            total_dims = sum(len(v) for v in dimension_schema.values())
+            logger.info(f"使用3类维度进行洞察提取: 总计 {total_dims} 个 "
+                       f"(产品:{len(dimension_schema['product'])}, "
+                       f"场景:{len(dimension_schema['scenario'])}, "
+                       f"情绪:{len(dimension_schema['emotion'])})")
+        else:
+            # 旧格式：全部作为产品维度，使用默认场景和情绪维度
+            product_dims = [
+                {"name": dim.name, "description": dim.description or ""}
+                for dim in dimensions
+            ]
+            dimension_schema = {
+                "product": product_dims,
+                "scenario": [
+                    {"name": "日常使用", "description": "日常生活场景"},
+                    {"name": "工作办公", "description": "办公场景"},
+                    {"name": "户外出行", "description": "户外场景"}
+                ],
+                "emotion": [
+                    {"name": "惊喜好评", "description": "超出预期的正面情绪"},
+                    {"name": "失望不满", "description": "期望落空的负面情绪"},
+                    {"name": "感激推荐", "description": "感谢并推荐"}
+                ]
+            }
+            logger.info(f"使用 {len(product_dims)} 个产品维度 + 默认场景/情绪维度进行洞察提取")
+    else:
+        logger.info(f"产品暂无定义维度，使用通用洞察提取逻辑")
+    
+    return dimension_schema
+
+
+def load_context_schema(db, product_id: str):
+    """
+    加载产品的 5W 标签库（主题提取用）及 (type, name) → label_id 映射
+    
+    Returns:
+        (context_schema, label_id_map)，没有标签库时为 (None, {})
+    """
+    from app.models.product_context_label import ProductContextLabel
+    
+    label_result = db.execute(
+        select(ProductContextLabel)
+        .where(ProductContextLabel.product_id == product_id)
+        .order_by(ProductContextLabel.type, ProductContextLabel.created_at)
+    )
+    labels = label_result.scalars().all()
+    if not labels:
+        return None, {}
+    
+    context_schema = {}
+    for label in labels:
+        context_schema.setdefault(label.type, []).append({
+            "name": label.name,
+            "description": label.description or ""
+        })
+    
+    # 🔥 优先从 Redis 缓存获取标签映射表
+    label_id_map = label_cache.get_label_id_map(str(product_id))
+    if not label_id_map:
+        label_id_map = {(label.type, label.name): label.id for label in labels}
+        label_cache.set_label_id_map(str(product_id), label_id_map)
+    
+    return context_schema, label_id_map
+
+
+def build_insight_rows(review_id, insights: list) -> list:
+    """将一条评论的洞察结果转换为 ReviewInsight 记录"""
     from app.models.insight import ReviewInsight
-    from app.services.translation import translation_service
     
-    logger.info(f"Starting translation task {task_id} for product {product_id}")
+    rows = []
+    for insight_data in insights:
+        # [UPDATED 2026-01-15] 添加 confidence 字段支持
+        confidence = insight_data.get('confidence', 'high')
+        if confidence not in ('high', 'medium', 'low'):
+            confidence = 'high'
+        
+        rows.append(ReviewInsight(
+            review_id=review_id,
+            insight_type=insight_data.get('type', 'emotion'),
+            quote=insight_data.get('quote', ''),
+            quote_translated=insight_data.get('quote_translated'),
+            analysis=insight_data.get('analysis', ''),
+            dimension=insight_data.get('dimension'),
+            confidence=confidence  # [NEW] 置信度
+        ))
+    return rows
+
+
+def build_theme_rows(review_id, themes: dict, label_id_map: dict) -> list:
+    """
+    将一条评论的5W主题结果转换为 ReviewThemeHighlight 记录
     
-    db = get_sync_db()
+    themes 为空字典表示 AI 判定该评论无主题，生成一条 skipped 标记，避免被当作"遗漏"无限重试。
+    """
+    from app.models.theme_highlight import ReviewThemeHighlight
+    
+    rows = []
+    for theme_type, items in (themes or {}).items():
+        for item in items or []:
+            label_name = item.get("content", "").strip()
+            if not label_name:
+                continue
+            
+            # [NEW 2026-01-15] 获取置信度
+            confidence = item.get("confidence", "high")
+            if confidence not in ("high", "medium", "low"):
+                confidence = "high"
+            
+            rows.append(ReviewThemeHighlight(
+                review_id=review_id,
+                theme_type=theme_type,
+                label_name=label_name,
+                quote=item.get("quote") or item.get("content_original") or None,
+                quote_translated=item.get("quote_translated") or item.get("content_translated") or None,
+                explanation=item.get("explanation") or None,
+                confidence=confidence,
+                context_label_id=label_id_map.get((theme_type, label_name)),
+                items=[item]
+            ))
+    
+    if not themes:
+        rows.append(ReviewThemeHighlight(
+            review_id=review_id,
+            theme_type="skipped",
+            label_name="无主题",
+            quote=None,
+            quote_translated=None,
+            explanation="AI判定该评论内容过短或无明确5W主题信息",
+            confidence="high",
+            context_label_id=None,
+            items=[]
+        ))
+    return rows
+
+
+def sync_context_label_counts(db, product_id: str):
+    """
+    同步更新 context_labels 的 count 值
+    
+    根据 review_theme_highlights 表中的关联情况，更新统计数量。
+    """
+    from app.models.review import Review
+    from app.models.theme_highlight import ReviewThemeHighlight
+    from app.models.product_context_label import ProductContextLabel
     
     try:
-        # Update task status to processing
-        db.execute(
-            update(Task)
-            .where(Task.id == task_id)
-            .values(status="processing")
-        )
-        db.commit()
-        
-        # Get pending reviews (including processing and failed - to retry stuck/failed translations)
-        # ordered by review_date descending (newest first, matching frontend display)
-        result = db.execute(
-            select(Review)
+        from sqlalchemy import update as sql_update
+
+        # 获取所有关联的 label 统计
+        count_result = db.execute(
+            select(ReviewThemeHighlight.context_label_id, func.count(ReviewThemeHighlight.id))
+            .join(Review, ReviewThemeHighlight.review_id == Review.id)
             .where(
                 and_(
                     Review.product_id == product_id,
-                    Review.translation_status.in_(["pending", "processing", "failed"])
+                    ReviewThemeHighlight.context_label_id.isnot(None)
                 )
             )
-            .order_by(Review.review_date.desc().nullslast(), Review.created_at.desc())
+            .group_by(ReviewThemeHighlight.context_label_id)
         )
-        reviews = result.scalars().all()
-        
-        total_reviews = len(reviews)
-        processed = 0
-        failed = 0
-        
-        logger.info(f"Found {total_reviews} pending reviews to translate")
-        
-        for review in reviews:
-            try:
-                # Mark as processing
+        label_counts = {row[0]: row[1] for row in count_result.all()}
+
+        # 批量更新 count 字段
+        if label_counts:
+            for label_id, count in label_counts.items():
                 db.execute(
-                    update(Review)
-                    .where(Review.id == review.id)
-                    .values(translation_status="processing")
+                    sql_update(ProductContextLabel)
+                    .where(ProductContextLabel.id == label_id)
+                    .values(count=count)
                 )
-                db.commit()
+            db.commit()
+            logger.info(f"[5W标签同步] ✅ 已更新 {len(label_counts)} 个标签的 count 值")
+    except Exception as count_error:
+        logger.error(f"[5W标签同步] ❌ 更新 count 失败: {count_error}")
+
+
+# ============== 流式有界并发执行器（洞察 / 主题 / 融合提取共用）==============
+
+STREAM_FLUSH_ROWS = 500       # 待入库记录达到该条数即提交
+STREAM_FLUSH_SECONDS = 2.0    # 距上次提交超过该秒数即提交（同时刷新进度与心跳）
+
+
+def stream_extraction(db, groups, process_group, handle_result, parallel_size: int,
+                      progress=None, on_flush=None, log_prefix: str = "[流式入库]",
+                      asin: Optional[str] = None) -> int:
+    """
+    流式有界并发执行 LLM 分组调用，结果按微批入库
+    
+    替代 pool.map 分批屏障：imap_unordered 始终保持 parallel_size 个调用在途，
+    任一分组返回即补位，单个慢请求不再让整批空等；结果按条数或时间阈值微批提交，
+    Task.processed_items 与记录在同一事务中更新（兼作心跳）。
+    
+    进度按增量累加（processed_items + delta），多个 Worker 协作同一产品时互不覆盖。
+    
+    Args:
+        db: 数据库会话（只在调用方协程中使用）
+        groups: 分组列表或惰性迭代器（如按需认领的分组），每组对应一次 LLM 调用
+        process_group: group -> 结果列表（在协程池中执行，不得访问 db）
+        handle_result: 单条结果 -> 待入库的 ORM 记录列表（在调用方协程中执行）
+        parallel_size: 在途调用上限
+        progress: 可选，() -> {task_id: 本 Worker 累计处理数}，每次提交时按增量写入 Task
+        on_flush: 可选，db -> None，在每次提交的同一事务中执行（如续期租约）
+        log_prefix: 日志前缀
+        asin: 可选，产品 ASIN；提交了新记录时递增产品数据版本
+    
+    Returns:
+        提交的记录总数
+    """
+    from gevent.pool import Pool
+    from app.models.task import Task
+    from datetime import datetime, timezone
+    
+    pool = Pool(parallel_size)
+    pending_rows = []
+    committed = 0
+    reported = {}
+    last_flush = time.monotonic()
+    
+    def flush():
+        nonlocal pending_rows, committed, last_flush
+        if pending_rows:
+            db.add_all(pending_rows)
+        for task_id, processed_items in (progress() if progress else {}).items():
+            delta = processed_items - reported.get(task_id, 0)
+            reported[task_id] = processed_items
+            db.execute(
+                update(Task)
+                .where(Task.id == task_id)
+                .values(processed_items=Task.processed_items + delta, last_heartbeat=datetime.now(timezone.utc))
+            )
+        if on_flush:
+            on_flush(db)
+        db.commit()
+        if pending_rows:
+            committed += len(pending_rows)
+            logger.info(f"{log_prefix} 已提交 {len(pending_rows)} 条记录（累计 {committed} 条）")
+            touch_product_data(asin)
+        pending_rows = []
+        last_flush = time.monotonic()
+    
+    try:
+        for group_results in pool.imap_unordered(process_group, groups):
+            for result in group_results:
+                pending_rows.extend(handle_result(result))
+            if len(pending_rows) >= STREAM_FLUSH_ROWS or time.monotonic() - last_flush >= STREAM_FLUSH_SECONDS:
+                flush()
+        flush()
+    except Exception:
+        pool.kill()
+        db.rollback()
+        raise
+    
+    return committed
+
+
+# ============== 🔒 分析阶段认领租约（洞察 / 主题多 Worker 协作）==============
+#
+# 与翻译任务的 SELECT ... FOR UPDATE SKIP LOCKED 同一思路，但租约需要跨越多次提交：
+# - 认领：INSERT ... SELECT 候选评论 FOR NO KEY UPDATE SKIP LOCKED ON CONFLICT DO UPDATE WHERE 租约已过期
+#   （候选 = 没有结果 + 没有有效租约；并发认领者的快照里彼此的租约都还不可见，
+#    SKIP LOCKED 让它们各自跳过别人正在认领的评论、拿到不同的块，而不是挤在同一批上由主键冲突裁决出空手的一方）
+# - 落空：认领到 0 条但仍有未认领的评论（被并发认领者锁住）时退避重试，见 claim_next_analysis_chunk
+# - 续期：每次流式入库提交时顺带延长本 Worker 持有的租约
+# - 释放：Worker 结束时删除自己的租约；崩溃的 Worker 租约到期后可被重新认领
+#
+
+ANALYSIS_STAGE_INSIGHTS = "insights"
+ANALYSIS_STAGE_THEMES = "themes"
+
+
+def _analysis_result_model(stage: str):
+    from app.models.insight import ReviewInsight
+    from app.models.theme_highlight import ReviewThemeHighlight
+    return ReviewInsight if stage == ANALYSIS_STAGE_INSIGHTS else ReviewThemeHighlight
+
+
+ANALYSIS_CLAIM_RETRY_BACKOFF = (0.2, 0.5, 1.0, 2.0, 2.0)  # 认领落空但仍有未认领评论时的退避间隔（秒）
+
+
+def _analysis_candidate_filter(product_id: str, stage: str):
+    """待认领评论：有原文、未删除、该阶段没有结果且没有有效租约"""
+    from app.models.review import Review
+    from app.models.analysis_lease import ReviewAnalysisLease
+    
+    result_model = _analysis_result_model(stage)
+    has_result = select(result_model.id).where(result_model.review_id == Review.id).exists()
+    has_active_lease = (
+        select(ReviewAnalysisLease.review_id)
+        .where(
+            and_(
+                ReviewAnalysisLease.review_id == Review.id,
+                ReviewAnalysisLease.stage == stage,
+                ReviewAnalysisLease.lease_until > func.now()
+            )
+        )
+        .exists()
+    )
+    return and_(
+        Review.product_id == product_id,
+        Review.body_original.isnot(None),
+        Review.is_deleted == False,
+        ~has_result,
+        ~has_active_lease
+    )
+
+
+def claim_analysis_reviews(db, product_id: str, stage: str, owner: str, limit: int) -> list:
+    """
+    认领一块待分析评论
+    
+    Returns:
+        [(id, body_original)] 行列表（普通行而非 ORM 对象，提交后仍可跨协程读取）
+    """
+    from datetime import timedelta
+    from sqlalchemy import literal, String, Integer
+    from sqlalchemy.dialects.postgresql import insert as pg_insert
+    from app.models.review import Review
+    from app.models.analysis_lease import ReviewAnalysisLease
+    
+    lease_until = func.now() + timedelta(seconds=settings.ANALYSIS_LEASE_SECONDS)
+    candidates = (
+        select(
+            Review.id,
+            literal(stage, String),
+            Review.product_id,
+            literal(owner, String),
+            lease_until,
+            literal(1, Integer)
+        )
+        .where(_analysis_candidate_filter(product_id, stage))
+        .order_by(Review.review_date.desc().nullslast(), Review.created_at.desc())
+        .limit(limit)
+        # 锁到本次认领提交为止；NO KEY 级别不阻塞结果表外键检查（FOR KEY SHARE）
+        .with_for_update(of=Review, skip_locked=True, key_share=True)
+    )
+    
+    stmt = pg_insert(ReviewAnalysisLease).from_select(
+        ["review_id", "stage", "product_id", "owner", "lease_until", "attempts"],
+        candidates
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[ReviewAnalysisLease.review_id, ReviewAnalysisLease.stage],
+        set_={
+            "owner": stmt.excluded.owner,
+            "lease_until": stmt.excluded.lease_until,
+            "attempts": ReviewAnalysisLease.attempts + 1,
+            "claimed_at": func.now()
+        },
+        where=ReviewAnalysisLease.lease_until <= func.now()  # 只抢占已过期的租约
+    ).returning(ReviewAnalysisLease.review_id)
+    
+    claimed_ids = db.execute(stmt).scalars().all()
+    db.commit()
+    if not claimed_ids:
+        return []
+    
+    return db.execute(
+        select(Review.id, Review.body_original)
+        .where(Review.id.in_(claimed_ids))
+        .order_by(Review.review_date.desc().nullslast(), Review.created_at.desc())
+    ).all()
+
+
+def has_unclaimed_analysis_reviews(db, product_id: str, stage: str) -> bool:
+    """是否还有未完成且没有有效租约的评论"""
+    from app.models.review import Review
+    
+    return bool(db.execute(
+        select(select(Review.id).where(_analysis_candidate_filter(product_id, stage)).exists())
+    ).scalar())
+
+
+def claim_next_analysis_chunk(db, product_id: str, stage: str, owner: str, limit: int) -> list:
+    """
+    认领下一块评论，返回空列表表示该阶段已没有可认领的评论
+    
+    认领落空不一定是没有活了：剩余评论可能正被并发认领者锁住（SKIP LOCKED 跳过）而其租约尚未提交。
+    只要还有未完成且没有有效租约的评论，就短暂退避后重试，不让 Worker 提前退出。
+    """
+    for attempt, delay in enumerate((0,) + ANALYSIS_CLAIM_RETRY_BACKOFF):
+        if delay:
+            time.sleep(delay * random.uniform(0.5, 1.5))
+        rows = claim_analysis_reviews(db, product_id, stage, owner, limit)
+        if rows or not has_unclaimed_analysis_reviews(db, product_id, stage):
+            return rows
+    logger.warning(f"[认领租约] {product_id} {stage} 连续 {attempt + 1} 次认领落空，剩余评论交给补全任务")
+    return []
+
+
+def iter_claimed_groups(product_id: str, stage: str, owner: str, group_size: int):
+    """
+    按需认领评论并切分为 LLM 调用分组（惰性迭代器，供 stream_extraction 消费）
+    
+    imap_unordered 只在有空闲并发槽位时才拉取下一组，因此认领节奏自动跟随处理速度，
+    不会一次性把整个产品的评论揽到一个 Worker 上。使用独立会话（迭代发生在 feeder 协程中）。
+    """
+    claim_db = get_sync_db()
+    try:
+        while True:
+            rows = claim_next_analysis_chunk(claim_db, product_id, stage, owner, settings.ANALYSIS_CLAIM_CHUNK)
+            if not rows:
+                return
+            for i in range(0, len(rows), group_size):
+                yield rows[i:i + group_size]
+    finally:
+        claim_db.close()
+
+
+FusedClaim = namedtuple("FusedClaim", ["id", "body_original", "has_insights", "has_themes"])
+
+
+def iter_claimed_fused_groups(product_id: str, owner: str, group_size: int):
+    """
+    融合分析的按需认领：同一 owner 分别认领洞察、主题两个阶段的租约后按评论合并
+    
+    两个阶段都拿到的评论走融合调用，只拿到一个阶段的只补该部分；
+    另一阶段的租约被独立任务持有时由它处理，不会重复提取。
+    """
+    stages = (ANALYSIS_STAGE_INSIGHTS, ANALYSIS_STAGE_THEMES)
+    claim_db = get_sync_db()
+    try:
+        misses = 0
+        while True:
+            insight_rows = claim_analysis_reviews(
+                claim_db, product_id, ANALYSIS_STAGE_INSIGHTS, owner, settings.ANALYSIS_CLAIM_CHUNK
+            )
+            theme_rows = claim_analysis_reviews(
+                claim_db, product_id, ANALYSIS_STAGE_THEMES, owner, settings.ANALYSIS_CLAIM_CHUNK
+            )
+            if not insight_rows and not theme_rows:
+                # 与 claim_next_analysis_chunk 相同：还有未认领的评论时退避重试
+                if misses >= len(ANALYSIS_CLAIM_RETRY_BACKOFF) or not any(
+                    has_unclaimed_analysis_reviews(claim_db, product_id, stage) for stage in stages
+                ):
+                    return
+                time.sleep(ANALYSIS_CLAIM_RETRY_BACKOFF[misses] * random.uniform(0.5, 1.5))
+                misses += 1
+                continue
+            misses = 0
+            
+            # has_insights / has_themes 为 True 表示本 Worker 不提取该部分（已有结果或不在本次认领内）
+            claims = {row.id: FusedClaim(row.id, row.body_original, False, True) for row in insight_rows}
+            for row in theme_rows:
+                claim = claims.get(row.id) or FusedClaim(row.id, row.body_original, True, True)
+                claims[row.id] = claim._replace(has_themes=False)
+            
+            rows = list(claims.values())
+            for i in range(0, len(rows), group_size):
+                yield rows[i:i + group_size]
+    finally:
+        claim_db.close()
+
+
+def renew_analysis_leases(db, stage: str, owner: str):
+    """延长本 Worker 持有的租约（不提交，随流式入库同一事务）"""
+    from datetime import timedelta
+    from app.models.analysis_lease import ReviewAnalysisLease
+    
+    db.execute(
+        update(ReviewAnalysisLease)
+        .where(and_(ReviewAnalysisLease.stage == stage, ReviewAnalysisLease.owner == owner))
+        .values(lease_until=func.now() + timedelta(seconds=settings.ANALYSIS_LEASE_SECONDS))
+    )
+
+
+def release_analysis_leases(db, stage: str, owner: str):
+    """释放本 Worker 持有的全部租约（失败的评论随即可被补全任务重新认领）"""
+    from sqlalchemy import delete
+    from app.models.analysis_lease import ReviewAnalysisLease
+    
+    try:
+        db.execute(
+            delete(ReviewAnalysisLease)
+            .where(and_(ReviewAnalysisLease.stage == stage, ReviewAnalysisLease.owner == owner))
+        )
+        db.commit()
+    except Exception as e:
+        logger.warning(f"[认领租约] 释放租约失败（到期后自动失效）: {e}")
+        db.rollback()
+
+
+def count_active_analysis_leases(db, product_id: str, stage: str) -> int:
+    """产品在该阶段仍有效的租约数（> 0 表示还有协作 Worker 在处理）"""
+    from app.models.analysis_lease import ReviewAnalysisLease
+    
+    return db.execute(
+        select(func.count())
+        .select_from(ReviewAnalysisLease)
+        .where(
+            and_(
+                ReviewAnalysisLease.product_id == product_id,
+                ReviewAnalysisLease.stage == stage,
+                ReviewAnalysisLease.lease_until > func.now()
+            )
+        )
+    ).scalar() or 0
+
+
+def finish_analysis_task(db, task_record, processed_items: int) -> bool:
+    """
+    把分析 Task 标记为完成（状态比较并设置，不提交），返回本 Worker 是否完成了这次状态转换
+    
+    最后结束的几个协作 Worker 可能同时看到"没有有效租约"：并发的 UPDATE 在同一行上排队，
+    后到者重新检查条件时状态已是完成，只有一个 Worker 拿到 True，由它派发补全任务。
+    """
+    from app.models.task import Task, TaskStatus
+    
+    if task_record is None:
+        return True
+    result = db.execute(
+        update(Task)
+        .where(and_(Task.id == task_record.id, Task.status != TaskStatus.COMPLETED.value))
+        .values(status=TaskStatus.COMPLETED.value, processed_items=processed_items)
+        .execution_options(synchronize_session=False)
+    )
+    return result.rowcount == 1
+
+
+def cleanup_expired_analysis_leases():
+    """清理过期租约（Worker 启动时执行；过期租约本身不会阻塞认领，仅回收空间）"""
+    from sqlalchemy import delete
+    from app.models.analysis_lease import ReviewAnalysisLease
+    
+    db = get_sync_db()
+    try:
+        result = db.execute(
+            delete(ReviewAnalysisLease).where(ReviewAnalysisLease.lease_until <= func.now())
+        )
+        db.commit()
+        if result.rowcount:
+            logger.info(f"[启动清理] 已清理 {result.rowcount} 条过期分析租约")
+    except Exception as e:
+        logger.error(f"[启动清理] 清理过期分析租约失败: {e}")
+        db.rollback()
+    finally:
+        db.close()
+
+
+def analysis_worker_count(db, product_id: str) -> int:
+    """按产品评论量决定每个分析阶段派发的协作 Worker 数"""
+    from app.models.review import Review
+    
+    review_count = db.execute(
+        select(func.count(Review.id))
+        .where(and_(Review.product_id == product_id, Review.is_deleted == False))
+    ).scalar() or 0
+    workers = -(-review_count // settings.ANALYSIS_REVIEWS_PER_WORKER)
+    return max(1, min(settings.ANALYSIS_MAX_WORKERS_PER_PRODUCT, workers))
+
+
+# 使用 Celery 信号在 Worker 启动时执行清理
+from celery.signals import worker_ready, task_prerun, task_postrun
+
+@worker_ready.connect
+def on_worker_ready(**kwargs):
+    """Worker 启动完成后执行清理"""
+    logger.info("Worker 已就绪，开始检查卡住的任务...")
+    cleanup_stuck_reviews()
+    cleanup_stuck_tasks()  # [NEW] 清理心跳超时的任务
+    cleanup_expired_analysis_leases()
+    task_ensure_ingestion_consumers.delay()  # 立即拉起入库消费者，不等 Beat 首次触发
+
+
+@task_prerun.connect
+def on_task_prerun(task=None, **kwargs):
+    """按任务所在队列设置 LLM 限流车道（learning 抢占批量翻译）"""
+    route = celery_app.conf.task_routes.get(task.name) if task else None
+    queue = (route or {}).get("queue")
+    set_current_lane(QUEUE_LLM_LANES.get(queue, LANE_ANALYSIS))
+
+
+# ============== 任务1: 五点翻译 ==============
+
+@celery_app.task(bind=True, max_retries=3, default_retry_delay=30)
+def task_translate_bullet_points(self, product_id: str):
+    """
+    Translate product bullet points and title.
+    This task should run FIRST, before review translation.
+    
+    Args:
+        product_id: UUID of the product
+    """
+    from app.models.product import Product
+    from app.services.translation import translation_service
+    import json
+    
+    logger.info(f"Starting bullet points translation for product {product_id}")
+    
+    db = get_sync_db()
+    
+    try:
+        # Get product
+        result = db.execute(
+            select(Product).where(Product.id == product_id)
+        )
+        product = result.scalar_one_or_none()
+        
+        if not product:
+            logger.error(f"Product {product_id} not found")
+            return {"success": False, "error": "Product not found"}
+        
+        translated_title = None
+        translated_bullets = None
+        
+        # 1. Translate product title if not already translated
+        if product.title and not product.title_translated:
+            try:
+                translated_title = translation_service.translate_product_title(product.title)
+                product.title_translated = translated_title
+                logger.info(f"Translated product title: {translated_title[:50]}...")
+            except Exception as e:
+                logger.error(f"Failed to translate product title: {e}")
+        
+        # 2. Translate bullet points if not already translated
+        if product.bullet_points and not product.bullet_points_translated:
+            try:
+                # Parse bullet points from JSON, PostgreSQL array, or Python list
+                bullet_points = []
+                if isinstance(product.bullet_points, list):
+                    bullet_points = product.bullet_points
+                elif isinstance(product.bullet_points, str):
+                    bp_str = product.bullet_points.strip()
+                    # 尝试 JSON 格式 [...]
+                    if bp_str.startswith('['):
+                        bullet_points = json.loads(bp_str)
+                    # 处理 PostgreSQL 数组格式 {...}
+                    elif bp_str.startswith('{') and bp_str.endswith('}'):
+                        # 移除首尾的 {} 并按逗号分割（考虑引号内的逗号）
+                        import re
+                        # 匹配引号内的内容或非逗号字符
+                        content = bp_str[1:-1]  # 移除 { }
+                        # 使用正则匹配带引号的字符串
+                        matches = re.findall(r'"([^"]*)"', content)
+                        if matches:
+                            bullet_points = matches
+                        else:
+                            # 简单分割（不带引号的情况）
+                            bullet_points = [s.strip() for s in content.split(',') if s.strip()]
+                    else:
+                        # 尝试直接 JSON 解析
+                        try:
+                            bullet_points = json.loads(bp_str)
+                        except:
+                            bullet_points = [bp_str] if bp_str else []
                 
+                if bullet_points and len(bullet_points) > 0:
+                    translated_bullets = translation_service.translate_bullet_points(bullet_points)
+                    # 统一保存为 JSON 字符串格式
+                    product.bullet_points_translated = json.dumps(translated_bullets, ensure_ascii=False)
+                    logger.info(f"Translated {len(translated_bullets)} bullet points")
+            except Exception as e:
+                logger.error(f"Failed to translate bullet points: {e}")
+        
+        db.commit()
+        if translated_title is not None or translated_bullets is not None:
+            touch_product_data(product.asin)
+        
+        return {
+            "success": True,
+            "product_id": product_id,
+            "title_translated": translated_title is not None,
+            "bullet_points_translated": translated_bullets is not None
+        }
+        
+    except Exception as e:
+        logger.error(f"Bullet points translation failed for product {product_id}: {e}")
+        db.rollback()
+        raise self.retry(exc=e)
+        
+    finally:
+        db.close()
+
+
+# ============== 任务2: 评论翻译 ==============
+
+@celery_app.task(bind=True, max_retries=3, default_retry_delay=60)
+def task_process_reviews(self, product_id: str, task_id: str):
+    """
+    Async task to process and translate reviews.
+    
+    Workflow:
+    1. Get pending reviews from database, mark them processing in one statement
+    2. For each review:
+       a. Call Qwen API for translation
+       b. Analyze sentiment
+    3. Every TRANSLATION_FLUSH_SIZE reviews: bulk write-back + task progress in one commit
+    4. Mark task as completed
+    
+    Args:
+        product_id: UUID of the product
+        task_id: UUID of the task to track progress
+    """
+    from app.models.review import Review
+    from app.models.task import Task
+    from app.models.insight import ReviewInsight
+    from app.services.translation import translation_service
+    
+    logger.info(f"Starting translation task {task_id} for product {product_id}")
+    
+    db = get_sync_db()
+    write_stats = DBWriteStats()
+    TRANSLATION_FLUSH_SIZE = 50  # 每 50 条评论写回一次
+    
+    try:
+        product_asin = get_product_asin(db, product_id)
+        
+        # Update task status to processing
+        write_stats.execute(
+            db,
+            update(Task)
+            .where(Task.id == task_id)
+            .values(status="processing")
+        )
+        
+        # Get pending reviews (including processing and failed - to retry stuck/failed translations)
+        # ordered by review_date descending (newest first, matching frontend display)
+        # 只取需要的列（普通行在提交后不会过期，避免逐条回查）
+        result = write_stats.execute(
+            db,
+            select(Review.id, Review.title_original, Review.body_original, Review.rating, Review.sentiment)
+            .where(
+                and_(
+                    Review.product_id == product_id,
+                    Review.translation_status.in_(["pending", "processing", "failed"])
+                )
+            )
+            .order_by(Review.review_date.desc().nullslast(), Review.created_at.desc())
+        )
+        reviews = result.all()
+        
+        total_reviews = len(reviews)
+        processed = 0
+        failed = 0
+        
+        logger.info(f"Found {total_reviews} pending reviews to translate")
+        
+        # Mark all as processing（一条语句）
+        if reviews:
+            write_stats.execute(
+                db,
+                update(Review)
+                .where(Review.id.in_([review.id for review in reviews]))
+                .values(translation_status="processing")
+            )
+        write_stats.commit(db)
+        if reviews:
+            touch_product_data(product_asin)
+        
+        pending_updates = []
+        
+        def flush_updates():
+            """批量写回已翻译的评论，并在同一事务中更新任务进度"""
+            written = bulk_write_review_translations(db, pending_updates, write_stats)
+            pending_updates.clear()
+            write_stats.execute(
+                db,
+                update(Task)
+                .where(Task.id == task_id)
+                .values(processed_items=processed)
+            )
+            write_stats.commit(db)
+            if written:
+                touch_product_data(product_asin)
+        
+        for review in reviews:
+            try:
                 # Validate body_original exists
                 if not review.body_original or not review.body_original.strip():
                     logger.warning(f"Review {review.id} has empty body, skipping translation")
-                    db.execute(
-                        update(Review)
-                        .where(Review.id == review.id)
-                        .values(translation_status="failed")
-                    )
-                    db.commit()
-                    failed += 1
-                    continue
+                    raise ValueError("Review body is empty")
                 
                 # 只做翻译，不提取洞察（洞察需要用户手动触发）
+                # 情感由本地引擎判断，低置信度时才调用 LLM
                 title_translated, body_translated, sentiment, _ = translation_service.translate_review(
                     title=review.title_original,
                     body=review.body_original,
-                    extract_insights=False  # 关闭自动洞察提取
+                    extract_insights=False,  # 关闭自动洞察提取
+                    rating=review.rating
                 )
                 
                 # Validate translation results
@@ -834,28 +1607,16 @@ def task_process_reviews(self, product_id: str, task_id: str):
                     logger.error(f"Translation returned empty for review {review.id}, body: {review.body_original[:100]}")
                     raise ValueError("Translation returned empty result")
                 
-                # Update review with translation only
-                db.execute(
-                    update(Review)
-                    .where(Review.id == review.id)
-                    .values(
-                        title_translated=title_translated if title_translated and title_translated.strip() else None,
-                        body_translated=body_translated,
-                        sentiment=sentiment.value,
-                        translation_status="completed"
-                    )
-                )
-                
+                # Queue review update (translation only)
+                pending_updates.append({
+                    "id": review.id,
+                    "title_translated": title_translated if title_translated and title_translated.strip() else None,
+                    "body_translated": body_translated,
+                    "sentiment": sentiment.value,
+                    "translation_status": "completed"
+                })
                 processed += 1
                 
-                # Update task progress
-                db.execute(
-                    update(Task)
-                    .where(Task.id == task_id)
-                    .values(processed_items=processed)
-                )
-                db.commit()
-                
                 logger.debug(f"Translated review {review.id}: {review.rating} stars")
                 
                 # Rate limiting: wait between API calls
@@ -866,23 +1627,23 @@ def task_process_reviews(self, product_id: str, task_id: str):
                 failed += 1
                 
                 # Mark review as failed (don't save empty translations)
-                db.execute(
-                    update(Review)
-                    .where(Review.id == review.id)
-                    .values(
-                        translation_status="failed",
-                        title_translated=None,
-                        body_translated=None
-                    )
-                )
-                db.commit()
-                
-                # Continue with next review
-                continue
+                pending_updates.append({
+                    "id": review.id,
+                    "title_translated": None,
+                    "body_translated": None,
+                    "sentiment": review.sentiment,
+                    "translation_status": "failed"
+                })
+            
+            if len(pending_updates) >= TRANSLATION_FLUSH_SIZE:
+                flush_updates()
+        
+        flush_updates()
         
         # Check if there are still pending reviews
         from app.models.review import TranslationStatus
-        pending_count_result = db.execute(
+        pending_count_result = write_stats.execute(
+            db,
             select(func.count(Review.id))
             .where(
                 and_(
@@ -902,7 +1663,8 @@ def task_process_reviews(self, product_id: str, task_id: str):
         
         error_msg = f"{failed} reviews failed" if failed > 0 else None
         
-        db.execute(
+        write_stats.execute(
+            db,
             update(Task)
             .where(Task.id == task_id)
             .values(
@@ -911,16 +1673,20 @@ def task_process_reviews(self, product_id: str, task_id: str):
                 error_message=error_msg
             )
         )
-        db.commit()
+        write_stats.commit(db)
         
-        logger.info(f"Task {task_id} completed: {processed} translated, {failed} failed")
+        logger.info(
+            f"Task {task_id} completed: {processed} translated, {failed} failed "
+            f"({write_stats.round_trips} DB round trips, {write_stats.commits} commits)"
+        )
         
         return {
             "task_id": task_id,
             "product_id": product_id,
             "total": total_reviews,
             "processed": processed,
-            "failed": failed
+            "failed": failed,
+            **write_stats.as_dict()
         }
         
     except Exception as e:
@@ -950,7 +1716,7 @@ def task_process_reviews(self, product_id: str, task_id: str):
 @celery_app.task
 def task_health_check():
     """Simple task to verify worker is running."""
-    return {"status": "healthy", "worker": "voc_worker"}
+    return {"status": "healthy", "worker": "voc_worker", "db_pool": get_db_pool_stats()}
 
 
 @celery_app.task
@@ -978,6 +1744,8 @@ def task_retry_failed_reviews(product_id: str):
             .values(translation_status="pending")
         )
         db.commit()
+        if result.rowcount:
+            touch_product_data(get_product_asin(db, product_id))
         
         logger.info(f"Reset {result.rowcount} failed reviews to pending")
         
@@ -989,22 +1757,24 @@ def task_retry_failed_reviews(product_id: str):
 
 
 @celery_app.task(bind=True, max_retries=2, default_retry_delay=30)
-def task_extract_insights(self, product_id: str):
+def task_extract_insights(self, product_id: str, assist: bool = False):
     """
     Extract insights for already translated reviews (without re-translating).
     
     This task:
-    1. Gets all translated reviews that don't have insights yet
+    1. Claims chunks of reviews without insights (lease-based, see claim_analysis_reviews)
     2. **[NEW] Loads product-specific dimensions if available**
     3. Calls AI to extract insights (using dimensions for categorization)
     4. Saves insights to database
     
+    🔒 多 Worker 协作：评论按块认领（带租约），同一产品可由多个任务并行处理而不重复。
+    
     Args:
         product_id: UUID of the product
+        assist: 协作 Worker（复用主任务的 Task 记录，不重置进度）
     """
     from app.models.review import Review
     from app.models.insight import ReviewInsight
-    from app.models.product_dimension import ProductDimension
     from app.models.task import Task, TaskType, TaskStatus
     from app.services.translation import translation_service
     from sqlalchemy import delete, exists
@@ -1021,68 +1791,7 @@ def task_extract_insights(self, product_id: str):
     
     try:
         # [NEW] 获取产品的维度 Schema（如果有的话）
-        # [UPDATED 2026-01-16] 支持3类维度体系
-        dimension_result = db.execute(
-            select(ProductDimension)
-            .where(ProductDimension.product_id == product_id)
-            .order_by(ProductDimension.created_at)
-        )
-        dimensions = dimension_result.scalars().all()
-        
-        # [UPDATED 2026-01-16] 按维度类型分组
-        dimension_schema = None
-        if dimensions and len(dimensions) > 0:
-            # 检查是否有 dimension_type 字段（新版本数据）
-            has_type_field = hasattr(dimensions[0], 'dimension_type') and dimensions[0].dimension_type
-            
-            if has_type_field:
-                # 新格式：按类型分组
-                dimension_schema = {
-                    "product": [],
-                    "scenario": [],
-                    "emotion": []
-                }
-                for dim in dimensions:
-                    dim_type = getattr(dim, 'dimension_type', 'product') or 'product'
-                    if dim_type in dimension_schema:
-                        dimension_schema[dim_type].append({
-                            "name": dim.name, 
-                            "description": dim.description or ""
-                        })
-                    else:
-                        # 未知类型默认归入产品维度
-                        dimension_schema["product"].append({
-                            "name": dim.name, 
-                            "description": dim.description or ""
-                        })
-                
-                total_dims = sum(len(v) for v in dimension_schema.values())
-                logger.info(f"使用3类维度进行洞察提取: 总计 {total_dims} 个 "
-                           f"(产品:{len(dimension_schema['product'])}, "
-                           f"场景:{len(dimension_schema['scenario'])}, "
-                           f"情绪:{len(dimension_schema['emotion'])})")
-            else:
-                # 旧格式：全部作为产品维度，使用默认场景和情绪维度
-                product_dims = [
-                    {"name": dim.name, "description": dim.description or ""}
-                    for dim in dimensions
-                ]
-                dimension_schema = {
-                    "product": product_dims,
-                    "scenario": [
-                        {"name": "日常使用", "description": "日常生活场景"},
-                        {"name": "工作办公", "description": "办公场景"},
-                        {"name": "户外出行", "description": "户外场景"}
-                    ],
-                    "emotion": [
-                        {"name": "惊喜好评", "description": "超出预期的正面情绪"},
-                        {"name": "失望不满", "description": "期望落空的负面情绪"},
-                        {"name": "感激推荐", "description": "感谢并推荐"}
-                    ]
-                }
-                logger.info(f"使用 {len(product_dims)} 个产品维度 + 默认场景/情绪维度进行洞察提取")
-        else:
-            logger.info(f"产品暂无定义维度，使用通用洞察提取逻辑")
+        dimension_schema = load_dimension_schema(db, product_id)
         
         # [UPDATED] 跨语言模式：获取总评论数（有原文的评论，不再依赖翻译）
         total_reviews_result = db.execute(
@@ -1111,17 +1820,23 @@ def task_extract_insights(self, product_id: str):
         already_processed = already_processed_result.scalar() or 0
         
         # [NEW] 创建/更新 Task 记录（total_items = 总评论数，processed_items = 已处理数）
-        task_record = get_or_create_task(
-            db=db,
-            product_id=product_id,
-            task_type=TaskType.INSIGHTS.value,
-            total_items=total_reviews,  # [UPDATED] 总评论数（不再是已翻译数）
-            celery_task_id=self.request.id
-        )
-        # 设置已处理数为当前已有洞察的评论数
-        task_record.processed_items = already_processed
-        db.commit()
-        logger.info(f"[跨语言洞察] Task record: total_items={total_reviews}, processed_items={already_processed}, remaining={total_reviews - already_processed}")
+        # 协作 Worker 复用主任务的记录，进度由各 Worker 增量累加
+        if assist:
+            task_record = db.execute(
+                select(Task).where(and_(Task.product_id == product_id, Task.task_type == TaskType.INSIGHTS.value))
+            ).scalar_one_or_none()
+        if task_record is None:
+            task_record = get_or_create_task(
+                db=db,
+                product_id=product_id,
+                task_type=TaskType.INSIGHTS.value,
+                total_items=total_reviews,  # [UPDATED] 总评论数（不再是已翻译数）
+                celery_task_id=self.request.id
+            )
+            # 设置已处理数为当前已有洞察的评论数
+            task_record.processed_items = already_processed
+            db.commit()
+        logger.info(f"[跨语言洞察] Task record: total_items={total_reviews}, processed_items={already_processed}, remaining={total_reviews - already_processed}, assist={assist}")
         
         # [FIX] 使用 NOT EXISTS 子查询排除已有洞察的评论，避免重复处理
         insight_exists_subquery = (
@@ -1130,22 +1845,10 @@ def task_extract_insights(self, product_id: str):
             .exists()
         )
         
-        # [UPDATED] 跨语言模式：获取有原文的评论（不再依赖翻译），排除已有洞察的评论
-        result = db.execute(
-            select(Review)
-            .where(
-                and_(
-                    Review.product_id == product_id,
-                    Review.body_original.isnot(None),  # [UPDATED] 只需有原文即可，不再依赖翻译
-                    Review.is_deleted == False,
-                    ~insight_exists_subquery  # [FIX] Only process reviews without insights
-                )
-            )
-            .order_by(Review.review_date.desc().nullslast(), Review.created_at.desc())
-        )
-        reviews = result.scalars().all()
+        # 🔒 认领者标识：同一任务重试时沿用，租约可被自己续期/释放
+        lease_owner = self.request.id or f"insights-{uuid.uuid4()}"
         
-        reviews_to_process = len(reviews)
+        reviews_to_process = total_reviews - already_processed
         processed = 0
         insights_extracted = 0
         
@@ -1154,130 +1857,100 @@ def task_extract_insights(self, product_id: str):
         import os
         PARALLEL_SIZE = int(os.environ.get('INSIGHT_PARALLEL_SIZE', '120'))  # 40K RPM 优化：60→120
         
-        # 🔥 [OPTIMIZED] BATCH_SIZE = PARALLEL_SIZE，充分利用并行池
-        # 之前 BATCH_SIZE=20 限制了真实并发，现在与 PARALLEL_SIZE 同步
-        BATCH_SIZE = PARALLEL_SIZE
-        pending_insights = []  # 待提交的洞察列表
+        # 🔥 多评论批量 Prompt：每次调用 GROUP_SIZE 条评论共享一份维度 Schema
+        GROUP_SIZE = settings.LLM_ANALYSIS_BATCH_SIZE
         
         logger.info(f"[跨语言洞察] Found {reviews_to_process} reviews remaining for insight extraction (total={total_reviews}, already_done={already_processed})")
-        logger.info(f"[并行优化-洞察] 使用 PARALLEL_SIZE={PARALLEL_SIZE} 并行处理, BATCH_SIZE={BATCH_SIZE} 批量入库")
+        logger.info(f"[并行优化-洞察] 使用 PARALLEL_SIZE={PARALLEL_SIZE} 流式并发, GROUP_SIZE={GROUP_SIZE} 条/调用")
         
         # [UPDATED] 跨语言模式：只使用英文原文进行洞察提取
-        def process_single_insight(review):
-            """并行处理单条评论的洞察提取（跨语言模式：英文输入→中文输出）"""
+        def process_insight_group(group):
+            """并行处理一组评论的洞察提取（一次调用 K 条，缺失的 ID 单条回退）"""
             try:
-                insights = translation_service.extract_insights(
-                    original_text=review.body_original or "",
-                    # [UPDATED] 不再传入 translated_text，跨语言模式直接从原文提取
+                extracted = translation_service.extract_insights_batch_with_fallback(
+                    [{"id": str(review.id), "text": review.body_original or ""} for review in group],
                     dimension_schema=dimension_schema
                 )
-                return {
-                    "review_id": review.id,
-                    "insights": insights,
-                    "success": True
-                }
+                return [
+                    {
+                        "review_id": review.id,
+                        "insights": extracted.get(str(review.id), []),
+                        "success": True
+                    }
+                    for review in group
+                ]
             except Exception as e:
-                logger.error(f"[跨语言洞察] Failed to extract insights for review {review.id}: {e}")
-                return {
-                    "review_id": review.id,
-                    "insights": None,
-                    "success": False,
-                    "error": str(e)
-                }
-        
-        # 使用 gevent pool 并行处理
-        from gevent.pool import Pool
-        pool = Pool(PARALLEL_SIZE)
+                logger.error(f"[跨语言洞察] Failed to extract insights for {len(group)} reviews: {e}")
+                return [
+                    {
+                        "review_id": review.id,
+                        "body_original": review.body_original,
+                        "insights": None,
+                        "success": False,
+                        "error": str(e)
+                    }
+                    for review in group
+                ]
         
-        # 分批并行处理
-        for batch_start in range(0, reviews_to_process, BATCH_SIZE):
-            batch_end = min(batch_start + BATCH_SIZE, reviews_to_process)
-            batch_reviews = reviews[batch_start:batch_end]
+        def handle_insight_result(result):
+            """单条结果 → 待入库记录"""
+            nonlocal processed, insights_extracted
+            processed += 1
             
-            # 🚀 并行调用 AI API
-            results = pool.map(process_single_insight, batch_reviews)
+            # [FIX 2026-01-15] 区分"成功但空结果"和"失败"
+            # 注意：洞察提取Prompt要求至少1个洞察，所以空结果理论上不应该发生
+            # 但如果发生，应该记录警告而不是当作失败
+            if result["success"]:
+                insights = result.get("insights", [])
+                if insights:  # 有洞察，正常处理
+                    insights_extracted += len(insights)
+                    return build_insight_rows(result["review_id"], insights)
+                # 成功但空结果（虽然Prompt要求至少1个，但AI可能返回空）
+                logger.warning(f"[跨语言洞察] 评论 {result['review_id']} AI返回空洞察数组（不符合Prompt要求，但视为成功）")
+                return []
             
-            # 处理结果
-            for result in results:
-                # [FIX 2026-01-15] 区分"成功但空结果"和"失败"
-                # 注意：洞察提取Prompt要求至少1个洞察，所以空结果理论上不应该发生
-                # 但如果发生，应该记录警告而不是当作失败
-                if result["success"]:
-                    insights = result.get("insights", [])
-                    if insights:  # 有洞察，正常处理
-                        for insight_data in insights:
-                            # [UPDATED 2026-01-15] 添加 confidence 字段支持
-                            confidence = insight_data.get('confidence', 'high')
-                            if confidence not in ('high', 'medium', 'low'):
-                                confidence = 'high'
-                            
-                            insight = ReviewInsight(
-                                review_id=result["review_id"],
-                                insight_type=insight_data.get('type', 'emotion'),
-                                quote=insight_data.get('quote', ''),
-                                quote_translated=insight_data.get('quote_translated'),
-                                analysis=insight_data.get('analysis', ''),
-                                dimension=insight_data.get('dimension'),
-                                confidence=confidence  # [NEW] 置信度
-                            )
-                            pending_insights.append(insight)
-                        insights_extracted += len(insights)
-                    else:
-                        # 成功但空结果（虽然Prompt要求至少1个，但AI可能返回空）
-                        logger.warning(f"[跨语言洞察] 评论 {result['review_id']} AI返回空洞察数组（不符合Prompt要求，但视为成功）")
-                else:
-                    # 🛡️ [FIX v3] 基于重试次数判断，避免无限循环
-                    from app.core.redis import get_sync_redis
-                    redis_client = get_sync_redis()
-                    review_id_str = str(result["review_id"])
-                    retry_key = f"insight_retry:{review_id_str}"
-                    
-                    # 增加失败计数
-                    retry_count = redis_client.incr(retry_key)
-                    redis_client.expire(retry_key, 86400)  # 24小时后过期
-                    
-                    if retry_count >= 3:
-                        # 已重试 3 次，AI 仍无法提取，标记为"已处理"
-                        review_obj = next((r for r in reviews if str(r.id) == review_id_str), None)
-                        review_text = review_obj.body_original[:100] if review_obj and review_obj.body_original else None
-                        
-                        empty_marker = ReviewInsight(
-                            review_id=result["review_id"],
-                            insight_type="_ai_no_content",
-                            quote=review_text or "",
-                            analysis=f"AI多次尝试后判定无法提取有意义洞察（重试{retry_count}次）"
-                        )
-                        pending_insights.append(empty_marker)
-                        redis_client.delete(retry_key)  # 清除计数
-                        logger.info(f"[跨语言洞察] ⏭️ 评论 {review_id_str} 重试{retry_count}次后AI判定无法提取，标记为已处理")
-                    else:
-                        # 未达到重试上限，允许下次重试
-                        error_msg = result.get("error", "Unknown error")
-                        logger.warning(f"[跨语言洞察] ⚠️ 评论 {review_id_str} 提取失败(第{retry_count}次): {error_msg}，将在下次任务中重试")
-                
-                processed += 1
+            # 🛡️ [FIX v3] 基于重试次数判断，避免无限循环
+            from app.core.redis import get_sync_redis
+            redis_client = get_sync_redis()
+            review_id_str = str(result["review_id"])
+            retry_key = f"insight_retry:{review_id_str}"
             
-            # 🔥 批量提交数据库
-            if pending_insights:
-                db.add_all(pending_insights)
-                db.commit()
-                logger.info(f"[并行入库] 已提交 {len(pending_insights)} 条洞察（进度: {processed}/{reviews_to_process}）")
-                pending_insights = []
-                # 注：缓存通过 API 层 2 秒 TTL 自动过期，无需在此处手动清除
+            # 增加失败计数
+            retry_count = redis_client.incr(retry_key)
+            redis_client.expire(retry_key, 86400)  # 24小时后过期
             
-            # 更新 Task 进度
-            if task_record:
-                task_record.processed_items = already_processed + processed
-                db.commit()
+            if retry_count >= 3:
+                # 已重试 3 次，AI 仍无法提取，标记为"已处理"
+                review_text = result["body_original"][:100] if result.get("body_original") else None
+                redis_client.delete(retry_key)  # 清除计数
+                logger.info(f"[跨语言洞察] ⏭️ 评论 {review_id_str} 重试{retry_count}次后AI判定无法提取，标记为已处理")
+                return [ReviewInsight(
+                    review_id=result["review_id"],
+                    insight_type="_ai_no_content",
+                    quote=review_text or "",
+                    analysis=f"AI多次尝试后判定无法提取有意义洞察（重试{retry_count}次）"
+                )]
             
-            # [OPTIMIZED] 批次间微小休息，阿里云 API 限流一般 60-100 QPS，0.05s 足够
-            time.sleep(0.05)
-        
-        # 🔥 提交剩余的待处理洞察
-        if pending_insights:
-            db.add_all(pending_insights)
-            db.commit()
-            logger.info(f"[并行入库] 最终提交 {len(pending_insights)} 条洞察")
+            # 未达到重试上限，允许下次重试
+            error_msg = result.get("error", "Unknown error")
+            logger.warning(f"[跨语言洞察] ⚠️ 评论 {review_id_str} 提取失败(第{retry_count}次): {error_msg}，将在下次任务中重试")
+            return []
+        
+        # 🚀 流式并发：按需认领评论分组，始终保持 PARALLEL_SIZE 个调用在途，
+        # 结果按微批入库，同一事务中更新进度并续期租约
+        insight_task_id = task_record.id
+        try:
+            stream_extraction(
+                db,
+                iter_claimed_groups(product_id, ANALYSIS_STAGE_INSIGHTS, lease_owner, GROUP_SIZE),
+                process_insight_group, handle_insight_result, PARALLEL_SIZE,
+                progress=lambda: {insight_task_id: processed},
+                on_flush=lambda session: renew_analysis_leases(session, ANALYSIS_STAGE_INSIGHTS, lease_owner),
+                log_prefix="[并行入库-洞察]",
+                asin=get_product_asin(db, product_id)
+            )
+        finally:
+            release_analysis_leases(db, ANALYSIS_STAGE_INSIGHTS, lease_owner)
         
         logger.info(f"[跨语言洞察] Insight extraction completed: processed {processed} new reviews (total={total_reviews}, now_done={already_processed + processed}), {insights_extracted} insights extracted")
         
@@ -1310,7 +1983,26 @@ def task_extract_insights(self, product_id: str):
         )
         remaining = final_check_result.scalar() or 0
         
-        if remaining > 0:
+        # 其他协作 Worker 仍持有租约：剩余评论由它们处理，补全与完成状态交给最后结束的 Worker
+        active_leases = count_active_analysis_leases(db, product_id, ANALYSIS_STAGE_INSIGHTS)
+        if active_leases > 0:
+            logger.info(f"[跨语言洞察] 仍有 {active_leases} 条评论由协作 Worker 处理中，本 Worker 结束")
+            return {
+                "product_id": product_id,
+                "total_reviews": total_reviews,
+                "processed": processed,
+                "insights_extracted": insights_extracted,
+                "remaining": remaining
+            }
+        
+        # [FIX] 更新 Task 状态为完成（最终处理数含协作 Worker）
+        # 🔒 比较并设置：同时收尾的 Worker 中只有一个完成状态转换并派发补全任务
+        finished = finish_analysis_task(db, task_record, max(0, total_reviews - remaining))
+        db.commit()
+        
+        if remaining > 0 and not finished:
+            logger.info("[跨语言洞察] 收尾已由其他 Worker 完成，不重复触发补全任务")
+        elif remaining > 0:
             logger.warning(f"[跨语言洞察] ⚠️ 发现 {remaining} 条遗漏评论，5秒后触发补全任务...")
             # 短暂延迟后触发补全任务（避免立即递归导致资源争抢）
             time.sleep(5)
@@ -1320,12 +2012,6 @@ def task_extract_insights(self, product_id: str):
             )
             logger.info(f"[跨语言洞察] 🔄 补全任务已触发，将处理 {remaining} 条遗漏评论")
         
-        # [FIX] 更新 Task 状态为完成
-        if task_record:
-            task_record.status = TaskStatus.COMPLETED.value
-            task_record.processed_items = already_processed + processed  # 最终处理数
-            db.commit()
-        
         return {
             "product_id": product_id,
             "total_reviews": total_reviews,  # [UPDATED] 跨语言模式：总评论数（不再是已翻译数）
@@ -1350,19 +2036,22 @@ def task_extract_insights(self, product_id: str):
 # ============== 任务4: 主题高亮提取 ==============
 
 @celery_app.task(bind=True, max_retries=2, default_retry_delay=30, time_limit=1800, soft_time_limit=1700)
-def task_extract_themes(self, product_id: str):
+def task_extract_themes(self, product_id: str, assist: bool = False):
     """
     Extract 5W theme keywords for already translated reviews.
     
     This task:
     1. **[NEW] Auto-generates 5W context labels if not exists (Definition phase)**
-    2. Gets all translated reviews that don't have theme highlights yet
+    2. Claims chunks of reviews without theme highlights (lease-based, see claim_analysis_reviews)
     3. **[NEW] Uses context labels for forced categorization (Execution phase)**
     4. Calls AI to extract 5W themes with evidence and explanation
     5. Saves theme highlights to database
     
+    🔒 多 Worker 协作：评论按块认领（带租约），同一产品可由多个任务并行处理而不重复。
+    
     Args:
         product_id: UUID of the product
+        assist: 协作 Worker（不学习标签库、不重置进度；标签库尚未生成时直接退出）
     """
     from app.models.review import Review
     from app.models.theme_highlight import ReviewThemeHighlight
@@ -1392,6 +2081,11 @@ def task_extract_themes(self, product_id: str):
         context_schema = None
         labels_generated = False
         
+        if label_count == 0 and assist:
+            # 标签库由主 Worker 学习，协作 Worker 不能用开放模式抢先处理（归类口径会不一致）
+            logger.info(f"[跨语言5W] 产品 {product_id} 标签库尚未生成，协作 Worker 退出")
+            return {"product_id": product_id, "total_reviews": 0, "processed": 0, "themes_extracted": 0, "remaining": 0}
+        
         if label_count == 0:
             logger.info(f"产品 {product_id} 暂无 5W 标签库，开始自动学习...")
             
@@ -1478,25 +2172,12 @@ def task_extract_themes(self, product_id: str):
             else:
                 logger.warning(f"⚠️ 没有可用评论，将使用开放提取模式")
         
-        # Step 2: 获取标签库 Schema（如果存在或刚生成）
+        # Step 2: 获取标签库 Schema 及标签映射表（如果存在或刚生成；映射表优先走 Redis 缓存）
+        label_id_map = {}
         if label_count > 0 or labels_generated:
-            label_result = db.execute(
-                select(ProductContextLabel)
-                .where(ProductContextLabel.product_id == product_id)
-                .order_by(ProductContextLabel.type, ProductContextLabel.created_at)
-            )
-            labels = label_result.scalars().all()
-            
-            if labels:
-                context_schema = {}
-                for label in labels:
-                    if label.type not in context_schema:
-                        context_schema[label.type] = []
-                    context_schema[label.type].append({
-                        "name": label.name,
-                        "description": label.description or ""
-                    })
-                logger.info(f"✅ 使用 5W 标签库进行强制归类，共 {len(labels)} 个标签")
+            context_schema, label_id_map = load_context_schema(db, product_id)
+        if context_schema:
+            logger.info(f"✅ 使用 5W 标签库进行强制归类，共 {len(label_id_map)} 个标签")
         else:
             logger.info(f"ℹ️ 未使用标签库，将使用开放提取模式")
         
@@ -1508,9 +2189,9 @@ def task_extract_themes(self, product_id: str):
             .exists()
         )
         
-        # Ordered by review_date to match page display order
-        result = db.execute(
-            select(Review)
+        # 只统计数量，评论按块认领（Ordered by review_date to match page display order）
+        total_reviews = db.execute(
+            select(func.count(Review.id))
             .where(
                 and_(
                     Review.product_id == product_id,
@@ -1519,18 +2200,19 @@ def task_extract_themes(self, product_id: str):
                     ~theme_exists_subquery  # Reviews without theme highlights
                 )
             )
-            .order_by(Review.review_date.desc().nullslast(), Review.created_at.desc())
-        )
-        reviews = result.scalars().all()
+        ).scalar() or 0
         
-        total_reviews = len(reviews)
         processed = 0
         themes_extracted = 0
         
-        logger.info(f"[跨语言5W] Found {total_reviews} reviews for theme extraction (no translation required)")
+        logger.info(f"[跨语言5W] Found {total_reviews} reviews for theme extraction (no translation required, assist={assist})")
         
-        # [NEW] 创建/更新任务记录，启用心跳
-        if total_reviews > 0:
+        # [NEW] 创建/更新任务记录，启用心跳（协作 Worker 复用主任务的记录）
+        if assist:
+            task_record = db.execute(
+                select(Task).where(and_(Task.product_id == product_id, Task.task_type == TaskType.THEMES.value))
+            ).scalar_one_or_none()
+        if total_reviews > 0 and task_record is None:
             task_record = get_or_create_task(
                 db=db,
                 product_id=product_id,
@@ -1540,221 +2222,117 @@ def task_extract_themes(self, product_id: str):
             )
             logger.info(f"任务记录已创建: {task_record.id}")
         
-        # 🔥 优先从 Redis 缓存获取标签映射表（避免频繁查 PostgreSQL）
-        label_id_map = label_cache.get_label_id_map(str(product_id))
-        
-        if label_id_map:
-            logger.info(f"[标签缓存] ✅ 命中缓存，共 {len(label_id_map)} 个标签")
-        elif context_schema:
-            # 缓存未命中，从数据库构建并缓存
-            label_id_map = {}
-            for label in labels:
-                key = (label.type, label.name)
-                label_id_map[key] = label.id
-            
-            # 存入 Redis 缓存
-            label_cache.set_label_id_map(str(product_id), label_id_map)
-            logger.info(f"[标签缓存] ⚡ 已构建并缓存 {len(label_id_map)} 个标签")
-        else:
-            label_id_map = {}
-            logger.debug(f"无标签库，使用开放提取模式")
+        # 🔒 认领者标识：同一任务重试时沿用，租约可被自己续期/释放
+        lease_owner = self.request.id or f"themes-{uuid.uuid4()}"
         
         # 🚀 并行协程优化：使用 gevent pool 并行调用 AI API
         # 支持环境变量配置，服务器 B 可以使用更高的值
         import os
         PARALLEL_SIZE = int(os.environ.get('THEME_PARALLEL_SIZE', '150'))  # 40K RPM 优化：80→150
         
-        # 🔥 [OPTIMIZED] BATCH_SIZE = PARALLEL_SIZE，充分利用并行池
-        # 之前 BATCH_SIZE=20 限制了真实并发，现在与 PARALLEL_SIZE 同步
-        BATCH_SIZE = PARALLEL_SIZE
-        pending_themes = []  # 待提交的主题列表
+        # 🔥 多评论批量 Prompt：每次调用 GROUP_SIZE 条评论共享一份标签库 Schema
+        GROUP_SIZE = settings.LLM_ANALYSIS_BATCH_SIZE
         
-        logger.info(f"[并行优化-主题] 使用 PARALLEL_SIZE={PARALLEL_SIZE} 并行处理, BATCH_SIZE={BATCH_SIZE} 批量入库")
+        logger.info(f"[并行优化-主题] 使用 PARALLEL_SIZE={PARALLEL_SIZE} 流式并发, GROUP_SIZE={GROUP_SIZE} 条/调用")
         
         # [UPDATED] 跨语言模式：只使用英文原文进行5W主题提取
-        def process_single_theme(review):
-            """并行处理单条评论的主题提取（跨语言模式：英文输入→中文输出）"""
+        def process_theme_group(group):
+            """并行处理一组评论的主题提取（一次调用 K 条，缺失的 ID 单条回退）"""
             try:
-                themes = translation_service.extract_themes(
-                    original_text=review.body_original or "",
-                    # [UPDATED] 不再传入 translated_text，跨语言模式直接从原文提取
+                extracted = translation_service.extract_themes_batch_with_fallback(
+                    [{"id": str(review.id), "text": review.body_original or ""} for review in group],
                     context_schema=context_schema
                 )
-                return {
-                    "review_id": review.id,
-                    "themes": themes,
-                    "success": True
-                }
+                return [
+                    {
+                        "review_id": review.id,
+                        "themes": extracted.get(str(review.id), {}),
+                        "success": True
+                    }
+                    for review in group
+                ]
             except Exception as e:
-                logger.error(f"[跨语言5W] Failed to extract themes for review {review.id}: {e}")
-                return {
-                    "review_id": review.id,
-                    "themes": None,
-                    "success": False,
-                    "error": str(e)
-                }
-        
-        # 使用 gevent pool 并行处理
-        from gevent.pool import Pool
-        pool = Pool(PARALLEL_SIZE)
+                logger.error(f"[跨语言5W] Failed to extract themes for {len(group)} reviews: {e}")
+                return [
+                    {
+                        "review_id": review.id,
+                        "body_original": review.body_original,
+                        "themes": None,
+                        "success": False,
+                        "error": str(e)
+                    }
+                    for review in group
+                ]
         
-        # 分批并行处理
-        for batch_start in range(0, total_reviews, BATCH_SIZE):
-            batch_end = min(batch_start + BATCH_SIZE, total_reviews)
-            batch_reviews = reviews[batch_start:batch_end]
-            
-            # 🚀 并行调用 AI API
-            results = pool.map(process_single_theme, batch_reviews)
+        def handle_theme_result(result):
+            """单条结果 → 待入库记录"""
+            nonlocal processed, themes_extracted
+            processed += 1
             
-            # 处理结果
-            batch_themes_count = 0
-            for result in results:
-                # [FIX 2026-01-15] 区分"成功但空结果"和"失败"
-                # - success=True, themes={} → 成功但无主题（符合"有勇气说没有"规则），不创建记录
-                # - success=False → 真正的失败，需要重试
-                if result["success"]:
-                    # 成功：处理有主题的情况，空字典表示AI判定无主题，这是正确的
-                    themes = result.get("themes", {})
-                    if themes:  # 只有当themes非空时才处理
-                        for theme_type, items in themes.items():
-                            if not items or len(items) == 0:
-                                continue
-                            
-                            for item in items:
-                                label_name = item.get("content", "").strip()
-                                quote = item.get("quote") or item.get("content_original") or None
-                                quote_translated = item.get("quote_translated") or item.get("content_translated") or None
-                                explanation = item.get("explanation") or None
-                                # [NEW 2026-01-15] 获取置信度
-                                confidence = item.get("confidence", "high")
-                                if confidence not in ("high", "medium", "low"):
-                                    confidence = "high"
-                                
-                                if not label_name:
-                                    continue
-                                
-                                context_label_id = label_id_map.get((theme_type, label_name))
-                                
-                                theme_highlight = ReviewThemeHighlight(
-                                    review_id=result["review_id"],
-                                    theme_type=theme_type,
-                                    label_name=label_name,
-                                    quote=quote,
-                                    quote_translated=quote_translated,
-                                    explanation=explanation,
-                                    confidence=confidence,  # [NEW] 置信度
-                                    context_label_id=context_label_id,
-                                    items=[item]
-                                )
-                                pending_themes.append(theme_highlight)
-                                batch_themes_count += 1
-                    else:
-                        # 🔥 [FIX 2026-01-15] themes为空字典，表示AI判定该评论无主题
-                        # 创建一个 skipped 类型的记录，避免被标记为"遗漏"而无限重试
-                        skipped_highlight = ReviewThemeHighlight(
-                            review_id=result["review_id"],
-                            theme_type="skipped",
-                            label_name="无主题",
-                            quote=None,
-                            quote_translated=None,
-                            explanation="AI判定该评论内容过短或无明确5W主题信息",
-                            confidence="high",
-                            context_label_id=None,
-                            items=[]
-                        )
-                        pending_themes.append(skipped_highlight)
-                        logger.debug(f"[跨语言5W] 评论 {result['review_id']} AI判定无主题，创建skipped标记")
+            # [FIX 2026-01-15] 区分"成功但空结果"和"失败"
+            # - success=True, themes={} → 成功但无主题（符合"有勇气说没有"规则），创建 skipped 标记
+            # - success=False → 真正的失败，需要重试
+            if result["success"]:
+                # 🔥 [FIX 2026-01-15] themes为空字典，表示AI判定该评论无主题
+                # build_theme_rows 会创建一个 skipped 类型的记录，避免被标记为"遗漏"而无限重试
+                themes = result.get("themes", {})
+                theme_rows = build_theme_rows(result["review_id"], themes, label_id_map)
+                if themes:
+                    themes_extracted += len(theme_rows)
                 else:
-                    # 🛡️ [FIX v3] 基于重试次数判断，避免无限循环
-                    # 使用 Redis 记录失败次数，超过 3 次就标记为"AI判定无法提取"
-                    from app.core.redis import get_sync_redis
-                    redis_client = get_sync_redis()
-                    review_id_str = str(result["review_id"])
-                    retry_key = f"theme_retry:{review_id_str}"
-                    
-                    # 增加失败计数
-                    retry_count = redis_client.incr(retry_key)
-                    redis_client.expire(retry_key, 86400)  # 24小时后过期
-                    
-                    if retry_count >= 3:
-                        # 已重试 3 次，AI 仍无法提取，标记为"已处理"
-                        review_obj = next((r for r in reviews if str(r.id) == review_id_str), None)
-                        review_text = review_obj.body_original[:100] if review_obj and review_obj.body_original else None
-                        
-                        empty_marker = ReviewThemeHighlight(
-                            review_id=result["review_id"],
-                            theme_type="skipped",
-                            label_name="_ai_no_content",
-                            quote=review_text,
-                            explanation=f"AI多次尝试后判定无法提取有意义主题（重试{retry_count}次）"
-                        )
-                        pending_themes.append(empty_marker)
-                        redis_client.delete(retry_key)  # 清除计数
-                        logger.info(f"[跨语言主题] ⏭️ 评论 {review_id_str} 重试{retry_count}次后AI判定无法提取，标记为已处理")
-                    else:
-                        # 未达到重试上限，允许下次重试
-                        error_msg = result.get("error", "Unknown error")
-                        logger.warning(f"[跨语言主题] ⚠️ 评论 {review_id_str} 提取失败(第{retry_count}次): {error_msg}，将在下次任务中重试")
-                
-                processed += 1
+                    logger.debug(f"[跨语言5W] 评论 {result['review_id']} AI判定无主题，创建skipped标记")
+                return theme_rows
             
-            themes_extracted += batch_themes_count
+            # 🛡️ [FIX v3] 基于重试次数判断，避免无限循环
+            # 使用 Redis 记录失败次数，超过 3 次就标记为"AI判定无法提取"
+            from app.core.redis import get_sync_redis
+            redis_client = get_sync_redis()
+            review_id_str = str(result["review_id"])
+            retry_key = f"theme_retry:{review_id_str}"
             
-            # 🔥 批量提交数据库
-            if pending_themes:
-                db.add_all(pending_themes)
-                db.commit()
-                logger.info(f"[并行入库] 已提交 {len(pending_themes)} 条主题（进度: {processed}/{total_reviews}）")
-                pending_themes = []
-                # 注：缓存通过 API 层 2 秒 TTL 自动过期，无需在此处手动清除
+            # 增加失败计数
+            retry_count = redis_client.incr(retry_key)
+            redis_client.expire(retry_key, 86400)  # 24小时后过期
             
-            # 更新 Task 进度
-            if task_record:
-                update_task_heartbeat(db, str(task_record.id), processed_items=processed)
+            if retry_count >= 3:
+                # 已重试 3 次，AI 仍无法提取，标记为"已处理"
+                review_text = result["body_original"][:100] if result.get("body_original") else None
+                redis_client.delete(retry_key)  # 清除计数
+                logger.info(f"[跨语言主题] ⏭️ 评论 {review_id_str} 重试{retry_count}次后AI判定无法提取，标记为已处理")
+                return [ReviewThemeHighlight(
+                    review_id=result["review_id"],
+                    theme_type="skipped",
+                    label_name="_ai_no_content",
+                    quote=review_text,
+                    explanation=f"AI多次尝试后判定无法提取有意义主题（重试{retry_count}次）"
+                )]
             
-            # [OPTIMIZED] 批次间微小休息，阿里云 API 限流一般 60-100 QPS，0.05s 足够
-            time.sleep(0.05)
-        
-        # 🔥 提交剩余的待处理主题
-        if pending_themes:
-            db.add_all(pending_themes)
-            db.commit()
-            logger.info(f"[并行入库] 最终提交 {len(pending_themes)} 条主题")
+            # 未达到重试上限，允许下次重试
+            error_msg = result.get("error", "Unknown error")
+            logger.warning(f"[跨语言主题] ⚠️ 评论 {review_id_str} 提取失败(第{retry_count}次): {error_msg}，将在下次任务中重试")
+            return []
+        
+        # 🚀 流式并发：按需认领评论分组，始终保持 PARALLEL_SIZE 个调用在途，
+        # 结果按微批入库，同一事务中更新进度并续期租约
+        theme_task_id = task_record.id if task_record else None
+        try:
+            stream_extraction(
+                db,
+                iter_claimed_groups(product_id, ANALYSIS_STAGE_THEMES, lease_owner, GROUP_SIZE),
+                process_theme_group, handle_theme_result, PARALLEL_SIZE,
+                progress=lambda: {theme_task_id: processed} if theme_task_id else {},
+                on_flush=lambda session: renew_analysis_leases(session, ANALYSIS_STAGE_THEMES, lease_owner),
+                log_prefix="[并行入库-主题]",
+                asin=get_product_asin(db, product_id)
+            )
+        finally:
+            release_analysis_leases(db, ANALYSIS_STAGE_THEMES, lease_owner)
         
         logger.info(f"Theme extraction completed: {processed}/{total_reviews} reviews processed, {themes_extracted} theme entries created")
         
         # 🔥 [NEW 2026-01-15] 同步更新 context_labels 的 count 值
-        # 根据 review_theme_highlights 表中的关联情况，更新统计数量
         if themes_extracted > 0 and context_schema:
-            try:
-                from sqlalchemy import update as sql_update
-                
-                # 获取所有关联的 label 统计
-                count_result = db.execute(
-                    select(ReviewThemeHighlight.context_label_id, func.count(ReviewThemeHighlight.id))
-                    .join(Review, ReviewThemeHighlight.review_id == Review.id)
-                    .where(
-                        and_(
-                            Review.product_id == product_id,
-                            ReviewThemeHighlight.context_label_id.isnot(None)
-                        )
-                    )
-                    .group_by(ReviewThemeHighlight.context_label_id)
-                )
-                label_counts = {row[0]: row[1] for row in count_result.all()}
-                
-                # 批量更新 count 字段
-                if label_counts:
-                    for label_id, count in label_counts.items():
-                        db.execute(
-                            sql_update(ProductContextLabel)
-                            .where(ProductContextLabel.id == label_id)
-                            .values(count=count)
-                        )
-                    db.commit()
-                    logger.info(f"[5W标签同步] ✅ 已更新 {len(label_counts)} 个标签的 count 值")
-            except Exception as count_error:
-                logger.error(f"[5W标签同步] ❌ 更新 count 失败: {count_error}")
+            sync_context_label_counts(db, product_id)
         
         # 🚀 缓存失效 - 主题提取完成后清除产品相关缓存
         if themes_extracted > 0:
@@ -1785,7 +2363,28 @@ def task_extract_themes(self, product_id: str):
         )
         remaining = final_check_result.scalar() or 0
         
-        if remaining > 0:
+        # 其他协作 Worker 仍持有租约：剩余评论由它们处理，补全与完成状态交给最后结束的 Worker
+        active_leases = count_active_analysis_leases(db, product_id, ANALYSIS_STAGE_THEMES)
+        if active_leases > 0:
+            logger.info(f"[跨语言主题] 仍有 {active_leases} 条评论由协作 Worker 处理中，本 Worker 结束")
+            return {
+                "product_id": product_id,
+                "total_reviews": total_reviews,
+                "processed": processed,
+                "themes_extracted": themes_extracted,
+                "remaining": remaining
+            }
+        
+        # [NEW] 更新 Task 状态为完成（含协作 Worker）
+        # 🔒 比较并设置：同时收尾的 Worker 中只有一个完成状态转换并派发补全任务
+        finished = finish_analysis_task(
+            db, task_record, max(0, task_record.total_items - remaining) if task_record else 0
+        )
+        db.commit()
+        
+        if remaining > 0 and not finished:
+            logger.info("[跨语言主题] 收尾已由其他 Worker 完成，不重复触发补全任务")
+        elif remaining > 0:
             logger.warning(f"[跨语言主题] ⚠️ 发现 {remaining} 条遗漏评论，5秒后触发补全任务...")
             # 短暂延迟后触发补全任务（避免立即递归导致资源争抢）
             time.sleep(5)
@@ -1795,13 +2394,6 @@ def task_extract_themes(self, product_id: str):
             )
             logger.info(f"[跨语言主题] 🔄 补全任务已触发，将处理 {remaining} 条遗漏评论")
         
-        # [NEW] 更新 Task 状态为完成
-        if task_record:
-            task_record.status = TaskStatus.COMPLETED.value
-            task_record.total_items = total_reviews
-            task_record.processed_items = processed
-            db.commit()
-        
         # [NOTE 2026-01-22] 维度总结改为用户手动触发（通过分享页面的"生成AI分析"按钮）
         # 不再自动触发，避免在数据不完整时生成，同时节省AI调用成本
         
@@ -1826,6 +2418,307 @@ def task_extract_themes(self, product_id: str):
         db.close()
 
 
+# ============== [NEW] 任务4.5: 洞察 + 主题融合提取 ==============
+
+@celery_app.task(bind=True, max_retries=2, default_retry_delay=30, time_limit=1800, soft_time_limit=1700)
+def task_extract_analysis_fused(self, product_id: str):
+    """
+    洞察 + 5W 主题融合提取（单次 LLM 调用同时产出 ReviewInsight 和 ReviewThemeHighlight）
+    
+    替代 task_extract_insights + task_extract_themes 对同一条原文各调用一次的模式，
+    分析阶段的 LLM 调用数和输入 token 约减半。
+    
+    与独立任务兼容：
+    - 已有洞察的评论只补主题，已有主题的评论只补洞察
+    - 两者都缺的评论才走融合调用
+    - 产品还没有 5W 标签库时，交给独立任务（主题任务负责自动学习标签库）
+    
+    🔒 评论按块认领（洞察 / 主题两个阶段的租约，见 iter_claimed_fused_groups），
+    与独立任务、补全巡检以及重复派发的融合任务并行时不会重复调用 LLM 或重复入库。
+    
+    开关：Product.fused_analysis（NULL 时使用 settings.FUSED_ANALYSIS_ENABLED）
+    
+    Args:
+        product_id: UUID of the product
+    """
+    from app.models.review import Review
+    from app.models.insight import ReviewInsight
+    from app.models.theme_highlight import ReviewThemeHighlight
+    from app.models.task import TaskType, TaskStatus
+    from app.services.translation import translation_service
+    
+    # 🚦 慢车道：启动随机延迟
+    startup_delay = random.uniform(0.2, 1.0)
+    logger.info(f"[融合分析] 🐢 慢车道启动，延迟 {startup_delay:.2f}s")
+    time.sleep(startup_delay)
+    
+    db = get_sync_db()
+    insight_task = None
+    theme_task = None
+    
+    try:
+        dimension_schema = load_dimension_schema(db, product_id)
+        context_schema, label_id_map = load_context_schema(db, product_id)
+        
+        if not context_schema:
+            logger.info(f"[融合分析] 产品 {product_id} 暂无 5W 标签库，交给独立任务（自动学习标签库）")
+            task_extract_insights.delay(product_id)
+            task_extract_themes.delay(product_id)
+            return {"product_id": product_id, "delegated": True}
+        
+        insight_exists_subquery = (
+            select(ReviewInsight.id)
+            .where(ReviewInsight.review_id == Review.id)
+            .exists()
+        )
+        theme_exists_subquery = (
+            select(ReviewThemeHighlight.id)
+            .where(ReviewThemeHighlight.review_id == Review.id)
+            .exists()
+        )
+        
+        def count_reviews(*conditions) -> int:
+            return db.execute(
+                select(func.count(Review.id)).where(
+                    and_(
+                        Review.product_id == product_id,
+                        Review.body_original.isnot(None),
+                        Review.is_deleted == False,
+                        *conditions
+                    )
+                )
+            ).scalar() or 0
+        
+        # 进度口径与独立任务一致：total = 有原文的评论数，processed = 已有结果的评论数
+        # （重复派发或与独立任务并存时写入的是同一个绝对值，不会把进度清零）
+        total_reviews = count_reviews()
+        need_insights_total = count_reviews(~insight_exists_subquery)
+        need_themes_total = count_reviews(~theme_exists_subquery)
+        
+        logger.info(
+            f"[融合分析] 产品 {product_id}: 共 {total_reviews} 条 "
+            f"(缺洞察 {need_insights_total}, 缺主题 {need_themes_total})"
+        )
+        
+        if need_insights_total == 0 and need_themes_total == 0:
+            return {"product_id": product_id, "total_reviews": total_reviews, "processed": 0}
+        
+        # 沿用独立任务的 Task 记录，前端进度与心跳超时检测无需改动
+        if need_insights_total:
+            insight_task = get_or_create_task(
+                db=db, product_id=product_id, task_type=TaskType.INSIGHTS.value,
+                total_items=total_reviews, celery_task_id=self.request.id
+            )
+            insight_task.processed_items = total_reviews - need_insights_total
+        if need_themes_total:
+            theme_task = get_or_create_task(
+                db=db, product_id=product_id, task_type=TaskType.THEMES.value,
+                total_items=total_reviews, celery_task_id=self.request.id
+            )
+            theme_task.processed_items = total_reviews - need_themes_total
+        db.commit()
+        
+        # 🔒 认领者标识：洞察 / 主题两个阶段的租约都记在同一 owner 下
+        lease_owner = self.request.id or f"fused-{uuid.uuid4()}"
+        
+        import os
+        PARALLEL_SIZE = int(os.environ.get('INSIGHT_PARALLEL_SIZE', '120'))
+        GROUP_SIZE = settings.LLM_FUSED_BATCH_SIZE
+        
+        logger.info(f"[融合分析] 使用 PARALLEL_SIZE={PARALLEL_SIZE} 流式并发, GROUP_SIZE={GROUP_SIZE} 条/调用")
+        
+        def process_fused_group(group):
+            """并行处理一组评论：两部分都缺的走融合调用，只缺一部分的走对应批量提取"""
+            try:
+                extracted = translation_service.extract_insights_and_themes_batch_with_fallback(
+                    [
+                        {
+                            "id": str(row.id),
+                            "text": row.body_original or "",
+                            "insights": not row.has_insights,
+                            "themes": not row.has_themes
+                        }
+                        for row in group
+                    ],
+                    dimension_schema=dimension_schema,
+                    context_schema=context_schema
+                )
+                return [
+                    {"review_id": row.id, "success": True, **extracted.get(str(row.id), {})}
+                    for row in group
+                ]
+            except Exception as e:
+                logger.error(f"[融合分析] Failed to analyze {len(group)} reviews: {e}")
+                return [{"review_id": row.id, "success": False} for row in group]
+        
+        processed = 0
+        insights_done = 0
+        themes_done = 0
+        insights_extracted = 0
+        themes_extracted = 0
+        
+        def handle_fused_result(result):
+            """单条结果 → 待入库记录（洞察和主题在同一事务提交）"""
+            nonlocal processed, insights_done, themes_done, insights_extracted, themes_extracted
+            processed += 1
+            if not result["success"]:
+                return []  # 租约释放后留给补全任务（独立任务带重试计数）
+            
+            rows_out = []
+            insights = result.get("insights")
+            if insights:
+                rows_out.extend(build_insight_rows(result["review_id"], insights))
+                insights_extracted += len(insights)
+                insights_done += 1
+            
+            themes = result.get("themes")
+            if themes is not None:
+                theme_rows = build_theme_rows(result["review_id"], themes, label_id_map)
+                rows_out.extend(theme_rows)
+                themes_extracted += len(theme_rows) if themes else 0
+                themes_done += 1
+            return rows_out
+        
+        insight_task_id = insight_task.id if insight_task else None
+        theme_task_id = theme_task.id if theme_task else None
+        
+        def fused_progress():
+            progress = {}
+            if insight_task_id:
+                progress[insight_task_id] = insights_done
+            if theme_task_id:
+                progress[theme_task_id] = themes_done
+            return progress
+        
+        def renew_fused_leases(session):
+            renew_analysis_leases(session, ANALYSIS_STAGE_INSIGHTS, lease_owner)
+            renew_analysis_leases(session, ANALYSIS_STAGE_THEMES, lease_owner)
+        
+        # 🚀 流式并发：按需认领（带租约），与独立任务、补全巡检、重复派发的融合任务互不重复
+        try:
+            stream_extraction(
+                db,
+                iter_claimed_fused_groups(product_id, lease_owner, GROUP_SIZE),
+                process_fused_group, handle_fused_result, PARALLEL_SIZE,
+                progress=fused_progress,
+                on_flush=renew_fused_leases,
+                log_prefix="[融合分析]",
+                asin=get_product_asin(db, product_id)
+            )
+        finally:
+            release_analysis_leases(db, ANALYSIS_STAGE_INSIGHTS, lease_owner)
+            release_analysis_leases(db, ANALYSIS_STAGE_THEMES, lease_owner)
+        
+        logger.info(
+            f"[融合分析] 完成: 处理 {processed} 条评论, "
+            f"洞察 {insights_extracted} 条 ({insights_done} 条评论), 主题 {themes_extracted} 条 ({themes_done} 条评论)"
+        )
+        
+        if themes_extracted > 0:
+            sync_context_label_counts(db, product_id)
+        
+        # 🚀 缓存失效
+        if insights_extracted > 0 or themes_extracted > 0:
+            try:
+                from app.core.cache import get_cache_service_sync
+                from app.models.product import Product
+                product = db.execute(select(Product).where(Product.id == product_id)).scalar_one_or_none()
+                if product:
+                    get_cache_service_sync().invalidate_all_for_product(product.asin)
+                    logger.info(f"[Cache] Invalidated caches for product {product.asin} after fused analysis")
+            except Exception as cache_error:
+                logger.warning(f"[Cache] Failed to invalidate cache: {cache_error}")
+        
+        remaining_insights = count_reviews(~insight_exists_subquery)
+        remaining_themes = count_reviews(~theme_exists_subquery)
+        
+        # 其他 Worker（融合或独立任务）仍持有租约：补全与完成状态交给最后结束的 Worker
+        active_leases = (
+            count_active_analysis_leases(db, product_id, ANALYSIS_STAGE_INSIGHTS)
+            + count_active_analysis_leases(db, product_id, ANALYSIS_STAGE_THEMES)
+        )
+        if active_leases > 0:
+            logger.info(f"[融合分析] 仍有 {active_leases} 条租约由其他 Worker 处理中，本 Worker 结束")
+            return {
+                "product_id": product_id,
+                "total_reviews": total_reviews,
+                "processed": processed,
+                "insights_extracted": insights_extracted,
+                "themes_extracted": themes_extracted,
+                "remaining_insights": remaining_insights,
+                "remaining_themes": remaining_themes
+            }
+        
+        # 🔒 比较并设置：同时收尾的 Worker 中只有完成状态转换的那个派发对应阶段的补全任务
+        insights_finished = finish_analysis_task(db, insight_task, max(0, total_reviews - remaining_insights))
+        themes_finished = finish_analysis_task(db, theme_task, max(0, total_reviews - remaining_themes))
+        db.commit()
+        
+        # 🛡️ 末尾补全检查：遗漏的部分交给独立任务（带重试计数和放弃标记）
+        if remaining_insights > 0 and insights_finished:
+            logger.warning(f"[融合分析] ⚠️ {remaining_insights} 条评论缺洞察，触发洞察补全任务")
+            task_extract_insights.apply_async(args=[product_id], countdown=10)
+        if remaining_themes > 0 and themes_finished:
+            logger.warning(f"[融合分析] ⚠️ {remaining_themes} 条评论缺主题，触发主题补全任务")
+            task_extract_themes.apply_async(args=[product_id], countdown=15)
+        
+        return {
+            "product_id": product_id,
+            "total_reviews": total_reviews,
+            "processed": processed,
+            "insights_extracted": insights_extracted,
+            "themes_extracted": themes_extracted,
+            "remaining_insights": remaining_insights,
+            "remaining_themes": remaining_themes
+        }
+        
+    except Exception as e:
+        logger.error(f"Fused analysis failed for product {product_id}: {e}")
+        for task_record in (insight_task, theme_task):
+            if task_record:
+                task_record.status = TaskStatus.FAILED.value
+                task_record.error_message = str(e)
+        db.commit()
+        raise self.retry(exc=e)
+        
+    finally:
+        db.close()
+
+
+def is_fused_analysis_enabled(db, product_id: str) -> bool:
+    """产品是否使用融合分析（Product.fused_analysis 为 NULL 时使用全局配置）"""
+    from app.models.product import Product
+    
+    flag = db.execute(
+        select(Product.fused_analysis).where(Product.id == product_id)
+    ).scalar_one_or_none()
+    return settings.FUSED_ANALYSIS_ENABLED if flag is None else bool(flag)
+
+
+def dispatch_review_analysis(db, product_id: str):
+    """
+    触发评论分析（洞察 + 主题）
+    
+    融合模式：一个 task_extract_analysis_fused；否则分别触发洞察和主题任务，
+    评论量大的产品按 ANALYSIS_REVIEWS_PER_WORKER 额外派发协作 Worker。
+    """
+    if is_fused_analysis_enabled(db, product_id):
+        task_extract_analysis_fused.delay(product_id)
+        return
+    
+    task_extract_insights.delay(product_id)
+    task_extract_themes.delay(product_id)
+    
+    # 大产品：额外派发协作 Worker，通过认领租约分摊同一产品的评论
+    # 延迟启动，让主 Worker 先完成标签库学习等一次性准备
+    assist_count = analysis_worker_count(db, product_id) - 1
+    for i in range(assist_count):
+        task_extract_insights.apply_async(args=[product_id], kwargs={"assist": True}, countdown=30 + i)
+        task_extract_themes.apply_async(args=[product_id], kwargs={"assist": True}, countdown=30 + i)
+    if assist_count > 0:
+        logger.info(f"[分析派发] 产品 {product_id} 评论量较大，额外派发 {assist_count} 组协作 Worker")
+
+
 # ============== [NEW] 任务5: 流式轻量翻译 ==============
 
 @celery_app.task(bind=True, max_retries=2, default_retry_delay=30)
@@ -1855,6 +2748,8 @@ def task_ingest_translation_only(self, product_id: str):
     from app.models.product import Product
     from app.models.review import Review, TranslationStatus
     from app.services.translation import translation_service
+    from app.services.sentiment_engine import sentiment_engine
+    from app.services.batch_packer import review_batch_packer
     import json
     
     # 🚦 慢车道：启动随机延迟（更大的延迟，避免瞬间冲高 QPS）
@@ -1878,12 +2773,14 @@ def task_ingest_translation_only(self, product_id: str):
             logger.error(f"[流式翻译] 产品 {product_id} 不存在")
             return {"success": False, "error": "Product not found"}
         
-        product_asin = product.asin  # 保存 asin 用于释放锁
+        product_asin = product.asin  # 保存 asin 用于释放锁（也用于递增数据版本）
+        product_translated = False
         
         # 2. 翻译产品标题（如果未翻译）
         if product.title and not product.title_translated:
             try:
                 product.title_translated = translation_service.translate_product_title(product.title)
+                product_translated = True
                 logger.info(f"[流式翻译] 标题翻译完成: {product.title_translated[:30]}...")
             except Exception as e:
                 logger.warning(f"[流式翻译] 标题翻译失败: {e}")
@@ -1919,28 +2816,34 @@ def task_ingest_translation_only(self, product_id: str):
                     translated_bullets = translation_service.translate_bullet_points(bullet_points)
                     # 统一保存为 JSON 字符串格式
                     product.bullet_points_translated = json.dumps(translated_bullets, ensure_ascii=False)
+                    product_translated = True
                     logger.info(f"[流式翻译] 五点翻译完成: {len(translated_bullets)} 条")
             except Exception as e:
                 logger.warning(f"[流式翻译] 五点翻译失败: {e}")
         
         db.commit()
+        if product_translated:
+            touch_product_data(product_asin)
         
         # =========================================================================
-        # 4. 🎯 智能批量翻译（差异化处理：VIP单独/标准5条/短评20条）
+        # 4. 🎯 智能批量翻译（按 token 预算装箱，长评论分片）
         # =========================================================================
         # 
         # 策略：
-        # - VIP 评论（>200字或极端星级>100字）：单独翻译，保证质量
-        # - 标准评论（50-200字）：5 条一批
-        # - 短评论（≤50字）：20 条一批，最大化效率
+        # - TokenBatchPacker 离线估算每条评论的输入/输出 token
+        # - First-Fit Decreasing 装箱，每个请求尽量填满 token 预算（VIP 长评论不再单独请求）
+        # - 超长评论按句子切成多个分片，全部分片到齐后拼接写回（不再截断）
         #
         # 优势：
-        # - 质量保证：重要评论不降低翻译质量
-        # - 效率最大化：短评论 QPS 消耗降低 20 倍
-        # - 灵活平衡：中等评论兼顾质量和效率
+        # - 每次 LLM 调用的有效工作量最大化，请求数随 token 总量而不是条数增长
+        # - 长评论完整翻译，不丢失 2000 字符之后的内容
+        # - 融合调用：每批一次请求同时返回正文译文、标题译文和情感（不再 2N+1 次调用）
+        # - 同一认领块内的请求经有界协程池并发发出，节奏交给全局令牌桶限流（不再固定 sleep）
+        # - 认领后一条语句标记 processing，整块结果一条语句写回
         #
         translated_count = 0
         failed_count = 0
+        write_stats = DBWriteStats()
         
         # 统计不同类别的处理情况
         category_stats = {
@@ -1950,12 +2853,27 @@ def task_ingest_translation_only(self, product_id: str):
         }
         
         # 每次获取更多评论，按分类处理
-        MAX_FETCH_SIZE = 100  # 每次最多获取 100 条待翻译评论
+        MAX_FETCH_SIZE = 500  # 每次最多认领 500 条待翻译评论（装箱后并发翻译）
+        
+        # 🚀 块内并发请求数（速率由 llm_rate_limiter 统一控制）
+        PARALLEL_SIZE = int(os.environ.get('TRANSLATION_PARALLEL_SIZE', '32'))
+        from gevent.pool import Pool
+        pool = Pool(PARALLEL_SIZE)
+        
+        def translate_batch(batch):
+            """并发翻译一个请求批次（新协程不继承 contextvar，需重新指定车道）"""
+            with llm_lane(LANE_TRANSLATION):
+                try:
+                    return batch, translation_service.translate_reviews_batch_with_fallback(batch)
+                except Exception as e:
+                    logger.error(f"[智能翻译] 批次翻译失败: {e}")
+                    return batch, {}
         
         while True:
             # 🔒 获取待翻译评论（使用 PostgreSQL 行级锁）
             # [FIXED] 只处理 pending 状态，不再自动重试 failed（避免内容审查失败无限循环）
-            pending_result = db.execute(
+            pending_result = write_stats.execute(
+                db,
                 select(Review)
                 .where(
                     and_(
@@ -1974,8 +2892,13 @@ def task_ingest_translation_only(self, product_id: str):
                 logger.info(f"[智能翻译] 没有更多待翻译的评论")
                 break
             
-            # 🎯 按长度和质量分类
+            # 📊 按长度和质量分类（仅用于统计）
             grouped_reviews = ReviewClassifier.group_reviews(pending_reviews)
+            review_category = {}
+            for category, reviews in grouped_reviews.items():
+                category_stats[category]['total'] += len(reviews)
+                for review in reviews:
+                    review_category[str(review.id)] = category
             
             logger.info(
                 f"[智能翻译] 📊 评论分类: "
@@ -1984,87 +2907,103 @@ def task_ingest_translation_only(self, product_id: str):
                 f"短评={len(grouped_reviews['short'])}"
             )
             
-            # 处理顺序：短评 → 标准 → VIP（优先快速处理大量短评）
-            for category in ['short', 'standard', 'vip']:
-                reviews = grouped_reviews[category]
-                if not reviews:
-                    continue
-                
-                batch_size = ReviewClassifier.get_batch_size(category)
-                category_stats[category]['total'] += len(reviews)
-                
-                logger.info(f"[智能翻译] 🚀 处理 {category} 类评论: {len(reviews)} 条，批量大小={batch_size}")
+            # 提交前留存当前值（提交后 ORM 对象过期，再读取会逐条回查）
+            review_map = {
+                str(review.id): {
+                    "id": review.id,
+                    "title_translated": review.title_translated,
+                    "body_translated": review.body_translated,
+                    "sentiment": review.sentiment
+                }
+                for review in pending_reviews
+            }
+            
+            # 构建融合翻译请求（正文 + 未翻译的标题）
+            batch_input = []
+            empty_ids = []
+            for review in pending_reviews:
+                text = review.body_original or ""
+                if text.strip():
+                    batch_input.append({
+                        "id": str(review.id),
+                        "text": text,
+                        "title": review.title_original if not review.title_translated else None,
+                        "rating": review.rating
+                    })
+                else:
+                    # 无正文，无法翻译
+                    empty_ids.append(review.id)
+            failed_count += len(empty_ids)
+            
+            # 🔒 认领：一条语句标记整块为处理中后提交（释放行锁，其他 Worker 只会认领 pending）
+            if batch_input:
+                write_stats.execute(
+                    db,
+                    update(Review)
+                    .where(Review.id.in_([item["id"] for item in batch_input]))
+                    .values(translation_status=TranslationStatus.PROCESSING.value)
+                )
+            if empty_ids:
+                write_stats.execute(
+                    db,
+                    update(Review)
+                    .where(Review.id.in_(empty_ids))
+                    .values(translation_status=TranslationStatus.FAILED.value)
+                )
+            write_stats.commit(db)
+            touch_product_data(product_asin)
+            
+            # 🧠 本地情感引擎整批打分（无网络 I/O，基于完整原文），低置信度才采用 LLM 的判定
+            local_sentiments = dict(zip(
+                [item["id"] for item in batch_input],
+                sentiment_engine.classify_batch(batch_input)
+            ))
+            
+            # 📦 按 token 预算装箱
+            batches = review_batch_packer.pack(batch_input)
+            
+            logger.info(
+                f"[智能翻译] 📦 {len(batch_input)} 条评论装箱为 {len(batches)} 个请求 "
+                f"（{sum(len(batch) for batch in batches)} 个分片），并发 {min(PARALLEL_SIZE, len(batches))}"
+            )
+            
+            # 🚀 块内全部请求并发发出，谁先返回先收集
+            all_chunks = [chunk for batch in batches for chunk in batch]
+            chunk_results = {}
+            for batch, batch_result in pool.imap_unordered(translate_batch, batches):
+                chunk_results.update(batch_result)
+                logger.info(f"[智能翻译] 批次翻译完成: {len(batch)} 个分片")
+            
+            # 分片到齐后合并为整条评论
+            merged_results = review_batch_packer.merge_results(all_chunks, chunk_results)
+            
+            # 整块结果一条 UPDATE ... FROM (VALUES ...) 写回
+            updates = []
+            for item_input in batch_input:
+                review_id = item_input["id"]
+                review = review_map[review_id]
+                item = merged_results.get(review_id)
                 
-                # 按批量大小分批处理
-                for i in range(0, len(reviews), batch_size):
-                    batch = reviews[i:i+batch_size]
-                    
-                    # 标记为处理中
-                    for review in batch:
-                        review.translation_status = TranslationStatus.PROCESSING.value
-                    db.commit()
-                    
-                    # 构建批量翻译请求
-                    batch_input = []
-                    for review in batch:
-                        text = review.body_original or ""
-                        if text.strip():
-                            batch_input.append({
-                                "id": str(review.id),
-                                "text": text
-                            })
-                    
-                    # 🔥 批量翻译（VIP=1条，标准=5条，短评=20条）
-                    try:
-                        if batch_size == 1:
-                            # VIP 评论：单独翻译
-                            review = batch[0]
-                            translated = translation_service.translate_text(review.body_original)
-                            batch_results = {str(review.id): translated}
-                        else:
-                            # 标准/短评：批量翻译
-                            batch_results = translation_service.translate_batch_with_fallback(batch_input)
-                        
-                        logger.info(f"[智能翻译] {category} 批次翻译完成: {len(batch_results)}/{len(batch)} 条")
-                    except Exception as e:
-                        logger.error(f"[智能翻译] {category} 批次翻译失败: {e}")
-                        batch_results = {}
-                    
-                    # 批量更新数据库
-                    for review in batch:
-                        review_id_str = str(review.id)
-                        
-                        if review_id_str in batch_results and batch_results[review_id_str]:
-                            # 翻译成功
-                            review.body_translated = batch_results[review_id_str]
-                            
-                            # 标题单独翻译
-                            if review.title_original and not review.title_translated:
-                                try:
-                                    review.title_translated = translation_service.translate_text(review.title_original)
-                                except:
-                                    pass
-                            
-                            # 情感分析
-                            try:
-                                sentiment = translation_service.analyze_sentiment(review.body_translated)
-                                review.sentiment = sentiment.value
-                            except:
-                                review.sentiment = "neutral"
-                            
-                            review.translation_status = TranslationStatus.COMPLETED.value
-                            translated_count += 1
-                            category_stats[category]['success'] += 1
-                        else:
-                            # 翻译失败
-                            review.translation_status = TranslationStatus.FAILED.value
-                            failed_count += 1
-                    
-                    # 提交本批更新
-                    db.commit()
-                    
-                    # 短暂延迟，避免 QPS 冲高
-                    time.sleep(0.3 if batch_size == 1 else 0.5)
+                if item and item.get("body"):
+                    # 翻译成功
+                    local = local_sentiments.get(review_id)
+                    updates.append({
+                        "id": review["id"],
+                        "body_translated": item["body"],
+                        "title_translated": review["title_translated"] or item.get("title") or None,
+                        "sentiment": local.label if local and not local.needs_llm else item["sentiment"].value,
+                        "translation_status": TranslationStatus.COMPLETED.value
+                    })
+                    translated_count += 1
+                    category_stats[review_category[review_id]]['success'] += 1
+                else:
+                    # 翻译失败（保留原值，键集合一致才能合并为一条语句）
+                    updates.append({**review, "translation_status": TranslationStatus.FAILED.value})
+                    failed_count += 1
+            
+            bulk_write_review_translations(db, updates, write_stats)
+            write_stats.commit(db)
+            touch_product_data(product_asin)
             
             # 如果获取的评论少于 MAX_FETCH_SIZE，说明没有更多了
             if len(pending_reviews) < MAX_FETCH_SIZE:
@@ -2078,7 +3017,10 @@ def task_ingest_translation_only(self, product_id: str):
             f"  📊 短评论: {category_stats['short']['success']}/{category_stats['short']['total']} 条"
         )
         
-        logger.info(f"[流式翻译] 完成: 翻译 {translated_count} 条, 失败 {failed_count} 条")
+        logger.info(
+            f"[流式翻译] 完成: 翻译 {translated_count} 条, 失败 {failed_count} 条 "
+            f"(DB 往返 {write_stats.round_trips} 次, 提交 {write_stats.commits} 次)"
+        )
         
         # 🚀 缓存失效 - 翻译完成后清除产品相关缓存
         if translated_count > 0:
@@ -2094,7 +3036,8 @@ def task_ingest_translation_only(self, product_id: str):
             "success": True,
             "product_id": product_id,
             "translated_count": translated_count,
-            "failed_count": failed_count
+            "failed_count": failed_count,
+            **write_stats.as_dict()
         }
         
     except Exception as e:
@@ -2214,130 +3157,489 @@ def task_scientific_learning_and_analysis(self, product_id: str):
         )
         dim_count = dim_count_result.scalar() or 0
         
-        dimensions_learned = 0
-        if dim_count == 0:
-            logger.info(f"[科学学习] 学习3类产品维度中...")
-            
-            # [FIX 2026-01-19] 增加重试机制，最多重试3次
-            dims_result = None
-            max_retries = 3
-            for attempt in range(max_retries):
-                dims_result = translation_service.learn_dimensions_from_raw(
-                    raw_reviews=raw_samples,
-                    product_title=product_title,
-                    bullet_points="\n".join(bullet_points) if bullet_points else ""
-                )
-                if dims_result and isinstance(dims_result, dict):
-                    break  # 学习成功
-                logger.warning(f"[科学学习] 维度学习第 {attempt + 1} 次失败，"
-                              f"{'重试中...' if attempt < max_retries - 1 else '已达最大重试次数'}")
-                if attempt < max_retries - 1:
-                    time.sleep(2)  # 等待 2 秒后重试
+        dimensions_learned = 0
+        if dim_count == 0:
+            logger.info(f"[科学学习] 学习3类产品维度中...")
+            
+            # [FIX 2026-01-19] 增加重试机制，最多重试3次
+            dims_result = None
+            max_retries = 3
+            for attempt in range(max_retries):
+                dims_result = translation_service.learn_dimensions_from_raw(
+                    raw_reviews=raw_samples,
+                    product_title=product_title,
+                    bullet_points="\n".join(bullet_points) if bullet_points else ""
+                )
+                if dims_result and isinstance(dims_result, dict):
+                    break  # 学习成功
+                logger.warning(f"[科学学习] 维度学习第 {attempt + 1} 次失败，"
+                              f"{'重试中...' if attempt < max_retries - 1 else '已达最大重试次数'}")
+                if attempt < max_retries - 1:
+                    time.sleep(2)  # 等待 2 秒后重试
+            
+            # [UPDATED 2026-01-16] 解析3类维度并保存
+            if dims_result and isinstance(dims_result, dict):
+                # 新格式：3类维度
+                for dim_type in ["product", "scenario", "emotion"]:
+                    type_dims = dims_result.get(dim_type, [])
+                    for dim in type_dims:
+                        if isinstance(dim, dict) and dim.get("name"):
+                            dimension = ProductDimension(
+                                product_id=product_id,
+                                name=dim["name"].strip(),
+                                description=dim.get("description", "").strip() or None,
+                                dimension_type=dim_type,  # [NEW] 设置维度类型
+                                is_ai_generated=True
+                            )
+                            db.add(dimension)
+                            dimensions_learned += 1
+                db.commit()
+                logger.info(f"[科学学习] 3类维度学习完成: {dimensions_learned} 个 "
+                           f"(产品:{len(dims_result.get('product', []))}, "
+                           f"场景:{len(dims_result.get('scenario', []))}, "
+                           f"情绪:{len(dims_result.get('emotion', []))})")
+            elif dims_result and isinstance(dims_result, list):
+                # 向后兼容：旧格式（单一列表）
+                for dim in dims_result:
+                    dimension = ProductDimension(
+                        product_id=product_id,
+                        name=dim["name"],
+                        description=dim.get("description", ""),
+                        dimension_type="product",  # 默认为产品维度
+                        is_ai_generated=True
+                    )
+                    db.add(dimension)
+                    dimensions_learned += 1
+                db.commit()
+                logger.info(f"[科学学习] 维度学习完成(旧格式): {dimensions_learned} 个")
+            else:
+                # [FIX 2026-01-19] 维度学习失败，阻断流程
+                logger.error(f"[科学学习] ❌ 维度学习失败（重试 {max_retries} 次后仍然失败），阻断后续流程")
+                raise ValueError(f"维度学习失败，无法继续分析流程。请检查 AI 服务或重试。")
+        else:
+            logger.info(f"[科学学习] 产品已有 {dim_count} 个维度，跳过学习")
+        
+        # 2.2 学习5W标签（如果不存在）
+        label_count_result = db.execute(
+            select(func.count(ProductContextLabel.id))
+            .where(ProductContextLabel.product_id == product_id)
+        )
+        label_count = label_count_result.scalar() or 0
+        
+        labels_learned = 0
+        if label_count == 0:
+            logger.info(f"[科学学习] 学习5W标签库中...")
+            labels = translation_service.learn_context_labels_from_raw(
+                raw_reviews=raw_samples,
+                product_title=product_title,
+                bullet_points=bullet_points
+            )
+            
+            if labels:
+                # [UPDATED 2026-01-14] 支持 buyer/user 拆分
+                for context_type in ["buyer", "user", "who", "where", "when", "why", "what"]:
+                    type_labels = labels.get(context_type, [])
+                    for item in type_labels:
+                        if isinstance(item, dict) and item.get("name"):
+                            label = ProductContextLabel(
+                                product_id=product_id,
+                                type=context_type,
+                                name=item["name"].strip(),
+                                description=item.get("description", "").strip() or None,
+                                count=0,
+                                is_ai_generated=True
+                            )
+                            db.add(label)
+                            labels_learned += 1
+                db.commit()
+                logger.info(f"[科学学习] 5W标签学习完成: {labels_learned} 个")
+        else:
+            logger.info(f"[科学学习] 产品已有 {label_count} 个5W标签，跳过学习")
+        
+        # === Step 3 & 4: 触发全量洞察 + 主题回填（融合模式下一次提取）===
+        logger.info(f"[科学学习] Step 3/4: 触发全量洞察 + 主题回填...")
+        dispatch_review_analysis(db, product_id)
+        
+        logger.info(f"[科学学习] 完成: 维度 +{dimensions_learned}, 标签 +{labels_learned}")
+        
+        return {
+            "success": True,
+            "product_id": product_id,
+            "samples_used": len(raw_samples),
+            "dimensions_learned": dimensions_learned,
+            "labels_learned": labels_learned,
+            "backfill_triggered": True
+        }
+        
+    except Exception as e:
+        logger.error(f"[科学学习] 产品 {product_id} 处理失败: {e}")
+        db.rollback()
+        raise self.retry(exc=e)
+        
+    finally:
+        db.close()
+
+
+# ============================================================================
+# 🔗 事件驱动流水线编排（全自动分析 Step 3 → Step 4）
+# ============================================================================
+#
+# 旧实现：task_full_auto_analysis 派发洞察/主题后 while 循环 sleep(15)，最长 1800 秒，
+# 每轮执行 4 个 COUNT（含 NOT IN 子查询），整个等待期占用一个 learning 槽位。
+#
+# 新实现（DAG，没有任何 Worker 睡眠轮询）：
+#
+#   learning(Step 1) ──► dispatch(Step 2) ──┬─► translation ──┐
+#                                           ├─► insights ─────┼─► 就绪判断 ──► report(Step 4)
+#                                           └─► themes ───────┘
+#
+# - 阶段任务结束时（task_postrun 信号）发出完成事件 → on_pipeline_event 判断报告输入是否就绪
+# - 定时 tick（apply_async countdown，等待期间不占用 Worker）兜底：心跳、停滞重派、超时收尾
+# - 就绪判断只跑 1 条聚合查询（COUNT FILTER + NOT EXISTS）
+# - 报告通过 Redis SET NX 保证只触发一次
+#
+# Redis 状态：pipeline:auto:{product_id} → {task_id, started_at}
+#
+
+PIPELINE_KEY_PREFIX = "pipeline:auto:"
+PIPELINE_FINALIZED_PREFIX = "pipeline:auto:finalized:"
+PIPELINE_REDISPATCH_PREFIX = "pipeline:auto:redispatch:"
+
+PIPELINE_TICK_SECONDS = 120          # 兜底 tick 间隔（同时是停滞重派的最小间隔）
+PIPELINE_DEADLINE_SECONDS = 1800     # 最长等待（与旧实现一致）
+PIPELINE_READY_RATIO = 0.90          # 洞察/主题完成度达到 90% 即生成报告
+PIPELINE_TIMEOUT_MIN_RATIO = 0.80    # 超时时完成度不低于 80% 仍生成报告
+PIPELINE_REDISPATCH_THRESHOLD = 10   # 剩余超过该条数才重新派发阶段任务
+
+# 会发出完成事件的阶段任务
+PIPELINE_STAGE_TASKS = {
+    "app.worker.task_ingest_translation_only": "translation",
+    "app.worker.task_extract_insights": "insights",
+    "app.worker.task_extract_themes": "themes",
+    "app.worker.task_extract_analysis_fused": "fused",
+}
+
+
+def get_analysis_progress(db, product_id: str) -> dict:
+    """
+    一条聚合查询得到翻译/洞察/主题进度（替代旧实现每轮 4 个 COUNT）
+    """
+    from app.models.review import Review, TranslationStatus
+    from app.models.insight import ReviewInsight
+    from app.models.theme_highlight import ReviewThemeHighlight
+
+    completed = Review.translation_status == TranslationStatus.COMPLETED.value
+    has_insight = select(ReviewInsight.review_id).where(ReviewInsight.review_id == Review.id).exists()
+    has_theme = select(ReviewThemeHighlight.review_id).where(ReviewThemeHighlight.review_id == Review.id).exists()
+
+    row = db.execute(
+        select(
+            func.count(Review.id).filter(
+                Review.translation_status.in_([
+                    TranslationStatus.PENDING.value,
+                    TranslationStatus.PROCESSING.value
+                ])
+            ).label("pending_translation"),
+            func.count(Review.id).filter(completed).label("translated"),
+            func.count(Review.id).filter(and_(completed, ~has_insight)).label("pending_insights"),
+            func.count(Review.id).filter(and_(completed, ~has_theme)).label("pending_themes"),
+        ).where(
+            and_(
+                Review.product_id == product_id,
+                Review.is_deleted == False
+            )
+        )
+    ).one()
+
+    translated = row.translated or 0
+    return {
+        "pending_translation": row.pending_translation or 0,
+        "translated": translated,
+        "pending_insights": row.pending_insights or 0,
+        "pending_themes": row.pending_themes or 0,
+        "insights_completion": (translated - row.pending_insights) / translated if translated else 0,
+        "themes_completion": (translated - row.pending_themes) / translated if translated else 0,
+    }
+
+
+def open_auto_pipeline(product_id: str, task_id: str):
+    """登记流水线状态，并启动兜底 tick"""
+    key = f"{PIPELINE_KEY_PREFIX}{product_id}"
+    pipe = redis_client.pipeline()
+    pipe.delete(f"{PIPELINE_FINALIZED_PREFIX}{product_id}")
+    pipe.hset(key, mapping={"task_id": task_id, "started_at": time.time()})
+    pipe.expire(key, PIPELINE_DEADLINE_SECONDS * 2)
+    pipe.execute()
+    task_auto_analysis_tick.apply_async(args=[product_id, task_id], countdown=PIPELINE_TICK_SECONDS)
+
+
+def close_auto_pipeline(product_id: str):
+    redis_client.delete(f"{PIPELINE_KEY_PREFIX}{product_id}")
+
+
+def redispatch_stalled_stages(db, product_id: str, progress: dict):
+    """
+    阶段任务已结束但仍有剩余（例如洞察任务先于翻译完成），重新派发
+    
+    每个产品每个阶段在 PIPELINE_TICK_SECONDS 内最多派发一次，避免事件风暴。
+    """
+    def claim(stage: str) -> bool:
+        return bool(redis_client.set(
+            f"{PIPELINE_REDISPATCH_PREFIX}{product_id}:{stage}", "1",
+            nx=True, ex=PIPELINE_TICK_SECONDS
+        ))
+
+    if progress["pending_translation"] > PIPELINE_REDISPATCH_THRESHOLD and claim("translation"):
+        logger.info(f"[流水线] 🔄 重新触发翻译任务（还有{progress['pending_translation']}条待处理）")
+        task_ingest_translation_only.delay(product_id)
+
+    pending_insights = progress["pending_insights"] > PIPELINE_REDISPATCH_THRESHOLD
+    pending_themes = progress["pending_themes"] > PIPELINE_REDISPATCH_THRESHOLD
+    if pending_insights and pending_themes and is_fused_analysis_enabled(db, product_id):
+        if claim("fused"):
+            logger.info(f"[流水线] 重新触发融合分析（洞察{progress['pending_insights']}条/主题{progress['pending_themes']}条待处理）")
+            task_extract_analysis_fused.delay(product_id)
+        return
+    if pending_insights and claim("insights"):
+        logger.info(f"[流水线] 重新触发洞察提取（还有{progress['pending_insights']}条待处理）")
+        task_extract_insights.delay(product_id)
+    if pending_themes and claim("themes"):
+        logger.info(f"[流水线] 重新触发主题提取（还有{progress['pending_themes']}条待处理）")
+        task_extract_themes.delay(product_id)
+
+
+def on_pipeline_event(product_id: str, source: str, expected_task_id: str = None) -> str:
+    """
+    流水线事件处理：判断报告输入是否就绪，就绪则触发报告生成
+    
+    Args:
+        product_id: 产品 UUID
+        source: 事件来源（dispatch / tick / translation / insights / themes / fused）
+        expected_task_id: tick 事件携带的任务 ID，与当前流水线不一致时忽略（旧 tick 链自然结束）
+    
+    Returns:
+        "idle": 没有进行中的流水线
+        "waiting": 仍在等待
+        "finalized": 已触发报告生成
+        "failed": 超时且完成度不足，任务已标记失败
+    """
+    from app.models.task import TaskStatus
+
+    state = redis_client.hgetall(f"{PIPELINE_KEY_PREFIX}{product_id}")
+    if not state or (expected_task_id and state.get("task_id") != expected_task_id):
+        return "idle"
+    if redis_client.exists(f"{PIPELINE_FINALIZED_PREFIX}{product_id}"):
+        return "finalized"
+
+    task_id = state["task_id"]
+    elapsed = time.time() - float(state.get("started_at") or time.time())
+
+    db = get_sync_db()
+    try:
+        progress = get_analysis_progress(db, product_id)
+        update_task_heartbeat(db, task_id, processed_items=3)
+
+        all_done = (
+            progress["pending_translation"] == 0
+            and progress["pending_insights"] == 0
+            and progress["pending_themes"] == 0
+        )
+        ready = all_done or (
+            progress["insights_completion"] >= PIPELINE_READY_RATIO
+            and progress["themes_completion"] >= PIPELINE_READY_RATIO
+        )
+
+        if not ready and elapsed >= PIPELINE_DEADLINE_SECONDS:
+            # 超时：完成度 >= 80% 仍生成报告，剩余任务可异步继续
+            if (progress["insights_completion"] >= PIPELINE_TIMEOUT_MIN_RATIO
+                    and progress["themes_completion"] >= PIPELINE_TIMEOUT_MIN_RATIO):
+                logger.warning(
+                    f"[流水线] 产品 {product_id} 等待超时，但完成度达到80%以上，继续生成报告"
+                    f"（洞察:{progress['insights_completion']:.0%}, 主题:{progress['themes_completion']:.0%}）"
+                )
+                ready = True
+            else:
+                message = (
+                    f"处理超时，洞察完成度:{progress['insights_completion']:.0%}，"
+                    f"主题完成度:{progress['themes_completion']:.0%}"
+                )
+                logger.error(f"[流水线] ⚠️ 产品 {product_id} {message}")
+                from app.models.task import Task
+                db.execute(
+                    update(Task)
+                    .where(Task.id == task_id)
+                    .values(status=TaskStatus.FAILED.value, error_message=message)
+                )
+                db.commit()
+                close_auto_pipeline(product_id)
+                return "failed"
+
+        if ready:
+            if redis_client.set(f"{PIPELINE_FINALIZED_PREFIX}{product_id}", task_id, nx=True, ex=PIPELINE_DEADLINE_SECONDS):
+                logger.info(
+                    f"[流水线] ✅ 产品 {product_id} 报告输入就绪（来源:{source}），触发报告生成 "
+                    f"洞察:{progress['insights_completion']:.0%}, 主题:{progress['themes_completion']:.0%}"
+                )
+                task_finalize_auto_analysis.delay(product_id, task_id)
+            return "finalized"
+
+        logger.debug(
+            f"[流水线] 产品 {product_id} 事件:{source} - 待翻译:{progress['pending_translation']} | "
+            f"待洞察:{progress['pending_insights']} | 待主题:{progress['pending_themes']}"
+        )
+        if source != "dispatch":
+            redispatch_stalled_stages(db, product_id, progress)
+        return "waiting"
+    finally:
+        db.close()
+
+
+@task_postrun.connect
+def on_stage_task_postrun(task=None, args=None, kwargs=None, state=None, **extra):
+    """阶段任务结束 → 发出流水线完成事件（重试中的任务不算结束）"""
+    if task is None or task.name not in PIPELINE_STAGE_TASKS or state == "RETRY":
+        return
+    product_id = (kwargs or {}).get("product_id") or (args[0] if args else None)
+    if not product_id:
+        return
+    try:
+        on_pipeline_event(str(product_id), PIPELINE_STAGE_TASKS[task.name])
+    except Exception as e:
+        logger.warning(f"[流水线] 处理阶段完成事件失败（tick 会兜底）: {e}")
+
+
+@celery_app.task(bind=True, max_retries=0)
+def task_auto_analysis_tick(self, product_id: str, task_id: str):
+    """
+    流水线兜底 tick：心跳、停滞重派、超时收尾
+    
+    以 countdown 自我调度，等待期间不占用任何 Worker。
+    """
+    status = on_pipeline_event(product_id, "tick", expected_task_id=task_id)
+    if status == "waiting":
+        task_auto_analysis_tick.apply_async(args=[product_id, task_id], countdown=PIPELINE_TICK_SECONDS)
+    return {"product_id": product_id, "status": status}
+
+
+@celery_app.task(bind=True, max_retries=1, default_retry_delay=60)
+def task_finalize_auto_analysis(self, product_id: str, task_id: str):
+    """
+    全自动分析 Step 4：生成综合战略版报告并完成任务
+    
+    由 on_pipeline_event 在洞察/主题输入就绪时触发（每条流水线只触发一次）。
+    """
+    from app.models.task import Task, TaskStatus
+    from datetime import datetime, timezone
+
+    db = get_sync_db()
+
+    def update_task_progress(step: int, status: str = TaskStatus.PROCESSING.value):
+        try:
+            db.execute(
+                update(Task)
+                .where(Task.id == task_id)
+                .values(processed_items=step, status=status, last_heartbeat=datetime.now(timezone.utc))
+            )
+            db.commit()
+        except Exception as e:
+            logger.error(f"[全自动分析] 更新任务进度失败: {e}")
+
+    try:
+        # ==========================================
+        # Step 4: 生成综合战略版报告
+        # ==========================================
+        update_task_progress(4, TaskStatus.PROCESSING.value)
+        logger.info(f"[全自动分析] Step 4/4: 生成综合报告...")
+        
+        try:
+            # 使用同步方式调用报告生成
+            # 由于 SummaryService 是异步的，需要使用 asyncio
+            import asyncio
+            from app.services.summary_service import SummaryService
             
-            # [UPDATED 2026-01-16] 解析3类维度并保存
-            if dims_result and isinstance(dims_result, dict):
-                # 新格式：3类维度
-                for dim_type in ["product", "scenario", "emotion"]:
-                    type_dims = dims_result.get(dim_type, [])
-                    for dim in type_dims:
-                        if isinstance(dim, dict) and dim.get("name"):
-                            dimension = ProductDimension(
-                                product_id=product_id,
-                                name=dim["name"].strip(),
-                                description=dim.get("description", "").strip() or None,
-                                dimension_type=dim_type,  # [NEW] 设置维度类型
-                                is_ai_generated=True
-                            )
-                            db.add(dimension)
-                            dimensions_learned += 1
-                db.commit()
-                logger.info(f"[科学学习] 3类维度学习完成: {dimensions_learned} 个 "
-                           f"(产品:{len(dims_result.get('product', []))}, "
-                           f"场景:{len(dims_result.get('scenario', []))}, "
-                           f"情绪:{len(dims_result.get('emotion', []))})")
-            elif dims_result and isinstance(dims_result, list):
-                # 向后兼容：旧格式（单一列表）
-                for dim in dims_result:
-                    dimension = ProductDimension(
+            async def generate_report_async():
+                # 使用正确的导入：engine 和 async_session_maker
+                from app.db.session import async_session_maker
+                
+                async with async_session_maker() as async_db:
+                    summary_service = SummaryService(async_db)
+                    result = await summary_service.generate_report(
                         product_id=product_id,
-                        name=dim["name"],
-                        description=dim.get("description", ""),
-                        dimension_type="product",  # 默认为产品维度
-                        is_ai_generated=True
+                        report_type="comprehensive",  # 综合战略版
+                        min_reviews=30,  # [UPDATED 2026-01-19] 报告需要至少30条评论
+                        save_to_db=True,
+                        force_regenerate=False,  # [NEW] 不强制重新生成，检查去重
+                        require_full_completion=False  # [优化] 允许90%完成度生成报告
                     )
-                    db.add(dimension)
-                    dimensions_learned += 1
-                db.commit()
-                logger.info(f"[科学学习] 维度学习完成(旧格式): {dimensions_learned} 个")
-            else:
-                # [FIX 2026-01-19] 维度学习失败，阻断流程
-                logger.error(f"[科学学习] ❌ 维度学习失败（重试 {max_retries} 次后仍然失败），阻断后续流程")
-                raise ValueError(f"维度学习失败，无法继续分析流程。请检查 AI 服务或重试。")
-        else:
-            logger.info(f"[科学学习] 产品已有 {dim_count} 个维度，跳过学习")
-        
-        # 2.2 学习5W标签（如果不存在）
-        label_count_result = db.execute(
-            select(func.count(ProductContextLabel.id))
-            .where(ProductContextLabel.product_id == product_id)
-        )
-        label_count = label_count_result.scalar() or 0
-        
-        labels_learned = 0
-        if label_count == 0:
-            logger.info(f"[科学学习] 学习5W标签库中...")
-            labels = translation_service.learn_context_labels_from_raw(
-                raw_reviews=raw_samples,
-                product_title=product_title,
-                bullet_points=bullet_points
-            )
+                    await async_db.commit()  # 确保提交
+                    return result
             
-            if labels:
-                # [UPDATED 2026-01-14] 支持 buyer/user 拆分
-                for context_type in ["buyer", "user", "who", "where", "when", "why", "what"]:
-                    type_labels = labels.get(context_type, [])
-                    for item in type_labels:
-                        if isinstance(item, dict) and item.get("name"):
-                            label = ProductContextLabel(
-                                product_id=product_id,
-                                type=context_type,
-                                name=item["name"].strip(),
-                                description=item.get("description", "").strip() or None,
-                                count=0,
-                                is_ai_generated=True
-                            )
-                            db.add(label)
-                            labels_learned += 1
-                db.commit()
-                logger.info(f"[科学学习] 5W标签学习完成: {labels_learned} 个")
-        else:
-            logger.info(f"[科学学习] 产品已有 {label_count} 个5W标签，跳过学习")
-        
-        # === Step 3: 触发全量洞察回填 ===
-        logger.info(f"[科学学习] Step 3: 触发全量洞察回填...")
-        task_extract_insights.delay(product_id)
+            # 运行异步函数 - 修复事件循环问题
+            try:
+                report_result = asyncio.run(generate_report_async())
+            except RuntimeError:
+                # 如果已有事件循环，使用备用方案
+                loop = asyncio.new_event_loop()
+                asyncio.set_event_loop(loop)
+                try:
+                    report_result = loop.run_until_complete(generate_report_async())
+                finally:
+                    pending = asyncio.all_tasks(loop)
+                    for task in pending:
+                        task.cancel()
+                    if pending:
+                        loop.run_until_complete(asyncio.gather(*pending, return_exceptions=True))
+                    loop.close()
+            
+            if report_result.get("success"):
+                report_id = report_result.get("report_id")
+                logger.info(f"[全自动分析] 综合报告生成成功，报告ID: {report_id}")
+                
+                # 更新任务记录，保存报告 ID
+                try:
+                    db.execute(
+                        update(Task)
+                        .where(Task.id == task_id)
+                        .values(error_message=f"report_id:{report_id}")  # 临时存储报告ID
+                    )
+                    db.commit()
+                except Exception as save_err:
+                    logger.warning(f"[全自动分析] 保存报告ID失败: {save_err}")
+            else:
+                logger.warning(f"[全自动分析] 综合报告生成失败: {report_result.get('error')}")
+                
+        except Exception as e:
+            logger.error(f"[全自动分析] 报告生成失败: {e}")
+            # 不因报告生成失败而中断整个任务
         
-        # === Step 4: 触发全量主题回填 ===
-        logger.info(f"[科学学习] Step 4: 触发全量主题回填...")
-        task_extract_themes.delay(product_id)
+        # ==========================================
+        # 完成
+        # ==========================================
+        update_task_progress(4, TaskStatus.COMPLETED.value)
+        logger.info(f"[全自动分析] ✅ 产品 {product_id} 全自动分析完成！（事件驱动版）")
         
-        logger.info(f"[科学学习] 完成: 维度 +{dimensions_learned}, 标签 +{labels_learned}")
+        # 清理相关分享链接的缓存（使分享页面获取最新数据）
+        try:
+            from app.models.share_link import ShareLink
+            share_links = db.query(ShareLink).filter(
+                ShareLink.product_id == product_id,
+                ShareLink.is_active == True
+            ).all()
+            for link in share_links:
+                cache_key = f"cache:share:data:{link.token}"
+                redis_client.delete(cache_key)
+                logger.info(f"[全自动分析] 已清理分享缓存: {cache_key}")
+        except Exception as cache_err:
+            logger.warning(f"[全自动分析] 清理分享缓存失败: {cache_err}")
         
         return {
             "success": True,
             "product_id": product_id,
-            "samples_used": len(raw_samples),
-            "dimensions_learned": dimensions_learned,
-            "labels_learned": labels_learned,
-            "backfill_triggered": True
+            "task_id": task_id,
+            "message": "全自动分析完成（事件驱动）"
         }
-        
-    except Exception as e:
-        logger.error(f"[科学学习] 产品 {product_id} 处理失败: {e}")
-        db.rollback()
-        raise self.retry(exc=e)
-        
     finally:
+        close_auto_pipeline(product_id)
         db.close()
 
 
@@ -2366,12 +3668,13 @@ def task_full_auto_analysis(self, product_id: str, task_id: str):
                               ↓
     Step 2: 触发洞察+主题提取（翻译此时已在进行中！）
                               ↓
-    Step 3: 等待三任务并行完成
+    Step 3: 登记事件驱动流水线后立即返回（不再 sleep 轮询）
             ├─ 翻译（已在进行，会先完成）
             ├─ 洞察提取（边翻译边提取）
             └─ 主题提取（边翻译边提取）
+            各阶段任务结束时发出完成事件（见 on_pipeline_event）
                               ↓
-    Step 4: 生成综合战略版报告
+    Step 4: 生成综合战略版报告（task_finalize_auto_analysis，就绪后触发）
     
     时间优化：
     - 翻译在采集时就开始 → 不等待
@@ -2386,8 +3689,6 @@ def task_full_auto_analysis(self, product_id: str, task_id: str):
     from app.models.product import Product
     from app.models.review import Review, TranslationStatus
     from app.models.task import Task, TaskStatus, TaskType
-    from app.models.insight import ReviewInsight
-    from app.models.theme_highlight import ReviewThemeHighlight
     from app.models.report import ProductReport, ReportType, ReportStatus
     from app.services.translation import translation_service
     from datetime import datetime, timezone
@@ -2609,271 +3910,60 @@ def task_full_auto_analysis(self, product_id: str, task_id: str):
         # Step 2: 触发洞察+主题提取
         # 注意：翻译任务在 ingest 时就已经启动了！不需要在这里触发
         # ==========================================
-        update_task_progress(2, TaskStatus.PROCESSING.value)
-        logger.info(f"[全自动分析] Step 2/4: 触发洞察+主题提取...")
-        
-        # 检查当前翻译进度（翻译在 ingest 时就已经开始了）
-        pending_result = db.execute(
-            select(func.count(Review.id))
-            .where(
-                and_(
-                    Review.product_id == product_id,
-                    Review.translation_status.in_([
-                        TranslationStatus.PENDING.value,
-                        TranslationStatus.PROCESSING.value
-                    ]),
-                    Review.is_deleted == False
-                )
-            )
-        )
-        pending_translation = pending_result.scalar() or 0
-        
-        translated_result = db.execute(
-            select(func.count(Review.id))
-            .where(
-                and_(
-                    Review.product_id == product_id,
-                    Review.translation_status == TranslationStatus.COMPLETED.value,
-                    Review.is_deleted == False
-                )
-            )
-        )
-        translated_count = translated_result.scalar() or 0
-        
-        logger.info(f"[全自动分析] 📊 当前翻译状态: 已翻译 {translated_count} 条, 待翻译 {pending_translation} 条")
-        logger.info(f"[全自动分析] 💡 翻译任务在 ingest 时就已启动，现在触发洞察+主题提取")
-        
-        # 触发洞察和主题提取（它们会处理已翻译的评论，边翻译边提取）
-        task_extract_insights.delay(product_id)
-        task_extract_themes.delay(product_id)
-        
-        # ==========================================
-        # Step 3: 等待三任务并行完成（翻译 + 洞察 + 主题）
-        # ==========================================
-        update_task_progress(3, TaskStatus.PROCESSING.value)
-        logger.info(f"[全自动分析] Step 3/4: 等待三任务并行完成（翻译+洞察+主题）...")
-        
-        # 并行等待所有任务完成（最多等 30 分钟，从 15 分钟提升）
-        max_wait_seconds = 1800  # 🔥 从 900 秒（15 分钟）提升到 1800 秒（30 分钟）
-        wait_interval = 15
-        waited = 0
-        last_log_time = 0
-        
-        while waited < max_wait_seconds:
-            time.sleep(wait_interval)
-            waited += wait_interval
-            
-            # 检查翻译进度
-            pending_result = db.execute(
-                select(func.count(Review.id))
-                .where(
-                    and_(
-                        Review.product_id == product_id,
-                        Review.translation_status.in_([
-                            TranslationStatus.PENDING.value,
-                            TranslationStatus.PROCESSING.value
-                        ]),
-                        Review.is_deleted == False
-                    )
-                )
-            )
-            pending_translation = pending_result.scalar() or 0
-            
-            # 检查已翻译的评论数
-            translated_result = db.execute(
-                select(func.count(Review.id))
-                .where(
-                    and_(
-                        Review.product_id == product_id,
-                        Review.translation_status == TranslationStatus.COMPLETED.value,
-                        Review.is_deleted == False
-                    )
-                )
-            )
-            translated_count = translated_result.scalar() or 0
-            
-            # 检查洞察提取进度（已翻译但未提取洞察的评论）
-            no_insight_result = db.execute(
-                select(func.count(Review.id))
-                .where(
-                    and_(
-                        Review.product_id == product_id,
-                        Review.translation_status == TranslationStatus.COMPLETED.value,
-                        Review.is_deleted == False,
-                        ~Review.id.in_(
-                            select(ReviewInsight.review_id).where(ReviewInsight.review_id == Review.id)
-                        )
-                    )
+        update_task_progress(2, TaskStatus.PROCESSING.value)
+        logger.info(f"[全自动分析] Step 2/4: 触发洞察+主题提取...")
+        
+        # 检查当前翻译进度（翻译在 ingest 时就已经开始了）
+        pending_result = db.execute(
+            select(func.count(Review.id))
+            .where(
+                and_(
+                    Review.product_id == product_id,
+                    Review.translation_status.in_([
+                        TranslationStatus.PENDING.value,
+                        TranslationStatus.PROCESSING.value
+                    ]),
+                    Review.is_deleted == False
                 )
             )
-            pending_insights = no_insight_result.scalar() or 0
-            
-            # 检查主题提取进度（已翻译但未提取主题的评论）
-            no_theme_result = db.execute(
-                select(func.count(Review.id))
-                .where(
-                    and_(
-                        Review.product_id == product_id,
-                        Review.translation_status == TranslationStatus.COMPLETED.value,
-                        Review.is_deleted == False,
-                        ~Review.id.in_(
-                            select(ReviewThemeHighlight.review_id).where(ReviewThemeHighlight.review_id == Review.id)
-                        )
-                    )
+        )
+        pending_translation = pending_result.scalar() or 0
+        
+        translated_result = db.execute(
+            select(func.count(Review.id))
+            .where(
+                and_(
+                    Review.product_id == product_id,
+                    Review.translation_status == TranslationStatus.COMPLETED.value,
+                    Review.is_deleted == False
                 )
             )
-            pending_themes = no_theme_result.scalar() or 0
-            
-            # 每30秒打印一次进度
-            if waited - last_log_time >= 30:
-                logger.info(f"[全自动分析] 📊 并行进度 - 待翻译:{pending_translation} | 待洞察:{pending_insights} | 待主题:{pending_themes}")
-                last_log_time = waited
-            
-            # 检查是否达到90%完成度，可以提前触发报告生成
-            insights_completion = (translated_count - pending_insights) / translated_count if translated_count > 0 else 0
-            themes_completion = (translated_count - pending_themes) / translated_count if translated_count > 0 else 0
-            
-            # 🚀 优化：90%完成度即可触发报告生成
-            if insights_completion >= 0.90 and themes_completion >= 0.90:
-                logger.info(f"[全自动分析] ✅ 达到90%完成度，触发报告生成！洞察:{insights_completion:.0%}, 主题:{themes_completion:.0%}")
-                break
-            
-            # 检查是否全部完成（100%）
-            if pending_translation == 0 and pending_insights == 0 and pending_themes == 0:
-                logger.info(f"[全自动分析] ✅ 并行处理全部完成！已翻译:{translated_count}条")
-                break
-            
-            # [OPTIMIZED] 每 120 秒检查一次，只在进度停滞时重新触发
-            # 避免频繁触发导致任务堆积，影响其他用户
-            if waited % 120 == 0 and waited > 0:
-                # 翻译任务：只在有大量待翻译时触发
-                if pending_translation > 10:
-                    logger.info(f"[全自动分析] 🔄 重新触发翻译任务（还有{pending_translation}条待处理）")
-                    task_ingest_translation_only.delay(product_id)
-                # 洞察/主题：只触发一个，避免占用太多资源
-                if pending_insights > 10:
-                    logger.info(f"[全自动分析] 重新触发洞察提取（还有{pending_insights}条待处理）")
-                    task_extract_insights.delay(product_id)
-                elif pending_themes > 10:  # 用 elif 避免同时触发
-                    logger.info(f"[全自动分析] 重新触发主题提取（还有{pending_themes}条待处理）")
-                    task_extract_themes.delay(product_id)
-            
-            # 更新心跳
-            update_task_progress(3, TaskStatus.PROCESSING.value)
-        
-        if waited >= max_wait_seconds:
-            # 🔥 优化：放宽完成度要求，从 95% 降到 80%
-            # 理由：80% 已足够生成高质量报告，剩余任务可异步继续
-            insights_completion = (translated_count - pending_insights) / translated_count if translated_count > 0 else 0
-            themes_completion = (translated_count - pending_themes) / translated_count if translated_count > 0 else 0
-            
-            if insights_completion < 0.80 or themes_completion < 0.80:
-                logger.error(f"[全自动分析] ⚠️ 等待超时且完成度 <80%（洞察:{insights_completion:.0%}, 主题:{themes_completion:.0%}）")
-                update_task_progress(3, TaskStatus.FAILED.value, f"处理超时，洞察完成度:{insights_completion:.0%}，主题完成度:{themes_completion:.0%}")
-                return {
-                    "success": False,
-                    "product_id": product_id,
-                    "task_id": task_id,
-                    "error": f"并行处理超时且完成度不足80%，请稍后重试。洞察:{insights_completion:.0%}，主题:{themes_completion:.0%}"
-                }
-            else:
-                logger.warning(f"[全自动分析] 并行处理等待超时，但完成度达到80%以上，继续生成报告（洞察:{insights_completion:.0%}, 主题:{themes_completion:.0%}）")
+        )
+        translated_count = translated_result.scalar() or 0
         
-        # ==========================================
-        # Step 4: 生成综合战略版报告
-        # ==========================================
-        update_task_progress(4, TaskStatus.PROCESSING.value)
-        logger.info(f"[全自动分析] Step 4/4: 生成综合报告...")
+        logger.info(f"[全自动分析] 📊 当前翻译状态: 已翻译 {translated_count} 条, 待翻译 {pending_translation} 条")
+        logger.info(f"[全自动分析] 💡 翻译任务在 ingest 时就已启动，现在触发洞察+主题提取")
         
-        try:
-            # 使用同步方式调用报告生成
-            # 由于 SummaryService 是异步的，需要使用 asyncio
-            import asyncio
-            from app.services.summary_service import SummaryService
-            
-            async def generate_report_async():
-                # 使用正确的导入：engine 和 async_session_maker
-                from app.db.session import async_session_maker
-                
-                async with async_session_maker() as async_db:
-                    summary_service = SummaryService(async_db)
-                    result = await summary_service.generate_report(
-                        product_id=product_id,
-                        report_type="comprehensive",  # 综合战略版
-                        min_reviews=30,  # [UPDATED 2026-01-19] 报告需要至少30条评论
-                        save_to_db=True,
-                        force_regenerate=False,  # [NEW] 不强制重新生成，检查去重
-                        require_full_completion=False  # [优化] 允许90%完成度生成报告
-                    )
-                    await async_db.commit()  # 确保提交
-                    return result
-            
-            # 运行异步函数 - 修复事件循环问题
-            try:
-                report_result = asyncio.run(generate_report_async())
-            except RuntimeError:
-                # 如果已有事件循环，使用备用方案
-                loop = asyncio.new_event_loop()
-                asyncio.set_event_loop(loop)
-                try:
-                    report_result = loop.run_until_complete(generate_report_async())
-                finally:
-                    pending = asyncio.all_tasks(loop)
-                    for task in pending:
-                        task.cancel()
-                    if pending:
-                        loop.run_until_complete(asyncio.gather(*pending, return_exceptions=True))
-                    loop.close()
-            
-            if report_result.get("success"):
-                report_id = report_result.get("report_id")
-                logger.info(f"[全自动分析] 综合报告生成成功，报告ID: {report_id}")
-                
-                # 更新任务记录，保存报告 ID
-                try:
-                    db.execute(
-                        update(Task)
-                        .where(Task.id == task_id)
-                        .values(error_message=f"report_id:{report_id}")  # 临时存储报告ID
-                    )
-                    db.commit()
-                except Exception as save_err:
-                    logger.warning(f"[全自动分析] 保存报告ID失败: {save_err}")
-            else:
-                logger.warning(f"[全自动分析] 综合报告生成失败: {report_result.get('error')}")
-                
-        except Exception as e:
-            logger.error(f"[全自动分析] 报告生成失败: {e}")
-            # 不因报告生成失败而中断整个任务
+        # 触发洞察和主题提取（它们会处理已翻译的评论，边翻译边提取）
+        dispatch_review_analysis(db, product_id)
         
         # ==========================================
-        # 完成
+        # Step 3: 登记事件驱动流水线，释放 learning 槽位
+        # 翻译/洞察/主题任务结束时发出完成事件，就绪后自动触发 Step 4（报告生成）
         # ==========================================
-        update_task_progress(4, TaskStatus.COMPLETED.value)
-        logger.info(f"[全自动分析] ✅ 产品 {product_id} 全自动分析完成！（流式并行优化版）")
+        update_task_progress(3, TaskStatus.PROCESSING.value)
+        logger.info(f"[全自动分析] Step 3/4: 登记流水线，等待阶段完成事件（不占用 Worker）...")
         
-        # 清理相关分享链接的缓存（使分享页面获取最新数据）
-        try:
-            from app.models.share_link import ShareLink
-            from app.core.redis import get_redis
-            share_links = db.query(ShareLink).filter(
-                ShareLink.product_id == product_id,
-                ShareLink.is_active == True
-            ).all()
-            if share_links:
-                redis = get_redis()
-                for link in share_links:
-                    cache_key = f"cache:share:data:{link.token}"
-                    redis.delete(cache_key)
-                    logger.info(f"[全自动分析] 已清理分享缓存: {cache_key}")
-        except Exception as cache_err:
-            logger.warning(f"[全自动分析] 清理分享缓存失败: {cache_err}")
+        open_auto_pipeline(product_id, task_id)
+        # 派发前已全部完成的情况（没有后续事件）立即收尾
+        status = on_pipeline_event(product_id, "dispatch")
         
         return {
             "success": True,
             "product_id": product_id,
             "task_id": task_id,
-            "message": "全自动分析完成（并行优化）"
+            "pipeline_status": status,
+            "message": "学习与派发完成，报告将在洞察/主题就绪后自动生成"
         }
         
     except Exception as e:
@@ -3105,103 +4195,320 @@ def task_generate_report(self, product_id: str, report_type: str = "comprehensiv
         db.close()
 
 
+# ============== 任务9.1: 评论导出产物预渲染 ==============
+
+@celery_app.task(bind=True)
+def task_render_review_export(self, asin: str, product_id: str, version: int, fmt: str):
+    """
+    📦 预渲染评论导出文件（XLSX / CSV）
+    
+    大产品的导出由 GET /reviews/{asin}/export 派发到 reports 队列，渲染结果按产品数据版本
+    存入 EXPORT_STORAGE_DIR，版本不变期间的下载直接发送该文件。
+    状态写入 ExportJobTracker，前端轮询 GET /reviews/{asin}/export/status。
+    
+    参数：
+        asin: 产品 ASIN
+        product_id: 产品 UUID
+        version: 派发时的产品数据版本（产物文件名的一部分）
+        fmt: xlsx / csv
+    """
+    from app.core.redis import get_sync_redis, ExportJobTrackerSync
+    from app.services.export_service import ExportArtifactStore, ReviewExportServiceSync
+    
+    tracker = ExportJobTrackerSync(get_sync_redis())
+    store = ExportArtifactStore()
+    
+    if store.find(asin, version, fmt):
+        tracker.update(asin, version, fmt, "completed")
+        return {"success": True, "asin": asin, "version": version, "format": fmt, "skipped": True}
+    
+    tracker.update(asin, version, fmt, "processing")
+    logger.info(f"[导出渲染] 开始渲染 {asin} v{version} {fmt}")
+    started = time.time()
+    
+    db = get_sync_db()
+    temp_path = None
+    try:
+        temp_path = store.new_temp(asin, fmt)
+        service = ReviewExportServiceSync(db)
+        if fmt == "csv":
+            rows = service.write_csv(UUID(product_id), temp_path)
+        else:
+            rows = service.write_xlsx(UUID(product_id), temp_path)
+        path = store.publish(temp_path, asin, version, fmt)
+        temp_path = None
+        size = os.path.getsize(path)
+        tracker.update(asin, version, fmt, "completed", rows=rows, size=size)
+        logger.info(f"[导出渲染] 完成 {asin} v{version} {fmt}: {rows} 行, {size} bytes, {time.time() - started:.1f}s")
+        return {"success": True, "asin": asin, "version": version, "format": fmt, "rows": rows, "size": size}
+    except Exception as e:
+        logger.error(f"[导出渲染] 失败 {asin} v{version} {fmt}: {e}")
+        tracker.update(asin, version, fmt, "failed", error=str(e))
+        return {"success": False, "asin": asin, "version": version, "format": fmt, "error": str(e)}
+    finally:
+        if temp_path and os.path.exists(temp_path):
+            os.unlink(temp_path)
+        db.close()
+
+
 # ============== [NEW] 任务10: 队列消费入库 ==============
+#
+# 入库队列为 Redis Stream + 消费组（app/core/redis.py）：
+# - 常驻消费者 task_consume_ingestion_stream 阻塞读取（XREADGROUP BLOCK），消息到达即入库，
+#   不再等待 Beat 的 5 秒 tick
+# - 入库事务提交后才 XACK，Worker 崩溃时消息留在待确认列表，由其他消费者 XAUTOCLAIM 接管
+# - 消费者按槽位（INGESTION_STREAM_CONSUMERS）占位，运行在专属的 ingestion_stream 队列（worker-ingestion），
+#   水平扩展只需增加 worker-ingestion 进程数并调大槽位数
+# - Beat 每 30 秒运行 task_ensure_ingestion_consumers，补派缺失槽位的消费者
+# ==============================================================
+
+INGESTION_CONSUMER_SLOT_KEY = "ingestion:consumer:slot:"   # 消费者槽位占位键前缀
+INGESTION_CONSUMER_SLOT_TTL = 60                           # 槽位占位过期秒数（每轮读取续期）
+INGESTION_CONSUMER_PURGE_IDLE_MS = 600000                  # 空闲 10 分钟的已退出消费者从消费组移除
+
+
+def trigger_ingested_translations(db, results: dict):
+    """为有新数据的产品触发翻译（使用 Redis 锁防止重复触发）"""
+    from app.models.product import Product
+    
+    for asin, result in results.items():
+        if result.get("inserted", 0) <= 0:
+            continue
+        # 使用 Redis SETNX 实现分布式锁，防止同一产品重复触发翻译任务
+        # 锁有效期 5 分钟（翻译任务通常在几分钟内完成）
+        lock_key = f"lock:translation:{asin}"
+        if not redis_client.set(lock_key, "1", nx=True, ex=300):
+            logger.debug(f"[Ingestion] 产品 {asin} 翻译任务已在运行中，跳过触发")
+            continue
+        
+        product_id = db.execute(
+            select(Product.id).where(Product.asin == asin)
+        ).scalar_one_or_none()
+        if product_id:
+            # 触发流式翻译
+            task_ingest_translation_only.delay(str(product_id))
+            logger.info(f"[Ingestion] 产品 {asin} 已触发翻译任务")
+
+
+def process_ingestion_entries(db, redis_cli, queue, entries: list) -> dict:
+    """
+    入库一批 Stream 消息并确认
+    
+    IngestionService 按 ASIN 逐个提交事务，返回后再 XACK：
+    - 入库成功（或 payload 无法解析）的消息确认并删除
+    - 所属 ASIN 入库失败的消息不确认，空闲超时后被 XAUTOCLAIM 重投
+    
+    Args:
+        entries: [(message_id, payload)]
+        
+    Returns:
+        处理结果统计
+    """
+    from app.services.ingestion_service import IngestionService
+    
+    items = [payload for _, payload in entries if payload]
+    results = IngestionService(db, redis_cli).process_queue_items(items) if items else {}
+    
+    failed_asins = {asin for asin, r in results.items() if r.get("error")}
+    ack_ids = [
+        message_id for message_id, payload in entries
+        if not payload or payload.get("asin") not in failed_asins
+    ]
+    queue.ack(ack_ids)
+    
+    total_inserted = sum(r.get("inserted", 0) for r in results.values())
+    total_skipped = sum(r.get("skipped", 0) for r in results.values())
+    logger.info(
+        f"[Ingestion] 处理完成: {len(entries)} 条消息, {len(results)} 个产品, "
+        f"新增 {total_inserted} 条, 跳过 {total_skipped} 条, 待重投 {len(entries) - len(ack_ids)} 条"
+    )
+    
+    trigger_ingested_translations(db, results)
+    
+    return {
+        "processed": len(entries),
+        "acked": len(ack_ids),
+        "products": len(results),
+        "inserted": total_inserted,
+        "skipped": total_skipped,
+        "details": results
+    }
+
+
+@celery_app.task(bind=True)
+def task_consume_ingestion_stream(self, slot: int = 0):
+    """
+    🚀 常驻入库消费者 (Ingestion Stream Consumer)
+    
+    占用一个消费者槽位，循环执行：
+    1. 定期 XAUTOCLAIM 接管空闲超时的待确认消息（崩溃消费者遗留）
+    2. XREADGROUP 阻塞读取新消息（最多 INGESTION_STREAM_BLOCK_MS）
+    3. 入库 → 提交 → XACK
+    
+    运行 INGESTION_CONSUMER_RUN_SECONDS 后释放槽位并自我续派，
+    避免长期占用同一个 Worker 进程（部署 / 重启时也能平滑切换）。
+    
+    Args:
+        slot: 消费者槽位编号（0 ~ INGESTION_STREAM_CONSUMERS-1）
+    """
+    import socket
+    from app.core.redis import ReviewIngestionQueueSync, get_sync_redis
+    
+    redis_cli = get_sync_redis()
+    queue = ReviewIngestionQueueSync(redis_cli)
+    slot_key = f"{INGESTION_CONSUMER_SLOT_KEY}{slot}"
+    consumer = f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:6]}"
+    
+    if not redis_cli.set(slot_key, consumer, nx=True, ex=INGESTION_CONSUMER_SLOT_TTL):
+        logger.debug(f"[Ingestion] 槽位 {slot} 已有消费者，退出")
+        return {"skipped": True, "slot": slot}
+    
+    queue.ensure_group()
+    queue.migrate_legacy()
+    logger.info(f"[Ingestion] 消费者 {consumer} 已启动（槽位 {slot}）")
+    
+    stats = {"batches": 0, "messages": 0, "inserted": 0, "reclaimed": 0, "errors": 0}
+    claim_interval = settings.INGESTION_STREAM_CLAIM_IDLE_MS / 2000
+    deadline = time.monotonic() + settings.INGESTION_CONSUMER_RUN_SECONDS
+    last_claim = 0.0
+    completed = False
+    
+    try:
+        while time.monotonic() < deadline:
+            # 续期槽位；被其他消费者接管（占位过期）时退出
+            if redis_cli.get(slot_key) != consumer:
+                logger.warning(f"[Ingestion] 消费者 {consumer} 已失去槽位 {slot}，退出")
+                break
+            redis_cli.expire(slot_key, INGESTION_CONSUMER_SLOT_TTL)
+            
+            entries = []
+            if time.monotonic() - last_claim >= claim_interval:
+                last_claim = time.monotonic()
+                entries = queue.claim_stale(
+                    consumer,
+                    min_idle_ms=settings.INGESTION_STREAM_CLAIM_IDLE_MS,
+                    count=settings.INGESTION_STREAM_BATCH,
+                    max_deliveries=settings.INGESTION_STREAM_MAX_DELIVERIES
+                )
+                if entries:
+                    stats["reclaimed"] += len(entries)
+                    logger.warning(f"[Ingestion] 接管 {len(entries)} 条超时未确认的消息")
+            if not entries:
+                entries = queue.read_batch(
+                    consumer,
+                    count=settings.INGESTION_STREAM_BATCH,
+                    block_ms=settings.INGESTION_STREAM_BLOCK_MS
+                )
+            if not entries:
+                continue
+            
+            db = get_sync_db()
+            try:
+                result = process_ingestion_entries(db, redis_cli, queue, entries)
+                stats["batches"] += 1
+                stats["messages"] += result["processed"]
+                stats["inserted"] += result["inserted"]
+            except Exception as e:
+                # 未确认的消息留在待确认列表，超时后重投
+                logger.error(f"[Ingestion] 处理失败: {e}")
+                db.rollback()
+                stats["errors"] += 1
+                time.sleep(1)
+            finally:
+                db.close()
+        else:
+            completed = True
+    finally:
+        if redis_cli.get(slot_key) == consumer:
+            redis_cli.delete(slot_key)
+        queue.remove_consumer(consumer)
+    
+    logger.info(f"[Ingestion] 消费者 {consumer} 退出（槽位 {slot}）: {stats}")
+    if completed:
+        # 到期自我续派（可能由其他 Worker 进程接手）
+        task_consume_ingestion_stream.delay(slot)
+    return {"slot": slot, "consumer": consumer, **stats}
+
+
+@celery_app.task
+def task_ensure_ingestion_consumers():
+    """
+    🛡️ 入库消费者看门狗（Beat 每 30 秒）
+    
+    为缺失的槽位补派消费者（首次部署、Worker 崩溃或重启后），
+    并清理已退出进程在消费组中遗留的空消费者。
+    """
+    from app.core.redis import ReviewIngestionQueueSync, get_sync_redis
+    
+    redis_cli = get_sync_redis()
+    queue = ReviewIngestionQueueSync(redis_cli)
+    queue.ensure_group()
+    queue.purge_idle_consumers(INGESTION_CONSUMER_PURGE_IDLE_MS)
+    
+    started = []
+    for slot in range(settings.INGESTION_STREAM_CONSUMERS):
+        if not redis_cli.exists(f"{INGESTION_CONSUMER_SLOT_KEY}{slot}"):
+            task_consume_ingestion_stream.delay(slot)
+            started.append(slot)
+    if started:
+        logger.info(f"[Ingestion] 补派入库消费者槽位: {started}")
+    return {"started": started, **queue.stats()}
+
 
 @celery_app.task(bind=True, max_retries=3, default_retry_delay=10)
 def task_process_ingestion_queue(self):
     """
-    🚀 队列消费入库任务 (Ingestion Queue Consumer)
+    🚀 队列消费入库任务（单次，兼容入口）
     
-    从 Redis 队列批量消费评论数据，入库到 PostgreSQL。
+    不阻塞地读取一批消息入库后退出，供手动触发或排障使用；
+    日常消费由常驻的 task_consume_ingestion_stream 完成。
     
     设计特点：
     1. 高并发写入优化：API 层只写 Redis，本任务批量入库
     2. 三层去重：Redis Set → 内存 Set → DB ON CONFLICT
     3. 按 ASIN 分组处理，减少数据库查询
-    4. 入库成功后触发翻译任务
-    
-    调度方式：
-    - Celery Beat 每 5 秒触发一次
-    - 每次最多处理 100 条队列数据
+    4. 入库提交后确认消息，入库成功后触发翻译任务
     
     Returns:
         处理结果统计
     """
+    import socket
     from app.core.redis import ReviewIngestionQueueSync, get_sync_redis
-    from app.services.ingestion_service import IngestionService
     
     logger.debug("[Ingestion] 开始消费队列...")
     
     redis_cli = get_sync_redis()
     queue = ReviewIngestionQueueSync(redis_cli)
+    queue.ensure_group()
+    consumer = f"{socket.gethostname()}-{os.getpid()}-oneshot"
     
-    # Step 1: 从队列批量取出数据
-    items = queue.pop_batch(count=100)
+    # Step 1: 从 Stream 读取一批数据（不阻塞）
+    entries = queue.read_batch(consumer, count=settings.INGESTION_STREAM_BATCH)
     
-    if not items:
+    if not entries:
         logger.debug("[Ingestion] 队列为空，跳过")
+        queue.remove_consumer(consumer)
         return {"processed": 0, "items": 0}
     
-    logger.info(f"[Ingestion] 从队列取出 {len(items)} 条数据")
+    logger.info(f"[Ingestion] 从队列取出 {len(entries)} 条数据")
     
     db = get_sync_db()
     
     try:
-        # Step 2: 调用入库服务处理
-        service = IngestionService(db, redis_cli)
-        results = service.process_queue_items(items)
-        
-        # Step 3: 统计结果
-        total_inserted = sum(r.get("inserted", 0) for r in results.values())
-        total_skipped = sum(r.get("skipped", 0) for r in results.values())
-        
-        logger.info(
-            f"[Ingestion] 处理完成: {len(results)} 个产品, "
-            f"新增 {total_inserted} 条, 跳过 {total_skipped} 条"
-        )
-        
-        # Step 4: 为有新数据的产品触发翻译（使用 Redis 锁防止重复触发）
-        from app.core.redis import get_sync_redis
-        redis_client = get_sync_redis()
-        
-        for asin, result in results.items():
-            if result.get("inserted", 0) > 0:
-                # 使用 Redis SETNX 实现分布式锁，防止同一产品重复触发翻译任务
-                # 锁有效期 5 分钟（翻译任务通常在几分钟内完成）
-                lock_key = f"lock:translation:{asin}"
-                lock_acquired = redis_client.set(lock_key, "1", nx=True, ex=300)
-                
-                if not lock_acquired:
-                    logger.debug(f"[Ingestion] 产品 {asin} 翻译任务已在运行中，跳过触发")
-                    continue
-                
-                # 获取 product_id
-                from app.models.product import Product
-                product_result = db.execute(
-                    select(Product).where(Product.asin == asin)
-                )
-                product = product_result.scalar_one_or_none()
-                
-                if product:
-                    # 触发流式翻译
-                    task_ingest_translation_only.delay(str(product.id))
-                    logger.info(f"[Ingestion] 产品 {asin} 已触发翻译任务")
-        
-        return {
-            "processed": len(items),
-            "products": len(results),
-            "inserted": total_inserted,
-            "skipped": total_skipped,
-            "details": results
-        }
+        # Step 2: 入库 → 确认 → 触发翻译
+        return process_ingestion_entries(db, redis_cli, queue, entries)
         
     except Exception as e:
+        # 未确认的消息留在待确认列表，由常驻消费者超时接管
         logger.error(f"[Ingestion] 处理失败: {e}")
         db.rollback()
         raise self.retry(exc=e)
         
     finally:
         db.close()
+        # 一次性消费者用完即移除，避免消费组里堆积；仍有待确认消息时保留，
+        # 由常驻消费者接管后看门狗的 purge_idle_consumers 清理
+        queue.remove_consumer(consumer)
 
 
 # ============== [NEW] 辅助函数：同步已有 review_id 到 Redis ==============
@@ -3395,6 +4702,15 @@ def task_analysis_completion_patrol(self):
                     )
                     triggered_insights += 1
                     triggered_themes += 1
+                elif missing_insights > 0 and missing_themes > 0 and is_fused_analysis_enabled(db, product_id_str):
+                    # 已有维度和标签，两部分都有遗漏 → 融合补全
+                    logger.warning(f"[巡检] ⚠️ 产品 {asin} 发现 {missing_insights} 条遗漏洞察 + {missing_themes} 条遗漏主题，触发融合补全")
+                    task_extract_analysis_fused.apply_async(
+                        args=[product_id_str],
+                        countdown=5
+                    )
+                    triggered_insights += 1
+                    triggered_themes += 1
                 else:
                     # 已有维度和标签，只触发补全任务
                     if missing_insights > 0:
@@ -3433,6 +4749,53 @@ def task_analysis_completion_patrol(self):
         db.close()
 
 
+# ============== [NEW] 定时任务：评论统计汇总对账 ==============
+
+@celery_app.task(bind=True)
+def task_reconcile_review_stats(self):
+    """
+    🧮 评论统计汇总对账 (product_review_stats)
+    
+    汇总行由数据库触发器增量维护；本任务逐个产品全量重算并修正漂移
+    （例如迁移前的历史数据、同一评论的首条洞察被两个事务并发插入、手工改库）。
+    
+    运行频率：每 6 小时
+    
+    - 每个产品一个短事务，无漂移时不加锁
+    - 修正后递增产品数据版本，统计缓存 / ETag 随之刷新
+    """
+    from app.models.product import Product
+    
+    logger.info("[统计对账] 🧮 开始评论统计汇总对账...")
+    
+    db = get_sync_db()
+    
+    try:
+        products = db.execute(select(Product.id, Product.asin).order_by(Product.id)).all()
+        db.commit()
+        
+        drifted = 0
+        failed = 0
+        for product_id, asin in products:
+            try:
+                if reconcile_product_review_stats(db, product_id):
+                    drifted += 1
+                    touch_product_data(asin)
+            except Exception as e:
+                db.rollback()
+                failed += 1
+                logger.error(f"[统计对账] ❌ 产品 {asin} 对账失败: {e}")
+        
+        logger.info(f"[统计对账] ✅ 对账完成：{len(products)} 个产品，修正 {drifted} 个，失败 {failed} 个")
+        return {"checked": len(products), "drifted": drifted, "failed": failed}
+        
+    except Exception as e:
+        logger.error(f"[统计对账] ❌ 对账失败: {e}")
+        return {"error": str(e)}
+    finally:
+        db.close()
+
+
 # ============== [NEW 2026-01-22] 任务: 维度总结生成 ==============
 
 @celery_app.task(bind=True, max_retries=2, default_retry_delay=60)
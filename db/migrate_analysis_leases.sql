@@ -0,0 +1,30 @@
+-- Migration: Create review_analysis_leases table
+-- Purpose: Chunked claim/lease work model for insight and theme extraction,
+--          so several workers can cooperate on one large product without duplicate work
+
+CREATE TABLE IF NOT EXISTS review_analysis_leases (
+    review_id UUID NOT NULL REFERENCES reviews(id) ON DELETE CASCADE,
+    stage VARCHAR(20) NOT NULL,
+    product_id UUID NOT NULL,
+    owner VARCHAR(100) NOT NULL,
+    lease_until TIMESTAMP WITH TIME ZONE NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 1,
+    claimed_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT NOW(),
+    PRIMARY KEY (review_id, stage)
+);
+
+CREATE INDEX IF NOT EXISTS ix_review_analysis_leases_product_id ON review_analysis_leases(product_id);
+CREATE INDEX IF NOT EXISTS ix_review_analysis_leases_owner ON review_analysis_leases(owner);
+CREATE INDEX IF NOT EXISTS ix_review_analysis_leases_lease_until ON review_analysis_leases(lease_until);
+
+COMMENT ON TABLE review_analysis_leases IS '洞察/主题提取的评论认领租约（过期可重新认领）';
+COMMENT ON COLUMN review_analysis_leases.stage IS '分析阶段：insights / themes';
+COMMENT ON COLUMN review_analysis_leases.owner IS '持有者（Celery 任务 ID）';
+COMMENT ON COLUMN review_analysis_leases.lease_until IS '租约到期时间，过期后可被重新认领';
+COMMENT ON COLUMN review_analysis_leases.attempts IS '累计认领次数（过期重认领时递增）';
+
+-- Verify the migration
+SELECT column_name, data_type, is_nullable
+FROM information_schema.columns
+WHERE table_name = 'review_analysis_leases'
+ORDER BY ordinal_position;
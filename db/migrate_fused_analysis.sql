@@ -0,0 +1,14 @@
+-- Migration: Add fused_analysis switch to products table
+-- Purpose: Per-product opt-in/opt-out of the fused insight + 5W theme extraction stage
+--          (NULL = follow the FUSED_ANALYSIS_ENABLED setting)
+
+ALTER TABLE products
+ADD COLUMN IF NOT EXISTS fused_analysis BOOLEAN NULL;
+
+COMMENT ON COLUMN products.fused_analysis IS '洞察+5W 融合提取开关（NULL 表示使用全局配置 FUSED_ANALYSIS_ENABLED）';
+
+-- Verify the migration
+SELECT column_name, data_type, is_nullable
+FROM information_schema.columns
+WHERE table_name = 'products'
+AND column_name = 'fused_analysis';
@@ -0,0 +1,292 @@
+-- Migration: Materialized per-product review rollup (product_review_stats)
+-- Purpose: GET /products/{asin}/stats, GET /products and GET /user/projects read one row per
+--          product instead of aggregating every review (conditional COUNTs + EXISTS subqueries).
+--          Statement-level triggers with transition tables keep the rollup current in the same
+--          transaction as the write: one upsert per product per statement (ingestion INSERT,
+--          translation write-back UPDATE ... FROM (VALUES ...), insight / theme micro-batch inserts,
+--          review edits and logical deletes), so no write path can forget to update it.
+--          The Celery beat job task_reconcile_review_stats corrects any drift.
+-- Fresh installs: init_db (backend/app/db/session.py) creates the table through create_all and
+--       applies backend/app/db/product_review_stats.sql when the triggers are missing.
+--       Keep the functions / triggers below in sync with that file.
+-- Note: Runs in one transaction. CREATE TRIGGER locks reviews against writes until COMMIT,
+--       so the backfill below is consistent with the triggers (writes pause for the backfill).
+--       Only reviews with is_deleted = false are counted. Reviews are never hard-deleted
+--       individually (product deletion cascades to this table), so there is no DELETE trigger on reviews.
+
+BEGIN;
+
+CREATE TABLE IF NOT EXISTS product_review_stats (
+    product_id UUID PRIMARY KEY REFERENCES products(id) ON DELETE CASCADE,
+    total_reviews INTEGER NOT NULL DEFAULT 0,
+    pending_reviews INTEGER NOT NULL DEFAULT 0,
+    processing_reviews INTEGER NOT NULL DEFAULT 0,
+    translated_reviews INTEGER NOT NULL DEFAULT 0,
+    failed_reviews INTEGER NOT NULL DEFAULT 0,
+    skipped_reviews INTEGER NOT NULL DEFAULT 0,
+    star_1 INTEGER NOT NULL DEFAULT 0,
+    star_2 INTEGER NOT NULL DEFAULT 0,
+    star_3 INTEGER NOT NULL DEFAULT 0,
+    star_4 INTEGER NOT NULL DEFAULT 0,
+    star_5 INTEGER NOT NULL DEFAULT 0,
+    rating_sum BIGINT NOT NULL DEFAULT 0,
+    sentiment_positive INTEGER NOT NULL DEFAULT 0,
+    sentiment_neutral INTEGER NOT NULL DEFAULT 0,
+    sentiment_negative INTEGER NOT NULL DEFAULT 0,
+    reviews_with_insights INTEGER NOT NULL DEFAULT 0,
+    reviews_with_themes INTEGER NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT NOW(),
+    reconciled_at TIMESTAMP WITH TIME ZONE
+);
+
+COMMENT ON TABLE product_review_stats IS '产品评论统计汇总（触发器增量维护，定时对账）';
+COMMENT ON COLUMN product_review_stats.translated_reviews IS 'translation_status = completed';
+COMMENT ON COLUMN product_review_stats.rating_sum IS '星级之和（平均分 = rating_sum / total_reviews）';
+COMMENT ON COLUMN product_review_stats.updated_at IS '最近一次增量更新时间';
+COMMENT ON COLUMN product_review_stats.reconciled_at IS '最近一次全量对账时间';
+
+-- ============================================================
+-- reviews：INSERT / UPDATE 按语句汇总每个产品的增量
+-- ============================================================
+CREATE OR REPLACE FUNCTION product_review_stats_on_reviews()
+RETURNS TRIGGER AS $$
+DECLARE
+    changes TEXT;
+    d RECORD;
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        -- 新评论还没有洞察 / 主题，不需要探测
+        changes := $q$
+            SELECT id, product_id, 1 AS sign, translation_status, rating, sentiment, false AS probe
+            FROM new_rows
+            WHERE NOT is_deleted
+        $q$;
+    ELSE
+        -- 只看统计相关列有变化的行：旧值 -1，新值 +1；
+        -- 洞察 / 主题只在删除标记或产品变化时探测（否则 ±1 相互抵消）
+        changes := $q$
+            WITH changed AS (
+                SELECT o.id,
+                       o.product_id AS old_product_id, o.is_deleted AS old_deleted,
+                       o.translation_status AS old_status, o.rating AS old_rating, o.sentiment AS old_sentiment,
+                       n.product_id, n.is_deleted, n.translation_status, n.rating, n.sentiment,
+                       (o.is_deleted IS DISTINCT FROM n.is_deleted OR o.product_id <> n.product_id) AS probe
+                FROM old_rows o
+                JOIN new_rows n ON n.id = o.id
+                WHERE (o.product_id, o.is_deleted, o.translation_status, o.rating, o.sentiment)
+                      IS DISTINCT FROM (n.product_id, n.is_deleted, n.translation_status, n.rating, n.sentiment)
+            )
+            SELECT id, old_product_id AS product_id, -1 AS sign,
+                   old_status AS translation_status, old_rating AS rating, old_sentiment AS sentiment, probe
+            FROM changed
+            WHERE NOT old_deleted
+            UNION ALL
+            SELECT id, product_id, 1 AS sign, translation_status, rating, sentiment, probe
+            FROM changed
+            WHERE NOT is_deleted
+        $q$;
+    END IF;
+
+    -- 按 product_id 排序逐个 upsert：多产品语句以固定顺序加行锁，避免并发死锁
+    FOR d IN EXECUTE format($q$
+        SELECT c.product_id,
+               SUM(c.sign) AS total_reviews,
+               SUM(CASE WHEN c.translation_status = 'pending' THEN c.sign ELSE 0 END) AS pending_reviews,
+               SUM(CASE WHEN c.translation_status = 'processing' THEN c.sign ELSE 0 END) AS processing_reviews,
+               SUM(CASE WHEN c.translation_status = 'completed' THEN c.sign ELSE 0 END) AS translated_reviews,
+               SUM(CASE WHEN c.translation_status = 'failed' THEN c.sign ELSE 0 END) AS failed_reviews,
+               SUM(CASE WHEN c.translation_status = 'skipped' THEN c.sign ELSE 0 END) AS skipped_reviews,
+               SUM(CASE WHEN c.rating = 1 THEN c.sign ELSE 0 END) AS star_1,
+               SUM(CASE WHEN c.rating = 2 THEN c.sign ELSE 0 END) AS star_2,
+               SUM(CASE WHEN c.rating = 3 THEN c.sign ELSE 0 END) AS star_3,
+               SUM(CASE WHEN c.rating = 4 THEN c.sign ELSE 0 END) AS star_4,
+               SUM(CASE WHEN c.rating = 5 THEN c.sign ELSE 0 END) AS star_5,
+               SUM(c.sign * COALESCE(c.rating, 0)) AS rating_sum,
+               SUM(CASE WHEN c.sentiment = 'positive' THEN c.sign ELSE 0 END) AS sentiment_positive,
+               SUM(CASE WHEN c.sentiment = 'neutral' THEN c.sign ELSE 0 END) AS sentiment_neutral,
+               SUM(CASE WHEN c.sentiment = 'negative' THEN c.sign ELSE 0 END) AS sentiment_negative,
+               SUM(CASE WHEN c.probe AND EXISTS (SELECT 1 FROM review_insights i WHERE i.review_id = c.id)
+                        THEN c.sign ELSE 0 END) AS reviews_with_insights,
+               SUM(CASE WHEN c.probe AND EXISTS (SELECT 1 FROM review_theme_highlights t WHERE t.review_id = c.id)
+                        THEN c.sign ELSE 0 END) AS reviews_with_themes
+        FROM (%s) c
+        GROUP BY c.product_id
+        ORDER BY c.product_id
+    $q$, changes)
+    LOOP
+        INSERT INTO product_review_stats AS s (
+            product_id, total_reviews,
+            pending_reviews, processing_reviews, translated_reviews, failed_reviews, skipped_reviews,
+            star_1, star_2, star_3, star_4, star_5, rating_sum,
+            sentiment_positive, sentiment_neutral, sentiment_negative,
+            reviews_with_insights, reviews_with_themes
+        ) VALUES (
+            d.product_id, d.total_reviews,
+            d.pending_reviews, d.processing_reviews, d.translated_reviews, d.failed_reviews, d.skipped_reviews,
+            d.star_1, d.star_2, d.star_3, d.star_4, d.star_5, d.rating_sum,
+            d.sentiment_positive, d.sentiment_neutral, d.sentiment_negative,
+            d.reviews_with_insights, d.reviews_with_themes
+        )
+        ON CONFLICT (product_id) DO UPDATE SET
+            total_reviews = s.total_reviews + EXCLUDED.total_reviews,
+            pending_reviews = s.pending_reviews + EXCLUDED.pending_reviews,
+            processing_reviews = s.processing_reviews + EXCLUDED.processing_reviews,
+            translated_reviews = s.translated_reviews + EXCLUDED.translated_reviews,
+            failed_reviews = s.failed_reviews + EXCLUDED.failed_reviews,
+            skipped_reviews = s.skipped_reviews + EXCLUDED.skipped_reviews,
+            star_1 = s.star_1 + EXCLUDED.star_1,
+            star_2 = s.star_2 + EXCLUDED.star_2,
+            star_3 = s.star_3 + EXCLUDED.star_3,
+            star_4 = s.star_4 + EXCLUDED.star_4,
+            star_5 = s.star_5 + EXCLUDED.star_5,
+            rating_sum = s.rating_sum + EXCLUDED.rating_sum,
+            sentiment_positive = s.sentiment_positive + EXCLUDED.sentiment_positive,
+            sentiment_neutral = s.sentiment_neutral + EXCLUDED.sentiment_neutral,
+            sentiment_negative = s.sentiment_negative + EXCLUDED.sentiment_negative,
+            reviews_with_insights = s.reviews_with_insights + EXCLUDED.reviews_with_insights,
+            reviews_with_themes = s.reviews_with_themes + EXCLUDED.reviews_with_themes,
+            updated_at = NOW();
+    END LOOP;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trigger_product_review_stats_reviews_insert ON reviews;
+CREATE TRIGGER trigger_product_review_stats_reviews_insert
+    AFTER INSERT ON reviews
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION product_review_stats_on_reviews();
+
+DROP TRIGGER IF EXISTS trigger_product_review_stats_reviews_update ON reviews;
+CREATE TRIGGER trigger_product_review_stats_reviews_update
+    AFTER UPDATE ON reviews
+    REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION product_review_stats_on_reviews();
+
+-- ============================================================
+-- review_insights / review_theme_highlights：评论的第一条插入 +1，最后一条删除 -1
+-- TG_ARGV[0] 为要维护的计数列
+-- ============================================================
+CREATE OR REPLACE FUNCTION product_review_stats_on_children()
+RETURNS TRIGGER AS $$
+DECLARE
+    counter TEXT := TG_ARGV[0];
+    d RECORD;
+BEGIN
+    -- INSERT：评论现有条数 = 本语句插入条数，说明之前没有；DELETE：删完后一条不剩
+    -- 评论已删除（产品级联删除）时 JOIN 不到，跳过
+    FOR d IN EXECUTE format($q$
+        SELECT r.product_id, COUNT(*) AS delta
+        FROM (SELECT review_id, COUNT(*) AS n FROM %1$s GROUP BY review_id) c
+        JOIN reviews r ON r.id = c.review_id
+        WHERE NOT r.is_deleted
+          AND (SELECT COUNT(*) FROM %2$I x WHERE x.review_id = c.review_id) = %3$s
+        GROUP BY r.product_id
+        ORDER BY r.product_id
+    $q$,
+        CASE WHEN TG_OP = 'INSERT' THEN 'new_rows' ELSE 'old_rows' END,
+        TG_TABLE_NAME,
+        CASE WHEN TG_OP = 'INSERT' THEN 'c.n' ELSE '0' END)
+    LOOP
+        EXECUTE format($q$
+            INSERT INTO product_review_stats AS s (product_id, %1$I) VALUES ($1, $2)
+            ON CONFLICT (product_id) DO UPDATE SET %1$I = s.%1$I + EXCLUDED.%1$I, updated_at = NOW()
+        $q$, counter)
+        USING d.product_id, CASE WHEN TG_OP = 'INSERT' THEN d.delta ELSE -d.delta END;
+    END LOOP;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trigger_product_review_stats_insights_insert ON review_insights;
+CREATE TRIGGER trigger_product_review_stats_insights_insert
+    AFTER INSERT ON review_insights
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION product_review_stats_on_children('reviews_with_insights');
+
+DROP TRIGGER IF EXISTS trigger_product_review_stats_insights_delete ON review_insights;
+CREATE TRIGGER trigger_product_review_stats_insights_delete
+    AFTER DELETE ON review_insights
+    REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION product_review_stats_on_children('reviews_with_insights');
+
+DROP TRIGGER IF EXISTS trigger_product_review_stats_themes_insert ON review_theme_highlights;
+CREATE TRIGGER trigger_product_review_stats_themes_insert
+    AFTER INSERT ON review_theme_highlights
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION product_review_stats_on_children('reviews_with_themes');
+
+DROP TRIGGER IF EXISTS trigger_product_review_stats_themes_delete ON review_theme_highlights;
+CREATE TRIGGER trigger_product_review_stats_themes_delete
+    AFTER DELETE ON review_theme_highlights
+    REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION product_review_stats_on_children('reviews_with_themes');
+
+-- ============================================================
+-- 回填（与 app.services.review_service.review_rollup_query 口径一致）
+-- ============================================================
+INSERT INTO product_review_stats (
+    product_id, total_reviews,
+    pending_reviews, processing_reviews, translated_reviews, failed_reviews, skipped_reviews,
+    star_1, star_2, star_3, star_4, star_5, rating_sum,
+    sentiment_positive, sentiment_neutral, sentiment_negative,
+    reviews_with_insights, reviews_with_themes, reconciled_at
+)
+SELECT r.product_id,
+       COUNT(*),
+       COUNT(*) FILTER (WHERE r.translation_status = 'pending'),
+       COUNT(*) FILTER (WHERE r.translation_status = 'processing'),
+       COUNT(*) FILTER (WHERE r.translation_status = 'completed'),
+       COUNT(*) FILTER (WHERE r.translation_status = 'failed'),
+       COUNT(*) FILTER (WHERE r.translation_status = 'skipped'),
+       COUNT(*) FILTER (WHERE r.rating = 1),
+       COUNT(*) FILTER (WHERE r.rating = 2),
+       COUNT(*) FILTER (WHERE r.rating = 3),
+       COUNT(*) FILTER (WHERE r.rating = 4),
+       COUNT(*) FILTER (WHERE r.rating = 5),
+       COALESCE(SUM(r.rating), 0),
+       COUNT(*) FILTER (WHERE r.sentiment = 'positive'),
+       COUNT(*) FILTER (WHERE r.sentiment = 'neutral'),
+       COUNT(*) FILTER (WHERE r.sentiment = 'negative'),
+       COUNT(*) FILTER (WHERE EXISTS (SELECT 1 FROM review_insights i WHERE i.review_id = r.id)),
+       COUNT(*) FILTER (WHERE EXISTS (SELECT 1 FROM review_theme_highlights t WHERE t.review_id = r.id)),
+       NOW()
+FROM reviews r
+WHERE NOT r.is_deleted
+GROUP BY r.product_id
+ON CONFLICT (product_id) DO UPDATE SET
+    total_reviews = EXCLUDED.total_reviews,
+    pending_reviews = EXCLUDED.pending_reviews,
+    processing_reviews = EXCLUDED.processing_reviews,
+    translated_reviews = EXCLUDED.translated_reviews,
+    failed_reviews = EXCLUDED.failed_reviews,
+    skipped_reviews = EXCLUDED.skipped_reviews,
+    star_1 = EXCLUDED.star_1,
+    star_2 = EXCLUDED.star_2,
+    star_3 = EXCLUDED.star_3,
+    star_4 = EXCLUDED.star_4,
+    star_5 = EXCLUDED.star_5,
+    rating_sum = EXCLUDED.rating_sum,
+    sentiment_positive = EXCLUDED.sentiment_positive,
+    sentiment_neutral = EXCLUDED.sentiment_neutral,
+    sentiment_negative = EXCLUDED.sentiment_negative,
+    reviews_with_insights = EXCLUDED.reviews_with_insights,
+    reviews_with_themes = EXCLUDED.reviews_with_themes,
+    updated_at = NOW(),
+    reconciled_at = EXCLUDED.reconciled_at;
+
+COMMIT;
+
+-- Verify the migration
+SELECT tgname, tgrelid::regclass AS table_name
+FROM pg_trigger
+WHERE tgname LIKE 'trigger_product_review_stats_%'
+ORDER BY tgname;
+
+SELECT COUNT(*) AS products, SUM(total_reviews) AS reviews FROM product_review_stats;
@@ -0,0 +1,19 @@
+-- Migration: Composite index for keyset (cursor) pagination of review lists
+-- Purpose: GET /reviews/{asin} and /share/{token}/reviews page by
+--          (COALESCE(review_date, '-infinity') DESC, created_at DESC, id DESC)
+--          with a row comparison against the cursor, so any page is an index seek
+--          instead of OFFSET scanning and discarding all earlier rows.
+--          COALESCE(..., '-infinity') sorts undated reviews last, same as NULLS LAST.
+--          Rating / sentiment filters walk the same index and filter in place.
+-- Note: CREATE INDEX CONCURRENTLY cannot run inside a transaction block (psql -f is fine).
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_reviews_product_keyset
+    ON reviews (product_id, (COALESCE(review_date, '-infinity'::date)) DESC, created_at DESC, id DESC)
+    WHERE is_deleted = false;
+
+COMMENT ON INDEX ix_reviews_product_keyset IS '评论列表游标分页（产品 + 评论日期 + 入库时间 + id，排除逻辑删除）';
+
+-- Verify the migration
+SELECT indexname, indexdef
+FROM pg_indexes
+WHERE tablename = 'reviews' AND indexname = 'ix_reviews_product_keyset';
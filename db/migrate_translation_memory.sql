@@ -0,0 +1,26 @@
+-- Migration: Create translation_memory table
+-- Purpose: Content-addressed translation memory shared across products
+--          (Redis is the hot LRU/TTL layer, this table is the durable fallback)
+
+CREATE TABLE IF NOT EXISTS translation_memory (
+    source_hash VARCHAR(64) PRIMARY KEY,
+    source_text TEXT NOT NULL,
+    translated_text TEXT NOT NULL,
+    model VARCHAR(100) NOT NULL,
+    prompt_version VARCHAR(50) NOT NULL,
+    hit_count INTEGER NOT NULL DEFAULT 0,
+    created_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT NOW(),
+    last_used_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT NOW()
+);
+
+CREATE INDEX IF NOT EXISTS ix_translation_memory_last_used_at ON translation_memory(last_used_at);
+
+COMMENT ON TABLE translation_memory IS '翻译记忆库：按归一化原文 + 模型 + 提示词版本寻址的译文缓存';
+COMMENT ON COLUMN translation_memory.source_hash IS 'sha256(模型|提示词版本|命名空间|归一化原文)';
+COMMENT ON COLUMN translation_memory.hit_count IS '从 Postgres 层命中的次数';
+
+-- Verify the migration
+SELECT column_name, data_type, is_nullable
+FROM information_schema.columns
+WHERE table_name = 'translation_memory'
+ORDER BY ordinal_position;
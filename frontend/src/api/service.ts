@@ -900,8 +900,27 @@ export async function getReviews(params: {
   return response.json();
 }
 
+/**
+ * 导出任务状态（大产品后台渲染时轮询）
+ */
+export interface ApiExportStatus {
+  asin: string;
+  format: 'xlsx' | 'csv';
+  version: number;
+  ready: boolean;
+  status: 'none' | 'queued' | 'processing' | 'completed' | 'failed';
+  rows: number | null;
+  size: number | null;
+  error: string | null;
+}
+
+const EXPORT_POLL_INTERVAL = 2000; // 每2秒轮询一次
+const EXPORT_POLL_TIMEOUT = 10 * 60 * 1000; // 最长等待10分钟
+
 /**
  * 导出评论（兼容现有后端）
+ *
+ * 评论较多的产品由后端后台渲染：响应 202 时轮询 /export/status 直到该版本生成完成，再下载
  */
 export async function exportReviewsByAsin(
   asin: string
@@ -911,7 +930,32 @@ export async function exportReviewsByAsin(
   if (!response.ok) {
     throw new ApiError(response.status, response.statusText);
   }
-  return response.blob();
+  if (response.status !== 202) {
+    return response.blob();
+  }
+
+  const job: { version: number } = await response.json();
+  const statusUrl = `${API_BASE}/reviews/${asin}/export/status?format=xlsx&version=${job.version}`;
+  const deadline = Date.now() + EXPORT_POLL_TIMEOUT;
+  while (Date.now() < deadline) {
+    await new Promise((resolve) => setTimeout(resolve, EXPORT_POLL_INTERVAL));
+    const statusResponse = await fetch(statusUrl);
+    if (!statusResponse.ok) {
+      throw new ApiError(statusResponse.status, statusResponse.statusText);
+    }
+    const status: ApiExportStatus = await statusResponse.json();
+    if (status.status === 'failed') {
+      throw new ApiError(500, status.error || '导出文件生成失败');
+    }
+    if (status.ready) {
+      const fileResponse = await fetch(`${url}?version=${job.version}`);
+      if (!fileResponse.ok || fileResponse.status === 202) {
+        throw new ApiError(fileResponse.status, fileResponse.statusText);
+      }
+      return fileResponse.blob();
+    }
+  }
+  throw new ApiError(504, '导出文件生成超时，请稍后重试');
 }
 
 /**
@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+"""
+分析阶段认领租约基准测试：多 Worker 协作处理同一个大产品
+
+在 Postgres 中创建一个临时产品和 N 条合成评论，启动 W 个 Worker 进程模拟洞察提取
+（LLM 调用用 sleep 模拟，结果写入 ReviewInsight），对比：
+- legacy：旧实现，每个 Worker 一次性加载全部未处理评论（多 Worker 时重复处理）
+- lease：新实现，claim_next_analysis_chunk 按块认领 + 租约（与 Worker 相同：认领落空但仍有
+  未认领评论时退避重试，只在真正没有可认领评论时退出）
+输出总耗时、吞吐量、重复处理的评论数；--crash 会在中途杀掉一个 Worker，
+验证其租约到期后被其他 Worker 重新认领（所有评论最终都被处理）。
+结束后删除临时产品（级联删除评论、洞察和租约）。
+
+Usage:
+    python3 scripts/bench_analysis_leases.py
+    python3 scripts/bench_analysis_leases.py --reviews 5000 --workers 1 2 4 8
+    python3 scripts/bench_analysis_leases.py --mode lease --workers 4 --crash --lease-seconds 10
+"""
+import sys
+import time
+import uuid
+import random
+import argparse
+import multiprocessing
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+# Add backend to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "backend"))
+
+from sqlalchemy import create_engine, select, delete, func, and_
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.product import Product
+from app.models.review import Review
+from app.models.insight import ReviewInsight
+from app.models.analysis_lease import ReviewAnalysisLease
+from app.worker import claim_next_analysis_chunk, release_analysis_leases, ANALYSIS_STAGE_INSIGHTS
+
+SYNC_URL = settings.DATABASE_URL.replace("+asyncpg", "")
+
+
+def create_product(n_reviews: int) -> str:
+    """创建临时产品与合成评论"""
+    engine = create_engine(SYNC_URL)
+    with Session(engine) as db:
+        product = Product(asin=f"BENCH{uuid.uuid4().hex[:5].upper()}", title="bench_analysis_leases")
+        db.add(product)
+        db.flush()
+        db.add_all([
+            Review(
+                product_id=product.id,
+                review_id=f"bench-{i}",
+                rating=random.randint(1, 5),
+                body_original=f"Synthetic review {i}: " + "works fine but the battery is weak. " * random.randint(1, 5)
+            )
+            for i in range(n_reviews)
+        ])
+        db.commit()
+        product_id = str(product.id)
+    engine.dispose()
+    return product_id
+
+
+def drop_product(product_id: str):
+    engine = create_engine(SYNC_URL)
+    with Session(engine) as db:
+        db.execute(delete(Product).where(Product.id == product_id))
+        db.commit()
+    engine.dispose()
+
+
+def reset_results(product_id: str):
+    """清空上一轮的洞察和租约"""
+    engine = create_engine(SYNC_URL)
+    with Session(engine) as db:
+        review_ids = select(Review.id).where(Review.product_id == product_id)
+        db.execute(delete(ReviewInsight).where(ReviewInsight.review_id.in_(review_ids)))
+        db.execute(delete(ReviewAnalysisLease).where(ReviewAnalysisLease.product_id == product_id))
+        db.commit()
+    engine.dispose()
+
+
+def fake_llm(group, latency: float):
+    """模拟一次批量 LLM 调用（长尾延迟）"""
+    time.sleep(random.lognormvariate(0, 0.5) * latency)
+    return [row.id for row in group]
+
+
+def worker_main(mode: str, product_id: str, parallel: int, group_size: int, latency: float, die_after: float):
+    """单个 Worker 进程：认领（或全量加载）→ 并发模拟 LLM → 写回洞察"""
+    engine = create_engine(SYNC_URL, pool_size=2)
+    owner = f"bench-{uuid.uuid4()}"
+    started = time.monotonic()
+    with Session(engine) as db, ThreadPoolExecutor(parallel) as executor:
+        while True:
+            if mode == "lease":
+                rows = claim_next_analysis_chunk(db, product_id, ANALYSIS_STAGE_INSIGHTS, owner, settings.ANALYSIS_CLAIM_CHUNK)
+            else:
+                has_insight = select(ReviewInsight.id).where(ReviewInsight.review_id == Review.id).exists()
+                rows = db.execute(
+                    select(Review.id, Review.body_original)
+                    .where(and_(Review.product_id == product_id, ~has_insight))
+                ).all()
+            if not rows:
+                break
+
+            groups = [rows[i:i + group_size] for i in range(0, len(rows), group_size)]
+            for review_ids in executor.map(lambda g: fake_llm(g, latency), groups):
+                if die_after and time.monotonic() - started > die_after:
+                    # 模拟 Worker 崩溃：不释放租约直接退出
+                    import os
+                    os._exit(1)
+                db.add_all([
+                    ReviewInsight(review_id=review_id, insight_type="_bench", quote="", analysis="bench")
+                    for review_id in review_ids
+                ])
+                db.commit()
+
+            if mode == "legacy":
+                break
+        if mode == "lease":
+            release_analysis_leases(db, ANALYSIS_STAGE_INSIGHTS, owner)
+    engine.dispose()
+
+
+def run(mode: str, product_id: str, workers: int, args) -> dict:
+    reset_results(product_id)
+    started = time.monotonic()
+    processes = [
+        multiprocessing.Process(
+            target=worker_main,
+            args=(mode, product_id, args.parallel, args.group_size, args.latency,
+                  args.latency * 3 if args.crash and i == 0 else 0)
+        )
+        for i in range(workers)
+    ]
+    for p in processes:
+        p.start()
+    for p in processes:
+        p.join()
+    if args.crash and mode == "lease":
+        # 崩溃 Worker 的租约到期后，补跑一个 Worker 收尾（相当于补全任务）
+        time.sleep(args.lease_seconds + 1)
+        worker_main(mode, product_id, args.parallel, args.group_size, args.latency, 0)
+    elapsed = time.monotonic() - started
+
+    engine = create_engine(SYNC_URL)
+    with Session(engine) as db:
+        per_review = (
+            select(ReviewInsight.review_id, func.count().label("n"))
+            .join(Review, Review.id == ReviewInsight.review_id)
+            .where(Review.product_id == product_id)
+            .group_by(ReviewInsight.review_id)
+            .subquery()
+        )
+        done, duplicates = db.execute(
+            select(func.count(), func.count().filter(per_review.c.n > 1)).select_from(per_review)
+        ).one()
+    engine.dispose()
+    return {"elapsed": elapsed, "done": done, "duplicates": duplicates}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark lease-based claiming for insight/theme extraction across workers")
+    parser.add_argument("--reviews", type=int, default=3000, help="合成评论数")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8], help="Worker 进程数（可多个）")
+    parser.add_argument("--mode", choices=["both", "legacy", "lease"], default="both")
+    parser.add_argument("--parallel", type=int, default=20, help="每个 Worker 的并发调用数")
+    parser.add_argument("--group-size", type=int, default=settings.LLM_ANALYSIS_BATCH_SIZE, help="每次调用的评论数")
+    parser.add_argument("--latency", type=float, default=0.5, help="模拟 LLM 调用的中位延迟（秒）")
+    parser.add_argument("--lease-seconds", type=int, default=30, help="租约时长（--crash 时建议调小）")
+    parser.add_argument("--crash", action="store_true", help="中途杀掉第一个 Worker，验证租约过期重认领")
+    args = parser.parse_args()
+
+    settings.ANALYSIS_LEASE_SECONDS = args.lease_seconds
+    modes = ["legacy", "lease"] if args.mode == "both" else [args.mode]
+
+    product_id = create_product(args.reviews)
+    print(f"📊 临时产品 {product_id}，{args.reviews} 条评论，每 Worker 并发 {args.parallel}，延迟 ~{args.latency}s")
+    print(f"{'模式':<8} | {'Worker':>6} | {'耗时(s)':>8} | {'条/秒':>8} | {'已处理':>7} | {'重复处理':>8}")
+    print("-" * 62)
+    try:
+        for workers in args.workers:
+            for mode in modes:
+                r = run(mode, product_id, workers, args)
+                print(
+                    f"{mode:<8} | {workers:>6} | {r['elapsed']:>8.1f} | {r['done'] / r['elapsed']:>8.1f} | "
+                    f"{r['done']:>7} | {r['duplicates']:>8}"
+                )
+    finally:
+        drop_product(product_id)
+
+
+if __name__ == "__main__":
+    main()
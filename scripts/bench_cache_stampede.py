@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+缓存击穿基准测试：热点 Key 过期瞬间的并发重算次数（需要本地 Redis）
+
+模拟一个热门分享链接 / 评论页：--clients 个并发客户端在 --duration 秒内不断读取同一个 Key，
+Key 每 --ttl 秒过期一次，每次重算（模拟 _get_review_reader_data 这类重查询）耗时 --compute-seconds。
+对比三种读取方式：
+- naive：GET 未命中 → 计算 → SETEX（旧写法，过期瞬间所有并发请求都打到 DB）
+- single-flight：CacheService.get_or_compute（每次过期只重算一次，其余请求等待结果）
+- swr：get_or_compute(soft_ttl=...)（过期后继续返回旧值，一个请求在后台刷新，无等待）
+输出"DB 查询次数 / 过期次数"以及请求延迟分位数。
+
+Usage:
+    python3 scripts/bench_cache_stampede.py
+    python3 scripts/bench_cache_stampede.py --clients 200 --ttl 2 --compute-seconds 0.5 --duration 20
+"""
+import sys
+import time
+import uuid
+import asyncio
+import argparse
+from pathlib import Path
+
+# Add backend to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "backend"))
+
+from app.core.cache import CacheService
+from app.core.redis import get_async_redis
+
+
+async def run(mode: str, args) -> dict:
+    redis_client = await get_async_redis()
+    cache = CacheService(redis_client)
+    key = f"cache:bench:stampede:{uuid.uuid4().hex[:8]}"
+    computes = 0
+    latencies = []
+
+    async def compute():
+        nonlocal computes
+        computes += 1
+        await asyncio.sleep(args.compute_seconds)  # 模拟重查询
+        return {"reviews": list(range(500)), "computed_at": time.time()}
+
+    async def read():
+        if mode == "naive":
+            value = await cache.get(key)
+            if value is None:
+                value = await compute()
+                await cache.set(key, value, args.ttl)
+            return value
+        if mode == "single-flight":
+            return await cache.get_or_compute(key, compute, ttl=args.ttl)
+        return await cache.get_or_compute(key, compute, ttl=args.ttl * 10, soft_ttl=args.ttl)
+
+    async def client(deadline: float):
+        while time.monotonic() < deadline:
+            started = time.perf_counter()
+            await read()
+            latencies.append(time.perf_counter() - started)
+            await asyncio.sleep(args.think_seconds)
+
+    deadline = time.monotonic() + args.duration
+    await asyncio.gather(*[client(deadline) for _ in range(args.clients)])
+    await asyncio.sleep(args.compute_seconds * 2)  # 等后台刷新结束
+    await redis_client.delete(key)
+
+    latencies.sort()
+    return {
+        "computes": computes,
+        "expirations": max(1, int(args.duration / args.ttl)),
+        "requests": len(latencies),
+        "p50": latencies[len(latencies) // 2],
+        "p99": latencies[int(len(latencies) * 0.99)],
+        "max": latencies[-1],
+    }
+
+
+async def main_async(args):
+    modes = ["naive", "single-flight", "swr"] if args.mode == "all" else [args.mode]
+    print(f"📊 {args.clients} 个并发客户端，TTL {args.ttl}s，重算耗时 {args.compute_seconds}s，持续 {args.duration}s")
+    print(f"{'模式':<14} | {'请求数':>7} | {'DB 查询':>7} | {'查询/过期':>9} | {'p50(ms)':>8} | {'p99(ms)':>8} | {'max(ms)':>8}")
+    print("-" * 80)
+    for mode in modes:
+        r = await run(mode, args)
+        print(
+            f"{mode:<14} | {r['requests']:>7} | {r['computes']:>7} | {r['computes'] / r['expirations']:>9.1f} | "
+            f"{r['p50'] * 1000:>8.1f} | {r['p99'] * 1000:>8.1f} | {r['max'] * 1000:>8.1f}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark cache stampede protection on a hot key")
+    parser.add_argument("--clients", type=int, default=100, help="并发客户端数")
+    parser.add_argument("--ttl", type=int, default=2, help="缓存 TTL（swr 模式为软 TTL）")
+    parser.add_argument("--compute-seconds", type=float, default=0.3, help="每次重算耗时")
+    parser.add_argument("--think-seconds", type=float, default=0.01, help="客户端两次请求间隔")
+    parser.add_argument("--duration", type=float, default=10.0, help="持续秒数")
+    parser.add_argument("--mode", choices=["all", "naive", "single-flight", "swr"], default="all")
+    args = parser.parse_args()
+    asyncio.run(main_async(args))
+
+
+if __name__ == "__main__":
+    main()
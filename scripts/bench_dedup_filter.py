@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+评论去重预过滤基准测试：Redis Set vs 可扩展 Bloom 过滤器（Redis 位图）
+
+对同一个临时 ASIN 分别用两种后端写入 N 个合成 review_id，然后：
+- 统计 Redis 内存占用（MEMORY USAGE），换算为每百万条的字节数
+- 以入库批次大小（--batch）测量写入 / 查询吞吐（条/秒）
+- 用 --probes 个从未写入的 id 测量实际误判率（Set 恒为 0）
+结束后删除临时键。
+
+Usage:
+    python3 scripts/bench_dedup_filter.py
+    python3 scripts/bench_dedup_filter.py --ids 1000000 --batch 500
+    python3 scripts/bench_dedup_filter.py --ids 200000 --error-rate 0.001 --initial-capacity 10000
+"""
+import sys
+import time
+import uuid
+import argparse
+from pathlib import Path
+
+# Add backend to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "backend"))
+
+from app.core.config import settings
+from app.core.redis import get_sync_redis
+from app.services.deduplicator import ReviewDeduplicatorSync
+
+
+def chunks(items: list, size: int):
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+
+def memory_usage(redis_cli, keys: list) -> int:
+    return sum(redis_cli.memory_usage(key, samples=0) or 0 for key in keys)
+
+
+def run(backend: str, asin: str, ids: list, probes: list, batch: int) -> dict:
+    redis_cli = get_sync_redis()
+    dedup = ReviewDeduplicatorSync(redis_cli, backend=backend)
+
+    started = time.perf_counter()
+    for chunk in chunks(ids, batch):
+        dedup.mark_as_seen(asin, chunk)
+    write_rate = len(ids) / (time.perf_counter() - started)
+
+    started = time.perf_counter()
+    missed = 0
+    for chunk in chunks(ids, batch):
+        missed += sum(1 for seen in dedup.exists_many(asin, chunk) if not seen)
+    read_rate = len(ids) / (time.perf_counter() - started)
+
+    false_positives = 0
+    for chunk in chunks(probes, batch):
+        false_positives += sum(1 for seen in dedup.exists_many(asin, chunk) if seen)
+
+    if backend == "bloom":
+        keys = redis_cli.keys(f"{dedup.bloom.prefix}{asin}:*")
+    else:
+        keys = [f"{dedup.KEY_PREFIX}{asin}"]
+    memory = memory_usage(redis_cli, keys)
+    redis_cli.delete(*keys)
+
+    return {
+        "memory_per_million": memory / len(ids) * 1_000_000,
+        "write_rate": write_rate,
+        "read_rate": read_rate,
+        "missed": missed,
+        "fp_rate": false_positives / len(probes) if probes else 0.0,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark Redis SET vs scalable Bloom filter review dedup")
+    parser.add_argument("--ids", type=int, default=1_000_000, help="写入的 review_id 数")
+    parser.add_argument("--probes", type=int, default=100_000, help="测量误判率的未写入 id 数")
+    parser.add_argument("--batch", type=int, default=200, help="每次写入 / 查询的条数（模拟入库批次）")
+    parser.add_argument("--error-rate", type=float, default=settings.REVIEW_DEDUP_BLOOM_ERROR_RATE)
+    parser.add_argument("--initial-capacity", type=int, default=settings.REVIEW_DEDUP_BLOOM_INITIAL_CAPACITY)
+    parser.add_argument("--backend", choices=["both", "set", "bloom"], default="both")
+    args = parser.parse_args()
+
+    settings.REVIEW_DEDUP_BLOOM_ERROR_RATE = args.error_rate
+    settings.REVIEW_DEDUP_BLOOM_INITIAL_CAPACITY = args.initial_capacity
+    backends = ["set", "bloom"] if args.backend == "both" else [args.backend]
+
+    ids = [f"R{uuid.uuid4().hex[:13].upper()}" for _ in range(args.ids)]
+    probes = [f"P{uuid.uuid4().hex[:13].upper()}" for _ in range(args.probes)]
+    asin = f"BENCH{uuid.uuid4().hex[:5].upper()}"
+
+    print(f"📊 {args.ids:,} 个 review_id，批次 {args.batch}，Bloom 误判率目标 {args.error_rate}")
+    print(f"{'后端':<6} | {'内存/百万条':>12} | {'写入 条/秒':>11} | {'查询 条/秒':>11} | {'漏判':>5} | {'误判率':>8}")
+    print("-" * 70)
+    for backend in backends:
+        r = run(backend, asin, ids, probes, args.batch)
+        print(
+            f"{backend:<6} | {r['memory_per_million'] / 1024 / 1024:>9.1f} MB | {r['write_rate']:>11,.0f} | "
+            f"{r['read_rate']:>11,.0f} | {r['missed']:>5} | {r['fp_rate']:>8.4%}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""
+全自动分析编排基准测试：旧 sleep 轮询 vs 新事件驱动（离散事件模拟）
+
+模拟 N 个产品同时进入全自动分析，对比：
+- 旧实现：task_full_auto_analysis 在 learning 槽位中 sleep(15) 轮询直到洞察/主题完成，
+  每轮 4 个 COUNT 查询，整个等待期占用槽位
+- 新实现：派发后立即释放槽位，阶段任务结束时发出完成事件，就绪判断只跑 1 条聚合查询，
+  另有每 120 秒一次的兜底 tick
+
+输出：全部报告生成完成的总耗时、单产品端到端延迟分位数、就绪判断产生的 DB 查询数。
+不依赖 Redis / Celery / 数据库，可在任意环境运行。
+
+Usage:
+    python3 scripts/bench_pipeline_orchestration.py
+    python3 scripts/bench_pipeline_orchestration.py --products 50 100 200 --learning-slots 4
+    python3 scripts/bench_pipeline_orchestration.py --analysis-slots 20 --seed 7
+"""
+import heapq
+import random
+import argparse
+from itertools import count
+
+POLL_SECONDS = 15             # 旧实现轮询间隔
+POLL_QUERIES = 4              # 旧实现每轮 COUNT 数
+TICK_SECONDS = 120            # 新实现兜底 tick 间隔
+EVENT_QUERIES = 1             # 新实现每次就绪判断的查询数
+
+
+class Simulation:
+    """最小离散事件引擎 + 两类有限槽位（learning / analysis）"""
+
+    def __init__(self, learning_slots: int, analysis_slots: int):
+        self.now = 0.0
+        self.queue = []
+        self.seq = count()
+        self.free = {"learning": learning_slots, "analysis": analysis_slots}
+        self.waiting = {"learning": [], "analysis": []}
+        self.queries = 0
+
+    def at(self, delay: float, fn, *args):
+        heapq.heappush(self.queue, (self.now + delay, next(self.seq), fn, args))
+
+    def acquire(self, pool: str, fn, *args):
+        """拿到槽位后执行 fn（否则排队）"""
+        if self.free[pool] > 0:
+            self.free[pool] -= 1
+            self.at(0, fn, *args)
+        else:
+            self.waiting[pool].append((fn, args))
+
+    def release(self, pool: str):
+        if self.waiting[pool]:
+            fn, args = self.waiting[pool].pop(0)
+            self.at(0, fn, *args)
+        else:
+            self.free[pool] += 1
+
+    def run(self):
+        while self.queue:
+            self.now, _, fn, args = heapq.heappop(self.queue)
+            fn(*args)
+
+
+def make_products(n: int, rng: random.Random):
+    """每个产品的学习 / 洞察 / 主题 / 报告耗时（秒）"""
+    return [
+        {
+            "learning": rng.uniform(30, 90),
+            "insights": rng.uniform(120, 600),
+            "themes": rng.uniform(120, 600),
+            "report": rng.uniform(20, 60),
+        }
+        for _ in range(n)
+    ]
+
+
+def simulate(products, mode: str, learning_slots: int, analysis_slots: int):
+    sim = Simulation(learning_slots, analysis_slots)
+    done_at = {}
+    stages_left = {}
+
+    def start_stage(pid, stage):
+        sim.acquire("analysis", run_stage, pid, stage)
+
+    def run_stage(pid, stage):
+        sim.at(products[pid][stage], finish_stage, pid, stage)
+
+    def finish_stage(pid, stage):
+        sim.release("analysis")
+        stages_left[pid].discard(stage)
+        if mode == "event":
+            sim.queries += EVENT_QUERIES
+            if not stages_left[pid]:
+                sim.acquire("analysis", run_report, pid)
+
+    def run_report(pid):
+        sim.at(products[pid]["report"], finish_report, pid)
+
+    def finish_report(pid):
+        done_at[pid] = sim.now
+        # 旧实现报告在 learning 槽位内生成，新实现在 reports 队列
+        sim.release("learning" if mode == "poll" else "analysis")
+
+    def learning(pid):
+        sim.at(products[pid]["learning"], dispatched, pid)
+
+    def dispatched(pid):
+        stages_left[pid] = {"insights", "themes"}
+        start_stage(pid, "insights")
+        start_stage(pid, "themes")
+        if mode == "poll":
+            sim.at(POLL_SECONDS, poll, pid)
+        else:
+            sim.release("learning")
+            sim.queries += EVENT_QUERIES
+            sim.at(TICK_SECONDS, tick, pid)
+
+    def poll(pid):
+        sim.queries += POLL_QUERIES
+        if stages_left[pid]:
+            sim.at(POLL_SECONDS, poll, pid)
+        else:
+            run_report(pid)
+
+    def tick(pid):
+        if pid in done_at or not stages_left[pid]:
+            return
+        sim.queries += EVENT_QUERIES
+        sim.at(TICK_SECONDS, tick, pid)
+
+    for pid in range(len(products)):
+        sim.acquire("learning", learning, pid)
+    sim.run()
+
+    latencies = sorted(done_at.values())
+    return {
+        "makespan": sim.now,
+        "p50": latencies[len(latencies) // 2],
+        "p95": latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))],
+        "queries": sim.queries,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Simulate polling vs event-driven auto-analysis orchestration")
+    parser.add_argument("--products", type=int, nargs="+", default=[10, 50, 100, 200], help="并发产品数（可多个）")
+    parser.add_argument("--learning-slots", type=int, default=4, help="learning 队列并发槽位")
+    parser.add_argument("--analysis-slots", type=int, default=20, help="洞察/主题/报告可用槽位")
+    parser.add_argument("--seed", type=int, default=42, help="随机种子")
+    args = parser.parse_args()
+
+    print(f"📊 learning 槽位: {args.learning_slots}，分析槽位: {args.analysis_slots}")
+    print(f"{'产品数':>6} | {'模式':<6} | {'总耗时(分)':>10} | {'p50(分)':>8} | {'p95(分)':>8} | {'就绪查询数':>10}")
+    print("-" * 66)
+    for n in args.products:
+        products = make_products(n, random.Random(args.seed))
+        for mode, label in (("poll", "轮询"), ("event", "事件")):
+            r = simulate(products, mode, args.learning_slots, args.analysis_slots)
+            print(
+                f"{n:>6} | {label:<6} | {r['makespan'] / 60:>10.1f} | {r['p50'] / 60:>8.1f} | "
+                f"{r['p95'] / 60:>8.1f} | {r['queries']:>10,}"
+            )
+
+
+if __name__ == "__main__":
+    main()
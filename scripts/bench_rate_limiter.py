@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+限流器基准测试：旧 ZSET 滑动窗口 vs 新 Lua 令牌桶（gevent 高并发）
+
+在本地 Redis 上用 300+ 个 gevent 协程争抢许可，对比：
+- 实际放行速率与任意 1 秒窗口内的峰值（是否冲过上限）
+- 每次放行消耗的 Redis 命令数（往返次数）
+- 获取许可的等待时间分位数，以及新实现中 learning 与 translation 车道的差异
+
+Usage:
+    python3 scripts/bench_rate_limiter.py
+    python3 scripts/bench_rate_limiter.py --greenlets 500 --rps 200 --duration 15
+    python3 scripts/bench_rate_limiter.py --redis-url redis://localhost:6379/15
+"""
+from gevent import monkey
+monkey.patch_all()
+
+import sys
+import time
+import random
+import argparse
+from bisect import bisect_right
+from pathlib import Path
+
+# Add backend to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "backend"))
+
+import gevent
+import redis
+
+from app.core.config import settings
+from app.core.rate_limiter import TokenBucketRateLimiter, LANE_LEARNING, LANE_TRANSLATION
+
+
+class CountingRedis(redis.Redis):
+    """统计发往 Redis 的命令数（每条命令一次往返）"""
+
+    commands = 0
+
+    def execute_command(self, *args, **options):
+        CountingRedis.commands += 1
+        return super().execute_command(*args, **options)
+
+
+class LegacyZSetRateLimiter:
+    """旧实现（worker.py 中的 APIRateLimiter），保留在此作为对照组"""
+
+    def __init__(self, redis_client, max_qps=200, window_seconds=1):
+        self.redis_client = redis_client
+        self.max_qps = max_qps
+        self.window_seconds = window_seconds
+        self.key_prefix = "bench_rate_limit"
+
+    def acquire(self, api_name="qwen"):
+        key = f"{self.key_prefix}:{api_name}"
+        current_time = time.time()
+        window_start = current_time - self.window_seconds
+        self.redis_client.zremrangebyscore(key, 0, window_start)
+        current_count = self.redis_client.zcard(key)
+        if current_count >= self.max_qps:
+            time.sleep(random.uniform(0.1, 0.5))
+            return False
+        self.redis_client.zadd(key, {str(current_time): current_time})
+        self.redis_client.expire(key, self.window_seconds * 2)
+        return True
+
+    def wait_and_acquire(self, api_name="qwen", max_retries=10):
+        for _ in range(max_retries):
+            if self.acquire(api_name):
+                return True
+            time.sleep(random.uniform(0.05, 0.2))
+        raise Exception(f"无法获取 API 许可，已重试 {max_retries} 次")
+
+
+def percentile(values, q):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def max_in_window(timestamps, window=1.0):
+    """任意 window 秒窗口内的最大放行数"""
+    ordered = sorted(timestamps)
+    return max((bisect_right(ordered, t + window) - i for i, t in enumerate(ordered)), default=0)
+
+
+def run(name, acquire_fn, greenlets, duration, learning_ratio):
+    """并发压测，返回放行时间戳与各车道等待时间"""
+    grants, failures = [], 0
+    waits = {LANE_LEARNING: [], LANE_TRANSLATION: []}
+    deadline = time.monotonic() + duration
+
+    def worker():
+        nonlocal failures
+        while time.monotonic() < deadline:
+            lane = LANE_LEARNING if random.random() < learning_ratio else LANE_TRANSLATION
+            start = time.monotonic()
+            try:
+                acquire_fn(lane)
+            except Exception:
+                failures += 1
+                continue
+            now = time.monotonic()
+            if now < deadline:
+                grants.append(now)
+                waits[lane].append(now - start)
+
+    CountingRedis.commands = 0
+    started = time.monotonic()
+    gevent.joinall([gevent.spawn(worker) for _ in range(greenlets)])
+    elapsed = time.monotonic() - started
+    commands = CountingRedis.commands
+
+    print(f"\n=== {name} ===")
+    print(f"放行总数: {len(grants)}，失败: {failures}，耗时 {elapsed:.1f}s")
+    print(f"平均放行速率: {len(grants) / duration:,.1f} 次/秒")
+    print(f"任意 1 秒窗口峰值: {max_in_window(grants)} 次")
+    print(f"Redis 命令数/放行: {commands / max(1, len(grants)):.2f}")
+    for lane, values in waits.items():
+        if values:
+            print(
+                f"  {lane:<12} 等待 p50={percentile(values, 0.5) * 1000:.0f}ms "
+                f"p99={percentile(values, 0.99) * 1000:.0f}ms （{len(values)} 次）"
+            )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark ZSET vs Lua token-bucket rate limiter under gevent")
+    parser.add_argument("--redis-url", type=str, default=settings.REDIS_URL, help="Redis 地址（建议独立 DB）")
+    parser.add_argument("--greenlets", type=int, default=300, help="并发协程数")
+    parser.add_argument("--rps", type=int, default=200, help="限流上限（次/秒）")
+    parser.add_argument("--duration", type=float, default=10.0, help="每组压测时长（秒）")
+    parser.add_argument("--learning-ratio", type=float, default=0.1, help="learning 车道请求占比")
+    args = parser.parse_args()
+
+    client = CountingRedis.from_url(args.redis_url, decode_responses=True)
+    client.delete("bench_rate_limit:qwen", "ratelimit:bench")
+
+    print(f"📊 协程数: {args.greenlets}，上限: {args.rps} 次/秒，时长: {args.duration}s")
+
+    legacy = LegacyZSetRateLimiter(client, max_qps=args.rps)
+    run("旧实现：ZSET 滑动窗口", lambda lane: legacy.wait_and_acquire(), args.greenlets, args.duration, args.learning_ratio)
+
+    # token 上限设为足够大，只比较请求桶
+    bucket = TokenBucketRateLimiter(client, api_name="bench", max_rps=args.rps, max_tpm=10 ** 9)
+    run("新实现：Lua 令牌桶", lambda lane: bucket.acquire(lane=lane, timeout=30), args.greenlets, args.duration, args.learning_ratio)
+
+    client.delete("bench_rate_limit:qwen", "ratelimit:bench")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+评论批量入库基准测试：旧 预查询 + INSERT VALUES vs 新 COPY 临时表 + INSERT ... SELECT RETURNING
+
+在 Postgres 中创建一个临时产品，按 --sizes 生成合成评论 payload，每个规模跑两轮：
+- fresh：全部为新评论
+- overlap：其中 --overlap 比例的 review_id 已存在（校验 inserted/skipped 计数是否准确）
+对比：
+- legacy：SELECT review_id IN (...) 预查询 + 单条 INSERT ... VALUES ... ON CONFLICT DO NOTHING
+- copy：IngestionService._bulk_insert_reviews（COPY 到临时表 + INSERT ... SELECT ... RETURNING）
+输出耗时、条/秒，以及报告的入库数与数据库实际新增数是否一致。
+结束后删除临时产品（级联删除评论）。
+
+Usage:
+    python3 scripts/bench_review_copy_ingest.py
+    python3 scripts/bench_review_copy_ingest.py --sizes 10000 50000 100000 --overlap 0.5
+    python3 scripts/bench_review_copy_ingest.py --mode copy --sizes 100000
+"""
+import sys
+import time
+import uuid
+import random
+import argparse
+from pathlib import Path
+
+# Add backend to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "backend"))
+
+from sqlalchemy import create_engine, select, delete, func, and_
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.product import Product
+from app.models.review import Review, TranslationStatus
+from app.services.ingestion_service import IngestionService
+
+SYNC_URL = settings.DATABASE_URL.replace("+asyncpg", "")
+
+
+def make_payload(n: int, prefix: str) -> list:
+    """合成爬虫上报格式的评论"""
+    return [
+        {
+            "review_id": f"{prefix}{i:07d}",
+            "author": f"Customer {i}",
+            "rating": random.randint(1, 5),
+            "title": "Pretty good\tvalue",
+            "body": "Works fine but the battery is weak.\nWould buy again. " * random.randint(1, 6),
+            "review_date": "March 3, 2024",
+            "verified_purchase": True,
+            "helpful_votes": random.randint(0, 30),
+            "image_urls": ["https://example.com/a.jpg"] if i % 7 == 0 else None,
+            "variant": "Color: Black",
+        }
+        for i in range(n)
+    ]
+
+
+def legacy_insert(db: Session, product_id, reviews: list) -> tuple:
+    """旧实现：预查询已存在 review_id + 单条 INSERT VALUES"""
+    records = [
+        {
+            "id": uuid.uuid4(),
+            "product_id": product_id,
+            "review_id": r["review_id"],
+            "author": r["author"],
+            "rating": r["rating"],
+            "title_original": r["title"],
+            "body_original": r["body"],
+            "review_date": None,
+            "verified_purchase": r["verified_purchase"],
+            "helpful_votes": r["helpful_votes"],
+            "variant": r["variant"],
+            "sentiment": "neutral",
+            "translation_status": TranslationStatus.PENDING.value,
+        }
+        for r in reviews
+    ]
+    review_ids = [r["review_id"] for r in records]
+    existing = set(db.execute(
+        select(Review.review_id).where(
+            and_(Review.product_id == product_id, Review.review_id.in_(review_ids))
+        )
+    ).scalars().all())
+    db.execute(
+        insert(Review).values(records).on_conflict_do_nothing(index_elements=["product_id", "review_id"])
+    )
+    db.commit()
+    return len(records) - len(existing), len(existing)
+
+
+def copy_insert(db: Session, product_id, reviews: list) -> tuple:
+    """新实现：COPY 临时表 + INSERT ... SELECT ... RETURNING"""
+    inserted_ids, skipped = IngestionService(db)._bulk_insert_reviews(product_id, reviews)
+    return len(inserted_ids), skipped
+
+
+def count_reviews(db: Session, product_id) -> int:
+    return db.execute(select(func.count(Review.id)).where(Review.product_id == product_id)).scalar()
+
+
+def run(engine, product_id, mode: str, size: int, overlap: float) -> list:
+    insert_fn = legacy_insert if mode == "legacy" else copy_insert
+    rows = []
+    with Session(engine) as db:
+        db.execute(delete(Review).where(Review.product_id == product_id))
+        db.commit()
+
+        payload = make_payload(size, "F")
+        started = time.perf_counter()
+        inserted, skipped = insert_fn(db, product_id, payload)
+        rows.append(("fresh", time.perf_counter() - started, inserted, skipped, count_reviews(db, product_id)))
+
+        # 一部分 review_id 与已入库数据重复
+        before = count_reviews(db, product_id)
+        reused = int(size * overlap)
+        payload = make_payload(reused, "F") + make_payload(size - reused, "O")
+        random.shuffle(payload)
+        started = time.perf_counter()
+        inserted, skipped = insert_fn(db, product_id, payload)
+        rows.append(("overlap", time.perf_counter() - started, inserted, skipped, count_reviews(db, product_id) - before))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark COPY-based review ingest vs pre-select + INSERT VALUES")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 50000, 100000], help="每批评论数（可多个）")
+    parser.add_argument("--overlap", type=float, default=0.5, help="overlap 轮中已存在 review_id 的比例")
+    parser.add_argument("--mode", choices=["both", "legacy", "copy"], default="both")
+    args = parser.parse_args()
+
+    modes = ["legacy", "copy"] if args.mode == "both" else [args.mode]
+    engine = create_engine(SYNC_URL)
+    with Session(engine) as db:
+        product = Product(asin=f"BENCH{uuid.uuid4().hex[:5].upper()}", title="bench_review_copy_ingest")
+        db.add(product)
+        db.commit()
+        product_id = product.id
+
+    print(f"📊 临时产品 {product_id}，overlap 比例 {args.overlap:.0%}")
+    print(f"{'模式':<7} | {'条数':>7} | {'轮次':<7} | {'耗时(s)':>8} | {'条/秒':>9} | {'报告入库':>8} | {'实际新增':>8} | 计数")
+    print("-" * 82)
+    try:
+        for size in args.sizes:
+            for mode in modes:
+                for phase, elapsed, inserted, skipped, actual in run(engine, product_id, mode, size, args.overlap):
+                    print(
+                        f"{mode:<7} | {size:>7} | {phase:<7} | {elapsed:>8.2f} | {size / elapsed:>9,.0f} | "
+                        f"{inserted:>8} | {actual:>8} | {'✅' if inserted == actual else '❌'}"
+                    )
+    finally:
+        with Session(engine) as db:
+            db.execute(delete(Product).where(Product.id == product_id))
+            db.commit()
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
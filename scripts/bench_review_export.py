@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+"""
+评论导出内存基准测试：旧 ORM + pandas + BytesIO vs 新流式导出（CSV / XLSX）
+
+在 Postgres 中创建一个临时产品，按 --sizes 逐步写入合成评论（约 1/3 带两条洞察、一条主题），
+每个规模分别在独立子进程中执行一次导出，记录：
+- 峰值 RSS（子进程 ru_maxrss，不受父进程影响）
+- 耗时、输出字节数
+模式：
+- legacy：旧实现（get_product_reviews 加载全部 ORM 对象 + DataFrame + 整个 XLSX 写入 BytesIO）
+- csv：ReviewExportService.stream_csv（服务端游标，逐批产出）
+- xlsx：ReviewExportService.write_xlsx（write-only 工作簿写临时文件）
+新实现的峰值 RSS 应基本不随评论数增长。结束后删除临时产品（级联删除评论）。
+
+Usage:
+    python3 scripts/bench_review_export.py
+    python3 scripts/bench_review_export.py --sizes 10000 50000 100000 --modes csv xlsx
+"""
+import os
+import sys
+import json
+import time
+import uuid
+import random
+import asyncio
+import argparse
+import resource
+import subprocess
+from io import BytesIO
+from pathlib import Path
+
+# Add backend to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "backend"))
+
+from sqlalchemy import create_engine, delete, insert
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.product import Product
+from app.models.review import Review, TranslationStatus
+from app.models.insight import ReviewInsight
+from app.models.theme_highlight import ReviewThemeHighlight
+
+SYNC_URL = settings.DATABASE_URL.replace("+asyncpg", "")
+
+
+def seed_reviews(db: Session, product_id, start: int, end: int) -> None:
+    """写入第 start..end 条合成评论及其洞察 / 主题"""
+    for offset in range(start, end, 1000):
+        reviews, insights, themes = [], [], []
+        for i in range(offset, min(offset + 1000, end)):
+            review_uuid = uuid.uuid4()
+            reviews.append({
+                "id": review_uuid,
+                "product_id": product_id,
+                "review_id": f"E{i:09d}",
+                "author": f"Customer {i}",
+                "rating": random.randint(1, 5),
+                "title_original": "Pretty good value",
+                "title_translated": "性价比不错",
+                "body_original": "Works fine but the battery is weak. " * random.randint(2, 10),
+                "body_translated": "能用，但电池不太行。" * random.randint(2, 10),
+                "sentiment": random.choice(["positive", "neutral", "negative"]),
+                "translation_status": TranslationStatus.COMPLETED.value,
+                "is_deleted": False,
+            })
+            if i % 3 == 0:
+                for insight_type in ("strength", "weakness"):
+                    insights.append({
+                        "id": uuid.uuid4(),
+                        "review_id": review_uuid,
+                        "insight_type": insight_type,
+                        "quote": "the battery is weak",
+                        "quote_translated": "电池不太行",
+                        "analysis": "续航是主要槽点",
+                        "dimension": "电池续航",
+                    })
+                themes.append({
+                    "id": uuid.uuid4(),
+                    "review_id": review_uuid,
+                    "theme_type": "who",
+                    "label_name": "通勤人群",
+                    "quote": "use it on my commute",
+                    "explanation": "通勤途中使用",
+                })
+        db.execute(insert(Review), reviews)
+        if insights:
+            db.execute(insert(ReviewInsight), insights)
+        if themes:
+            db.execute(insert(ReviewThemeHighlight), themes)
+    db.commit()
+
+
+# ==========================================
+# 子进程：执行一次导出并报告峰值 RSS
+# ==========================================
+
+async def export_legacy(asin: str) -> int:
+    import pandas as pd
+    from app.db.session import async_session_maker
+    from app.services.review_service import ReviewService
+
+    async with async_session_maker() as db:
+        reviews, _ = await ReviewService(db).get_product_reviews(asin=asin, page=1, page_size=10_000_000)
+        data = [
+            {
+                "rating": r.rating,
+                "title": r.title_original,
+                "title_cn": r.title_translated,
+                "body": r.body_original,
+                "body_cn": r.body_translated,
+                "insights": " | ".join(f"[{i.insight_type}] {i.quote} | 分析: {i.analysis}" for i in r.insights),
+                "themes": " | ".join(t.label_name or "" for t in r.theme_highlights),
+            }
+            for r in reviews
+        ]
+    output = BytesIO()
+    with pd.ExcelWriter(output, engine="openpyxl") as writer:
+        pd.DataFrame(data).to_excel(writer, index=False, sheet_name="Reviews")
+    return output.tell()
+
+
+async def export_streaming(product_id: str, mode: str) -> int:
+    from app.services.export_service import ReviewExportService
+
+    service = ReviewExportService()
+    if mode == "csv":
+        size = 0
+        async for chunk in service.stream_csv(uuid.UUID(product_id)):
+            size += len(chunk)
+        return size
+    path = await service.write_xlsx(uuid.UUID(product_id))
+    size = os.path.getsize(path)
+    os.unlink(path)
+    return size
+
+
+def run_child(args) -> None:
+    started = time.perf_counter()
+    if args.child == "legacy":
+        size = asyncio.run(export_legacy(args.asin))
+    else:
+        size = asyncio.run(export_streaming(args.product_id, args.child))
+    print(json.dumps({
+        "bytes": size,
+        "seconds": time.perf_counter() - started,
+        "max_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    }))
+
+
+def measure(mode: str, product_id, asin: str) -> dict:
+    output = subprocess.run(
+        [sys.executable, __file__, "--child", mode, "--product-id", str(product_id), "--asin", asin],
+        check=True, capture_output=True, text=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark peak RSS of review export: legacy vs streaming")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[5000, 20000, 50000], help="评论数（递增，可多个）")
+    parser.add_argument("--modes", nargs="+", choices=["legacy", "csv", "xlsx"], default=["legacy", "csv", "xlsx"])
+    parser.add_argument("--child", choices=["legacy", "csv", "xlsx"], help=argparse.SUPPRESS)
+    parser.add_argument("--product-id", help=argparse.SUPPRESS)
+    parser.add_argument("--asin", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run_child(args)
+        return
+
+    engine = create_engine(SYNC_URL)
+    asin = f"BENCH{uuid.uuid4().hex[:5].upper()}"
+    with Session(engine) as db:
+        product = Product(asin=asin, title="bench_review_export")
+        db.add(product)
+        db.commit()
+        product_id = product.id
+
+    print(f"📊 临时产品 {product_id}（{asin}）")
+    print(f"{'评论数':>8} | {'模式':<6} | {'峰值 RSS(MB)':>12} | {'耗时(s)':>8} | {'输出(MB)':>9}")
+    print("-" * 56)
+    try:
+        seeded = 0
+        for size in sorted(args.sizes):
+            with Session(engine) as db:
+                seed_reviews(db, product_id, seeded, size)
+            seeded = size
+            for mode in args.modes:
+                r = measure(mode, product_id, asin)
+                print(
+                    f"{size:>8} | {mode:<6} | {r['max_rss_mb']:>12.1f} | {r['seconds']:>8.2f} | "
+                    f"{r['bytes'] / 1024 / 1024:>9.1f}"
+                )
+    finally:
+        with Session(engine) as db:
+            db.execute(delete(Product).where(Product.id == product_id))
+            db.commit()
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""
+评论列表分页基准测试：OFFSET + 每页 COUNT(*) vs 游标分页（keyset）
+
+在 Postgres 中创建一个临时产品并写入 --reviews 条合成评论（约 5% 无评论日期），
+对 --pages 中的每个页码分别测量：
+- legacy：旧实现，每页 COUNT(*) + ORDER BY review_date DESC NULLS LAST, created_at DESC OFFSET
+- offset：新排序键 + OFFSET（不 COUNT），即未带游标时的请求
+- keyset：新排序键 + 游标行比较（ix_reviews_product_keyset 索引定位）
+输出每种方式的中位数 / p95 延迟（毫秒），--explain 打印最深一页游标查询的执行计划。
+结束后删除临时产品（级联删除评论）。
+
+需要先执行 db/migrate_review_keyset_index.sql 创建索引。
+
+Usage:
+    python3 scripts/bench_review_keyset.py
+    python3 scripts/bench_review_keyset.py --reviews 20000 --pages 1 500 --page-size 20 --repeat 50
+    python3 scripts/bench_review_keyset.py --explain
+"""
+import sys
+import time
+import uuid
+import random
+import argparse
+from datetime import date, timedelta
+from pathlib import Path
+
+# Add backend to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "backend"))
+
+from sqlalchemy import create_engine, select, delete, func, and_, text, insert
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.product import Product
+from app.models.review import Review, TranslationStatus
+from app.services.review_service import REVIEW_KEYSET_ORDER, encode_review_cursor, review_cursor_condition
+
+SYNC_URL = settings.DATABASE_URL.replace("+asyncpg", "")
+
+
+def seed_reviews(db: Session, product_id, n: int) -> None:
+    """写入合成评论（分批 INSERT）"""
+    start = date(2019, 1, 1)
+    for offset in range(0, n, 1000):
+        rows = [
+            {
+                "id": uuid.uuid4(),
+                "product_id": product_id,
+                "review_id": f"K{offset + i:09d}",
+                "author": f"Customer {offset + i}",
+                "rating": random.randint(1, 5),
+                "title_original": "Pretty good value",
+                "body_original": "Works fine but the battery is weak. " * random.randint(1, 4),
+                "review_date": None if random.random() < 0.05 else start + timedelta(days=random.randint(0, 2000)),
+                "sentiment": random.choice(["positive", "neutral", "negative"]),
+                "translation_status": TranslationStatus.COMPLETED.value,
+                "is_deleted": False,
+            }
+            for i in range(min(1000, n - offset))
+        ]
+        db.execute(insert(Review), rows)
+    db.commit()
+    db.execute(text("ANALYZE reviews"))
+    db.commit()
+
+
+def conditions(product_id) -> list:
+    return [Review.product_id == product_id, Review.is_deleted == False]
+
+
+def legacy_page(db: Session, product_id, page: int, page_size: int, cursor: str) -> None:
+    db.execute(select(func.count(Review.id)).where(and_(*conditions(product_id)))).scalar()
+    db.execute(
+        select(Review)
+        .where(and_(*conditions(product_id)))
+        .order_by(Review.review_date.desc().nullslast(), Review.created_at.desc())
+        .offset((page - 1) * page_size)
+        .limit(page_size)
+    ).scalars().all()
+
+
+def offset_page(db: Session, product_id, page: int, page_size: int, cursor: str) -> None:
+    db.execute(
+        select(Review)
+        .where(and_(*conditions(product_id)))
+        .order_by(*REVIEW_KEYSET_ORDER)
+        .offset((page - 1) * page_size)
+        .limit(page_size + 1)
+    ).scalars().all()
+
+
+def keyset_page(db: Session, product_id, page: int, page_size: int, cursor: str) -> None:
+    where = conditions(product_id)
+    if cursor:
+        where.append(review_cursor_condition(cursor))
+    db.execute(
+        select(Review).where(and_(*where)).order_by(*REVIEW_KEYSET_ORDER).limit(page_size + 1)
+    ).scalars().all()
+
+
+def cursor_for_page(db: Session, product_id, page: int, page_size: int) -> str:
+    """第 page 页的游标 = 上一页最后一条评论的排序键"""
+    if page <= 1:
+        return None
+    last = db.execute(
+        select(Review)
+        .where(and_(*conditions(product_id)))
+        .order_by(*REVIEW_KEYSET_ORDER)
+        .offset((page - 1) * page_size - 1)
+        .limit(1)
+    ).scalar_one()
+    return encode_review_cursor(last)
+
+
+def measure(fn, db: Session, product_id, page: int, page_size: int, cursor: str, repeat: int) -> tuple:
+    fn(db, product_id, page, page_size, cursor)  # 预热
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn(db, product_id, page, page_size, cursor)
+        samples.append((time.perf_counter() - started) * 1000)
+        db.rollback()
+    samples.sort()
+    return samples[len(samples) // 2], samples[int(len(samples) * 0.95)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark OFFSET + COUNT vs keyset pagination of review lists")
+    parser.add_argument("--reviews", type=int, default=20000, help="临时产品的评论数")
+    parser.add_argument("--pages", type=int, nargs="+", default=[1, 500], help="测量的页码（可多个）")
+    parser.add_argument("--page-size", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=30, help="每种方式每页重复次数")
+    parser.add_argument("--explain", action="store_true", help="打印最深一页游标查询的执行计划")
+    args = parser.parse_args()
+
+    engine = create_engine(SYNC_URL)
+    with Session(engine) as db:
+        has_index = db.execute(text(
+            "SELECT 1 FROM pg_indexes WHERE tablename = 'reviews' AND indexname = 'ix_reviews_product_keyset'"
+        )).scalar()
+        if not has_index:
+            print("⚠️  未找到 ix_reviews_product_keyset，请先执行 db/migrate_review_keyset_index.sql")
+        product = Product(asin=f"BENCH{uuid.uuid4().hex[:5].upper()}", title="bench_review_keyset")
+        db.add(product)
+        db.commit()
+        product_id = product.id
+
+    try:
+        with Session(engine) as db:
+            started = time.perf_counter()
+            seed_reviews(db, product_id, args.reviews)
+            print(f"📊 临时产品 {product_id}：写入 {args.reviews:,} 条评论（{time.perf_counter() - started:.1f}s），"
+                  f"每页 {args.page_size} 条，每项重复 {args.repeat} 次")
+            print(f"{'页码':>6} | {'方式':<7} | {'p50(ms)':>8} | {'p95(ms)':>8}")
+            print("-" * 40)
+            for page in args.pages:
+                cursor = cursor_for_page(db, product_id, page, args.page_size)
+                for mode, fn in (("legacy", legacy_page), ("offset", offset_page), ("keyset", keyset_page)):
+                    p50, p95 = measure(fn, db, product_id, page, args.page_size, cursor, args.repeat)
+                    print(f"{page:>6} | {mode:<7} | {p50:>8.2f} | {p95:>8.2f}")
+
+            if args.explain:
+                page = max(args.pages)
+                cursor = cursor_for_page(db, product_id, page, args.page_size)
+                where = conditions(product_id)
+                if cursor:
+                    where.append(review_cursor_condition(cursor))
+                query = select(Review.id).where(and_(*where)).order_by(*REVIEW_KEYSET_ORDER).limit(args.page_size + 1)
+                compiled = query.compile(engine, compile_kwargs={"literal_binds": True})
+                print(f"\n=== EXPLAIN keyset page {page} ===")
+                for line in db.execute(text(f"EXPLAIN (ANALYZE, BUFFERS) {compiled}")).scalars():
+                    print(line)
+    finally:
+        with Session(engine) as db:
+            db.execute(delete(Product).where(Product.id == product_id))
+            db.commit()
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,244 @@
+#!/usr/bin/env python3
+"""
+评论统计基准测试：实时聚合评论表 vs 读 product_review_stats 汇总行
+
+在 Postgres 中创建一个临时产品并写入 --reviews 条合成评论（约 1/3 带洞察、1/4 带主题），
+写入本身经过汇总触发器，顺带输出写入吞吐。然后对三个读接口的查询分别测量：
+- stats：旧 get_product_stats（条件聚合 + EXISTS 子查询）vs 产品 LEFT JOIN 汇总行
+- products：旧 get_all_products（LEFT JOIN reviews GROUP BY + 洞察 / 主题 COUNT DISTINCT）vs LEFT JOIN 汇总行
+- projects：旧 get_my_projects 的 review_stats 子查询（整张评论表 GROUP BY）vs LEFT JOIN 汇总行
+输出每种方式的中位数 / p95 延迟（毫秒），最后用全量聚合校验汇总行是否一致。
+结束后删除临时产品（级联删除评论与汇总行）。
+
+需要先执行 db/migrate_product_review_stats.sql 创建汇总表与触发器。
+
+Usage:
+    python3 scripts/bench_review_stats.py
+    python3 scripts/bench_review_stats.py --reviews 2000000 --repeat 10
+"""
+import sys
+import time
+import uuid
+import random
+import argparse
+from pathlib import Path
+
+# Add backend to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "backend"))
+
+from sqlalchemy import create_engine, select, delete, func, and_, case, distinct, exists, text, insert
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.product import Product
+from app.models.review import Review, TranslationStatus
+from app.models.insight import ReviewInsight
+from app.models.theme_highlight import ReviewThemeHighlight
+from app.models.product_review_stats import ProductReviewStats
+from app.services.review_service import review_rollup_query, REVIEW_ROLLUP_COLUMNS
+
+SYNC_URL = settings.DATABASE_URL.replace("+asyncpg", "")
+
+STATUSES = [s.value for s in TranslationStatus]
+
+
+def seed_reviews(db: Session, product_id, n: int, batch: int) -> None:
+    """写入合成评论及洞察 / 主题（分批 INSERT，每批一次提交）"""
+    for offset in range(0, n, batch):
+        reviews, insights, themes = [], [], []
+        for i in range(offset, min(offset + batch, n)):
+            review_uuid = uuid.uuid4()
+            reviews.append({
+                "id": review_uuid,
+                "product_id": product_id,
+                "review_id": f"S{i:09d}",
+                "rating": random.randint(1, 5),
+                "body_original": "Works fine but the battery is weak.",
+                "sentiment": random.choice(["positive", "neutral", "negative"]),
+                "translation_status": random.choice(STATUSES),
+                "is_deleted": random.random() < 0.01,
+            })
+            if i % 3 == 0:
+                insights.append({
+                    "id": uuid.uuid4(),
+                    "review_id": review_uuid,
+                    "insight_type": "weakness",
+                    "quote": "the battery is weak",
+                    "analysis": "续航是主要槽点",
+                    "dimension": "电池续航",
+                })
+            if i % 4 == 0:
+                themes.append({
+                    "id": uuid.uuid4(),
+                    "review_id": review_uuid,
+                    "theme_type": "who",
+                    "label_name": "通勤人群",
+                    "quote": "use it on my commute",
+                })
+        db.execute(insert(Review), reviews)
+        if insights:
+            db.execute(insert(ReviewInsight), insights)
+        if themes:
+            db.execute(insert(ReviewThemeHighlight), themes)
+        db.commit()
+    db.execute(text("ANALYZE reviews"))
+    db.execute(text("ANALYZE review_insights"))
+    db.execute(text("ANALYZE review_theme_highlights"))
+    db.commit()
+
+
+# ==========================================
+# 旧实现（实时聚合）
+# ==========================================
+
+def legacy_stats(db: Session, product_id) -> None:
+    alive = Review.is_deleted == False
+    db.execute(select(
+        func.count(case((alive, Review.id))),
+        *[func.count(case((and_(alive, Review.translation_status == s), Review.id))) for s in STATUSES],
+        *[func.count(case((and_(alive, Review.rating == star), Review.id))) for star in range(1, 6)],
+        *[func.count(case((and_(alive, Review.sentiment == s), Review.id))) for s in ("positive", "neutral", "negative")],
+        func.avg(case((alive, Review.rating))),
+    ).where(Review.product_id == product_id)).one()
+    db.execute(select(
+        func.count(case((and_(alive, exists(select(1).where(ReviewInsight.review_id == Review.id))), Review.id))),
+        func.count(case((and_(alive, exists(select(1).where(ReviewThemeHighlight.review_id == Review.id))), Review.id))),
+    ).where(Review.product_id == product_id)).one()
+
+
+def legacy_products(db: Session, product_id) -> None:
+    rows = db.execute(
+        select(
+            Product.id,
+            func.count(Review.id),
+            func.count(case((Review.translation_status == TranslationStatus.COMPLETED.value, Review.id))),
+            func.avg(Review.rating),
+        )
+        .outerjoin(Review, Review.product_id == Product.id)
+        .group_by(Product.id)
+    ).all()
+    product_ids = [row[0] for row in rows]
+    for child in (ReviewInsight, ReviewThemeHighlight):
+        db.execute(
+            select(Review.product_id, func.count(distinct(child.review_id)))
+            .join(child, child.review_id == Review.id)
+            .where(Review.product_id.in_(product_ids))
+            .group_by(Review.product_id)
+        ).all()
+
+
+def legacy_projects(db: Session, product_id) -> None:
+    review_stats = (
+        select(
+            Review.product_id,
+            func.count(Review.id).label("total_reviews"),
+            func.count(case((Review.translation_status == TranslationStatus.COMPLETED.value, Review.id))).label("translated"),
+        )
+        .where(Review.is_deleted == False)
+        .group_by(Review.product_id)
+        .subquery()
+    )
+    db.execute(
+        select(Product.id, review_stats.c.total_reviews, review_stats.c.translated)
+        .outerjoin(review_stats, Product.id == review_stats.c.product_id)
+        .where(Product.id == product_id)
+    ).all()
+
+
+# ==========================================
+# 新实现（汇总行）
+# ==========================================
+
+def rollup_stats(db: Session, product_id) -> None:
+    db.execute(
+        select(Product, ProductReviewStats)
+        .outerjoin(ProductReviewStats, ProductReviewStats.product_id == Product.id)
+        .where(Product.id == product_id)
+    ).one()
+
+
+def rollup_products(db: Session, product_id) -> None:
+    db.execute(
+        select(Product, ProductReviewStats)
+        .outerjoin(ProductReviewStats, ProductReviewStats.product_id == Product.id)
+        .order_by(Product.updated_at.desc())
+    ).all()
+
+
+def rollup_projects(db: Session, product_id) -> None:
+    db.execute(
+        select(Product.id, ProductReviewStats.total_reviews, ProductReviewStats.translated_reviews)
+        .outerjoin(ProductReviewStats, Product.id == ProductReviewStats.product_id)
+        .where(Product.id == product_id)
+    ).all()
+
+
+def measure(fn, db: Session, product_id, repeat: int) -> tuple:
+    fn(db, product_id)  # 预热
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn(db, product_id)
+        samples.append((time.perf_counter() - started) * 1000)
+        db.rollback()
+    samples.sort()
+    return samples[len(samples) // 2], samples[int(len(samples) * 0.95)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark live review aggregation vs product_review_stats rollup")
+    parser.add_argument("--reviews", type=int, default=1_000_000, help="临时产品的评论数")
+    parser.add_argument("--batch", type=int, default=5000, help="每批写入评论数（每批一次提交）")
+    parser.add_argument("--repeat", type=int, default=20, help="每种方式重复次数")
+    args = parser.parse_args()
+
+    engine = create_engine(SYNC_URL)
+    with Session(engine) as db:
+        has_trigger = db.execute(text(
+            "SELECT 1 FROM pg_trigger WHERE tgname = 'trigger_product_review_stats_reviews_insert'"
+        )).scalar()
+        if not has_trigger:
+            print("⚠️  未找到汇总触发器，请先执行 db/migrate_product_review_stats.sql")
+            return
+        product = Product(asin=f"BENCH{uuid.uuid4().hex[:5].upper()}", title="bench_review_stats")
+        db.add(product)
+        db.commit()
+        product_id = product.id
+
+    try:
+        with Session(engine) as db:
+            started = time.perf_counter()
+            seed_reviews(db, product_id, args.reviews, args.batch)
+            elapsed = time.perf_counter() - started
+            print(f"📊 临时产品 {product_id}：写入 {args.reviews:,} 条评论（含触发器）{elapsed:.1f}s，"
+                  f"{args.reviews / elapsed:,.0f} 条/s；每项重复 {args.repeat} 次")
+            print(f"{'接口':<9} | {'方式':<7} | {'p50(ms)':>9} | {'p95(ms)':>9}")
+            print("-" * 44)
+            for name, legacy, rollup in (
+                ("stats", legacy_stats, rollup_stats),
+                ("products", legacy_products, rollup_products),
+                ("projects", legacy_projects, rollup_projects),
+            ):
+                for mode, fn in (("legacy", legacy), ("rollup", rollup)):
+                    p50, p95 = measure(fn, db, product_id, args.repeat)
+                    print(f"{name:<9} | {mode:<7} | {p50:>9.2f} | {p95:>9.2f}")
+
+            stored = db.execute(
+                select(*[getattr(ProductReviewStats, column) for column in REVIEW_ROLLUP_COLUMNS])
+                .where(ProductReviewStats.product_id == product_id)
+            ).one()
+            actual = db.execute(review_rollup_query(product_id)).one()
+            mismatched = [c for c, old, new in zip(REVIEW_ROLLUP_COLUMNS, stored, actual) if old != new]
+            if mismatched:
+                print(f"\n❌ 汇总行与全量聚合不一致: {mismatched}")
+            else:
+                print(f"\n✅ 汇总行与全量聚合一致（total={actual.total_reviews:,}）")
+    finally:
+        with Session(engine) as db:
+            db.execute(delete(Product).where(Product.id == product_id))
+            db.commit()
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
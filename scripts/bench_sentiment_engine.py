@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+本地情感引擎基准测试：与 Review.sentiment 中已存储的 LLM 标签对比准确率与吞吐量
+
+Usage:
+    python3 scripts/bench_sentiment_engine.py
+    python3 scripts/bench_sentiment_engine.py --limit 20000
+    python3 scripts/bench_sentiment_engine.py --asin B08XXXXXXX  # 只测某个产品
+"""
+import sys
+import time
+import argparse
+from collections import Counter
+from pathlib import Path
+
+# Add backend to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "backend"))
+
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.product import Product
+from app.models.review import Review, TranslationStatus
+from app.services.sentiment_engine import sentiment_engine
+
+LABELS = ["positive", "neutral", "negative"]
+
+
+def load_labeled_reviews(limit: int, asin: str = None):
+    """读取已完成翻译、带 LLM 情感标签的评论"""
+    engine = create_engine(settings.DATABASE_URL.replace("+asyncpg", ""))
+    with Session(engine) as db:
+        query = select(Review.id, Review.body_original, Review.rating, Review.sentiment).where(
+            Review.translation_status == TranslationStatus.COMPLETED.value,
+            Review.sentiment.in_(LABELS),
+            Review.body_original.isnot(None)
+        )
+        if asin:
+            query = query.join(Product, Product.id == Review.product_id).where(Product.asin == asin)
+        rows = db.execute(query.limit(limit)).all()
+    engine.dispose()
+    return [
+        {"id": str(row.id), "text": row.body_original, "rating": row.rating, "llm": row.sentiment}
+        for row in rows
+    ]
+
+
+def run_benchmark(items, rounds: int):
+    """打印准确率、混淆矩阵、吞吐量与 LLM 复核比例"""
+    if not items:
+        print("❌ 没有可用的带标签评论")
+        return
+
+    # 预热一次，排除首次导入/分配开销
+    sentiment_engine.classify_batch(items[:100])
+
+    start = time.perf_counter()
+    for _ in range(rounds):
+        predictions = sentiment_engine.classify_batch(items)
+    elapsed = (time.perf_counter() - start) / rounds
+
+    total = len(items)
+    correct = sum(1 for item, p in zip(items, predictions) if p.label == item["llm"])
+    confident = [(item, p) for item, p in zip(items, predictions) if not p.needs_llm]
+    confident_correct = sum(1 for item, p in confident if p.label == item["llm"])
+    confusion = Counter((item["llm"], p.label) for item, p in zip(items, predictions))
+
+    print(f"\n📊 样本数: {total}")
+    print(f"⚡ 吞吐量: {total / elapsed:,.0f} 条/秒（每批 {elapsed * 1000:.1f} ms，{rounds} 轮平均）")
+    print(f"🎯 全量准确率（仅本地）: {correct / total:.2%}")
+    print(f"🤖 需 LLM 复核: {total - len(confident)} 条 ({(total - len(confident)) / total:.2%})")
+    if confident:
+        print(f"✅ 高置信度子集准确率: {confident_correct / len(confident):.2%} ({len(confident)} 条)")
+
+    print("\n混淆矩阵（行 = LLM 标签，列 = 本地标签）")
+    print(f"{'':>10}" + "".join(f"{label:>10}" for label in LABELS))
+    for actual in LABELS:
+        print(f"{actual:>10}" + "".join(f"{confusion[(actual, pred)]:>10}" for pred in LABELS))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark local sentiment engine against stored LLM labels")
+    parser.add_argument("--limit", type=int, default=5000, help="最多读取的评论数")
+    parser.add_argument("--asin", type=str, help="只测试指定产品")
+    parser.add_argument("--rounds", type=int, default=5, help="吞吐量测试轮数")
+    args = parser.parse_args()
+
+    items = load_labeled_reviews(args.limit, args.asin)
+    run_benchmark(items, args.rounds)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+gevent 协作式数据库 I/O 压力测试：证明 DB 调用与 LLM 调用在同一进程内交错执行
+
+在 gevent monkey patch 下启动：
+- DB 协程：每个执行 SELECT pg_sleep(--query-seconds)，模拟慢查询 / 写回
+- LLM 协程：gevent.sleep(--llm-seconds) 模拟 HTTP 等待（已被 monkey patch 的 socket 行为一致）
+- 心跳协程：每 10ms 醒来一次，记录最大间隔（hub 被阻塞时间）
+分别在阻塞模式（默认 psycopg2）和协作模式（app/db/green.py 的 wait callback）下运行，对比：
+- 总耗时（协作模式下 ≈ 单次查询耗时；阻塞模式下 ≈ 查询数 × 耗时）
+- 心跳最大间隔
+- 连接池 checked-out 峰值（用于推导 WORKER_DB_POOL_SIZE）
+
+Usage:
+    python3 scripts/stress_gevent_db.py
+    python3 scripts/stress_gevent_db.py --db-greenlets 100 --llm-greenlets 150 --query-seconds 0.2
+    python3 scripts/stress_gevent_db.py --pool-size 20 --max-overflow 30
+"""
+from gevent import monkey
+monkey.patch_all()
+
+import sys
+import time
+import argparse
+from pathlib import Path
+
+# Add backend to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "backend"))
+
+import gevent
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.pool import QueuePool
+
+from app.core.config import settings
+from app.db.green import make_psycopg2_green, make_psycopg2_blocking
+
+SYNC_URL = settings.DATABASE_URL.replace("+asyncpg", "")
+
+
+def run(label: str, args) -> None:
+    engine = create_engine(
+        SYNC_URL,
+        poolclass=QueuePool,
+        pool_size=args.pool_size,
+        max_overflow=args.max_overflow,
+        pool_timeout=60,
+    )
+    stats = {"checked_out": 0, "peak": 0}
+
+    @event.listens_for(engine, "checkout")
+    def on_checkout(*_):
+        stats["checked_out"] += 1
+        stats["peak"] = max(stats["peak"], stats["checked_out"])
+
+    @event.listens_for(engine, "checkin")
+    def on_checkin(*_):
+        stats["checked_out"] -= 1
+
+    # 预热连接，排除建连耗时
+    with engine.connect() as conn:
+        conn.execute(text("SELECT 1"))
+
+    done = {"db": [], "llm": []}
+    max_gap = 0.0
+    running = True
+
+    def db_worker():
+        with engine.connect() as conn:
+            conn.execute(text("SELECT pg_sleep(:s)"), {"s": args.query_seconds})
+        done["db"].append(time.perf_counter() - started)
+
+    def llm_worker():
+        gevent.sleep(args.llm_seconds)
+        done["llm"].append(time.perf_counter() - started)
+
+    def heartbeat():
+        nonlocal max_gap
+        last = time.perf_counter()
+        while running:
+            gevent.sleep(0.01)
+            now = time.perf_counter()
+            max_gap = max(max_gap, now - last - 0.01)
+            last = now
+
+    hb = gevent.spawn(heartbeat)
+    started = time.perf_counter()
+    jobs = [gevent.spawn(db_worker) for _ in range(args.db_greenlets)]
+    jobs += [gevent.spawn(llm_worker) for _ in range(args.llm_greenlets)]
+    gevent.joinall(jobs, raise_error=True)
+    elapsed = time.perf_counter() - started
+    running = False
+    hb.join()
+    engine.dispose()
+
+    print(f"\n=== {label} ===")
+    print(f"总耗时: {elapsed:.2f}s（{args.db_greenlets} 个查询 × {args.query_seconds}s，"
+          f"{args.llm_greenlets} 个 LLM 等待 × {args.llm_seconds}s）")
+    print(f"LLM 协程最晚完成: {max(done['llm'], default=0):.2f}s（理想值 ≈ {args.llm_seconds}s）")
+    print(f"DB 协程最晚完成: {max(done['db'], default=0):.2f}s")
+    print(f"心跳最大延迟: {max_gap * 1000:.0f}ms")
+    print(f"连接池 checked-out 峰值: {stats['peak']}（pool_size={args.pool_size}, max_overflow={args.max_overflow}）")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Stress test cooperative psycopg2 under gevent")
+    parser.add_argument("--db-greenlets", type=int, default=50, help="并发 DB 协程数")
+    parser.add_argument("--llm-greenlets", type=int, default=150, help="并发模拟 LLM 协程数")
+    parser.add_argument("--query-seconds", type=float, default=0.1, help="每次 pg_sleep 秒数")
+    parser.add_argument("--llm-seconds", type=float, default=0.5, help="模拟 LLM 等待秒数")
+    parser.add_argument("--pool-size", type=int, default=settings.WORKER_DB_POOL_SIZE)
+    parser.add_argument("--max-overflow", type=int, default=settings.WORKER_DB_MAX_OVERFLOW)
+    parser.add_argument("--mode", choices=["both", "blocking", "green"], default="both")
+    args = parser.parse_args()
+
+    if args.mode in ("both", "blocking"):
+        make_psycopg2_blocking()
+        run("阻塞模式：psycopg2 默认", args)
+    if args.mode in ("both", "green"):
+        make_psycopg2_green(force=True)
+        run("协作模式：gevent wait callback", args)
+
+
+if __name__ == "__main__":
+    main()